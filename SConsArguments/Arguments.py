@@ -26,16 +26,26 @@ Provides the `_Arguments` class.
 
 __docformat__ = "restructuredText"
 
-from SConsArguments.Util import ENV, VAR, OPT, ALL, UNDEFINED
+from SConsArguments.Util import ENV, VAR, OPT, OSE, ALL, MISSING, UNDEFINED
 from SConsArguments.Util import _compose_mappings, _invert_dict, _build_resubst_dict
+from SConsArguments.Util import _is_immutable, _value_digest
+from SConsArguments.Util import _placeholders, _expand_placeholders
 from SConsArguments.VariablesWrapper import _VariablesWrapper
 from SConsArguments.Proxy import _ArgumentsProxy
+from SConsArguments import Instrumentation
+from SConsArguments.Defaults import LazyDefault, _resolve
+from SConsArguments.Suggestions import _rank, _did_you_mean
+from SConsArguments.Sources import _PendingSources
+import SCons.Errors
+import SCons.Util
+import weakref
 
 #############################################################################
 class _Arguments(object):
     #========================================================================
     """Binds *arguments* to their *endpoints* (construction variables,
-    command-line variables and command-line options).
+    command-line variables, command-line options and OS environment
+    variables).
 
     In fact, the only internal data the object holds is a list of supplementary
     dictionaries to map the names of variables between the namespace of
@@ -44,7 +54,7 @@ class _Arguments(object):
     **Note**:
 
         In several places we use ``ns`` as placeholder for one of the `ENV`,
-        `VAR` or `OPT` *endpoint* selectors.
+        `VAR`, `OPT` or `OSE` *endpoint* selectors.
     """
     #========================================================================
 
@@ -58,8 +68,13 @@ class _Arguments(object):
                 declarations of *arguments*,
         """
         # -------------------------------------------------------------------
-        self.__keys = decls.keys()
+        from SConsArguments.Importer import _get_origins
+        self.__keys = list(decls.keys())
         self.__init_supp_dicts(decls)
+        self.__env_caches = []
+        self.__origins = _get_origins(decls) if decls is not None else {}
+        self.__suggest_var_keys = decls.suggest_var_keys if decls is not None else None
+        self.__ose_table = decls.get_ose_table() if decls is not None else ()
 
     #========================================================================
     def __reset_supp_dicts(self):
@@ -70,6 +85,14 @@ class _Arguments(object):
         self._resubst_dict = [{} for n in range(0,ALL)]
         self._iresubst_dict = [{} for n in range(0,ALL)]
 
+    #========================================================================
+    def _get_supp_dicts(self):
+        """Return the supplementary dictionaries as a tuple ``(rename,
+        irename, resubst, iresubst)``, each being a list indexed by namespace.
+        This is internal method and IS **NOT a part of public API**"""
+        return (self._rename_dict, self._irename_dict, self._resubst_dict,
+                self._iresubst_dict)
+
     #========================================================================
     def __init_supp_dicts(self, decls):
         """Initialize supplementary dictionaries according to variable
@@ -172,7 +195,12 @@ class _Arguments(object):
         return self._rename_dict[OPT][key]
 
     #========================================================================
-    def update_env_from_vars(self, env, variables, args=None):
+    def get_ose_key(self, key):
+        """Similar to `get_key(OSE,key)`"""
+        return self._rename_dict[OSE][key]
+
+    #========================================================================
+    def update_env_from_vars(self, env, variables, args=None, profile=None):
         #--------------------------------------------------------------------
         """Update construction variables in SCons environment
         (``env["VARIABLE"]=VALUE``) according to values stored in their
@@ -188,7 +216,12 @@ class _Arguments(object):
             env
                 `SCons environment`_ object to be updated,
             variables
-                `SCons variables`_ object to take values from
+                `SCons variables`_ object to take values from,
+            args
+                command-line variables, ``variables.args`` by default,
+            profile
+                `SConsArguments.Profiles.ProfileValues` or a list of profile
+                layers, see `SConsArguments.Profiles.LoadProfile()`.
 
         .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
         .. _SCons variables: http://www.scons.org/doc/HTML/scons-user.html#sect-command-line-variables
@@ -196,7 +229,10 @@ class _Arguments(object):
         """
         #--------------------------------------------------------------------
         proxy = self.VarEnvProxy(env)
-        _VariablesWrapper(variables).Update(proxy,args)
+        if profile is None:
+            _VariablesWrapper(variables).Update(proxy,args)
+        else:
+            _VariablesWrapper(variables).Update(proxy,args,profile)
 
 
     #========================================================================
@@ -219,11 +255,13 @@ class _Arguments(object):
         for opt_key in self._irename_dict[OPT]:
             opt_value = GetOption(opt_key)
             # FIXME: why not pass None to environment (currently it's skipped)?
-            if opt_value is not None and opt_value is not UNDEFINED:
+            if opt_value is not None and opt_value is not UNDEFINED \
+               and not isinstance(opt_value, LazyDefault):
                 proxy[opt_key] = opt_value
 
     #========================================================================
-    def UpdateEnvironment(self, env, variables=None, use_options=False, args=None):
+    def UpdateEnvironment(self, env, variables=None, use_options=False, args=None,
+                          sources=None, profile=None):
         #--------------------------------------------------------------------
         """Update construction variables in SCons environment
         (``env["VARIABLE"]=VALUE``) according to values stored in their
@@ -241,6 +279,15 @@ class _Arguments(object):
                 when updating `env`.
             args
                 if not ``None``, passed verbatim to `update_env_from_vars()`.
+            sources : list | None
+                `SConsArguments.Sources.ValueSource` objects providing values
+                for *arguments* not set by `variables` nor options; they're
+                loaded concurrently, while `variables` and options are
+                processed.
+            profile
+                `SConsArguments.Profiles.ProfileValues` or a list of profile
+                layers, values of `variables` not given on command line are
+                taken from (see `SConsArguments.Profiles`).
 
         .. _SCons.Variables.Variables: http://www.scons.org/doc/latest/HTML/scons-api/SCons.Variables.Variables-class.html
         .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
@@ -250,10 +297,18 @@ class _Arguments(object):
         """
         #--------------------------------------------------------------------
         # TODO: implement priority?
+        if sources:
+            pending = _PendingSources(sources)
+            org = self.GetCurrentValues(env)
         if variables is not None:
-            self.update_env_from_vars(env, variables, args)
+            if profile is None:
+                self.update_env_from_vars(env, variables, args)
+            else:
+                self.update_env_from_vars(env, variables, args, profile)
         if use_options:
             self.update_env_from_opts(env)
+        if sources:
+            self.OverwriteUnaltered(env, org, pending.result())
 
     def SaveVariables(self, variables, filename, env):
         #--------------------------------------------------------------------
@@ -294,13 +349,57 @@ class _Arguments(object):
             args
                 other arguments passed verbatim to ``GenerateHelpText()``
 
+        :Keywords:
+            select : str | list
+                render help only for selected variables; a comma-separated
+                string or a list of glob patterns matched against names of
+                command-line variables, names of *arguments* and names of
+                modules the *arguments* were imported from (so ``"cc,link"``
+                selects variables imported from ``cc`` and ``link``
+                modules),
+            output : file
+                if given, the help text of every variable is written to it
+                as soon as it's rendered,
+            cache
+                `SConsArguments.Defaults.DefaultsCache` used to cache the
+                rendered texts; by default (``None``) the texts are not
+                cached.
+
+            If any of these keywords is given, the help is rendered
+            variable by variable instead of with a single
+            ``GenerateHelpText()`` call.
+
         .. _SCons.Variables.Variables: http://www.scons.org/doc/latest/HTML/scons-api/SCons.Variables.Variables-class.html
         .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
         """
         #--------------------------------------------------------------------
         proxy = self.VarEnvProxy(env)
+        if kw.get('select') is not None:
+            kw['select'] = self._help_selector(kw['select'])
         return _VariablesWrapper(variables).GenerateHelpText(proxy, *args, **kw)
 
+    #========================================================================
+    def _help_selector(self, patterns):
+        """Return a predicate selecting command-line variables by their
+        names, names of their *arguments* or modules the *arguments* come
+        from (see `GenerateVariablesHelpText()`). This method is for internal
+        use and IS **NOT a part of public API**."""
+        from fnmatch import fnmatchcase
+        if SCons.Util.is_String(patterns):
+            patterns = patterns.split(',')
+        patterns = [p.strip() for p in patterns if p.strip()]
+        irename = self._irename_dict[VAR]
+        origins = self.__origins
+        def select(var_key):
+            names = [var_key]
+            if var_key in irename:
+                name = irename[var_key]
+                names.append(name)
+                if name in origins:
+                    names.append(origins[name])
+            return any(fnmatchcase(n, p) for n in names for p in patterns)
+        return select
+
     def HandleVariablesHelp(self, variables, env, *args, **kw):
         #--------------------------------------------------------------------
         """Handle help option related to CLI variables
@@ -309,6 +408,12 @@ class _Arguments(object):
         prints additional help describing all the CLI variables provided by
         this **arguments** object. The function also handles printing the help.
 
+        The option takes optional comma-separated list of patterns, for
+        example ``--help-variables=cc,link`` or ``--help-variables='CC*'``,
+        to print only selected variables (see the ``select`` keyword of
+        `GenerateVariablesHelpText()`). The help is written to ``output``
+        variable by variable, as it's rendered.
+
         Usage Example::
 
             if args.HandleVariablesHelp(variables, env):
@@ -361,18 +466,140 @@ class _Arguments(object):
 
         option_create = kw.get('option_create', True)
         if option_create:
-            AddOption(option_name, dest=option_dest, action='store_true', help=option_help)
+            AddOption(option_name, dest=option_dest, type='string', nargs='?',
+                      const='*', metavar='PATTERNS', help=option_help)
 
-        if GetOption(option_dest):
+        selection = GetOption(option_dest)
+        if selection:
             local = {'option_name', 'option_help', 'option_dest',
                      'option_create', 'print_help', 'output'}
             kw2 = { k : kw[k] for k in kw.keys() if k not in local }
-            text = self.GenerateVariablesHelpText(variables, env, *args, **kw2)
+            if SCons.Util.is_String(selection) and selection != '*':
+                kw2.setdefault('select', selection)
             if kw.get('print_help', True):
-                kw.get('output', sys.stdout).write(text)
-            return text
+                kw2['output'] = kw.get('output', sys.stdout)
+            else:
+                kw2['output'] = None
+            return self.GenerateVariablesHelpText(variables, env, *args, **kw2)
         return None
 
+    #========================================================================
+    def SuggestVariables(self, name, variables=None, n=3):
+        #--------------------------------------------------------------------
+        """Return names of command-line variables similar to `name`, best
+        first, to tell users what they probably meant when they misspelled a
+        variable.
+
+        :Parameters:
+            name : str
+                the (unknown) variable name,
+            variables : ``SCons.Variables.Variables`` | None
+                if given, aliases of its variables are suggested too,
+            n : int
+                maximum number of suggestions.
+        :Returns:
+            a list of variable names (`VAR` keys or aliases).
+        """
+        #--------------------------------------------------------------------
+        if self.__suggest_var_keys is None:
+            suggestions = []
+        else:
+            suggestions = self.__suggest_var_keys(name, n)
+        if variables is not None:
+            aliases = [a for option in variables.options for a in (getattr(option, 'aliases', None) or [])]
+            if aliases:
+                suggestions = _rank(name, suggestions + aliases, n)
+        return suggestions
+
+    #========================================================================
+    def CheckUnknownVariables(self, variables, error=False):
+        #--------------------------------------------------------------------
+        """Diagnose command-line variables given by user but not declared
+        (these found in ``variables.unknown`` after `UpdateEnvironment()`).
+
+        :Parameters:
+            variables : ``SCons.Variables.Variables``
+                the variables object used to update environment,
+            error : boolean
+                if ``True`` and there are unknown variables, raise
+                ``SCons.Errors.UserError`` with the diagnostics.
+        :Returns:
+            a list of messages, one per unknown variable, such as
+            ``"Unknown variable 'CXXFLAG', did you mean 'CXXFLAGS'?"``.
+        """
+        #--------------------------------------------------------------------
+        messages = []
+        for name in sorted(variables.unknown):
+            question = _did_you_mean(self.SuggestVariables(name, variables))
+            messages.append('Unknown variable %r%s' % (name, ', ' + question if question else ''))
+        if error and messages:
+            raise SCons.Errors.UserError('\n'.join(messages))
+        return messages
+
+    def GetOSEValues(self, ose, env=None):
+        #--------------------------------------------------------------------
+        """Read values of *arguments* from OS environment variables (their
+        `OSE` *endpoints*) found in `ose`.
+
+        Only the variables declared as `OSE` *endpoints* are looked up in
+        `ose`, so it's cheap to pass entire ``os.environ``. The values found
+        are converted with the declared converters first and then checked
+        with validators, in the same way the command-line variables are
+        handled by SCons.
+
+        :Parameters:
+            ose : dict
+                OS environment, usually ``os.environ``,
+            env
+                `SCons environment`_ passed to converters accepting two
+                arguments.
+        :Return:
+            Dict with converted values, the keys are *argument* names.
+        :Raises:
+            ``SCons.Errors.UserError`` if a value can't be converted;
+            validators raise their own exceptions.
+
+        .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
+        """
+        #--------------------------------------------------------------------
+        found = []
+        values = {}
+        for (ose_key, key, converter, validator) in self.__ose_table:
+            value = ose.get(ose_key, MISSING)
+            if value is MISSING:
+                continue
+            if converter is not None:
+                try:
+                    try:
+                        value = converter(value)
+                    except TypeError:
+                        value = converter(value, env)
+                except ValueError as e:
+                    raise SCons.Errors.UserError('Error converting environment variable: %s\n%s' % (ose_key, e))
+            values[ose_key] = value
+            found.append((ose_key, key, validator))
+        # validators get the converted values, as SCons validators do
+        res = {}
+        for (ose_key, key, validator) in found:
+            if validator is not None:
+                validator(ose_key, values[ose_key], values)
+            res[key] = values[ose_key]
+        if Instrumentation.active:
+            Instrumentation.count('Arguments.ose_values', len(res))
+        return res
+
+    def __merge_ose_values(self, ose, env):
+        """Return values read from `ose` by `GetOSEValues()` updated with
+        entries of `ose` keyed by *argument* names (other than declared OS
+        environment variables), which take priority. This method is for
+        internal use and IS **NOT a part of public API**."""
+        values = self.GetOSEValues(ose, env)
+        ose_keys = set(ose_key for (ose_key, key, converter, validator) in self.__ose_table)
+        for key in self.__keys:
+            if key not in ose_keys and key in ose:
+                values[key] = ose[key]
+        return values
+
     def GetCurrentValues(self, env):
         #--------------------------------------------------------------------
         """Get current values of *arguments* stored in environment
@@ -559,7 +786,7 @@ class _Arguments(object):
         return res
 
     def Postprocess(self, env, variables=None, use_options=False, ose={},
-                    args=None, filename=None):
+                    args=None, filename=None, sources=None, profile=None):
         #--------------------------------------------------------------------
         """Postprocess `variables` and **options** updating variables in
         `env` and optionally saving them to file.
@@ -582,6 +809,19 @@ class _Arguments(object):
         options. The intent is to not let the variables from OS environment to
         overwrite these provided by commandline (or retrieved from file).
 
+        The keys of `ose` are taken as *argument* names and the values are
+        used as they are. If any *argument* declares an `OSE` *endpoint*,
+        `ose` is also read with `GetOSEValues()`, i.e. the declared OS
+        environment variables are looked up and their values get converted
+        and validated. Entries of `ose` keyed by *argument* names take
+        priority over values read this way (keys declared as `OSE`
+        *endpoints* are only read as OS environment variables).
+
+        Additional `sources` (see `SConsArguments.Sources`) are treated the
+        same way as `ose`, which takes precedence over all of them. They're
+        loaded concurrently, while `variables` and options are processed,
+        and merged with `ose` in a single pass.
+
         **Example**::
 
             # SConstruct
@@ -650,16 +890,23 @@ class _Arguments(object):
             filename : str|None
                 Name of the file to save current values of `variables`.
                 By default (``None``) variables are not saved.
+            sources : list | None
+                `SConsArguments.Sources.ValueSource` objects, additional
+                sources of data with lower precedence than `ose`.
+            profile
+                passed as `profile` to `UpdateEnvironment()`.
 
         :Return:
             New dictionary with only entries updated by either of the data
-            sources (variables, options or ose).
+            sources (variables, options, ose or sources).
 
         :Note:
-            Often you will have to preprocess ``os.environ`` before passing it
-            as `ose`. This is necessary especially when your *argument* use
-            ``converter``. In that case you have to pass values from
-            ``os.environ`` through a similar converter too.
+            Without `OSE` *endpoints* you will often have to preprocess
+            ``os.environ`` before passing it as `ose`. This is necessary
+            especially when your *argument* use ``converter``. In that case you
+            have to pass values from ``os.environ`` through a similar converter
+            too. Declare `OSE` *endpoints* (``ose_key``) to have it done for
+            you.
 
         .. _SCons.Variables.Variables: http://www.scons.org/doc/latest/HTML/scons-api/SCons.Variables.Variables-class.html
         .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
@@ -667,13 +914,33 @@ class _Arguments(object):
         .. _command-line options: http://www.scons.org/doc/HTML/scons-user.html#sect-command-line-options
         """
         #--------------------------------------------------------------------
-        org = self.GetCurrentValues(env)
-        self.UpdateEnvironment(env, variables, use_options, args)
-        alt = self.GetAltered(env, org)
-        if filename:
-            self.SaveVariables(variables, filename, env)
-        chg = self.OverwriteUnaltered(env, org, ose)
-        alt.update(chg)
+        phase = Instrumentation.phase
+        with phase('Postprocess'):
+            pending = _PendingSources(sources) if sources else None
+            if self.__ose_table:
+                with phase('Postprocess.ose'):
+                    ose = self.__merge_ose_values(ose, env)
+            with phase('Postprocess.GetCurrentValues'):
+                org = self.GetCurrentValues(env)
+            with phase('Postprocess.UpdateEnvironment'):
+                if profile is None:
+                    self.UpdateEnvironment(env, variables, use_options, args)
+                else:
+                    self.UpdateEnvironment(env, variables, use_options, args, profile = profile)
+            with phase('Postprocess.GetAltered'):
+                alt = self.GetAltered(env, org)
+            if filename:
+                with phase('Postprocess.SaveVariables'):
+                    self.SaveVariables(variables, filename, env)
+            if pending is not None:
+                with phase('Postprocess.sources'):
+                    new = pending.result()
+                    new.update(ose)
+            else:
+                new = ose
+            with phase('Postprocess.OverwriteUnaltered'):
+                chg = self.OverwriteUnaltered(env, org, new)
+            alt.update(chg)
         return alt
 
     def Demangle(self, env):
@@ -732,6 +999,263 @@ class _Arguments(object):
                 pass
         return res
 
+    #========================================================================
+    def ResolveDefaults(self, env, keys=None):
+        #--------------------------------------------------------------------
+        """Compute lazy defaults (see `SConsArguments.Defaults.LazyDefault`)
+        which are still present in `env` and replace them with computed
+        values.
+
+        :Parameters:
+            env
+                `SCons environment`_ object or simply a dict which holds
+                current values of *arguments*,
+            keys : list | None
+                names of *arguments* to be resolved; by default (``None``)
+                all the *arguments* are taken into account.
+
+        :Return:
+            Dictionary with *argument* names as keys and the computed values.
+
+        .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
+        """
+        #--------------------------------------------------------------------
+        rename = self._rename_dict[ENV]
+        if keys is None:
+            keys = [k for k in self.__keys if k in rename]
+        res = {}
+        for key in keys:
+            env_key = rename[key]
+            try:
+                value = env[env_key]
+            except KeyError:
+                continue
+            if isinstance(value, LazyDefault):
+                res[key] = env[env_key] = value.resolve(env)
+        return res
+
+    #========================================================================
+    _env_cache_size = 8
+    """Number of environments for which `Fingerprint()` and `ExpandAll()`
+    keep their per-argument results. SCons environments are referenced
+    weakly, so the caches don't keep them alive (plain dicts, which can't be
+    referenced weakly, are held until evicted)."""
+
+    #========================================================================
+    def __env_cache(self, env, name):
+        """Return dictionary of cached per-argument results of method `name`
+        for `env`. This method is for internal use and IS **NOT a part of
+        public API**"""
+        try:
+            ref = weakref.ref(env)
+        except TypeError:
+            ref = lambda : env
+        cache = self.__env_caches
+        cache[:] = [ entry for entry in cache if entry[0]() is not None ]
+        for i, (r, caches) in enumerate(cache):
+            if r() is env:
+                if i:
+                    cache.insert(0, cache.pop(i))
+                return caches.setdefault(name, {})
+        caches = {}
+        cache.insert(0, (ref, caches))
+        del cache[self._env_cache_size:]
+        return caches.setdefault(name, {})
+
+    #========================================================================
+    def Fingerprint(self, env, keys=None):
+        #--------------------------------------------------------------------
+        """Return a digest of current values of *arguments* in `env`.
+
+        The digest is computed from values in namespace of *arguments* (as
+        returned by `Demangle()`), so it doesn't depend on the names of
+        construction variables. It doesn't depend on the order of
+        *arguments*, nor on the order of items in dictionary values, and
+        ``CLVar`` values give same results as lists with same items. It's
+        thus suitable for naming variant directories or ``CacheDir``
+        partitions after the effective configuration.
+
+        Digests of individual values are cached, so recomputing the
+        fingerprint after a few values were changed rehashes only these
+        values (values which may be modified in place, such as lists, are
+        rehashed always). Lazy defaults (see
+        `SConsArguments.Defaults.LazyDefault`) are computed as needed.
+
+        **Example**::
+
+            # SConstruct
+            from SConsArguments import ImportArguments
+            env = Environment()
+            decls = ImportArguments(['cc', 'cxx'])
+            args = decls.Commit(env)
+            VariantDir('build/' + args.Fingerprint(env)[:8], 'src')
+
+        :Parameters:
+            env
+                `SCons environment`_ object or simply a dict which holds
+                current values of *arguments*,
+            keys : list | None
+                names of *arguments* to be included in the fingerprint; by
+                default (``None``) all the *arguments* having construction
+                variables are included.
+
+        :Return:
+            Hexadecimal string (40 digits).
+
+        .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
+        """
+        #--------------------------------------------------------------------
+        rename = self._rename_dict[ENV]
+        iresubst = self._iresubst_dict[ENV]
+        if keys is None:
+            keys = [k for k in self.__keys if k in rename]
+        digests = self.__env_cache(env, 'Fingerprint')
+        total = 0
+        for key in keys:
+            try:
+                value = _resolve(env[rename[key]], env)
+            except KeyError:
+                if key not in rename:
+                    raise
+                value = UNDEFINED
+            try:
+                cached, digest = digests[key]
+            except KeyError:
+                cached = UNDEFINED
+            if cached is not value or not _is_immutable(value):
+                if Instrumentation.active:
+                    Instrumentation.count('Fingerprint.digests')
+                digest = _value_digest(key, value, iresubst)
+                digests[key] = (value, digest)
+            total += digest
+        return '%040x' % (total % (1 << 160))
+
+    #========================================================================
+    def FingerprintGenerator(self, keys=None, length=None):
+        #--------------------------------------------------------------------
+        """Return a callable which may be assigned to a construction variable
+        to expose `Fingerprint()` of the environment being substituted.
+
+        **Example**::
+
+            # SConstruct
+            env['CONFIGID'] = args.FingerprintGenerator(length = 8)
+            print(env.subst('build/${CONFIGID}'))
+
+        :Parameters:
+            keys : list | None
+                passed to `Fingerprint()`,
+            length : int | None
+                if given, the fingerprint is truncated to that many digits.
+        """
+        #--------------------------------------------------------------------
+        def fingerprint(target=None, source=None, env=None, for_signature=False):
+            return self.Fingerprint(env, keys)[:length]
+        return fingerprint
+
+    #========================================================================
+    def ExpandAll(self, env):
+        #--------------------------------------------------------------------
+        """Expand placeholders referring to other *arguments* in current
+        values of all *arguments*.
+
+        Values are expanded in topological order of dependencies between
+        *arguments*, so each value is expanded once, no matter how many other
+        values refer to it. Expansions are cached, and the next call
+        re-expands only the values which were changed (or replaced) since
+        then, and the values which depend on them. Values which may be
+        modified in place (lists) are re-examined always.
+
+        Placeholders referring to construction variables which are not
+        *arguments* (e.g. ``$TARGET``) and escaped dollars (``$$``) are left
+        intact, so the results may be further passed to ``env.subst()``.
+        Lazy defaults (see `SConsArguments.Defaults.LazyDefault`) are
+        computed as needed.
+
+        **Example**::
+
+            # SConstruct
+            from SConsArguments import DeclareArguments
+            env = Environment()
+            decls = DeclareArguments(
+                prefix = { 'env_key' : 'PREFIX', 'default' : '/usr/local' },
+                bindir = { 'env_key' : 'BINDIR', 'default' : '${prefix}/bin' } )
+            args = decls.Commit(env)
+            print(args.ExpandAll(env)['bindir'])    # prints /usr/local/bin
+
+        :Parameters:
+            env
+                `SCons environment`_ object or simply a dict which holds
+                current values of *arguments*.
+
+        :Return:
+            New dictionary with *argument* names as keys and expanded values
+            (strings) as values. *Arguments* missing in `env` are not
+            included.
+
+        :Raises:
+            ``SCons.Errors.UserError`` if values reference each other
+            cyclically.
+
+        .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
+        """
+        #--------------------------------------------------------------------
+        rename = self._rename_dict[ENV]
+        irename = self._irename_dict[ENV]
+        cache = self.__env_cache(env, 'ExpandAll')
+        done = {}
+        path = []
+
+        def expand(key):
+            # returns (expansion, version) of the value of argument 'key'
+            try:
+                return done[key]
+            except KeyError:
+                pass
+            if key in path:
+                cycle = path[path.index(key):] + [key]
+                raise SCons.Errors.UserError("cyclic dependency between values " \
+                                             "of arguments: %s" % ' -> '.join(cycle))
+            try:
+                value = _resolve(env[rename[key]], env)
+            except KeyError:
+                value = UNDEFINED
+            entry = cache.get(key)
+            unchanged = entry is not None and entry[0] is value and _is_immutable(value)
+            if unchanged:
+                refs = entry[1]
+            else:
+                refs = tuple(irename[k] for k in sorted(_placeholders(value)) if k in irename)
+            path.append(key)
+            deps = [expand(k) for k in refs]
+            path.pop()
+            versions = tuple(v for (_, v) in deps)
+            if unchanged and entry[4] == versions:
+                result = (entry[2], entry[3])
+            else:
+                if Instrumentation.active:
+                    Instrumentation.count('ExpandAll.expansions')
+                expansions = dict((rename[k], x) for (k, (x, _)) in zip(refs, deps))
+                expansion = _expand_placeholders(value, expansions)
+                if entry is None:
+                    version = 0
+                elif entry[2] != expansion:
+                    version = entry[3] + 1
+                else:
+                    version = entry[3]
+                cache[key] = (value, refs, expansion, version, versions)
+                result = (expansion, version)
+            done[key] = result
+            return result
+
+        res = {}
+        for key in self.__keys:
+            if key in rename:
+                expansion = expand(key)[0]
+                if rename[key] in env:
+                    res[key] = expansion
+        return res
+
 # Local Variables:
 # # tab-width:4
 # # indent-tabs-mode:nil
@@ -0,0 +1,313 @@
+"""`SConsArguments.Completion`
+
+Shell completion scripts generated from *argument* declarations.
+
+The scripts complete names of command-line variables (``CC<TAB>`` gives
+``CC=``), names of command-line options (``--with-<TAB>``) and, where the
+declarations provide them, values of options and variables (``choices``).
+Everything is known when the script is generated, so completing a word
+never starts SCons nor python::
+
+    # SConstruct
+    from SConsArguments import ImportArguments, ExportCompletion
+
+    decls = ImportArguments(['cc', 'link'])
+    ExportCompletion(decls, '.scons-completion.bash', 'bash')
+    ...
+
+    # ~/.bashrc
+    source /path/to/project/.scons-completion.bash
+
+The script is rewritten only when the declarations change (see
+`SConsArguments.Declarations._ArgumentDeclarations.SchemaFingerprint()`).
+Scripts may be also generated from a schema file exported with
+`SConsArguments.Declarations._ArgumentDeclarations.ExportSchema()`.
+"""
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+from SConsArguments.Util import _write_file
+import SCons.Util
+import hashlib
+import json
+import re
+
+_version = 1
+"""Version of the generator, changing it invalidates generated scripts."""
+
+_stamp_re = re.compile(r'^# sconsarguments-stamp: ([0-9a-f]+)$', re.M)
+
+_word_re = re.compile(r'^[^\s\'"\\$`;&|<>()]+$')
+
+#############################################################################
+def _load_schema(source):
+    """Return the schema document for `source`, which may be declarations
+    (anything with ``Schema()`` method), a schema dictionary or a name of a
+    schema file. This function is for internal use and IS **NOT a part of
+    public API**."""
+    if hasattr(source, 'Schema'):
+        return source.Schema()
+    if SCons.Util.is_String(source):
+        with open(source) as f:
+            return json.load(f)
+    return source
+
+#############################################################################
+def _takes_value(opt):
+    """Check whether option described by schema entry `opt` takes a value.
+    This function is for internal use and IS **NOT a part of public API**."""
+    action = opt.get('action', 'store')
+    return action in ('store', 'append') or ('type' in opt and action == 'callback')
+
+#############################################################################
+def _words(values):
+    """Return items of `values` which may be safely put into the generated
+    scripts as completion words. This function is for internal use and IS
+    **NOT a part of public API**."""
+    words = []
+    for value in values or []:
+        if value is not None and not isinstance(value, (dict, list)):
+            value = str(value)
+            if _word_re.match(value):
+                words.append(value)
+    return words
+
+#############################################################################
+def _collect(schema):
+    """Extract variables and options from `schema`. Return a ``(variables,
+    options)`` tuple where ``variables`` is a sorted list of ``(key, help,
+    choices)`` tuples and ``options`` is a sorted list of ``(names, help,
+    takes_value, metavar, choices)`` tuples. This function is for internal
+    use and IS **NOT a part of public API**."""
+    variables = []
+    options = []
+    for (name, arg) in sorted(schema.get('arguments', {}).items()):
+        opt = arg.get('opt')
+        choices = _words(opt.get('choices')) if opt else []
+        var = arg.get('var')
+        if var and var.get('key') and _word_re.match(str(var['key'])):
+            variables.append((var['key'], var.get('help') or '', choices))
+        if opt:
+            names = [n for n in opt.get('names', []) if _word_re.match(n)]
+            if names:
+                metavar = opt.get('metavar') or opt.get('dest', name).upper()
+                options.append((names, opt.get('help') or '', _takes_value(opt), metavar, choices))
+    variables.sort()
+    options.sort()
+    return (variables, options)
+
+#############################################################################
+def _zsh_quote(text):
+    """Quote `text` with single quotes for zsh. This function is for internal
+    use and IS **NOT a part of public API**."""
+    return "'" + text.replace("'", "'\\''") + "'"
+
+#############################################################################
+def _zsh_spec_text(text):
+    """Escape `text` for use in brackets of zsh ``_arguments`` spec. This
+    function is for internal use and IS **NOT a part of public API**."""
+    text = ' '.join(str(text).split())
+    for c in '\\[]:':
+        text = text.replace(c, '\\' + c)
+    return text
+
+#############################################################################
+def _bash_script(variables, options, command, fname):
+    """Generate bash completion script. This function is for internal use and
+    IS **NOT a part of public API**."""
+    optwords = []
+    for (names, help, takes_value, metavar, choices) in options:
+        for n in names:
+            optwords.append(n + '=' if takes_value and n.startswith('--') else n)
+    varwords = [key + '=' for (key, help, choices) in variables]
+    optcases = []
+    for (names, help, takes_value, metavar, choices) in options:
+        if choices:
+            optcases.append('            %s) words="%s" ;;' % ('|'.join(names), ' '.join(choices)))
+    varcases = []
+    for (key, help, choices) in variables:
+        if choices:
+            varcases.append('            %s) words="%s" ;;' % (key, ' '.join(choices)))
+    lines = [
+        '%s()' % fname,
+        '{',
+        '    local line="${COMP_LINE:0:COMP_POINT}"',
+        '    local cur="${line##*[[:space:]]}"',
+        '    local word="${COMP_WORDS[COMP_CWORD]}"',
+        '    local words="" prefix=""',
+        '    case "$cur" in',
+        '    *=*)',
+        '        local name="${cur%%=*}" value="${cur#*=}"',
+        '        [ "$word" = "$cur" ] && prefix="$name="',
+        '        case "$name" in',
+    ] + optcases + varcases + [
+        '            *) COMPREPLY=( $(compgen -f -- "$value") ); return 0 ;;',
+        '        esac',
+        '        COMPREPLY=( $(compgen -P "$prefix" -W "$words" -- "$value") )',
+        '        ;;',
+        '    -*)',
+        '        COMPREPLY=( $(compgen -W "%s" -- "$cur") )' % ' '.join(optwords),
+        '        ;;',
+        '    *)',
+        '        COMPREPLY=( $(compgen -W "%s" -- "$cur") $(compgen -f -- "$cur") )' % ' '.join(varwords),
+        '        ;;',
+        '    esac',
+        '    case "${COMPREPLY[*]}" in',
+        '    *=) compopt -o nospace 2>/dev/null ;;',
+        '    esac',
+        '    return 0',
+        '}',
+        'complete -o default -F %s %s' % (fname, command),
+    ]
+    return '\n'.join(lines) + '\n'
+
+#############################################################################
+def _zsh_script(variables, options, command, fname):
+    """Generate zsh completion script. This function is for internal use and
+    IS **NOT a part of public API**."""
+    specs = []
+    for (names, help, takes_value, metavar, choices) in options:
+        for n in names:
+            spec = n
+            if takes_value:
+                spec += '=' if n.startswith('--') else '+'
+            spec += '[%s]' % _zsh_spec_text(help)
+            if takes_value:
+                action = '(%s)' % ' '.join(choices) if choices else '_files'
+                spec += ':%s:%s' % (_zsh_spec_text(metavar), action)
+            specs.append('        ' + _zsh_quote(spec) + ' \\')
+    descs = []
+    for (key, help, choices) in variables:
+        descs.append('        ' + _zsh_quote('%s:%s' % (key, ' '.join(help.split()))))
+    cases = []
+    for (key, help, choices) in variables:
+        if choices:
+            cases.append('            %s) compadd -- %s ;;' % (key, ' '.join(choices)))
+    lines = [
+        '#compdef %s' % command,
+        '%s() {' % fname,
+        '    local curcontext="$curcontext" state line',
+        '    local -a variables',
+        '    variables=(',
+    ] + descs + [
+        '    )',
+        '    _arguments -s -S \\',
+    ] + specs + [
+        "        '*:: :->args' && return 0",
+        '    case $state in',
+        '    args)',
+        "        if compset -P '(#b)([A-Za-z_][A-Za-z0-9_]#)='; then",
+        '            case $match[1] in',
+    ] + cases + [
+        '            *) _files ;;',
+        '            esac',
+        '        else',
+        "            _describe -t variables 'variable' variables -S '='",
+        '            _files',
+        '        fi',
+        '        ;;',
+        '    esac',
+        '}',
+        'compdef %s %s' % (fname, command),
+    ]
+    return '\n'.join(lines) + '\n'
+
+#############################################################################
+_generators = { 'bash' : _bash_script, 'zsh' : _zsh_script }
+
+#############################################################################
+def _completion_stamp(schema, shell, command):
+    """Return the stamp identifying script generated for `schema`, `shell`
+    and `command`. This function is for internal use and IS **NOT a part of
+    public API**."""
+    data = '%d:%s:%s:%s' % (_version, schema.get('fingerprint'), shell, command)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+#############################################################################
+def GenerateCompletion(source, shell='bash', command='scons'):
+    #------------------------------------------------------------------------
+    """Generate shell completion script for the declared *arguments*.
+
+    :Parameters:
+        source
+            `SConsArguments.Declarations._ArgumentDeclarations`, a schema
+            document returned by its ``Schema()`` method or a name of schema
+            file written by its ``ExportSchema()`` method,
+        shell : str
+            ``'bash'`` or ``'zsh'``,
+        command : str
+            name of the command to complete (``'scons'`` by default).
+    :Returns:
+        the script, as a string.
+    """
+    #------------------------------------------------------------------------
+    try:
+        generator = _generators[shell]
+    except KeyError:
+        raise ValueError("unsupported shell %r, use one of %s" % \
+                         (shell, ', '.join(sorted(_generators))))
+    schema = _load_schema(source)
+    (variables, options) = _collect(schema)
+    fname = '_%s_sconsarguments' % re.sub(r'\W', '_', command)
+    header = [ '# %s completion for %s, generated by SConsArguments' % (shell, command),
+               '# sconsarguments-stamp: %s' % _completion_stamp(schema, shell, command) ]
+    if shell == 'zsh':
+        # '#compdef' must be the first line of zsh completion functions
+        body = generator(variables, options, command, fname).split('\n', 1)
+        return body[0] + '\n' + '\n'.join(header) + '\n' + body[1]
+    return '\n'.join(header) + '\n' + generator(variables, options, command, fname)
+
+#############################################################################
+def ExportCompletion(source, filename, shell='bash', command='scons'):
+    #------------------------------------------------------------------------
+    """Write shell completion script to file `filename`.
+
+    The file is left untouched if it already contains a script generated for
+    the same declarations, shell and command.
+
+    :Parameters:
+        source, shell, command
+            same as for `GenerateCompletion()`,
+        filename : str
+            name of the script file.
+    :Returns:
+        ``True`` if the file has been written, ``False`` otherwise.
+    """
+    #------------------------------------------------------------------------
+    schema = _load_schema(source)
+    stamp = _completion_stamp(schema, shell, command)
+    try:
+        with open(filename) as f:
+            match = _stamp_re.search(f.read(512))
+        if match and match.group(1) == stamp:
+            return False
+    except (IOError, OSError):
+        pass
+    return _write_file(filename, GenerateCompletion(schema, shell, command))
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,238 @@
+"""`SConsArguments.Daemon`
+
+Transport for the ``serve`` mode of the command-line interface (see
+`SConsArguments.__main__`).
+
+A daemon keeps committed declarations and values read from variables files
+in memory and answers queries sent over a Unix domain socket, so editors and
+hooks asking the same questions over and over don't pay for starting SCons
+each time::
+
+    python -m SConsArguments -m cc serve --socket .sconsarguments.sock &
+    python -m SConsArguments -m cc --socket .sconsarguments.sock check local.py
+
+The protocol is trivial: the client connects, sends a single JSON object
+terminated with a newline and receives a single JSON object (terminated with
+a newline too) in reply. Requests carry the ``protocol`` version; replies
+carry ``status``, which is ``null`` if the daemon refused to answer (in this
+case the client is expected to evaluate the query by itself). This module
+knows nothing about the meaning of requests, they're interpreted by the
+handler passed to `Serve()`.
+"""
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import json
+import os
+import socket
+import stat
+
+_protocol = 1
+"""Version of the protocol, daemons refuse requests of other versions."""
+
+_max_message = 1 << 24
+"""Maximum size of a message, in bytes."""
+
+_client_timeout = 10.0
+"""How long the daemon waits for a client to send its request or receive
+the reply, in seconds. A client that stalls can't block the daemon."""
+
+#############################################################################
+def _send_message(sock, message):
+    """Send `message` (a JSON-serializable object) through `sock`. This
+    function is for internal use and IS **NOT a part of public API**."""
+    sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+#############################################################################
+def _recv_message(sock):
+    """Receive a message from `sock`. Raises ``ValueError`` if the message
+    is malformed. This function is for internal use and IS **NOT a part of
+    public API**."""
+    chunks = []
+    size = 0
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        chunks.append(data)
+        size += len(data)
+        if data.endswith(b'\n'):
+            break
+        if size > _max_message:
+            raise ValueError('message too long')
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+#############################################################################
+def _connect(path, timeout):
+    """Connect to the daemon listening on `path`. This function is for
+    internal use and IS **NOT a part of public API**."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except:
+        sock.close()
+        raise
+    return sock
+
+#############################################################################
+def _remove_stale_socket(path):
+    """Remove socket `path` left by a daemon which is no longer running.
+    Raises ``RuntimeError`` if another daemon listens on `path` or `path` is
+    not a socket. This function is for internal use and IS **NOT a part of
+    public API**."""
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError("%s exists and is not a socket" % path)
+    try:
+        _connect(path, 1.0).close()
+    except socket.error:
+        os.remove(path)
+    else:
+        raise RuntimeError("a daemon is already listening on %s" % path)
+
+#############################################################################
+def _available():
+    """Check whether Unix domain sockets are supported on this platform.
+    This function is for internal use and IS **NOT a part of public API**."""
+    return hasattr(socket, 'AF_UNIX')
+
+#############################################################################
+def Serve(path, handler, ready = None):
+    #------------------------------------------------------------------------
+    """Listen on Unix domain socket `path` and answer requests.
+
+    Requests are served one at a time, in the order they come. The function
+    returns when a ``shutdown`` request is received (see `Shutdown()`); the
+    socket file is removed then. A socket left by a daemon that has been
+    killed is removed when the next one starts.
+
+    :Parameters:
+        path : str
+            the socket file name,
+        handler : callable
+            called as ``handler(request)`` for each request (a dictionary
+            decoded from JSON), shall return a JSON-serializable dictionary
+            with the ``status`` key; exceptions raised by the handler are
+            reported to the client as refusals,
+        ready : callable
+            if given, called without arguments once the socket accepts
+            connections.
+    """
+    #------------------------------------------------------------------------
+    if not _available():
+        raise RuntimeError("Unix domain sockets are not supported on this platform")
+    _remove_stale_socket(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+        server.listen(8)
+        if ready is not None:
+            ready()
+        while True:
+            conn = server.accept()[0]
+            conn.settimeout(_client_timeout)
+            try:
+                try:
+                    request = _recv_message(conn)
+                except ValueError as e:
+                    _send_message(conn, { 'status' : None, 'error' : str(e) })
+                    continue
+                if not isinstance(request, dict) or request.get('protocol') != _protocol:
+                    _send_message(conn, { 'status' : None, 'error' : 'unsupported protocol' })
+                elif request.get('shutdown'):
+                    _send_message(conn, { 'status' : 0 })
+                    break
+                else:
+                    try:
+                        reply = handler(request)
+                    except Exception as e:
+                        # the client will evaluate the request by itself
+                        reply = { 'status' : None, 'error' : '%s: %s' % (type(e).__name__, e) }
+                    _send_message(conn, reply)
+            except socket.error:
+                pass # client has gone away
+            finally:
+                conn.close()
+    finally:
+        server.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+#############################################################################
+def Query(path, request, timeout = 60.0):
+    #------------------------------------------------------------------------
+    """Send `request` to the daemon listening on `path` and return its reply.
+
+    :Parameters:
+        path : str
+            the socket file name,
+        request : dict
+            the request, a JSON-serializable dictionary,
+        timeout : float
+            how long to wait for the reply, in seconds.
+    :Returns:
+        the reply (a dictionary) or ``None`` if there is no daemon
+        listening on `path` or it refused to answer the request. The caller
+        is expected to evaluate the request by itself in the later case.
+    """
+    #------------------------------------------------------------------------
+    if not path or not _available():
+        return None
+    request = dict(request, protocol = _protocol)
+    try:
+        sock = _connect(path, timeout)
+        try:
+            _send_message(sock, request)
+            reply = _recv_message(sock)
+        finally:
+            sock.close()
+    except (socket.error, ValueError):
+        return None
+    if not isinstance(reply, dict) or reply.get('status') is None:
+        return None
+    return reply
+
+#############################################################################
+def Shutdown(path, timeout = 60.0):
+    #------------------------------------------------------------------------
+    """Ask the daemon listening on `path` to exit.
+
+    :Returns:
+        ``True`` if the daemon has acknowledged the request, ``False`` if
+        there was no daemon listening on `path`.
+    """
+    #------------------------------------------------------------------------
+    return Query(path, { 'shutdown' : True }, timeout) is not None
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -28,7 +28,7 @@ Provides the `_ArgumentDeclaration` class and factory methods
 __docformat__ = "restructuredText"
 
 import SCons.Util
-from SConsArguments.Util import ENV, VAR, OPT, ALL, UNDEFINED
+from SConsArguments.Util import ENV, VAR, OPT, OSE, ALL, UNDEFINED
 
 #############################################################################
 class _ArgumentDeclaration(object):
@@ -39,15 +39,16 @@ class _ArgumentDeclaration(object):
     SCons Environment, SCons command-line variable (``variable=value``) and
     SCons command-line option (``--option=value``) corresponding to a given
     *argument* (it for example holds the names and default values of
-    these variables/options before they get created).
+    these variables/options before they get created). It may also name an OS
+    environment variable the *argument* may be read from.
 
     **Note**:
 
         In several places we use ``ns`` as placeholder for one of the ``ENV``,
-        ``VAR`` or ``OPT`` constants which represent selection of
+        ``VAR``, ``OPT`` or ``OSE`` constants which represent selection of
         "corresponding Environment construction variable", "corresponding SCons
-        command-line variable" or "corresponding SCons command-line option"
-        respectively.  So, for example the call ``decl.set_decl(ENV,decl)``
+        command-line variable", "corresponding SCons command-line option" or
+        "corresponding OS environment variable" respectively.  So, for example the call ``decl.set_decl(ENV,decl)``
         stores the declaration of corresponding construction variable in a
         SCons environment (``ENV``).
     """
@@ -55,7 +56,7 @@ class _ArgumentDeclaration(object):
 
 
     #========================================================================
-    def __init__(self, env_decl=None, var_decl=None, opt_decl=None):
+    def __init__(self, env_decl=None, var_decl=None, opt_decl=None, ose_decl=None):
         #--------------------------------------------------------------------
         """Constructor for the `_ArgumentDeclaration` object
 
@@ -69,40 +70,47 @@ class _ArgumentDeclaration(object):
                 variable`_, same as ``decl`` argument to `set_var_decl()`,
             opt_decl
                 parameters used later to create related `SCons command-line
-                option`_, same as  ``decl`` argument to `set_opt_decl()`.
+                option`_, same as  ``decl`` argument to `set_opt_decl()`,
+            ose_decl
+                parameters used later to read related OS environment variable,
+                same as ``decl`` argument to `set_ose_decl()`.
 
         .. _SCons environment:  http://www.scons.org/doc/HTML/scons-user.html#chap-environments
         .. _SCons command-line option: http://www.scons.org/doc/HTML/scons-user.html#sect-command-line-options
         .. _SCons command-line variable: http://www.scons.org/doc/HTML/scons-user.html#sect-command-line-variables
         """
         #--------------------------------------------------------------------
-        # __decl_tab is an internal 3-element list and holds argument info
-        #            for ENV, VAR and OPT endpoints.
-        self.__decl_tab = [None,None,None]
+        # __decl_tab is an internal 4-element list and holds argument info
+        #            for ENV, VAR, OPT and OSE endpoints.
+        self.__decl_tab = [None,None,None,None]
         if env_decl: self.set_env_decl(env_decl)
         if var_decl: self.set_var_decl(var_decl)
         if opt_decl: self.set_opt_decl(opt_decl)
+        if ose_decl: self.set_ose_decl(ose_decl)
 
     #========================================================================
     def set_decl(self, ns, decl):
         #--------------------------------------------------------------------
         """Declare related *endpoint* in `ns` namespace. `ns` is one of `ENV`,
-        `VAR` or `OPT`.
+        `VAR`, `OPT` or `OSE`.
 
         This functions just dispatches the job between `set_env_decl()`,
-        `set_var_decl()` and `set_opt_decl()` according to `ns` argument.
+        `set_var_decl()`, `set_opt_decl()` and `set_ose_decl()` according to
+        `ns` argument.
 
         :Parameters:
             ns : int
-                one of `ENV`, `VAR` or `OPT`,
+                one of `ENV`, `VAR`, `OPT` or `OSE`,
             decl
                 declaration parameters passed to particular setter method
-                (`set_env_decl()`, `set_var_decl()`, or `set_opt_decl()`).
+                (`set_env_decl()`, `set_var_decl()`, `set_opt_decl()` or
+                `set_ose_decl()`).
         """
         #--------------------------------------------------------------------
         if ns == ENV:     self.set_env_decl(decl)
         elif ns == VAR:   self.set_var_decl(decl)
         elif ns == OPT:   self.set_opt_decl(decl)
+        elif ns == OSE:   self.set_ose_decl(decl)
         else:               raise IndexError("index out of range")
 
     #========================================================================
@@ -282,15 +290,56 @@ class _ArgumentDeclaration(object):
             raise ValueError("missing parameter 'dest' in option specification")
         self.__decl_tab[OPT] = (names, kw)
 
+    #========================================================================
+    def set_ose_decl(self, decl):
+        #--------------------------------------------------------------------
+        """Set parameters for reading the related OS environment variable.
+
+        :Parameters:
+            decl : tuple | list | dict | str
+                may be just a string ``"NAME"`` (name of the OS environment
+                variable), a tuple in form ``("NAME" [, converter,
+                validator])`` or a dictionary::
+
+                    { 'key'         : "NAME",
+                      'converter'   : converter,
+                      'validator'   : validator }
+
+                where only the ``'key'`` entry is required; the ``converter``
+                and ``validator`` have same meaning as for
+                `SCons.Variables.Variables.Add()`_ and are applied to the
+                value read from OS environment.
+
+        .. _SCons.Variables.Variables.Add(): http://www.scons.org/doc/latest/HTML/scons-api/SCons.Variables.Variables-class.html#Add
+        """
+        #--------------------------------------------------------------------
+        if SCons.Util.is_Tuple(decl) or SCons.Util.is_List(decl):
+            keys = [ 'key', 'converter', 'validator' ]
+            if not 0 < len(decl) <= len(keys):
+                raise ValueError("'decl' must have 1 to %d elements but " \
+                                 "has %d" % (len(keys), len(decl)))
+            decl = dict(zip(keys, decl))
+        elif SCons.Util.is_Dict(decl):
+            if 'key' not in decl:
+                raise ValueError("missing parameter 'key' in OS environment " \
+                                 "variable specification")
+            decl = decl.copy()
+        elif SCons.Util.is_String(decl):
+            decl = { 'key' : decl }
+        else:
+            raise TypeError("'decl' must be tuple, list, dictionary or string, " \
+                            "%r is not allowed" % type(decl).__name__)
+        self.__decl_tab[OSE] = decl
+
     #========================================================================
     def has_decl(self, ns):
         #--------------------------------------------------------------------
         """Test if declaration of *endpoint* `ns` was provided. `ns` is one of
-        `ENV`, `VAR` or `OPT`.
+        `ENV`, `VAR`, `OPT` or `OSE`.
 
         :Parameters:
             ns : int
-                one of `ENV`, `VAR` or `OPT`
+                one of `ENV`, `VAR`, `OPT` or `OSE`
         :Returns:
             ``True`` if the declaration exists, or ``False`` otherwise.
         """
@@ -312,6 +361,11 @@ class _ArgumentDeclaration(object):
         """Same as `has_decl(OPT)`"""
         return self.has_decl(OPT)
 
+    #========================================================================
+    def has_ose_decl(self):
+        """Same as `has_decl(OSE)`"""
+        return self.has_decl(OSE)
+
     #========================================================================
     def get_decl(self, ns):
         #--------------------------------------------------------------------
@@ -330,7 +384,7 @@ class _ArgumentDeclaration(object):
         if (ns < 0) or ns > ALL:
             raise IndexError("index out of range")
         elif not self.has_decl(ns):
-            nsstr = [ 'ENV', 'VAR', 'OPT' ]
+            nsstr = [ 'ENV', 'VAR', 'OPT', 'OSE' ]
             raise IndexError("there is no %s declaration in this _ArgumentDeclaration" % nsstr[ns])
         return self.__decl_tab[ns]
 
@@ -349,21 +403,26 @@ class _ArgumentDeclaration(object):
         """Same as `get_decl(OPT)`"""
         return self.get_decl(OPT)
 
+    #========================================================================
+    def get_ose_decl(self):
+        """Same as `get_decl(OSE)`"""
+        return self.get_decl(OSE)
+
     #========================================================================
     def get_key(self, ns):
         #--------------------------------------------------------------------
         """Returns the key (variable name) identifying *endpoint* variable from
-        namespace `ns`. `ns` is one of `ENV`, `VAR` or `OPT`.
+        namespace `ns`. `ns` is one of `ENV`, `VAR`, `OPT` or `OSE`.
 
         :Parameters:
             ns : int
-                one of `ENV`, `VAR` or `OPT`
+                one of `ENV`, `VAR`, `OPT` or `OSE`
         :Returns:
             ``decl`` parameters stored by last call `set_decl(ns,decl)`.
         """
         #--------------------------------------------------------------------
         decl = self.get_decl(ns)
-        if ns == ENV or ns == VAR:
+        if ns == ENV or ns == VAR or ns == OSE:
             return decl['key']
         elif ns == OPT:
             return decl[1]['dest']
@@ -385,11 +444,16 @@ class _ArgumentDeclaration(object):
         """Same as `get_key(OPT)`"""
         return self.get_key(OPT)
 
+    #========================================================================
+    def get_ose_key(self):
+        """Same as `get_key(OSE)`"""
+        return self.get_key(OSE)
+
     #========================================================================
     def set_key(self, ns, key):
         #--------------------------------------------------------------------
         """Rename the corresponding *endpoint* in `ns` namespace. `ns` is one
-        of `ENV`, `VAR` or `OPT`.
+        of `ENV`, `VAR`, `OPT` or `OSE`.
 
         The corresponding declaration must exists, that is ``has_decl(ns)``
         must be ``True``. Otherwise, ``IndexError`` will be raised.
@@ -402,13 +466,13 @@ class _ArgumentDeclaration(object):
 
         :Parameters:
             ns : int
-                one of `ENV`, `VAR` or `OPT`
+                one of `ENV`, `VAR`, `OPT` or `OSE`
             key : string
                 new name for the *endpoint* `ns`.
         """
         #--------------------------------------------------------------------
         decl = self.get_decl(ns)
-        if ns == ENV or ns == VAR:
+        if ns == ENV or ns == VAR or ns == OSE:
             decl['key'] = key
         elif ns == OPT:
             decl[1]['dest'] = key
@@ -451,15 +515,28 @@ class _ArgumentDeclaration(object):
         """
         self.set_key(OPT,key)
 
+    #========================================================================
+    def set_ose_key(self, key):
+        """Same as `set_key(OSE, key)`.
+
+        **Warning**
+            This method should not be used on `_ArgumentDeclaration` objects which
+            belong to an `_ArgumentDeclarations` dictionary. To rename *endpoints* of
+            such *arguments*, use `_ArgumentDeclarations.set_key()`. This limitation
+            may be removed in future.
+        """
+        self.set_key(OSE,key)
+
     #========================================================================
     def get_default(self, ns):
         #--------------------------------------------------------------------
         """Get the default value of `ns` *endpoint*. `ns` is one of `ENV`,
-        `VAR`, `OPT`.
+        `VAR`, `OPT`, `OSE`. OS environment variables have no defaults, so
+        `UNDEFINED` is always returned for `OSE`.
 
         :Parameters:
             ns : int
-                one of `ENV`, `VAR` or `OPT`
+                one of `ENV`, `VAR`, `OPT` or `OSE`
         """
         #--------------------------------------------------------------------
         decl = self.get_decl(ns)
@@ -467,6 +544,8 @@ class _ArgumentDeclaration(object):
             return decl.get('default', UNDEFINED)
         elif ns == OPT:
             return decl[1].get('default', UNDEFINED)
+        elif ns == OSE:
+            return UNDEFINED
         else: # pragma: no cover
             raise IndexError("index out of range")
 
@@ -489,11 +568,11 @@ class _ArgumentDeclaration(object):
     def set_default(self, ns, default):
         #--------------------------------------------------------------------
         """Define the default value of `ns` *endpoint*. `ns` is one of `ENV`,
-        `VAR`, `OPT`.
+        `VAR`, `OPT`, `OSE`. For `OSE` only `UNDEFINED` is accepted.
 
         :Parameters:
             ns : int
-                one of `ENV`, `VAR` or `OPT`
+                one of `ENV`, `VAR`, `OPT` or `OSE`
             default
                 the new default value
         """
@@ -503,6 +582,9 @@ class _ArgumentDeclaration(object):
             decl['default'] = default
         elif ns == OPT:
             decl[1]['default'] = default
+        elif ns == OSE:
+            if default is not UNDEFINED:
+                raise ValueError("OS environment variables can't have default values")
         else: # pragma: no cover
             raise IndexError("index out of range")
 
@@ -526,7 +608,8 @@ class _ArgumentDeclaration(object):
         #--------------------------------------------------------------------
         """Add new construction variable, command-line variable or command-line
         option (an *endpoint*) depending on the `ns` variable. The `ns` is one
-        of `ENV`, `VAR` or `OPT`.
+        of `ENV`, `VAR`, `OPT` or `OSE` (nothing is created for `OSE`, the OS
+        environment variables are only read).
 
         The method actually dispatches the job between `add_to_env()`,
         `add_to_var()` and `add_to_opt()`.
@@ -545,7 +628,7 @@ class _ArgumentDeclaration(object):
 
         :Parameters:
             ns : int
-                one of `ENV`, `VAR` or `OPT`
+                one of `ENV`, `VAR`, `OPT` or `OSE`
             args, kw
                 additional arguments and keywords, depend on `ns`:
 
@@ -570,6 +653,9 @@ class _ArgumentDeclaration(object):
             self.add_to_var(args[0],*args[1:],**kw)
         elif ns == OPT:
             self.add_to_opt()
+        elif ns == OSE:
+            # nothing to create, just raise IndexError if not declared
+            self.get_decl(OSE)
         else:
             raise IndexError("index out of range")
 
@@ -651,7 +737,7 @@ class _ArgumentDeclaration(object):
 
         :Parameters:
             ns : int
-                one of `ENV`, `VAR` or `OPT`
+                one of `ENV`, `VAR`, `OPT` or `OSE`
 
         :Returns:
             returns ``True`` is new variable has been created or ``False`` if
@@ -686,37 +772,39 @@ def DeclareArgument(env_key=None, var_key=None, opt_key=None, default=UNDEFINED,
               help=None, validator=None, converter=None, option=None,
               type=None, opt_default=None, metavar=None, nargs=None,
               choices=None, action=None, const=None, callback=None,
-              callback_args=None, callback_kwargs=None):
+              callback_args=None, callback_kwargs=None, ose_key=None):
     #------------------------------------------------------------------------
     """Convert unified set of arguments to `_ArgumentDeclaration` instance.
 
     This function accepts minimal set of parameters to declare consistently an
-    *argument* and its corresponding `ENV`, `VAR` and `OPT` counterparts.  If
-    the first argument named `env_key` is an instance of `_ArgumentDeclaration`, then
-    it is returned unaltered. Otherwise the arguments are mapped onto following
-    attributes of corresponding `ENV`, `VAR` and `OPT` variables/options::
-
-        ARG                 ENV         VAR         OPT
-        ----------------+-----------------------------------------
-        env_key         |   key         -           -
-        var_key         |   -           key         -
-        opt_key         |   -           -           dest
-        default         |   default     default     -
-        help            |   -           help        help
-        validator       |   -           validator   -
-        converter       |   -           converter   -
-        option          |   -           -           option strings
-        type            |   -           -           type
-        opt_default     |   -           -           default
-        metavar         |   -           -           metavar
-        nargs           |   -           -           nargs
-        choices         |   -           -           choices
-        action          |   -           -           action
-        const           |   -           -           const
-        callback        |   -           -           callback
-        callback_args   |   -           -           callback_args
-        callback_kwargs |   -           -           callback_kwargs
-        ----------------+------------------------------------------
+    *argument* and its corresponding `ENV`, `VAR`, `OPT` and `OSE`
+    counterparts.  If the first argument named `env_key` is an instance of
+    `_ArgumentDeclaration`, then it is returned unaltered. Otherwise the
+    arguments are mapped onto following attributes of corresponding `ENV`,
+    `VAR`, `OPT` and `OSE` variables/options::
+
+        ARG                 ENV         VAR         OPT                 OSE
+        ----------------+-------------------------------------------------------
+        env_key         |   key         -           -                   -
+        var_key         |   -           key         -                   -
+        opt_key         |   -           -           dest                -
+        ose_key         |   -           -           -                   key
+        default         |   default     default     -                   -
+        help            |   -           help        help                -
+        validator       |   -           validator   -                   validator
+        converter       |   -           converter   -                   converter
+        option          |   -           -           option strings      -
+        type            |   -           -           type                -
+        opt_default     |   -           -           default             -
+        metavar         |   -           -           metavar             -
+        nargs           |   -           -           nargs               -
+        choices         |   -           -           choices             -
+        action          |   -           -           action              -
+        const           |   -           -           const               -
+        callback        |   -           -           callback            -
+        callback_args   |   -           -           callback_args       -
+        callback_kwargs |   -           -           callback_kwargs     -
+        ----------------+-------------------------------------------------------
 
     :Parameters:
         env_key : `_ArgumentDeclaration` | string | None
@@ -741,9 +829,11 @@ def DeclareArgument(env_key=None, var_key=None, opt_key=None, default=UNDEFINED,
             message used to initialize help in corresponding command-line
             variable (`VAR`) and command-line option (`OPT`),
         validator
-            same as for `SCons.Variables.Variables.Add()`_,
+            same as for `SCons.Variables.Variables.Add()`_, applied also to
+            values read from OS environment (`OSE`),
         converter
-            same as for `SCons.Variables.Variables.Add()`_,
+            same as for `SCons.Variables.Variables.Add()`_, applied also to
+            values read from OS environment (`OSE`),
         option
             option string, e.g. ``"--option"`` used for corresponding
             command-line option,
@@ -767,6 +857,10 @@ def DeclareArgument(env_key=None, var_key=None, opt_key=None, default=UNDEFINED,
             same as `callback_args` in `optparse option attributes`_,
         callback_kwargs
             same as `callback_kwargs` in `optparse option attributes`_,
+        ose_key : string | None
+            name of the OS environment variable the *argument* may be read
+            from (`OSE`); if ``None``, the *argument* has no corresponding OS
+            environment variable.
 
     :Returns:
         - if `env_key` is present and it is an instance of `_ArgumentDeclaration`, then it
@@ -805,7 +899,14 @@ def DeclareArgument(env_key=None, var_key=None, opt_key=None, default=UNDEFINED,
             opt_decl = (option, dict( [(k, v) for (v,k) in items if v is not None] ))
         else:
             opt_decl = None
-        return _ArgumentDeclaration(env_decl, var_decl, opt_decl)
+        # --- OSE ---
+        if ose_key is not None:
+            items = [ (ose_key, 'key'), (converter, 'converter'),
+                      (validator, 'validator') ]
+            ose_decl = dict([ (k, v) for (v,k) in items if v is not None ])
+        else:
+            ose_decl = None
+        return _ArgumentDeclaration(env_decl, var_decl, opt_decl, ose_decl)
 
 # Local Variables:
 # # tab-width:4
@@ -27,10 +27,56 @@ Provides `_ArgumentDeclarations` class and factory methods
 
 __docformat__ = "restructuredText"
 
-from SConsArguments.Util import ENV, VAR, OPT, ALL, MISSING, NOTFOUND
+from SConsArguments.Util import ENV, VAR, OPT, OSE, ALL, MISSING, NOTFOUND, UNDEFINED
 from SConsArguments.Util import _build_resubst_dict, _build_iresubst_dict, _resubst
+from SConsArguments.Util import _placeholders, _find_cycle
+from SConsArguments.Util import _canonical_value, _json_value, _write_json_file
 from SConsArguments.Declaration import _ArgumentDeclaration, ArgumentDeclaration, DeclareArgument
 from SConsArguments.Arguments import _Arguments
+from SConsArguments.Suggestions import _SuggestionIndex
+from SConsArguments import Instrumentation
+import SCons.Errors
+import hashlib
+import json
+import sys
+
+# Names of namespaces used in schema documents.
+_ns_names = ('env', 'var', 'opt', 'ose')
+
+# Command-line options which make SCons print the option table.
+_help_options = frozenset(('-h', '-H', '--help', '--help-options'))
+
+#############################################################################
+def _scan_option_names(argv):
+    """Return the set of option names found in command-line arguments
+    ``argv``, e.g. ``{'--foo', '-x', '-v'}`` for ``['--foo=1', '-xv']``.
+    Clusters of short options yield all their letters. The scan stops at
+    ``--``. This function is for internal use and IS **NOT a part of public
+    API**."""
+    names = set()
+    for arg in argv:
+        if arg == '--':
+            break
+        if arg.startswith('--'):
+            names.add(arg.split('=', 1)[0])
+        elif arg.startswith('-') and len(arg) > 1:
+            names.update('-' + c for c in arg[1:])
+    return names
+
+#############################################################################
+def _option_requested(names, seen):
+    """Check whether any of the option ``names`` was found on the command
+    line (``seen`` is a result of `_scan_option_names()`). Abbreviated long
+    options (``--fo`` for ``--foo``) are also taken into account. This
+    function is for internal use and IS **NOT a part of public API**."""
+    for name in names:
+        if name in seen:
+            return True
+        if name.startswith('--'):
+            for arg in seen:
+                if len(arg) > 2 and arg.startswith('--') and name.startswith(arg):
+                    return True
+    return False
 
 #############################################################################
 class _ArgumentDeclarations(dict):
@@ -65,7 +111,7 @@ class _ArgumentDeclarations(dict):
     **Note**:
 
         In several places we use ``ns`` as placeholder for one of the `ENV`,
-        `VAR` or `OPT` selectors.
+        `VAR`, `OPT` or `OSE` selectors.
     """
     #========================================================================
 
@@ -92,6 +138,11 @@ class _ArgumentDeclarations(dict):
         """
         #--------------------------------------------------------------------
         self.__committed = False
+        self.__deps = {}
+        self.__deferred_opts = []
+        self.__schema = None
+        self.__var_index = None
+        self.__ose_table = ()
         _ArgumentDeclarations.__validate_values(*args,**kw)
         super(_ArgumentDeclarations, self).__init__(*args,**kw)
         self.__update_supp_dicts()
@@ -396,6 +447,29 @@ class _ArgumentDeclarations(dict):
         self[key].set_key(ns, ns_key)
         self.__replace_key_in_supp_dicts(ns, key, ns_key)
 
+    #========================================================================
+    def suggest_var_keys(self, name, n = 3):
+        #--------------------------------------------------------------------
+        """Return keys of declared command-line variables similar to `name`
+        (misspelled name of a variable), best first.
+
+        Once the declarations are committed, the keys are indexed on first
+        call, so subsequent calls are fast even for large declaration sets.
+
+        :Parameters:
+            name : str
+                the name to find similar keys for,
+            n : int
+                maximum number of keys to return.
+        """
+        #--------------------------------------------------------------------
+        index = self.__var_index
+        if index is None:
+            index = _SuggestionIndex(self.__irename[VAR])
+            if self.__committed:
+                self.__var_index = index
+        return index.suggest(name, n)
+
     #========================================================================
     def _add_to(self, ns, *args):
         """Invoke `_ArgumentDeclaration.add_to()` for each *argument* declared
@@ -410,6 +484,147 @@ class _ArgumentDeclarations(dict):
         **NOT a part of public API**."""
         for (k,v) in self.items(): v.safe_add_to(ns, *args)
 
+    #========================================================================
+    def _bulk_add_to(self, ns, *args):
+        """Create ``ns`` *endpoints* for all the *arguments* declared in this
+        dictionary at once. *Arguments* with no ``ns`` declaration are
+        skipped, as in `_safe_add_to()`. This method is for internal use, it
+        IS **NOT a part of public API**.
+
+        :Parameters:
+            ns : int
+                one of `ENV`, `VAR` or `OPT`,
+            args
+                ``env`` for `ENV`, ``variables`` for `VAR`; for `OPT` an
+                optional ``mode``, if it is ``'deferred'`` the options are
+                registered lazily (see `add_deferred_options()`).
+        """
+        decls = [v for (k,v) in self.items() if v.has_decl(ns)]
+        if ns == ENV:
+            self.__bulk_add_to_env(decls, *args)
+        elif ns == VAR:
+            self.__bulk_add_to_var(decls, *args)
+        elif ns == OPT:
+            if args and args[0] == 'deferred':
+                self.__defer_add_to_opt(decls)
+            else:
+                self.__bulk_add_to_opt(decls)
+        elif ns == OSE:
+            pass # OS environment variables are only read, see get_ose_table()
+        else:
+            raise IndexError("index out of range")
+
+    #========================================================================
+    def __bulk_add_to_env(self, decls, env):
+        """Set defaults of all construction variables with a single
+        ``env.SetDefault()`` call. This method is for internal use, it IS
+        **NOT a part of public API**."""
+        defaults = {}
+        for decl in decls:
+            env_decl = decl.get_decl(ENV)
+            default = env_decl.get('default', UNDEFINED)
+            if default is not UNDEFINED:
+                defaults[env_decl['key']] = default
+        if defaults:
+            env.SetDefault(**defaults)
+
+    #========================================================================
+    def __bulk_add_to_var(self, decls, variables):
+        """Register all command-line variables. ``Variables.AddVariables()``
+        just calls ``Add()`` in a loop, so there is nothing to batch here and
+        `_ArgumentDeclaration.add_to_var()` is called for each declaration.
+        This method is for internal use, it IS **NOT a part of public API**."""
+        for decl in decls:
+            decl.add_to_var(variables)
+
+    #========================================================================
+    def __bulk_add_to_opt(self, decls):
+        """Create all command-line options in one pass over the command line.
+        This method is for internal use, it IS **NOT a part of public API**.
+
+        ``SCons.Script.AddOption()`` re-parses the leftover command-line
+        arguments after every new option. Here the leftovers are hidden from
+        the parser while the options are added and parsed once afterwards.
+        """
+        if not decls:
+            return
+        from SCons.Script import Main
+        parser = Main.OptionsParser
+        largs = getattr(parser, 'largs', None)
+        if not largs or not hasattr(parser, 'values'):
+            for decl in decls: decl.add_to_opt()
+            return
+        parser.largs = []
+        try:
+            for decl in decls: decl.add_to_opt()
+        finally:
+            parser.largs = largs
+        if hasattr(parser, 'reparse_local_options'):
+            parser.reparse_local_options()
+        else:
+            parser.parse_args(largs, parser.values)
+
+    #========================================================================
+    def __defer_add_to_opt(self, decls):
+        """Create only the command-line options that appear on the command
+        line and keep the rest pending, with their defaults made visible to
+        ``GetOption()``. All the options are created if help was requested.
+        This method is for internal use, it IS **NOT a part of public API**.
+        """
+        from SCons.Script import Main
+        parser = Main.OptionsParser
+        defaults = getattr(getattr(parser, 'values', None), '__defaults__', None)
+        if defaults is None:
+            # not a real SCons option parser, nothing to save
+            return self.__bulk_add_to_opt(decls)
+        argv = list(sys.argv[1:]) + list(getattr(parser, 'largs', None) or [])
+        seen = _scan_option_names(argv)
+        if seen & _help_options:
+            return self.__bulk_add_to_opt(decls)
+        now = []
+        for decl in decls:
+            (names, kw) = decl.get_decl(OPT)
+            if _option_requested(names, seen):
+                now.append(decl)
+            else:
+                self.__deferred_opts.append(decl)
+                if not hasattr(defaults, kw['dest']):
+                    setattr(defaults, kw['dest'], kw.get('default'))
+        if Instrumentation.active:
+            Instrumentation.count('Declarations.deferred_options', len(decls) - len(now))
+        self.__bulk_add_to_opt(now)
+
+    #========================================================================
+    def add_deferred_options(self):
+        #--------------------------------------------------------------------
+        """Create command-line options which were deferred by
+        ``add_to(env, variables, 'deferred')``.
+
+        In the deferred mode only options found on the command line are
+        created at commit time. Options which were not given on the command
+        line still answer ``GetOption()`` with their default values, but are
+        not known to SCons option parser (so they are not listed by
+        ``scons -H``, for example). Call this method if the full option table
+        is needed. It's also done automatically if ``-h``, ``-H`` or
+        ``--help`` is on the command line.
+
+        :Returns:
+            the number of options created by this call.
+        """
+        #--------------------------------------------------------------------
+        decls = self.__deferred_opts
+        self.__deferred_opts = []
+        self.__bulk_add_to_opt(decls)
+        return len(decls)
+
+    #========================================================================
+    def _get_supp_dicts(self):
+        """Return the supplementary dictionaries (not copies) as a tuple
+        ``(rename, irename, resubst, iresubst)``, each being a list indexed by
+        namespace. This method is for internal use, it IS **NOT a part of
+        public API**."""
+        return (self.__rename, self.__irename, self.__resubst, self.__iresubst)
+
     #========================================================================
     def _build_resubst_dicts(self):
         """Build supplementary dictionaries used to rename placeholders in
@@ -426,6 +641,68 @@ class _ArgumentDeclarations(dict):
         for ns in range(0,ALL):
             self.__iresubst[ns] = _build_iresubst_dict(self.__rename[ns])
 
+    #========================================================================
+    def _build_ose_table(self):
+        """Build the table of OS environment variables read by *arguments*,
+        see `get_ose_table()`. This method is for internal use, it IS **NOT
+        a part of public API**."""
+        table = []
+        for (ose_key, key) in self.__irename[OSE].items():
+            decl = self[key].get_decl(OSE)
+            table.append((ose_key, key, decl.get('converter'), decl.get('validator')))
+        table.sort(key = lambda entry : entry[0])
+        self.__ose_table = tuple(table)
+
+    #========================================================================
+    def get_ose_table(self):
+        #--------------------------------------------------------------------
+        """Get the table of OS environment variables (`OSE` *endpoints*)
+        declared by *arguments*, built when committing.
+
+        :Returns:
+            tuple of ``(ose_key, key, converter, validator)`` tuples sorted by
+            ``ose_key``, where ``ose_key`` is the name of OS environment
+            variable, ``key`` is the name of *argument* it belongs to and
+            ``converter``, ``validator`` are these declared for the `OSE`
+            *endpoint* (or ``None``).
+        """
+        #--------------------------------------------------------------------
+        return self.__ose_table
+
+    #========================================================================
+    def _build_dependency_graph(self):
+        """Build the graph of dependencies between *arguments*, that is, for
+        every *argument* find other *arguments* referenced by placeholders in
+        its default values. Raise ``SCons.Errors.UserError`` if the
+        dependencies are cyclic. This method is for internal use, it IS **NOT
+        a part of public API**."""
+        deps = {}
+        for (key, decl) in self.items():
+            refs = set()
+            for ns in range(0,ALL):
+                if decl.has_decl(ns):
+                    refs.update(_placeholders(decl.get_default(ns)))
+            deps[key] = frozenset(k for k in refs if k in self)
+        cycle = _find_cycle(deps)
+        if cycle:
+            raise SCons.Errors.UserError("cyclic dependency between default " \
+                                         "values of arguments: %s" % ' -> '.join(cycle))
+        self.__deps = deps
+
+    #========================================================================
+    def get_dependency_graph(self):
+        #--------------------------------------------------------------------
+        """Get the graph of dependencies between *arguments*, built from
+        placeholders found in their default values when committing.
+
+        :Returns:
+            dictionary with items ``(key, refs)``, where ``key`` is an
+            *argument* name and ``refs`` is a frozenset of names of other
+            *arguments* referenced by its default values.
+        """
+        #--------------------------------------------------------------------
+        return self.__deps.copy()
+
     #========================================================================
     def _resubst_decl_defaults(self, decl):
         """Rename placeholders found in the declarations of default values of
@@ -473,7 +750,9 @@ class _ArgumentDeclarations(dict):
         options.
 
         The function finishes declaration stage, freezes the dictionary and
-        makes call to `add_to()` with ``*args`` passed verbatim to it.
+        makes call to `add_to()` with ``*args`` passed verbatim to it. It
+        raises ``SCons.Errors.UserError`` if default values of *arguments*
+        reference each other cyclically (see `get_dependency_graph()`).
 
         :Parameters:
             args
@@ -481,11 +760,14 @@ class _ArgumentDeclarations(dict):
         """
         #--------------------------------------------------------------------
         if not self.__committed:
-            self._build_resubst_dicts()
-            self._build_iresubst_dicts()
-            self.__resubst_defaults()
-            self.__committed = True
-            self.add_to(*args)
+            with Instrumentation.phase('commit'):
+                self._build_dependency_graph()
+                self._build_resubst_dicts()
+                self._build_iresubst_dicts()
+                self.__resubst_defaults()
+                self._build_ose_table()
+                self.__committed = True
+                self.add_to(*args)
 
     #========================================================================
     def add_to(self, *args):
@@ -493,8 +775,11 @@ class _ArgumentDeclarations(dict):
         """Create and initialize the corresponding ``ns`` variables (where
         ``ns`` is one of `ENV`, `VAR` or `OPT`).
 
-        This function calls `_safe_add_to()` for each ``ns`` from ``(ENV,
-        VAR, OPT)``.
+        This function calls `_bulk_add_to()` for each ``ns`` from ``(ENV,
+        VAR, OPT)`` (there is nothing to create for `OSE`), so that all the construction variables get their
+        defaults in a single ``env.SetDefault()`` call, all the command-line
+        variables are registered at once and the command line is re-parsed
+        only once for the new options.
 
         :Parameters:
             args
@@ -507,7 +792,9 @@ class _ArgumentDeclarations(dict):
                       command-line variables will be defined,
                     - ``options`` is a Boolean deciding whether the
                       corresponding command-line options should be created or
-                      not (default ``False`` means 'do not create').
+                      not (default ``False`` means 'do not create'); the
+                      string ``'deferred'`` creates only the options present
+                      on the command line (see `add_deferred_options()`).
 
                 All the arguments are optional. ``None`` may be used to
                 represent missing argument and skip the creation of certain
@@ -515,8 +802,9 @@ class _ArgumentDeclarations(dict):
         """
         #--------------------------------------------------------------------
         self.__ensure_committed()
-        for ns in range(0,min(len(args),ALL)):
-            if args[ns]: self._safe_add_to(ns, args[ns])
+        with Instrumentation.phase('add_to'):
+            for ns in range(0,min(len(args),OSE)):
+                if args[ns]: self._bulk_add_to(ns, args[ns])
 
     #========================================================================
     def Commit(self, env=None, variables=None, create_options=False, create_args=True, *args):
@@ -532,7 +820,8 @@ class _ArgumentDeclarations(dict):
                 variables defined by *arguments* declared here,
             create_options : Boolean
                 if ``True``, the command-line create_options declared by *arguments*
-                are created,
+                are created; if ``'deferred'``, only these given on the
+                command line are created (see `add_deferred_options()`),
             create_args
                 if ``True`` (default) create and return a `_Arguments` object for
                 further operation on variables and their values,
@@ -547,6 +836,103 @@ class _ArgumentDeclarations(dict):
         if create_args:   return _Arguments(self)
         else:       return None
 
+    #========================================================================
+    def SchemaFingerprint(self):
+        #--------------------------------------------------------------------
+        """Return a digest of all the declarations, as a hex string. The
+        digest changes whenever the declarations (or the modules the
+        *arguments* were imported from) change. It identifies versions of the
+        schema document, see `Schema()`."""
+        #--------------------------------------------------------------------
+        from SConsArguments.Importer import _get_origins, _get_groups
+        origins = _get_origins(self)
+        groups = _get_groups(self)
+        data = []
+        for (name, decl) in sorted(self.items()):
+            tabs = [decl.get_decl(ns) if decl.has_decl(ns) else None for ns in range(0,ALL)]
+            data.append((name, origins.get(name), groups.get(name, []), tabs))
+        data.append(('__committed__', self.__committed))
+        return hashlib.sha1(_canonical_value(data).encode('utf-8')).hexdigest()
+
+    #========================================================================
+    def Schema(self):
+        #--------------------------------------------------------------------
+        """Return machine-readable description of the declared *arguments*.
+
+        The returned dictionary may be serialized to JSON and has the
+        form::
+
+            { 'format' : 'sconsarguments-schema', 'version' : 1,
+              'fingerprint' : '<SchemaFingerprint()>',
+              'arguments' : {
+                  'CC' : { 'module' : 'cc', 'groups' : ['progs'],
+                           'env' : { 'key' : 'CC' },
+                           'var' : { 'key' : 'CC', 'help' : 'The C compiler', ... },
+                           'opt' : { 'names' : ['--cc'], 'dest' : 'cc', ... } },
+                  ... } }
+
+        The ``module`` is the name of module the *argument* was imported
+        from (``None`` for *arguments* declared otherwise), ``groups`` lists
+        the groups of the module (``progs``, ``flags``, ...) the *argument*
+        belongs to. The ``env``,
+        ``var`` and ``opt`` entries are present only for the declared
+        *endpoints*; undefined defaults are omitted. Callables (converters,
+        validators, ...) are represented by their ``"module.name"``. After
+        commit, placeholders in defaults refer to names of the respective
+        *endpoints*.
+
+        The document is kept in memory until the declarations change.
+        """
+        #--------------------------------------------------------------------
+        from SConsArguments.Importer import _get_origins, _get_groups
+        fingerprint = self.SchemaFingerprint()
+        if self.__schema is not None and self.__schema['fingerprint'] == fingerprint:
+            return self.__schema
+        origins = _get_origins(self)
+        groups = _get_groups(self)
+        arguments = {}
+        for (name, decl) in self.items():
+            entry = { 'module' : origins.get(name), 'groups' : groups.get(name, []) }
+            for ns in range(0,ALL):
+                if not decl.has_decl(ns):
+                    continue
+                tab = decl.get_decl(ns)
+                if ns == OPT:
+                    tab = dict(tab[1], names = tab[0])
+                tab = dict((k, v) for (k, v) in tab.items() if v is not UNDEFINED)
+                entry[_ns_names[ns]] = _json_value(tab)
+            arguments[name] = entry
+        self.__schema = { 'format' : 'sconsarguments-schema', 'version' : 1,
+                          'fingerprint' : fingerprint, 'arguments' : arguments }
+        return self.__schema
+
+    #========================================================================
+    def ExportSchema(self, filename):
+        #--------------------------------------------------------------------
+        """Write the document returned by `Schema()` to JSON file.
+
+        The file is not rewritten (and the schema is not generated), if it
+        already describes current declarations, i.e. its ``fingerprint`` is
+        equal to `SchemaFingerprint()`. Tools may read the file without
+        running SCons.
+
+        :Parameters:
+            filename : str
+                name of the file to write
+        :Returns:
+            ``True`` if the file has been written, ``False`` if it was up to
+            date (or couldn't be written).
+        """
+        #--------------------------------------------------------------------
+        fingerprint = self.SchemaFingerprint()
+        try:
+            with open(filename) as f:
+                if json.load(f).get('fingerprint') == fingerprint:
+                    return False
+        except (IOError, OSError, ValueError, AttributeError):
+            pass
+        return _write_json_file(filename, self.Schema())
+
 #############################################################################
 def __dict_converted(convert, initializer=MISSING, **kw):
     """Generic algorithm for dict initialization while converting the values
@@ -0,0 +1,294 @@
+"""`SConsArguments.Defaults`
+
+Lazily computed, persistently cached default values of *arguments*.
+
+Some defaults are expensive to compute (compiler version probes, ``WhereIs``
+lookups, ``pkg-config`` queries, ...). A `LazyDefault` may be used as a
+default value of an *argument*, in place of the value itself. It's stored in
+the construction environment as is, and the wrapped function is invoked
+only when the value is actually read:
+
+- when the construction variable is substituted (``env.subst('$CC')``, or
+  indirectly, when a command line is being built) - `LazyDefault` objects
+  are callable, as SCons expects for construction variables computed at
+  substitution time,
+- when `SConsArguments.Arguments._Arguments.ResolveDefaults()` is called,
+- by `LazyDefault.resolve()`.
+
+If the value gets overridden by a command-line variable, an option or
+``os.environ`` (see `SConsArguments.Arguments._Arguments.Postprocess()`),
+the function is not invoked at all.
+
+Results may be cached on disk (see `DefaultsCache`), keyed by a
+user-supplied *fingerprint* of the things the result depends on, so the
+probes don't rerun on every invocation of SCons::
+
+    # SConstruct
+    import os
+    from SConsArguments import DeclareArguments, LazyDefault
+
+    def gcc_version(env):
+        return os.popen('gcc -dumpversion').read().strip()
+
+    def gcc_stamp(env):
+        return os.path.getmtime(env.WhereIs('gcc'))
+
+    decls = DeclareArguments(
+        gcc_version = { 'env_key' : 'GCC_VERSION', 'var_key' : 'GCC_VERSION',
+                        'default' : LazyDefault(gcc_version, gcc_stamp) }
+    )
+"""
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+from SConsArguments.Util import MISSING, _canonical_value, _write_json_file, _json_exact
+from SConsArguments import Instrumentation
+import SCons.Util
+import hashlib
+import atexit
+import json
+
+#############################################################################
+class DefaultsCache(object):
+    #========================================================================
+    """On-disk cache of values computed by `LazyDefault` objects.
+
+    The cache is a JSON file mapping keys of `LazyDefault` objects to their
+    values and stamps (digests of fingerprints) the values were computed
+    for. The file is read on first lookup and written back at exit, if
+    anything has been changed. Values which don't survive a round-trip
+    through JSON unchanged (tuples, for example, would come back as lists)
+    are not stored.
+    """
+    #========================================================================
+
+    _version = 1
+
+    #========================================================================
+    def __init__(self, filename):
+        """Constructor for `DefaultsCache`
+
+        :Parameters:
+            filename : str
+                name of the cache file
+        """
+        self.filename = filename
+        self.__entries = None
+        self.__dirty = False
+
+    #========================================================================
+    def __load(self):
+        """Read the cache file. This method is for internal use and IS **NOT
+        a part of public API**."""
+        if self.__entries is None:
+            self.__entries = {}
+            try:
+                with open(self.filename) as f:
+                    data = json.load(f)
+                if data.get('version') == self._version:
+                    self.__entries = data['entries']
+            except (IOError, OSError, ValueError, KeyError, AttributeError):
+                pass
+        return self.__entries
+
+    #========================================================================
+    def lookup(self, key, stamp):
+        """Return the value cached under `key` for `stamp`, or `MISSING` if
+        there is no such value."""
+        try:
+            entry = self.__load()[key]
+        except KeyError:
+            return MISSING
+        if entry.get('stamp') != stamp:
+            return MISSING
+        return entry.get('value', MISSING)
+
+    #========================================================================
+    def store(self, key, stamp, value):
+        """Store `value` under `key` for `stamp`. Return ``False`` if the
+        value can't be stored in the cache."""
+        if not _json_exact(value):
+            return False
+        if not self.__dirty:
+            atexit.register(self.flush)
+        self.__load()[key] = { 'stamp' : stamp, 'value' : value }
+        self.__dirty = True
+        return True
+
+    #========================================================================
+    def flush(self):
+        """Write the cache file, if it's been modified."""
+        if not self.__dirty:
+            return
+        data = { 'version' : self._version, 'entries' : self.__entries }
+        if _write_json_file(self.filename, data):
+            self.__dirty = False
+
+#############################################################################
+_defaults_cache = MISSING
+
+#############################################################################
+def GetDefaultsCache():
+    """Return the `DefaultsCache` used by `LazyDefault` objects by default.
+    Unless changed with `SetDefaultsCache()`, it's a cache stored in
+    ``.sconsarguments.defaults.json`` file in current directory (the top
+    source directory, when running SCons)."""
+    global _defaults_cache
+    if _defaults_cache is MISSING:
+        _defaults_cache = DefaultsCache('.sconsarguments.defaults.json')
+    return _defaults_cache
+
+#############################################################################
+def SetDefaultsCache(cache):
+    """Set the `DefaultsCache` used by `LazyDefault` objects by default.
+
+    :Parameters:
+        cache : `DefaultsCache` | str | None
+            a cache object or a name of the cache file; ``None`` disables
+            persistent caching
+    """
+    global _defaults_cache
+    if SCons.Util.is_String(cache):
+        cache = DefaultsCache(cache)
+    _defaults_cache = cache
+
+#############################################################################
+class LazyDefault(object):
+    #========================================================================
+    """Default value computed on demand.
+
+    Use instances of this class as default values of *arguments*. See
+    `SConsArguments.Defaults` for details.
+    """
+    #========================================================================
+
+    #========================================================================
+    def __init__(self, func, fingerprint=None, key=None, cache=MISSING):
+        #--------------------------------------------------------------------
+        """Constructor for `LazyDefault`
+
+        :Parameters:
+            func : callable
+                invoked as ``func(env)`` to compute the value,
+            fingerprint
+                describes everything the value depends on (tool paths,
+                their mtimes, versions, ...); may be a callable invoked as
+                ``fingerprint(env)`` or a constant; if ``None`` (default),
+                the value is computed once per process and not stored on
+                disk,
+            key : str
+                key identifying the value in the on-disk cache; by default
+                it's derived from the module and name of `func`,
+            cache : `DefaultsCache` | None
+                cache to be used instead of the default one (see
+                `GetDefaultsCache()`); ``None`` disables persistent caching
+                for this value.
+        """
+        #--------------------------------------------------------------------
+        if key is None:
+            name = getattr(func, '__qualname__', getattr(func, '__name__', None))
+            if name is None or '<' in name:
+                if fingerprint is not None:
+                    raise ValueError("key must be given for %r" % func)
+                name = repr(func)
+            key = '%s.%s' % (getattr(func, '__module__', None), name)
+        self.func = func
+        self.fingerprint = fingerprint
+        self.key = key
+        self.cache = cache
+        self.__values = {}
+
+    #========================================================================
+    def __repr__(self):
+        return 'LazyDefault(%s)' % self.key
+
+    __str__ = __repr__
+
+    #========================================================================
+    def __call__(self, target=None, source=None, env=None, for_signature=False):
+        """Compute the value when the corresponding construction variable is
+        being substituted by SCons."""
+        return self.resolve(env)
+
+    #========================================================================
+    def stamp(self, env):
+        """Return a digest of the fingerprint (for `env`) or ``None`` if
+        there is no fingerprint."""
+        fingerprint = self.fingerprint
+        if fingerprint is None:
+            return None
+        if callable(fingerprint):
+            fingerprint = fingerprint(env)
+        data = _canonical_value(fingerprint)
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        return hashlib.sha1(data).hexdigest()
+
+    #========================================================================
+    def resolve(self, env=None):
+        """Return the value, computing it (or reading from cache) if
+        necessary.
+
+        :Parameters:
+            env
+                SCons environment passed to `func` and `fingerprint`.
+        """
+        stamp = self.stamp(env)
+        try:
+            return self.__values[stamp]
+        except KeyError:
+            pass
+        cache = self.cache
+        if cache is MISSING:
+            cache = GetDefaultsCache()
+        if stamp is not None and cache is not None:
+            value = cache.lookup(self.key, stamp)
+            if value is not MISSING:
+                if Instrumentation.active:
+                    Instrumentation.count('LazyDefault.cache_hits')
+                self.__values[stamp] = value
+                return value
+        if Instrumentation.active:
+            with Instrumentation.phase('LazyDefault', key = self.key):
+                value = self.func(env)
+        else:
+            value = self.func(env)
+        self.__values[stamp] = value
+        if stamp is not None and cache is not None:
+            cache.store(self.key, stamp, value)
+        return value
+
+#############################################################################
+def _resolve(value, env):
+    """Return `value`, or the value it computes if it's a `LazyDefault`. This
+    function is for internal use and IS **NOT a part of public API**."""
+    if isinstance(value, LazyDefault):
+        return value.resolve(env)
+    return value
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -34,6 +34,16 @@ This function may use the utility function `export_arguments()` to handle
 common parameteres. See the source code of existing modules in
 ``"SConsArguments"`` to find an example.
 
+Loaded modules are cached (until their files get modified), and so are the
+results returned by their ``arguments(**kw)`` functions. The ``arguments()``
+function should thus depend only on its keyword arguments.
+
+Declarations of the modules bundled with ``SConsArguments`` are read from
+a prebuilt catalog (``catalog.json``), so importing them requires no module
+lookups. A module found in ``argpath`` still takes precedence over the
+catalog. The catalog must be regenerated with ``bin/gencatalog.py`` whenever
+a bundled module gets changed.
+
 Modules may be imported with `ImportArguments()` function, which takes a
 module name(s) as firsta argument (so, `ImportArguments("mine")` for the above
 example).
@@ -63,23 +73,241 @@ example).
 __docformat__ = "restructuredText"
 
 from SConsArguments.Declarations import ArgumentDeclarations, DeclareArgument
+from SConsArguments.Declarations import _ArgumentDeclarations
 from SConsArguments.NameConv import _ArgumentNameConv
+from SConsArguments.Util import _is_immutable
+from SConsArguments import Instrumentation
 import SCons.Util
-import SCons.Tool
-import SCons.Script.Main
-import SCons.Node.FS
-import SCons.Platform
 import SCons.Errors
 import types
+import copy
 import os.path
 import sys
+import weakref
+import fnmatch
+import re
+import json
 
-def _load_module_file(name, path):
+#############################################################################
+_argmod_cache = {}
+"""Cache of loaded arguments' modules, see `_load_module_file()`. Maps
+``(name, filename)`` to ``(mtime, module)``."""
+
+#############################################################################
+_argmod_results = weakref.WeakKeyDictionary()
+"""Cache of frozen results of ``module.arguments(**kw)``, see
+`_argmod_arguments()`. Maps modules to ``{ fingerprint : frozen_result }``
+dictionaries."""
+
+#############################################################################
+_origins = {}
+"""Names of modules the imported *arguments* come from and groups they
+belong to. Maps ids of `_ArgumentDeclarations` objects returned by
+`ImportArguments()` to ``(weakref, { argument_name : module_name },
+{ argument_name : [group, ...] })`` tuples (the declarations are
+unhashable, so a ``WeakKeyDictionary`` can't be used here)."""
+
+#############################################################################
+def _argmod_name(mod):
+    """Return the name of arguments' module **mod** (which may be a name or
+    a module object). This function is for internal use and IS **NOT a part
+    of public API**."""
+    if isinstance(mod, types.ModuleType):
+        return mod.__name__.split('.')[-1]
+    return mod
+
+#############################################################################
+def _argmod_groups(mod):
+    """Return the ``_groups`` dictionary of arguments' module **mod** (which
+    may be a module object or anything else providing ``arguments()``), or
+    an empty dictionary. This function is for internal use and IS **NOT
+    a part of public API**."""
+    groups = getattr(mod, '_groups', None)
+    if groups is None:
+        # the module may re-export arguments of another one (c++ -> cxx)
+        func = getattr(mod, 'arguments', None)
+        groups = getattr(func, '__globals__', {}).get('_groups')
+    return groups if SCons.Util.is_Dict(groups) else {}
+
+#############################################################################
+def _record_origins(decls, names, mod, groups = None):
+    """Record, that *arguments* **names** of **decls** come from module
+    **mod** and belong to **groups** (the ``_groups`` dictionary of the
+    module). This function is for internal use and IS **NOT a part of public
+    API**."""
+    key = id(decls)
+    try:
+        origins, memberships = _origins[key][1:]
+    except KeyError:
+        ref = weakref.ref(decls, lambda r : _origins.pop(key, None))
+        origins, memberships = {}, {}
+        _origins[key] = (ref, origins, memberships)
+    modname = _argmod_name(mod)
+    members = [ (g, set(m)) for (g, m) in (groups or {}).items() ]
+    for name in names:
+        origins[name] = modname
+        memberships[name] = sorted(g for (g, m) in members if name in m)
+
+#############################################################################
+def _get_origins(decls):
+    """Return ``{ argument_name : module_name }`` dictionary for *arguments*
+    imported to **decls** by `ImportArguments()`. This function is for
+    internal use and IS **NOT a part of public API**."""
+    return _get_recorded(decls, 1)
+
+#############################################################################
+def _get_groups(decls):
+    """Return ``{ argument_name : [group, ...] }`` dictionary for *arguments*
+    imported to **decls** by `ImportArguments()`. This function is for
+    internal use and IS **NOT a part of public API**."""
+    return _get_recorded(decls, 2)
+
+#############################################################################
+def _get_recorded(decls, index):
+    try:
+        entry = _origins[id(decls)]
+    except KeyError:
+        return {}
+    if entry[0]() is not decls: # pragma: no cover
+        return {}
+    return dict((k, v) for (k, v) in entry[index].items() if dict.__contains__(decls, k))
+
+#############################################################################
+def _file_mtime(filename):
+    try:
+        return os.path.getmtime(filename)
+    except (OSError, TypeError):
+        return None
+
+#############################################################################
+def _cached_argmod(name, filename, load):
+    """Return module ``name`` loaded from ``filename``, using the cache of
+    already loaded modules. The ``load`` callable is invoked to actually load
+    the module if it's not found in cache or the file has been modified since
+    it was cached. This function is for internal use and IS **NOT a part of
+    public API**."""
+    mtime = _file_mtime(filename)
+    if mtime is None:
+        # Not a regular file (builtin, frozen, ...) - don't cache
+        return load()
+    key = (name, filename)
+    try:
+        cached_mtime, mod = _argmod_cache[key]
+    except KeyError:
+        pass
+    else:
+        if cached_mtime == mtime:
+            if Instrumentation.active:
+                Instrumentation.count('Importer.argmod_cache_hits')
+            return mod
+    if Instrumentation.active:
+        Instrumentation.count('Importer.argmod_cache_misses')
+    mod = load()
+    _argmod_cache[key] = (mtime, mod)
+    return mod
+
+#############################################################################
+_argpath_index = {}
+"""Index of directories searched for arguments' modules, see
+`_argdir_index()`. Maps directory names to ``(generation, mtime, index)``
+triples, where ``index`` maps module names to their file names."""
+
+#############################################################################
+_argpath_generation = 0
+"""Incremented by each call to `ImportArguments()`. Directories in
+`_argpath_index` are re-validated (their mtime checked) at most once per
+generation."""
+
+#############################################################################
+def _module_suffixes():
+    if sys.version_info < (3,4):
+        import imp
+        return [ s[0] for s in imp.get_suffixes() ]
+    else:
+        import importlib.machinery
+        return importlib.machinery.all_suffixes()
+
+#############################################################################
+def _scan_argdir(dirname):
+    """Scan directory ``dirname`` once and return a dictionary mapping names
+    of python modules found in this directory to their file names. This
+    function is for internal use and IS **NOT a part of public API**."""
+    suffixes = _module_suffixes()
+    modules = {}
+    packages = {}
+    for entry in os.listdir(dirname):
+        path = os.path.join(dirname, entry)
+        for suffix in suffixes:
+            if entry.endswith(suffix):
+                modules.setdefault(entry[:-len(suffix)], path)
+                break
+        else:
+            if '.' not in entry:
+                init = os.path.join(path, '__init__.py')
+                if os.path.isfile(init):
+                    packages[entry] = init
+    # packages take precedence over modules, as with python import system
+    modules.update(packages)
+    return modules
+
+#############################################################################
+def _argdir_index(dirname):
+    """Return the index of modules found in directory ``dirname`` (see
+    `_scan_argdir()`), or ``None`` if ``dirname`` is not a directory.
+
+    The directory is scanned at first use and re-scanned only when its mtime
+    changes. The mtime is checked at most once per `_argpath_generation`.
+    This function is for internal use and IS **NOT a part of public API**.
+    """
+    try:
+        generation, mtime, index = _argpath_index[dirname]
+    except KeyError:
+        generation, mtime, index = None, None, None
+    if generation == _argpath_generation:
+        return index
+    newmtime = _file_mtime(dirname)
+    if newmtime is None or not os.path.isdir(dirname):
+        index = None
+    elif newmtime != mtime or index is None:
+        index = _scan_argdir(dirname)
+    _argpath_index[dirname] = (_argpath_generation, newmtime, index)
+    return index
+
+#############################################################################
+def _load_module_from(name, filename):
+    """Load module ``name`` from a file ``filename`` (found by
+    `_argdir_index()`). This function is for internal use and IS **NOT a part
+    of public API**."""
+    if sys.version_info < (3,4):
+        import imp
+        dirname = os.path.dirname(filename)
+        if os.path.basename(filename) == '__init__.py':
+            dirname = os.path.dirname(dirname)
+        file, path, desc = imp.find_module(name, [dirname])
+        try:
+            return _cached_argmod(name, path, lambda : imp.load_module(name, file, path, desc))
+        finally:
+            if file:
+                file.close()
+    else:
+        import importlib.util
+        def load():
+            spec = importlib.util.spec_from_file_location(name, filename)
+            mod = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(mod)
+            return mod
+        return _cached_argmod(name, filename, load)
+
+#############################################################################
+def _find_and_load_module(name, path):
+    """Find module ``name`` in ``path`` using python import machinery and
+    load it. This function is for internal use and IS **NOT a part of public
+    API**."""
     if sys.version_info < (3,4):
         import imp
         file, path, desc = imp.find_module(name, path)
         try:
-            return imp.load_module(name, file, path, desc)
+            return _cached_argmod(name, path, lambda : imp.load_module(name, file, path, desc))
         finally:
             if file:
                 file.close()
@@ -92,9 +320,38 @@ def _load_module_file(name, path):
                 break
         if spec is None:
             raise ImportError("No module named '%s'" % name)
-        mod = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(mod)
-        return mod
+        def load():
+            mod = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(mod)
+            return mod
+        return _cached_argmod(name, getattr(spec, 'origin', None), load)
+
+#############################################################################
+def _load_module_file(name, path):
+    """Load module ``name`` from one of the directories listed in ``path``.
+
+    Directories are looked up in their indexes (see `_argdir_index()`), so
+    finding a module is a dictionary lookup instead of a sequence of probes
+    on the filesystem. Entries of ``path`` which exist but are not
+    directories (e.g. zip files) are handed to the python import machinery.
+    This function is for internal use and IS **NOT a part of public API**.
+    """
+    if SCons.Util.is_String(path):
+        path = [ path ]
+    for entry in path:
+        index = _argdir_index(entry)
+        if index is not None:
+            try:
+                filename = index[name]
+            except KeyError:
+                continue
+            return _load_module_from(name, filename)
+        elif os.path.exists(entry):
+            try:
+                return _find_and_load_module(name, [entry])
+            except ImportError:
+                continue
+    raise ImportError("No module named '%s'" % name)
 
 #############################################################################
 # This shall be initialized with _initDefaultArgpath(). It has to be a list.
@@ -112,18 +369,18 @@ def _handle_site_scons_dir(topdir, site_dir_name=None):
         err_if_not_found = False
 
     site_dir = os.path.join(topdir, site_dir_name)
-    if not os.path.exists(site_dir):
-        if err_if_not_found:
-            raise SCons.Errors.UserError("site dir %s not found." % site_dir)
-        return
-
     site_arguments_dirname = "site_arguments"
     site_arguments_dir = os.path.join(site_dir, site_arguments_dirname)
+    # Probe for site_arguments first, in the common case it saves us a
+    # filesystem round trip.
     if os.path.exists(site_arguments_dir):
         _defaultArgpath.insert(0, os.path.abspath(site_arguments_dir))
+    elif err_if_not_found and not os.path.exists(site_dir):
+        raise SCons.Errors.UserError("site dir %s not found." % site_dir)
 
 #############################################################################
 def _handle_all_site_scons_dirs(topdir):
+    import SCons.Platform
     platform = SCons.Platform.platform_default()
     homedir = lambda d : os.path.expanduser('~/' + d)
 
@@ -156,12 +413,19 @@ def _handle_all_site_scons_dirs(topdir):
 
 #############################################################################
 def _initDefaultArgpath():
+    # SCons.Script.Main is rather heavy, import it only when really needed
+    import SCons.Script.Main
+    import SCons.Node.FS
     global _defaultArgpath
 
     _defaultArgpath = []
 
     site_dir = SCons.Script.Main.GetOption('site_dir')
-    no_site_dir = SCons.Script.Main.GetOption('no_site_dir')
+    try:
+        no_site_dir = SCons.Script.Main.GetOption('no_site_dir')
+    except AttributeError:
+        # newer SCons stores --no-site-dir as site_dir = False
+        no_site_dir = site_dir is False
     topdir = SCons.Node.FS.get_default_fs().SConstruct_dir
 
     toppath = topdir.get_abspath()
@@ -186,6 +450,181 @@ def GetDefaultArgpath():
         _initDefaultArgpath()
     return _defaultArgpath
 
+#############################################################################
+_catalog_version = 1
+"""Version of the format of arguments' catalog. Catalogs of other versions
+are ignored."""
+
+_catalog_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json')
+"""The catalog of arguments' modules bundled with SConsArguments. It's
+generated by ``bin/gencatalog.py``, see `_write_catalog()`."""
+
+_catalog = (None, None)
+"""The catalog loaded by `_load_catalog()`, as ``(mtime, modules)``."""
+
+_catalog_argmods = {}
+"""Module objects created from catalog entries, see `_catalog_argmod()`."""
+
+#############################################################################
+def _bundled_argmod_names():
+    """Return sorted names of arguments' modules bundled with SConsArguments.
+    This function is for internal use and IS **NOT a part of public API**."""
+    pkgdir = os.path.dirname(_catalog_file)
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(pkgdir)
+                  if f.endswith('.py') and f[:1].islower() and f != '__init__.py')
+
+#############################################################################
+def _catalog_ref(obj):
+    """Return a reference (dotted name) to the function or class ``obj``,
+    as stored in catalog. This function is for internal use and IS **NOT
+    a part of public API**."""
+    modname = getattr(obj, '__module__', None)
+    name = getattr(obj, '__name__', None)
+    if modname in ('__builtin__', 'builtins'):
+        modname = 'builtins'
+    try:
+        ref = modname + '.' + name
+        if _catalog_deref(ref) is obj:
+            return ref
+    except (TypeError, ImportError, AttributeError):
+        pass
+    raise ValueError("can't store a reference to %r in catalog" % obj)
+
+#############################################################################
+def _catalog_deref(ref):
+    """Resolve a reference created by `_catalog_ref()`. This function is for
+    internal use and IS **NOT a part of public API**."""
+    modname, name = ref.rsplit('.', 1)
+    if modname == 'builtins' and sys.version_info < (3,):
+        modname = '__builtin__'
+    __import__(modname)
+    return getattr(sys.modules[modname], name)
+
+#############################################################################
+def _generate_catalog():
+    """Generate the catalog of bundled arguments' modules.
+
+    The catalog contains ``_all_arguments`` and ``_groups`` of every bundled
+    module together with the module name used by its ``arguments()``
+    function. Converters, validators and other callables are stored as
+    ``{"ref" : "<module>.<name>"}``. This function is for internal use and
+    IS **NOT a part of public API**.
+
+    :Returns:
+        a dictionary ready to be serialized with ``json``
+    """
+    def encode(value):
+        if callable(value):
+            return { 'ref' : _catalog_ref(value) }
+        return value
+
+    modules = {}
+    for name in _bundled_argmod_names():
+        mod = _load_module_file(name, sys.modules['SConsArguments'].__path__)
+        # the module may re-export stuff from another one (c++ -> cxx)
+        g = mod.arguments.__globals__
+        args, groups = g['_all_arguments'], g['_groups']
+        modname = _catalog_modname(name, mod, args)
+        modules[name] = {
+            'modname' : modname,
+            'arguments' : { k : { a : encode(v) for (a,v) in d.items() } for (k,d) in args.items() },
+            'groups' : groups
+        }
+    return { 'version' : _catalog_version, 'modules' : modules }
+
+#############################################################################
+def _catalog_modname(name, mod, args):
+    """Determine the module name the ``mod.arguments()`` passes to
+    `export_arguments()` (it's not always equal to ``name``, see ``c++`` or
+    ``sunc++``). This function is for internal use and IS **NOT a part of
+    public API**."""
+    candidates = [ name, mod.arguments.__globals__['__name__'].split('.')[-1], name.replace('+', 'x') ]
+    for modname in candidates:
+        kw = { 'include_groups' : [], modname + '_include_groups' : None }
+        if mod.arguments(**kw) == args:
+            return modname
+    raise ValueError("can't determine the name used by %r module" % name)
+
+#############################################################################
+def _write_catalog(filename = None):
+    """Generate the catalog of bundled arguments' modules and write it to
+    ``filename`` (by default `_catalog_file`). This function is for internal
+    use and IS **NOT a part of public API**."""
+    if filename is None:
+        filename = _catalog_file
+    text = json.dumps(_generate_catalog(), indent = 1, sort_keys = True, separators = (',', ': '))
+    with open(filename, 'w') as f:
+        f.write(text + '\n')
+
+#############################################################################
+def _load_catalog():
+    """Load the catalog of bundled arguments' modules from `_catalog_file`.
+
+    Returns a dictionary with catalog entries, keyed by module names, or
+    ``None`` if the catalog is missing or has unsupported version. The file is
+    read once (and again when it gets modified). This function is for
+    internal use and IS **NOT a part of public API**.
+    """
+    global _catalog
+    mtime = _file_mtime(_catalog_file)
+    if mtime is None:
+        return None
+    if _catalog[0] == mtime:
+        return _catalog[1]
+    try:
+        with open(_catalog_file) as f:
+            data = json.load(f, object_hook = _catalog_object_hook)
+    except (IOError, OSError, ValueError):
+        data = {}
+    if data.get('version') == _catalog_version:
+        modules = data.get('modules')
+    else:
+        modules = None
+    _catalog_argmods.clear()
+    _catalog = (mtime, modules)
+    return modules
+
+#############################################################################
+def _catalog_object_hook(obj):
+    if sys.version_info < (3,):
+        obj = { str(k) : (str(v) if isinstance(v, unicode) else v) for (k,v) in obj.items() }
+        for k, v in obj.items():
+            if isinstance(v, list):
+                obj[k] = [ (str(x) if isinstance(x, unicode) else x) for x in v ]
+    if len(obj) == 1 and 'ref' in obj:
+        return _catalog_deref(obj['ref'])
+    return obj
+
+#############################################################################
+def _catalog_argmod(name):
+    """Return a module object created from the catalog entry ``name``, or
+    ``None`` if there is no such entry.
+
+    The module object provides ``_all_arguments``, ``_groups`` and
+    ``arguments()``, as the original bundled module does. This function is for
+    internal use and IS **NOT a part of public API**.
+    """
+    catalog = _load_catalog()
+    if not catalog or name not in catalog:
+        return None
+    try:
+        return _catalog_argmods[name]
+    except KeyError:
+        pass
+    if Instrumentation.active:
+        Instrumentation.count('Importer.catalog_loads')
+    entry = catalog[name]
+    mod = types.ModuleType('SConsArguments.' + name)
+    mod.__file__ = _catalog_file
+    mod._all_arguments = all_arguments = entry['arguments']
+    mod._groups = groups = entry['groups']
+    modname = entry['modname']
+    def arguments(**kw):
+        return export_arguments(modname, all_arguments, groups, **kw)
+    mod.arguments = arguments
+    _catalog_argmods[name] = mod
+    return mod
+
 #############################################################################
 def _import_argmod(name, argpath = None, **kw):
     if isinstance(name, types.ModuleType):
@@ -203,44 +642,159 @@ def _import_argmod(name, argpath = None, **kw):
     try:
         return sys.modules[full_name]
     except KeyError:
+        mod = _catalog_argmod(name)
+        if mod is not None:
+            return mod
         try:
             return _load_module_file(name, sys.modules['SConsArguments'].__path__)
         except ImportError as e:
             raise RuntimeError("No module named %s : %s" % (name, e))
 
 #############################################################################
-def _load_dict_decl(name, decl, **kw):
+def _freeze(value):
+    """Convert `value` to a hashable object which may be used as (a part of)
+    a dictionary key. Raises ``TypeError`` if it's not possible. This function
+    is for internal use and IS **NOT a part of public API**."""
+    if SCons.Util.is_Dict(value):
+        return frozenset((k, _freeze(v)) for (k, v) in value.items())
+    elif SCons.Util.is_List(value) or SCons.Util.is_Tuple(value):
+        return tuple(_freeze(v) for v in value)
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    hash(value)
+    return value
+
+#############################################################################
+def _kw_fingerprint(kw):
+    """Return hashable fingerprint of keyword arguments ``kw`` or ``None`` if
+    the fingerprint can't be computed (e.g. some values are not hashable).
+    This function is for internal use and IS **NOT a part of public API**."""
+    try:
+        return _freeze(kw)
+    except TypeError:
+        return None
+
+#############################################################################
+def _freeze_arguments(args):
+    """Return a private deep copy of `args` to be memoized, so later changes
+    to `args` don't affect the memoized result. Each value is flagged, whether
+    it has to be copied by `_thaw_arguments()`. This function is for internal
+    use and IS **NOT a part of public API**."""
+    return tuple((name, tuple((k, v, not (_is_immutable(v) or callable(v)))
+                              for (k, v) in decl.items()))
+                 for (name, decl) in copy.deepcopy(args).items())
+
+#############################################################################
+def _thaw_arguments(frozen):
+    """Rebuild the dictionary of arguments from memoized `frozen` arguments.
+    Mutable values (such as list defaults or option keywords) are copied, so
+    callers may modify the result freely; immutable ones are shared. This
+    function is for internal use and IS **NOT a part of public API**."""
+    return dict((name, dict((k, copy.deepcopy(v) if mutable else v)
+                            for (k, v, mutable) in decl))
+                for (name, decl) in frozen)
+
+#############################################################################
+def _argmod_arguments(mod, **kw):
+    """Return the result of ``mod.arguments(**kw)``.
+
+    For modules loaded from files the result is memoized per distinct
+    fingerprint of ``kw``, so the ``arguments()`` function of a given module
+    is invoked only once for given set of keyword arguments. The caller gets
+    a fresh copy of the memoized result each time. This function is for
+    internal use and IS **NOT a part of public API**.
+    """
+    if not isinstance(mod, types.ModuleType):
+        return mod.arguments(**kw)
+    fingerprint = _kw_fingerprint(kw)
+    if fingerprint is None:
+        return mod.arguments(**kw)
+    results = _argmod_results.setdefault(mod, {})
+    try:
+        frozen = results[fingerprint]
+    except KeyError:
+        if Instrumentation.active:
+            Instrumentation.count('Importer.arguments_calls')
+        args = mod.arguments(**kw)
+        if not (SCons.Util.is_Dict(args) and all(SCons.Util.is_Dict(v) for v in args.values())):
+            return args
+        frozen = results[fingerprint] = _freeze_arguments(args)
+    return _thaw_arguments(frozen)
+
+#############################################################################
+_nameconv_keywords = frozenset([
+    'env_key_prefix', 'env_key_suffix', 'env_key_transform',
+    'var_key_prefix', 'var_key_suffix', 'var_key_transform',
+    'opt_key_prefix', 'opt_key_suffix', 'opt_key_transform',
+    'ose_key_prefix', 'ose_key_suffix', 'ose_key_transform',
+    'opt_prefix', 'opt_name_prefix', 'opt_name_suffix',
+    'option_transform' ])
+"""Keywords of `ImportArguments()` which are used to create the default
+`_ArgumentNameConv` object."""
+
+#############################################################################
+_nameconv_cache = {}
+"""Cache of `_ArgumentNameConv` objects created by `_nameconv_for()`, keyed
+by fingerprints of the keywords they were created from."""
+
+_nameconv_cache_size = 32
+"""Maximum number of entries in `_nameconv_cache`."""
+
+#############################################################################
+def _nameconv_for(kw):
+    """Return the `_ArgumentNameConv` object to be used when importing
+    arguments with keywords ``kw``, and a flag telling whether it was
+    provided by user (the **nameconv** keyword) or created by us.
+
+    Name converters created from same keywords are shared, so the converter
+    is created once per `ImportArguments()` call (and usually once for all
+    the calls using same keywords). This function is for internal use and IS
+    **NOT a part of public API**.
+    """
     try:
         nameconv = kw['nameconv']
+    except KeyError:
+        pass
+    else:
         if not isinstance(nameconv, _ArgumentNameConv):
             raise TypeError("The nameconv must be an instance of _ArgumentNameConv, not %r" % nameconv)
-        forcenameconv = True
+        return (nameconv, True)
+
+    # initially kw2 contains defaults
+    kw2 = { 'env_key_transform' : True,     # generate construction variable
+            'var_key_transform' : True,     # generate CLI variable
+            'opt_key_transform' : False,    # but skip CLI option
+            'option_transform'  : False }   # ...
+    kw2.update({ k : v for (k,v) in kw.items() if k in _nameconv_keywords })
+    fingerprint = _kw_fingerprint(kw2)
+    if fingerprint is None:
+        return (_ArgumentNameConv(**kw2), False)
+    try:
+        return (_nameconv_cache[fingerprint], False)
     except KeyError:
-        # initially kw2 contains defaults
-        kw2 = { 'env_key_transform' : True,     # generate construction variable
-                'var_key_transform' : True,     # generate CLI variable
-                'opt_key_transform' : False,    # but skip CLI option
-                'option_transform'  : False }   # ...
-        kws = { 'env_key_prefix', 'env_key_suffix', 'env_key_transform',
-                'var_key_prefix', 'var_key_suffix', 'var_key_transform',
-                'opt_key_prefix', 'opt_key_suffix', 'opt_key_transform',
-                'opt_prefix', 'opt_name_prefix', 'opt_name_suffix',
-                'option_transform' }
-        kw2.update({ k : v for (k,v) in kw.items() if k in kws })
-        nameconv = _ArgumentNameConv(**kw2)
-        forcenameconv = False
+        if len(_nameconv_cache) >= _nameconv_cache_size:
+            _nameconv_cache.clear()
+        nameconv = _nameconv_cache[fingerprint] = _ArgumentNameConv(**kw2)
+        return (nameconv, False)
 
+#############################################################################
+def _merge_dict_decl(endpoints, decl, forcenameconv):
     if forcenameconv:
         # nameconv provided by user, so we ignore *_prefix/*_suffix/*_transform
         # keywords and let the nameconv to override some entries provided in
         # decl (env_key, var_key, opt_key, option)
         decl2 = decl.copy()
-        decl2.update(nameconv.name2dict(name))
+        decl2.update(endpoints)
     else:
-        decl2 = nameconv.name2dict(name)
+        decl2 = endpoints
         decl2.update(decl)
     return decl2
 
+#############################################################################
+def _load_dict_decl(name, decl, **kw):
+    nameconv, forcenameconv = _nameconv_for(kw)
+    return _merge_dict_decl(nameconv.name2dict(name), decl, forcenameconv)
+
 #############################################################################
 def _load_decl(name, decl, **kw):
     preprocessor = kw.get('preprocessor', lambda d : d)
@@ -250,24 +804,328 @@ def _load_decl(name, decl, **kw):
     else:
         raise TypeError("Unsupported decl type %s" % type(decl))
 
+#############################################################################
+def _is_glob(pattern):
+    """Return ``True`` if ``pattern`` contains any of the glob wildcards."""
+    return any(c in pattern for c in '*?[')
+
+#############################################################################
+def _compile_globs(patterns):
+    """Compile glob ``patterns`` into a single regular expression and return
+    its ``match`` method."""
+    regex = '|'.join('(?:%s)' % fnmatch.translate(p) for p in patterns)
+    return re.compile(regex).match
+
+#############################################################################
+_name_filter_cache = {}
+"""Cache of name filters compiled by `_compile_name_filter()`."""
+
+_name_filter_cache_size = 32
+"""Maximum number of entries in `_name_filter_cache`."""
+
+#############################################################################
+def _compile_name_filter(name_filter):
+    """Compile the **name_filter** keyword of `ImportArguments()` into
+    a predicate.
+
+    The **name_filter** may be a callable (returned as is), a string or
+    a collection (list, tuple, set) of strings. Strings are either literal
+    argument names or glob patterns (such as ``'*FLAGS'``). Literal names are
+    collected into a frozenset, the patterns get compiled into a single
+    regular expression, so the resultant predicate takes constant time
+    per argument name. Compiled filters are cached. This function is for
+    internal use and IS **NOT a part of public API**.
+
+    :Parameters:
+        name_filter : callable | str | list | tuple | set
+            the filter to be compiled; ``None`` means "accept all names"
+
+    :Returns:
+        a callable ``f(name)`` returning ``True`` for the names which shall
+        be accepted
+    """
+    if name_filter is None:
+        return lambda x : True
+    if SCons.Util.is_String(name_filter):
+        name_filter = (name_filter,)
+    elif not (SCons.Util.is_Sequence(name_filter) or isinstance(name_filter, (set, frozenset))):
+        return name_filter
+    try:
+        key = frozenset(name_filter)
+        return _name_filter_cache[key]
+    except TypeError:
+        key = None
+    except KeyError:
+        pass
+    literals = frozenset(x for x in name_filter if not (SCons.Util.is_String(x) and _is_glob(x)))
+    patterns = [ x for x in name_filter if SCons.Util.is_String(x) and _is_glob(x) ]
+    if patterns:
+        match = _compile_globs(patterns)
+        predicate = lambda x : x in literals or match(x) is not None
+    else:
+        predicate = literals.__contains__
+    if key is not None:
+        if len(_name_filter_cache) >= _name_filter_cache_size:
+            _name_filter_cache.clear()
+        _name_filter_cache[key] = predicate
+    return predicate
+
 #############################################################################
 def _load_decls(args, **kw):
-    name_filter = kw.get('name_filter', lambda x : True)
-    if SCons.Util.is_Sequence(name_filter) or isinstance(name_filter, set):
-        allowed_names = name_filter
-        name_filter = lambda x : x in allowed_names
+    name_filter = _compile_name_filter(kw.get('name_filter'))
     decls = ArgumentDeclarations()
     if SCons.Util.is_Dict(args):
-        for name, decl in args.items():
-            if name_filter(name):
-                decls[name] = _load_decl(name, decl, **kw)
+        names = [ name for name in args if name_filter(name) ]
+        # endpoint names for all the arguments are generated in one pass
+        nameconv, forcenameconv = _nameconv_for(kw)
+        endpoints = nameconv.names2dicts(names)
+        preprocessor = kw.get('preprocessor', lambda d : d)
+        for name in names:
+            decl = args[name]
+            if not SCons.Util.is_Dict(decl):
+                raise TypeError("Unsupported decl type %s" % type(decl))
+            decl = _merge_dict_decl(endpoints[name], preprocessor(decl), forcenameconv)
+            decls[name] = DeclareArgument(**decl)
     else:
         raise TypeError("Can not load arguments from %r object" % type(args))
     return decls
 
 
 #############################################################################
-def ImportArguments(modules, argpath = None, **kw):
+def _catalog_names(modname, argpath, kw):
+    """Return names of arguments provided by module **modname**, as listed
+    in the catalog, or ``None`` if the module wouldn't be taken from the
+    catalog by `_import_argmod()`. The module is not loaded. This function
+    is for internal use and IS **NOT a part of public API**."""
+    if not SCons.Util.is_String(modname):
+        return None
+    catalog = _load_catalog()
+    if not catalog or modname not in catalog:
+        return None
+    for entry in (argpath or []) + GetDefaultArgpath():
+        index = _argdir_index(entry)
+        if index is None and os.path.exists(entry) or index is not None and modname in index:
+            # may be shadowed by user's module
+            return None
+    return _catalog_argmod(modname).arguments(**kw).keys()
+
+#############################################################################
+class _LazyArgmod(object):
+    """An arguments' module recorded by `_LazyArgumentDeclarations` to be
+    loaded later. This class is for internal use and IS **NOT a part of public
+    API**."""
+    def __init__(self, modname, argpath, kw):
+        self.modname = modname
+        self.argpath = argpath
+        self.kw = kw
+        self.loaded = False
+        self.module = None
+        self.__args = None
+        self.__names = None
+
+    def arguments(self):
+        """Return the (filtered) dictionary of arguments provided by the
+        module, without building any declarations"""
+        if self.__args is None:
+            mod = self.module = _import_argmod(self.modname, self.argpath)
+            args = _argmod_arguments(mod, **self.kw)
+            name_filter = _compile_name_filter(self.kw.get('name_filter'))
+            self.__args = { k : v for (k,v) in args.items() if name_filter(k) }
+        return self.__args
+
+    def names(self):
+        """Return names of arguments provided by the module. Names of bundled
+        modules are taken from the catalog, other modules have to be loaded
+        and their ``arguments()`` invoked"""
+        if self.__names is None:
+            names = None
+            if self.__args is None:
+                names = _catalog_names(self.modname, self.argpath, self.kw)
+            if names is None:
+                self.__names = frozenset(self.arguments())
+            else:
+                name_filter = _compile_name_filter(self.kw.get('name_filter'))
+                self.__names = frozenset(k for k in names if name_filter(k))
+        return self.__names
+
+    def declarations(self, names = None):
+        """Return the declarations of arguments provided by the module
+        (only these listed in **names**, if given)"""
+        args = self.arguments()
+        if names is not None:
+            args = { k : args[k] for k in names if k in args }
+        return _load_decls(args, **self.kw)
+
+#############################################################################
+class _LazyArgumentDeclarations(_ArgumentDeclarations):
+    """`_ArgumentDeclarations` with some of the declarations to be loaded
+    from arguments' modules on demand.
+
+    Modules are recorded with `add_argmod()`. Declarations of a module are
+    materialized when any of the module's arguments is first queried (by
+    name), or when whole declarations get accessed (endpoint dictionaries,
+    `commit()` and so on). Names of arguments are known without materializing
+    anything (bundled modules are not even loaded, their arguments are listed
+    in the catalog), so membership tests, iteration over keys and `len()` load
+    nothing. An argument declared by several modules is taken from the last
+    one, as `ImportArguments()` does.
+
+    This class is for internal use and IS **NOT a part of public API**.
+    """
+    def __init__(self, *args, **kw):
+        self.__argmods = []
+        self.__materializing = False
+        super(_LazyArgumentDeclarations, self).__init__(*args, **kw)
+
+    def add_argmod(self, modname, argpath = None, **kw):
+        """Record arguments' module **modname** to be loaded on demand"""
+        self.__argmods.append(_LazyArgmod(modname, argpath, kw))
+
+    def pending(self):
+        """Return names of recorded modules which are not loaded yet"""
+        return [ m.modname for m in self.__argmods if not m.loaded ]
+
+    def __owned_names(self, index):
+        """Return names of arguments the module **index** provides and which
+        are not overridden by modules recorded after it"""
+        names = set(self.__argmods[index].names())
+        for argmod in self.__argmods[index+1:]:
+            if not names:
+                break
+            names.difference_update(argmod.names())
+        return names
+
+    def __get_owner(self, key):
+        """Return the pending module providing argument **key** or ``None``"""
+        for argmod in reversed(self.__argmods):
+            if argmod.loaded:
+                # loaded module still wins over these recorded before it
+                if key in argmod.names():
+                    return None
+            elif key in argmod.names():
+                return argmod
+        return None
+
+    def __load(self, argmod):
+        """Materialize declarations provided by **argmod**"""
+        argmod.loaded = True
+        was_materializing, self.__materializing = self.__materializing, True
+        try:
+            with Instrumentation.phase('ImportArguments.lazy', module = str(argmod.modname)):
+                names = self.__owned_names(self.__argmods.index(argmod))
+                loaded = []
+                for (name, decl) in argmod.declarations(names).items():
+                    _ArgumentDeclarations.__setitem__(self, name, decl)
+                    loaded.append(name)
+                _record_origins(self, loaded, argmod.modname, _argmod_groups(argmod.module))
+        finally:
+            self.__materializing = was_materializing
+
+    def __load_key(self, key):
+        argmod = self.__get_owner(key)
+        if argmod is not None:
+            self.__load(argmod)
+
+    def materialize(self):
+        """Load all the pending modules"""
+        if self.__materializing:
+            return
+        for argmod in self.__argmods:
+            if not argmod.loaded:
+                self.__load(argmod)
+
+    def keys(self):
+        """Return names of all the declared *arguments*, including these
+        provided by pending modules (which are not loaded)"""
+        keys = list(super(_LazyArgumentDeclarations, self).keys())
+        for (i, argmod) in enumerate(self.__argmods):
+            if not argmod.loaded:
+                keys.extend(sorted(self.__owned_names(i)))
+        return keys
+
+    def __contains__(self, key):
+        return super(_LazyArgumentDeclarations, self).__contains__(key) or \
+               self.__get_owner(key) is not None
+
+    def has_key(self, key):
+        return key in self
+
+    def __getitem__(self, key):
+        self.__load_key(key)
+        return super(_LazyArgumentDeclarations, self).__getitem__(key)
+
+    def get(self, key, *args):
+        self.__load_key(key)
+        return super(_LazyArgumentDeclarations, self).get(key, *args)
+
+    def setdefault(self, key, *args):
+        self.__load_key(key)
+        return super(_LazyArgumentDeclarations, self).setdefault(key, *args)
+
+    def __setitem__(self, key, value):
+        self.__load_key(key)
+        return super(_LazyArgumentDeclarations, self).__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.__load_key(key)
+        return super(_LazyArgumentDeclarations, self).__delitem__(key)
+
+    def pop(self, key, *args):
+        self.__load_key(key)
+        return super(_LazyArgumentDeclarations, self).pop(key, *args)
+
+    def clear(self):
+        for argmod in self.__argmods:
+            argmod.loaded = True
+        return super(_LazyArgumentDeclarations, self).clear()
+
+    def __len__(self):
+        if not self.pending():
+            return super(_LazyArgumentDeclarations, self).__len__()
+        return len(self.keys())
+
+    def __iter__(self):
+        if not self.pending():
+            return super(_LazyArgumentDeclarations, self).__iter__()
+        return iter(self.keys())
+
+    def __eq__(self, other):
+        self.materialize()
+        if isinstance(other, _LazyArgumentDeclarations):
+            other.materialize()
+        return super(_LazyArgumentDeclarations, self).__eq__(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        self.materialize()
+        return super(_LazyArgumentDeclarations, self).__repr__()
+
+    def __materialized(method):
+        name = method.__name__
+        def wrapper(self, *args, **kw):
+            self.materialize()
+            return getattr(super(_LazyArgumentDeclarations, self), name)(*args, **kw)
+        wrapper.__name__ = name
+        wrapper.__doc__ = getattr(_ArgumentDeclarations, name).__doc__
+        return wrapper
+
+    values = __materialized(_ArgumentDeclarations.values)
+    items = __materialized(_ArgumentDeclarations.items)
+    popitem = __materialized(_ArgumentDeclarations.popitem)
+    update = __materialized(_ArgumentDeclarations.update)
+    copy = __materialized(_ArgumentDeclarations.copy)
+    get_rename_dict = __materialized(_ArgumentDeclarations.get_rename_dict)
+    get_irename_dict = __materialized(_ArgumentDeclarations.get_irename_dict)
+    get_resubst_dict = __materialized(_ArgumentDeclarations.get_resubst_dict)
+    get_iresubst_dict = __materialized(_ArgumentDeclarations.get_iresubst_dict)
+    commit = __materialized(_ArgumentDeclarations.commit)
+    Commit = __materialized(_ArgumentDeclarations.Commit)
+    del __materialized
+
+#############################################################################
+def ImportArguments(modules, argpath = None, lazy = False, **kw):
     """Import argument declarations from modules
 
     Note, that all the keyword arguments get passed to module's
@@ -280,6 +1138,12 @@ def ImportArguments(modules, argpath = None, **kw):
         argpath : list
             A list of directories to be searched for arguments' modules prior
             to default ones (returned by `GetDefaultArgpath()`).
+        lazy : bool
+            If ``True``, the modules are not loaded immediately. They get
+            loaded on demand, when any of their arguments is first queried or
+            when whole declarations are needed (e.g. at commit time). Errors
+            in modules (including missing modules) are also reported at that
+            time.
 
     :Keywords:
         preprocessor : callable
@@ -288,10 +1152,13 @@ def ImportArguments(modules, argpath = None, **kw):
             provided by third parties. It's used internally as follows:
             ``y = preprocessor(x)``, where ``x`` is the original argument
             declaration record from a module.
-        name_filter : callable | list | set
+        name_filter : callable | str | list | set
             A callable object used to filter-out unwanted arguments based on
             their names. If **name_filter** is a list or set (a collection),
-            only arguments listed in this collection will be imported.
+            only arguments listed in this collection will be imported. The
+            collection may contain glob patterns, for example
+            ``['CC', '*FLAGS']``. A string is treated as a single name or
+            pattern.
         nameconv : `SConsArguments.NameConv._ArgumentNameConv`
             An instance of `SConsArguments.NameConv._ArgumentNameConv` that
             will be used internally to map argument names to their
@@ -299,7 +1166,8 @@ def ImportArguments(modules, argpath = None, **kw):
             options. If **nameconv** is present, then **env_key_prefix**,
             **env_key_suffix**, **env_key_transform**, **var_key_prefix**,
             **var_key_suffix**, **var_key_transform**, **opt_key_prefix**,
-            **opt_key_suffix**, **opt_key_transform**, **opt_prefix**, 
+            **opt_key_suffix**, **opt_key_transform**, **ose_key_prefix**,
+            **ose_key_suffix**, **ose_key_transform**, **opt_prefix**,
             **opt_name_prefix**, **opt_name_suffix**, and **option_transform**
             are ignored.
         env_key_prefix : str
@@ -335,6 +1203,16 @@ def ImportArguments(modules, argpath = None, **kw):
             option keys, may be customized to completely redefine the way OPT
             keys are transformed. See
             `SConsArguments.NameConv._ArgumentNameConv`.
+        ose_key_prefix : str
+            A prefix to be prepended to OSE keys. See
+            `SConsArguments.NameConv._ArgumentNameConv`.
+        ose_key_suffix : str
+            A suffix to be appended to OSE keys. See
+            `SConsArguments.NameConv._ArgumentNameConv`.
+        ose_key_transform : callable | bool
+            A lambda used to transform *argument* names to OS environment
+            variables; OSE keys are not generated unless it's given. See
+            `SConsArguments.NameConv._ArgumentNameConv`.
         opt_prefix : str
             a prefix that is by default used when composing option names,
             usually a single or double dash, see
@@ -356,15 +1234,182 @@ def ImportArguments(modules, argpath = None, **kw):
        An instance of `SConsArguments.Declarations._ArgumentDeclarations`
        containing the imported argument declarations.
     """
-    # Load modules possibly containing arguments
-    decls = ArgumentDeclarations()
+    global _argpath_generation
+    _argpath_generation += 1
     if SCons.Util.is_String(modules):
         modules = [ modules ]
-    for modname in modules:
-        mod = _import_argmod(modname, argpath)
-        decls.update(_load_decls(mod.arguments(**kw), **kw))
+    if lazy:
+        decls = _LazyArgumentDeclarations()
+        for modname in modules:
+            decls.add_argmod(modname, argpath, **kw)
+        return decls
+    # Load modules possibly containing arguments
+    with Instrumentation.phase('ImportArguments'):
+        decls = ArgumentDeclarations()
+        for modname in modules:
+            mod = _import_argmod(modname, argpath)
+            loaded = _load_decls(_argmod_arguments(mod, **kw), **kw)
+            _record_origins(decls, loaded, modname, _argmod_groups(mod))
+            decls.update(loaded)
     return decls
 
+#############################################################################
+_group_expr_tokenizer = re.compile(r'\s*(?:([&|!()])|([^\s&|!()]+))')
+
+#############################################################################
+def _compile_group_expr(expr):
+    """Compile a group selector expression into a callable.
+
+    The expression is built of group names (possibly glob patterns, such as
+    ``'*flags'``), operators ``&`` (intersection), ``|`` (union), ``!``
+    (complement with respect to all the arguments of a module) and
+    parentheses, for example ``'flags & !pch'``. The returned callable takes
+    a group index (see `_group_index()`) and returns a frozenset of selected
+    argument names. This function is for internal use and IS **NOT a part
+    of public API**.
+    """
+    tokens = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        m = _group_expr_tokenizer.match(expr, pos)
+        if not m:
+            break
+        tokens.append(m.group(1) or ('name', m.group(2)))
+        pos = m.end()
+    tokens.append(None)
+
+    def error(what):
+        return ValueError("invalid group expression %r: %s" % (expr, what))
+
+    def unexpected(tok):
+        if isinstance(tok, tuple):
+            tok = tok[1]
+        return error("unexpected %r" % (tok,))
+
+    def parse_union(i):
+        lhs, i = parse_intersection(i)
+        while tokens[i] == '|':
+            rhs, i = parse_intersection(i + 1)
+            lhs = (lambda a, b : lambda idx : a(idx) | b(idx))(lhs, rhs)
+        return lhs, i
+
+    def parse_intersection(i):
+        lhs, i = parse_factor(i)
+        while tokens[i] == '&':
+            rhs, i = parse_factor(i + 1)
+            lhs = (lambda a, b : lambda idx : a(idx) & b(idx))(lhs, rhs)
+        return lhs, i
+
+    def parse_factor(i):
+        tok = tokens[i]
+        if tok == '!':
+            arg, i = parse_factor(i + 1)
+            return (lambda idx : idx.all - arg(idx)), i
+        elif tok == '(':
+            arg, i = parse_union(i + 1)
+            if tokens[i] != ')':
+                raise error("missing ')'")
+            return arg, i + 1
+        elif isinstance(tok, tuple):
+            name = tok[1]
+            return (lambda idx : idx.select(name)), i + 1
+        elif tok is None:
+            raise error("unexpected end of expression")
+        else:
+            raise unexpected(tok)
+
+    selector, i = parse_union(0)
+    if tokens[i] is not None:
+        raise unexpected(tokens[i])
+    return selector
+
+#############################################################################
+class _GroupIndex(object):
+    """Argument groups of a single module, prepared for fast selection.
+
+    This class is for internal use and IS **NOT a part of public API**.
+    """
+    def __init__(self, args, groups):
+        self.args = args
+        self.groups = groups
+        self.all = frozenset(args)
+        self._sets = { k : frozenset(v) for (k, v) in (groups or {}).items() }
+        self._globs = {}
+        self._selections = {}
+
+    def select(self, name):
+        """Return names of arguments belonging to group(s) ``name``, which
+        may be a glob pattern."""
+        try:
+            return self._sets[name]
+        except KeyError:
+            pass
+        if not _is_glob(name):
+            return frozenset()
+        try:
+            return self._globs[name]
+        except KeyError:
+            selected = frozenset().union(*[ v for (k, v) in self._sets.items() if fnmatch.fnmatchcase(k, name) ])
+            self._globs[name] = selected
+            return selected
+
+    def selection(self, include, exclude):
+        """Return names of arguments selected by **include** and
+        **exclude** selector tuples (see `_group_selectors()`)."""
+        key = (include, exclude)
+        try:
+            return self._selections[key]
+        except KeyError:
+            pass
+        if include is None:
+            selected = self.all
+        else:
+            selected = frozenset().union(*[ _group_selector(x)(self) for x in include ])
+        if exclude:
+            selected = selected - frozenset().union(*[ _group_selector(x)(self) for x in exclude ])
+        self._selections[key] = selected
+        return selected
+
+#############################################################################
+_group_selector_cache = {}
+"""Group selector expressions compiled by `_group_selector()`."""
+
+#############################################################################
+def _group_selector(expr):
+    try:
+        return _group_selector_cache[expr]
+    except KeyError:
+        selector = _group_selector_cache[expr] = _compile_group_expr(expr)
+        return selector
+
+#############################################################################
+def _group_selectors(groups):
+    """Normalize **include_groups**/**exclude_groups** keyword to a tuple of
+    group expressions (or ``None``)."""
+    if groups is None:
+        return None
+    if SCons.Util.is_String(groups):
+        return (groups,)
+    return tuple(groups)
+
+#############################################################################
+_group_indexes = {}
+"""Group indexes built by `_group_index()`, one per module name."""
+
+#############################################################################
+def _group_index(modname, args, groups):
+    """Return a `_GroupIndex` for module **modname**.
+
+    The index is rebuilt only when the module provides different **args** or
+    **groups** objects than previously. This function is for internal use
+    and IS **NOT a part of public API**.
+    """
+    index = _group_indexes.get(modname)
+    if index is None or index.args is not args or index.groups is not groups:
+        index = _group_indexes[modname] = _GroupIndex(args, groups)
+    return index
+
 #############################################################################
 def export_arguments(modname, args, groups = None, **kw):
     """Helper function for arguments' module developers
@@ -414,6 +1459,14 @@ def export_arguments(modname, args, groups = None, **kw):
             exclude arguments assigned to the listed groups; if defined, the
             **exclude_groups** is ignored
 
+    Each group listed in **include_groups** or **exclude_groups** may be
+    a glob pattern (``'*flags'``) or an expression combining groups with
+    ``&``, ``|``, ``!`` and parentheses, for example ``'flags & !pch'``.
+
+    The **args** and **groups** should not be modified once they were
+    passed to this function, as the group index built for **modname** is
+    cached.
+
     :Returns:
         A dict with argument names as keys, each followed by a dict which may
         be passed directly as an argument to `SConsArguments.DeclareArgument`.
@@ -423,26 +1476,11 @@ def export_arguments(modname, args, groups = None, **kw):
         `SConsArguments.DeclareArguments(**result)`.
     """
     include_groups = kw.get("%s_include_groups" % modname, kw.get('include_groups', None))
-    if SCons.Util.is_String(include_groups):
-        include_groups = [ include_groups ]
-
     exclude_groups = kw.get("%s_exclude_groups" % modname, kw.get('exclude_groups', None))
-    if SCons.Util.is_String(exclude_groups):
-        exclude_groups = [ exclude_groups ]
-
-    if include_groups is not None:
-        include = set()
-        for groupname in include_groups:
-            include.update(groups.get(groupname,[]))
-    else:
-        include = set(args.keys())
-
-    exclude = set()
-    if exclude_groups is not None:
-        for groupname in exclude_groups:
-            exclude.update(groups.get(groupname,[]))
 
-    return { k : args[k] for k in (include - exclude) }
+    index = _group_index(modname, args, groups)
+    selected = index.selection(_group_selectors(include_groups), _group_selectors(exclude_groups))
+    return { k : args[k] for k in selected }
 
 
 
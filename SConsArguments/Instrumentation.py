@@ -0,0 +1,532 @@
+"""`SConsArguments.Instrumentation`
+
+Opt-in instrumentation of SConsArguments' hot paths.
+
+When enabled, SConsArguments records how much time is spent in its phases
+(`ImportArguments()`, ``commit()``, ``add_to()``, ``Update()`` of command-line
+variables, ``Postprocess()`` and so on), counts interesting events (proxy
+traffic, placeholder renaming, cache hits, converter invocations) and
+measures time spent by converters and validators of individual variables.
+At exit, a summary table is printed to ``stderr`` and/or a trace file in
+Chrome's Trace Event format (to be viewed in ``chrome://tracing`` or
+Perfetto) is written.
+
+Instrumentation is disabled by default and costs a single attribute lookup
+per instrumented call then. It may be enabled with `Enable()`, or by setting
+the ``SCONSARGUMENTS_INSTRUMENT`` environment variable to a comma-separated
+list of ``summary``, ``trace=<filename>`` and ``memory``::
+
+    SCONSARGUMENTS_INSTRUMENT=summary scons -Q
+    SCONSARGUMENTS_INSTRUMENT=summary,trace=trace.json scons -Q
+    SCONSARGUMENTS_INSTRUMENT=memory scons -Q
+
+or, equivalently, at the top of ``SConstruct``::
+
+    from SConsArguments import Instrumentation
+    Instrumentation.Enable(summary = True, trace = 'trace.json')
+
+Memory held by declarations, supplementary dictionaries, proxies and values
+of *arguments* may be examined at any time with `MemoryReport()`.
+"""
+
+#
+# Copyright (c) 2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+clock = getattr(time, 'perf_counter', time.time)
+"""Clock used to measure time intervals."""
+
+#############################################################################
+active = False
+"""``True`` if the instrumentation is enabled. Instrumented code checks this
+flag before recording anything."""
+
+_summary = False
+_trace = None
+_memory = False
+_atexit_registered = False
+
+_phases = {}
+"""Phase timings, ``name -> [calls, total_time]``."""
+
+_counters = {}
+"""Event counters, ``name -> count``."""
+
+_variables = {}
+"""Per-variable timings, ``(kind, variable) -> [calls, total_time]``."""
+
+_events = []
+"""Trace events (Chrome's Trace Event format)."""
+
+_origin = clock()
+
+#############################################################################
+class _NullPhase(object):
+    """Context manager doing nothing, used when instrumentation is disabled"""
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        return False
+
+_null_phase = _NullPhase()
+
+#############################################################################
+class _Phase(object):
+    """Context manager measuring a single phase"""
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = clock()
+        return self
+
+    def __exit__(self, *args):
+        end = clock()
+        record = _phases.setdefault(self.name, [0, 0.0])
+        record[0] += 1
+        record[1] += end - self.start
+        if _trace is not None:
+            event = { 'name' : self.name, 'cat' : 'SConsArguments', 'ph' : 'X',
+                      'ts' : (self.start - _origin) * 1e6,
+                      'dur' : (end - self.start) * 1e6,
+                      'pid' : os.getpid(), 'tid' : _thread_id() }
+            if self.args:
+                event['args'] = self.args
+            _events.append(event)
+        return False
+
+#############################################################################
+def _thread_id():
+    try:
+        return threading.current_thread().ident
+    except AttributeError: # pragma: no cover
+        return 0
+
+#############################################################################
+def phase(name, **args):
+    """Return a context manager measuring phase **name**
+
+    Usage example::
+
+        with Instrumentation.phase('commit'):
+            ...
+
+    :Parameters:
+        name : str
+            name of the phase
+        args
+            extra data stored in trace events
+    """
+    if not active:
+        return _null_phase
+    return _Phase(name, args)
+
+#############################################################################
+def instrumented(name):
+    """Decorator measuring every call to the decorated function as phase
+    **name**"""
+    def decorator(func):
+        def wrapper(*args, **kw):
+            if not active:
+                return func(*args, **kw)
+            with _Phase(name, None):
+                return func(*args, **kw)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorator
+
+#############################################################################
+def count(name, n = 1):
+    """Increment counter **name** by **n**"""
+    _counters[name] = _counters.get(name, 0) + n
+
+#############################################################################
+def variable_time(kind, variable, seconds):
+    """Record **seconds** spent by **kind** (e.g. ``'converter'``) of
+    **variable**"""
+    record = _variables.setdefault((kind, variable), [0, 0.0])
+    record[0] += 1
+    record[1] += seconds
+
+#############################################################################
+def Enable(summary = True, trace = None, memory = False):
+    """Enable instrumentation
+
+    :Parameters:
+        summary : bool
+            print summary table to ``stderr`` at exit,
+        trace : str | None
+            if given, write Chrome trace to this file at exit,
+        memory : bool
+            trace memory allocations (see `StartMemoryTracing()`) and print
+            the statistics of allocations made by SConsArguments at exit
+    """
+    global active, _summary, _trace, _memory, _atexit_registered
+    active = True
+    _summary = summary
+    _trace = trace
+    _memory = memory and StartMemoryTracing()
+    if not _atexit_registered:
+        atexit.register(_report)
+        _atexit_registered = True
+
+#############################################################################
+def Disable():
+    """Disable instrumentation (already collected data is preserved)"""
+    global active
+    active = False
+
+#############################################################################
+def Reset():
+    """Discard all the collected data"""
+    global _origin
+    _phases.clear()
+    _counters.clear()
+    _variables.clear()
+    del _events[:]
+    _origin = clock()
+
+#############################################################################
+def GetData():
+    """Return collected data as a dictionary with ``phases``, ``counters``
+    and ``variables`` entries"""
+    return { 'phases' : dict((k, tuple(v)) for (k, v) in _phases.items()),
+             'counters' : dict(_counters),
+             'variables' : dict((k, tuple(v)) for (k, v) in _variables.items()) }
+
+#############################################################################
+def FormatSummary(top = 10):
+    """Format collected data as a human-readable table
+
+    :Parameters:
+        top : int
+            number of the most expensive variables (converters/validators) to
+            be listed
+    """
+    lines = [ 'SConsArguments instrumentation summary',
+              '%-44s %8s %12s %12s' % ('phase', 'calls', 'total [ms]', 'avg [ms]') ]
+    for name, (calls, total) in sorted(_phases.items(), key = lambda x : -x[1][1]):
+        lines.append('%-44s %8d %12.3f %12.3f' % (name, calls, total * 1e3, total * 1e3 / calls))
+    if _counters:
+        lines.append('%-44s %8s' % ('counter', 'count'))
+        for name, value in sorted(_counters.items()):
+            lines.append('%-44s %8d' % (name, value))
+    if _variables:
+        lines.append('%-44s %8s %12s' % ('variable', 'calls', 'total [ms]'))
+        ranked = sorted(_variables.items(), key = lambda x : -x[1][1])[:top]
+        for (kind, variable), (calls, total) in ranked:
+            lines.append('%-44s %8d %12.3f' % ('%s (%s)' % (variable, kind), calls, total * 1e3))
+    return '\n'.join(lines) + '\n'
+
+#############################################################################
+def WriteTrace(filename):
+    """Write collected trace events to **filename** (Chrome's Trace Event
+    format)"""
+    events = list(_events)
+    for name, value in sorted(_counters.items()):
+        events.append({ 'name' : name, 'cat' : 'SConsArguments', 'ph' : 'C',
+                        'ts' : (clock() - _origin) * 1e6, 'pid' : os.getpid(),
+                        'args' : { 'count' : value } })
+    with open(filename, 'w') as f:
+        json.dump({ 'traceEvents' : events, 'displayTimeUnit' : 'ms' }, f)
+
+#############################################################################
+_namespaces = ('ENV', 'VAR', 'OPT', 'OSE')
+
+_unattributed = '<local>'
+"""Module name reported for *arguments* which were not imported with
+`SConsArguments.Importer.ImportArguments()`."""
+
+#############################################################################
+def StartMemoryTracing(nframes = 1):
+    """Start tracing memory allocations with ``tracemalloc``, so that
+    `MemoryReport()` may include allocations made by SConsArguments.
+
+    The earlier it's called, the more allocations are captured, so it's best
+    to call it at the very top of ``SConstruct`` (or use
+    ``SCONSARGUMENTS_INSTRUMENT=memory``).
+
+    :Returns:
+        ``False`` if ``tracemalloc`` is not available (python < 3.4),
+        ``True`` otherwise.
+    """
+    try:
+        import tracemalloc
+    except ImportError: # pragma: no cover
+        return False
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(nframes)
+    return True
+
+#############################################################################
+def _deep_sizeof(obj, seen):
+    """Return the number of bytes held by **obj** and the containers it
+    refers to. Objects whose ids are in **seen** are skipped, so objects
+    shared between several entries are counted once. Only builtin containers
+    are traversed. This function is for internal use and IS **NOT a part of
+    public API**."""
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return total
+
+#############################################################################
+class _MemoryAccount(object):
+    """Accumulates bytes by category, module and namespace. This class is for
+    internal use and IS **NOT a part of public API**."""
+    def __init__(self, origins):
+        self.origins = origins
+        self.seen = set()
+        self.categories = {}
+        self.modules = {}
+        self.namespaces = {}
+
+    def add(self, category, name, ns, obj):
+        size = _deep_sizeof(obj, self.seen)
+        if not size:
+            return
+        module = self.origins.get(name, _unattributed) if name is not None else None
+        self.categories[category] = self.categories.get(category, 0) + size
+        if module is not None:
+            self.modules[module] = self.modules.get(module, 0) + size
+        if ns is not None:
+            ns = _namespaces[ns]
+            self.namespaces[ns] = self.namespaces.get(ns, 0) + size
+
+    def add_container(self, category, obj):
+        """Account the container itself, but not its items"""
+        if id(obj) not in self.seen:
+            self.seen.add(id(obj))
+            self.categories[category] = self.categories.get(category, 0) + sys.getsizeof(obj)
+
+    def add_supp_dicts(self, category, rename, irename, resubst, iresubst):
+        for ns in range(len(_namespaces)):
+            for name, ns_key in rename[ns].items():
+                self.add(category, name, ns, (name, ns_key))
+                self.add(category, name, ns, resubst[ns].get(name))
+                self.add(category, name, ns, iresubst[ns].get(ns_key))
+            for d in (rename[ns], irename[ns], resubst[ns], iresubst[ns]):
+                self.add_container(category, d)
+                # entries not covered above (should not happen normally)
+                self.add(category, None, ns, d)
+
+    def add_declaration(self, name, decl):
+        for ns in range(len(_namespaces)):
+            if not decl.has_decl(ns):
+                continue
+            d = decl.get_decl(ns)
+            # OPT declarations are (names, kw) tuples
+            kw = d[1] if _namespaces[ns] == 'OPT' else d
+            try:
+                self.add('help', name, ns, kw['help'])
+            except (KeyError, TypeError):
+                pass
+            self.add('declarations', name, ns, d)
+        self.add('declarations', name, None, decl.__dict__)
+        self.add('declarations', name, None, decl)
+
+#############################################################################
+def _tracemalloc_stats(filenames):
+    """Return ``tracemalloc`` statistics of allocations made in files matching
+    **filenames** or ``None`` if ``tracemalloc`` isn't tracing. This function
+    is for internal use and IS **NOT a part of public API**."""
+    try:
+        import tracemalloc
+    except ImportError: # pragma: no cover
+        return None
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    filters = [tracemalloc.Filter(True, f) for f in filenames]
+    snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+    files = dict((s.traceback[0].filename, s.size) for s in snapshot.statistics('filename'))
+    return { 'current' : current, 'peak' : peak, 'files' : files }
+
+#############################################################################
+def MemoryReport(*objects, **kw):
+    """Report memory held by SConsArguments objects
+
+    The **objects** may be `_ArgumentDeclarations`, `_Arguments` and/or
+    `_ArgumentsProxy` instances. Objects shared between them (e.g. names of
+    arguments) are counted only once. The bytes are broken down by category:
+
+    - ``declarations`` - argument declarations (except help strings),
+    - ``help`` - help strings of command-line variables and options,
+    - ``supplementary`` - rename/irename/resubst/iresubst dictionaries,
+    - ``proxies`` - dictionaries owned by proxies (not shared with `_Arguments`),
+    - ``values`` - current values of arguments in **env** (if given).
+
+    and also by the module each argument was imported from (see
+    `SConsArguments.Importer.ImportArguments()`) and by namespace (``ENV``,
+    ``VAR``, ``OPT``). If memory allocations are traced (see
+    `StartMemoryTracing()`), the report includes ``tracemalloc`` statistics
+    of allocations made by SConsArguments and the argument modules it loaded.
+
+    **Example**::
+
+        # SConstruct
+        from SConsArguments import ImportArguments, Instrumentation
+        env = Environment()
+        decls = ImportArguments(['cc', 'cxx'])
+        args = decls.Commit(env)
+        print(Instrumentation.FormatMemoryReport(
+              Instrumentation.MemoryReport(decls, args, env = env)))
+
+    :Parameters:
+        objects
+            objects to be examined,
+
+    :Keywords:
+        env
+            SCons environment (or dict) holding current values of arguments,
+
+    :Returns:
+        a dictionary with entries ``total``, ``categories``, ``modules``,
+        ``namespaces`` and ``tracemalloc`` (``None`` if not tracing).
+    """
+    from SConsArguments.Declarations import _ArgumentDeclarations
+    from SConsArguments.Arguments import _Arguments
+    from SConsArguments.Proxy import _ArgumentsProxy
+    from SConsArguments import Importer
+
+    env = kw.get('env')
+    origins = {}
+    for obj in objects:
+        if isinstance(obj, _ArgumentDeclarations):
+            origins.update(Importer._get_origins(obj))
+    account = _MemoryAccount(origins)
+    for obj in objects:
+        if isinstance(obj, _ArgumentDeclarations):
+            account.add_container('declarations', obj)
+            for name, decl in dict.items(obj):
+                account.add('declarations', name, None, name)
+                account.add_declaration(name, decl)
+            account.add_supp_dicts('supplementary', *obj._get_supp_dicts())
+        elif isinstance(obj, _Arguments):
+            account.add_supp_dicts('supplementary', *obj._get_supp_dicts())
+            account.add('supplementary', None, None, obj.get_keys())
+            if env is not None:
+                for name in obj.get_keys():
+                    try:
+                        value = env[obj.get_env_key(name)]
+                    except KeyError:
+                        continue
+                    account.add('values', name, 0, value)
+        elif isinstance(obj, _ArgumentsProxy):
+            for d in (obj._rename_dict, obj._irename_dict, obj._resubst_dict,
+                      obj._iresubst_dict):
+                account.add('proxies', None, None, d)
+            account.add('proxies', None, None, obj.__dict__)
+        else:
+            raise TypeError("can't report memory held by %r object" % type(obj).__name__)
+
+    pkgdir = os.path.dirname(os.path.abspath(__file__))
+    filenames = [ os.path.join(pkgdir, '*') ]
+    filenames.extend(f for (_, f) in Importer._argmod_cache)
+    return { 'total' : sum(account.categories.values()),
+             'categories' : account.categories,
+             'modules' : account.modules,
+             'namespaces' : account.namespaces,
+             'tracemalloc' : _tracemalloc_stats(filenames) }
+
+#############################################################################
+def FormatMemoryReport(report, top = 10):
+    """Format the result of `MemoryReport()` as a human-readable table
+
+    :Parameters:
+        report : dict
+            the result of `MemoryReport()`,
+        top : int
+            number of the most expensive modules (and traced files) to be
+            listed
+    """
+    lines = [ 'SConsArguments memory report (%d bytes)' % report['total'] ]
+    sections = [ ('category', report['categories'], None),
+                 ('module', report['modules'], top),
+                 ('namespace', report['namespaces'], None) ]
+    traced = report.get('tracemalloc')
+    if traced is not None:
+        files = dict((os.path.basename(k), v) for (k, v) in traced['files'].items())
+        sections.append(('traced file', files, top))
+    for title, data, limit in sections:
+        lines.append('%-44s %12s' % (title, 'bytes'))
+        ranked = sorted(data.items(), key = lambda x : -x[1])
+        for name, size in ranked[:limit]:
+            lines.append('%-44s %12d' % (name, size))
+    if traced is not None:
+        lines.append('%-44s %12d' % ('traced (current)', traced['current']))
+        lines.append('%-44s %12d' % ('traced (peak)', traced['peak']))
+    return '\n'.join(lines) + '\n'
+
+#############################################################################
+def _report():
+    if _summary and (_phases or _counters):
+        sys.stderr.write(FormatSummary())
+    if _trace is not None:
+        WriteTrace(_trace)
+    if _memory:
+        sys.stderr.write(FormatMemoryReport(MemoryReport()))
+
+#############################################################################
+def _enable_from_environment(value):
+    """Enable instrumentation according to the value of
+    ``SCONSARGUMENTS_INSTRUMENT`` environment variable"""
+    summary, trace, memory = False, None, False
+    for item in value.split(','):
+        item = item.strip()
+        if item.startswith('trace='):
+            trace = item[len('trace='):]
+        elif item == 'memory':
+            memory = True
+        elif item in ('summary', '1', 'yes', 'on'):
+            summary = True
+    if summary or trace or memory:
+        Enable(summary, trace, memory)
+
+if os.environ.get('SCONSARGUMENTS_INSTRUMENT'):
+    _enable_from_environment(os.environ['SCONSARGUMENTS_INSTRUMENT'])
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
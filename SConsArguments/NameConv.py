@@ -57,6 +57,12 @@ class _ArgumentNameConv(object):
     :Ivar opt_key_suffix:
         a suffix that is by default prepended to OPT key by the
         `name2opt` lambda, default: ``''``
+    :Ivar ose_key_prefix:
+        a prefix that is by default prepended to OSE key by the
+        `name2ose` lambda, default: ``''``
+    :Ivar ose_key_suffix:
+        a suffix that is by default prepended to OSE key by the
+        `name2ose` lambda, default: ``''``
     :Ivar opt_prefix:
         a prefix that is by default used when composing option names,
         usually a single or double dash, default: ``'--'``
@@ -103,6 +109,12 @@ class _ArgumentNameConv(object):
             opt_key_suffix : str
                 a suffix that is by default prepended to OPT key by the
                 **opt_key_transform** lambda, default: ``''``
+            ose_key_prefix : str
+                a prefix that is by default prepended to OSE key by the
+                **ose_key_transform** lambda, default: ``''``
+            ose_key_suffix : str
+                a suffix that is by default prepended to OSE key by the
+                **ose_key_transform** lambda, default: ``''``
             opt_prefix : str
                 a prefix that is by default used when composing option names,
                 usually a single or double dash, default: ``'--'``
@@ -130,6 +142,13 @@ class _ArgumentNameConv(object):
                 transformed, if ``opt_key_transform`` is not callable, then if
                 evaluates to ``True`` a default transform is used, or if it
                 evaluates to ``False`` a ``lambda x : None`` is used
+            ose_key_transform : callable | bool
+                a lambda used to transform *argument* names to OS environment
+                variables, may be customized to completely redefine the way
+                OSE keys are transformed, if ``ose_key_transform`` is not
+                callable, then if evaluates to ``True`` a default transform is
+                used, or if it evaluates to ``False`` (default) a ``lambda x :
+                None`` is used
             option_transform : callable | bool
                 a lambda used to transform *argument* names to command-line options,
                 may be customized to completely redefine the way option names are
@@ -152,6 +171,8 @@ class _ArgumentNameConv(object):
         self.var_key_suffix     = kw.get('var_key_suffix', '')
         self.opt_key_prefix     = kw.get('opt_key_prefix', '')
         self.opt_key_suffix     = kw.get('opt_key_suffix', '')
+        self.ose_key_prefix     = kw.get('ose_key_prefix', '')
+        self.ose_key_suffix     = kw.get('ose_key_suffix', '')
         self.opt_prefix         = kw.get('opt_prefix', '--')
         self.opt_name_prefix    = kw.get('opt_name_prefix', '')
         self.opt_name_suffix    = kw.get('opt_name_suffix', '')
@@ -159,9 +180,16 @@ class _ArgumentNameConv(object):
         self._env_key_fcn  = get_lambda('env_key_transform', lambda x : x, kw)
         self._var_key_fcn  = get_lambda('var_key_transform', lambda x : x, kw)
         self._opt_key_fcn  = get_lambda('opt_key_transform', lambda x : x.lower(), kw)
+        # OSE keys are generated only on request
+        if kw.get('ose_key_transform'):
+            self._ose_key_fcn = get_lambda('ose_key_transform', lambda x : x, kw)
+        else:
+            self._ose_key_fcn = lambda x : None
         self._opt_name_fcn = get_lambda('opt_name_transform', lambda x : x.lower(), kw)
         self._option_fcn   = get_lambda('option_transform', lambda x : x.replace('_', '-'), kw)
 
+        self._names2dicts_memo = (None, {})
+
     def name2env(self, name):
         """Transform *argument* name to corresponding construction variable name.
 
@@ -204,6 +232,20 @@ class _ArgumentNameConv(object):
             return None
         return self.opt_key_prefix + s + self.opt_key_suffix
 
+    def name2ose(self, name):
+        """Transform *argument* name to corresponding OS environment variable name.
+
+        :Parameters:
+            name : str
+                the string to be transformed
+
+        Usage example: ``ose_key = _ArgumentNameConv(ose_key_transform = True).name2ose('foo')``
+        """
+        s = self._ose_key_fcn(name)
+        if not s:
+            return None
+        return self.ose_key_prefix + s + self.ose_key_suffix
+
     def name2optname(self, name):
         """Transform *argument* name to corresponding command-line option name (without ``--`` prefix).
 
@@ -237,7 +279,7 @@ class _ArgumentNameConv(object):
 
     def name2dict(self, name):
         """Transform *argument* name to a dictionary possibly containing
-        env_key, var_key, opt_key and option.
+        env_key, var_key, opt_key, option and ose_key.
 
         :Parameters:
             name : str
@@ -250,12 +292,51 @@ class _ArgumentNameConv(object):
         var = self.name2var(name)
         opt = self.name2opt(name)
         option  = self.name2option(name)
+        ose = self.name2ose(name)
         if env:     d['env_key'] = env
         if var:     d['var_key'] = var
         if opt:     d['opt_key'] = opt
         if option:  d['option']  = option
+        if ose:     d['ose_key'] = ose
         return d
 
+    def names2dicts(self, names):
+        """Transform multiple *argument* names to dictionaries, as
+        `name2dict()` does for a single name.
+
+        The results are memoized, so repeated transformations of same names
+        are cheap. The memo is invalidated when any of the prefixes or
+        suffixes of this object gets changed.
+
+        :Parameters:
+            names : iterable
+                the strings to be transformed
+
+        :Returns:
+            a dictionary with ``names`` as keys and the dictionaries returned
+            by `name2dict()` as values; each call returns fresh copies of
+            these dictionaries, so they may be freely modified by caller
+
+        Usage example: ``d = _ArgumentNameConv().names2dicts(['foo', 'bar'])``
+        """
+        key = ( self.env_key_prefix, self.env_key_suffix,
+                self.var_key_prefix, self.var_key_suffix,
+                self.opt_key_prefix, self.opt_key_suffix,
+                self.ose_key_prefix, self.ose_key_suffix,
+                self.opt_prefix, self.opt_name_prefix, self.opt_name_suffix )
+        memo_key, memo = self._names2dicts_memo
+        if memo_key != key:
+            memo = {}
+            self._names2dicts_memo = (key, memo)
+        result = {}
+        for name in names:
+            try:
+                d = memo[name]
+            except KeyError:
+                d = memo[name] = self.name2dict(name)
+            result[name] = d.copy()
+        return result
+
 # Local Variables:
 # # tab-width:4
 # # indent-tabs-mode:nil
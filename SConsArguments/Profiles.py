@@ -0,0 +1,234 @@
+"""`SConsArguments.Profiles`
+
+Layered configuration profiles.
+
+A profile is a stack of *layers*, files which assign values to command-line
+variables, as the files given to ``SCons.Variables.Variables(files=[...])``
+do (``CC = 'gcc'``, ...). Layers are listed in order of precedence, later
+layers win over earlier ones::
+
+    # SConstruct
+    import os
+    from SConsArguments import ImportArguments, LoadProfile
+
+    env = Environment()
+    var = Variables()
+    decls = ImportArguments(['cc', 'link'])
+    args = decls.Commit(env, var, True)
+    profile = LoadProfile(['defaults.py', 'site.py', 'ci.py', '.scons.variables'])
+    args.Postprocess(env, var, True, os.environ, profile = profile,
+                     filename = '.scons.variables')
+    print("CC comes from %s" % profile.provenance.get('CC'))
+
+Values from a profile are handled as values read from variables' files: they
+are overridden by command-line variables and pass through converters and
+validators of the variables.
+
+Unlike variables' files, each layer is executed in its own namespace, so
+a layer can't refer to values assigned by other layers. This lets the
+parsed layers be cached: a layer is executed again only when its contents
+change (it's checked by modification time and size first, then by digest of
+the contents). Values of layers are also kept in the cache returned by
+`SConsArguments.Defaults.GetDefaultsCache()`, so unchanged layers are not
+executed by subsequent SCons runs. Only layers whose values JSON represents
+exactly (no tuples, sets, objects, ...) are kept there. Layers should
+therefore only assign values, their results must not depend on anything but
+their contents.
+"""
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+from SConsArguments.Util import MISSING, _json_exact
+from SConsArguments import Instrumentation
+import SCons.Errors
+import SCons.Util
+import hashlib
+import types
+import sys
+import os
+
+#############################################################################
+_parsed_layers = {}
+"""Layers parsed by this process, ``{ path : (stat, digest, values) }``."""
+
+#############################################################################
+def _stat_stamp(path):
+    """Return modification time and size of file `path` or ``None`` if it
+    doesn't exist. This function is for internal use and IS **NOT a part of
+    public API**."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+#############################################################################
+def _exec_layer(path, content):
+    """Execute `content` of layer file `path` and return the values it
+    assigns. This function is for internal use and IS **NOT a part of public
+    API**."""
+    values = { '__name__' : path }
+    dir = os.path.dirname(path)
+    sys.path.insert(0, dir)
+    try:
+        exec(compile(content, path, 'exec'), {}, values)
+    finally:
+        del sys.path[0]
+    return dict((k, v) for (k, v) in values.items()
+                if k != '__name__' and not isinstance(v, types.ModuleType))
+
+#############################################################################
+class ProfileLayer(object):
+    #========================================================================
+    """Single layer of a profile, a file assigning values to command-line
+    variables."""
+    #========================================================================
+
+    #========================================================================
+    def __init__(self, filename, name=None, precedence=0, required=False, cache=MISSING):
+        """Constructor for `ProfileLayer`
+
+        :Parameters:
+            filename : str
+                name of the file,
+            name : str
+                name of the layer, reported as provenance of its values; the
+                `filename` by default,
+            precedence : int
+                layers with higher precedence win over these with lower one
+                (for equal precedence the later layer wins),
+            required : boolean
+                if ``True``, a missing file is an error; otherwise it
+                provides no values,
+            cache : `SConsArguments.Defaults.DefaultsCache` | None
+                persistent cache for the values; `MISSING` (default) selects
+                the cache returned by
+                `SConsArguments.Defaults.GetDefaultsCache()`, ``None``
+                disables persistent caching.
+        """
+        self.filename = filename
+        self.name = name if name is not None else filename
+        self.precedence = precedence
+        self.required = required
+        self.cache = cache
+
+    #========================================================================
+    def __repr__(self):
+        return 'ProfileLayer(%r)' % self.name
+
+    #========================================================================
+    def _persistent_cache(self):
+        """Return the persistent cache to use, if any. This method is for
+        internal use and IS **NOT a part of public API**."""
+        if self.cache is MISSING:
+            from SConsArguments.Defaults import GetDefaultsCache
+            return GetDefaultsCache()
+        return self.cache
+
+    #========================================================================
+    def load(self):
+        """Return the values assigned by the layer, as a dictionary mapping
+        names of command-line variables to values. The file is executed
+        only if its contents changed since it was executed last time. The
+        returned dictionary is shared, it must not be modified."""
+        path = os.path.abspath(self.filename)
+        stat = _stat_stamp(path)
+        if stat is None:
+            if self.required:
+                raise SCons.Errors.UserError("profile layer %s not found: %s" % (self.name, self.filename))
+            return {}
+        parsed = _parsed_layers.get(path)
+        if parsed is not None and parsed[0] == stat:
+            if Instrumentation.active:
+                Instrumentation.count('Profiles.cache_hits')
+            return parsed[2]
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha1(content).hexdigest()
+        if parsed is not None and parsed[1] == digest:
+            # touched, but not changed
+            if Instrumentation.active:
+                Instrumentation.count('Profiles.cache_hits')
+            _parsed_layers[path] = (stat, digest, parsed[2])
+            return parsed[2]
+        cache = self._persistent_cache()
+        values = cache.lookup('profile:' + path, digest) if cache is not None else MISSING
+        if isinstance(values, dict) and _json_exact(values):
+            if Instrumentation.active:
+                Instrumentation.count('Profiles.cache_hits')
+        else:
+            with Instrumentation.phase('Profiles.parse', layer = self.name):
+                values = _exec_layer(path, content)
+            if cache is not None and _json_exact(values):
+                # values which JSON can't represent exactly are cached in
+                # memory only
+                cache.store('profile:' + path, digest, values)
+        _parsed_layers[path] = (stat, digest, values)
+        return values
+
+#############################################################################
+class ProfileValues(dict):
+    """Values merged from layers of a profile, a dictionary mapping names of
+    command-line variables to values. The ``provenance`` attribute maps
+    these names to names of layers the values were taken from, the
+    ``layers`` attribute lists the layers in order of precedence."""
+
+    #========================================================================
+    def __init__(self, *args, **kw):
+        super(ProfileValues, self).__init__(*args, **kw)
+        self.provenance = {}
+        self.layers = []
+
+#############################################################################
+def LoadProfile(layers):
+    #------------------------------------------------------------------------
+    """Load `layers` of a profile and merge their values.
+
+    :Parameters:
+        layers : list
+            `ProfileLayer` objects or file names, in order of precedence
+            (later layers win).
+    :Returns:
+        `ProfileValues` with the merged values and their provenance.
+    """
+    #------------------------------------------------------------------------
+    if SCons.Util.is_String(layers) or isinstance(layers, ProfileLayer):
+        layers = [layers]
+    layers = [l if isinstance(l, ProfileLayer) else ProfileLayer(l) for l in layers]
+    order = sorted(range(len(layers)), key = lambda i : (layers[i].precedence, i))
+    merged = ProfileValues()
+    with Instrumentation.phase('Profiles.load'):
+        for i in order:
+            layer = layers[i]
+            values = layer.load()
+            merged.update(values)
+            merged.provenance.update((k, layer.name) for k in values)
+            merged.layers.append(layer)
+    return merged
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
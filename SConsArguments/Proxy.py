@@ -29,6 +29,7 @@ __docformat__ = "restructuredText"
 import SCons.Util
 import string
 from SConsArguments import Util
+from SConsArguments import Instrumentation
 
 #############################################################################
 class _ArgumentsProxy(object):
@@ -166,6 +167,8 @@ class _ArgumentsProxy(object):
 
     #========================================================================
     def __getitem__(self, key):
+        if Instrumentation.active:
+            Instrumentation.count('Proxy.getitem')
         return self.__getitem__impl(key)
 
     #========================================================================
@@ -180,6 +183,8 @@ class _ArgumentsProxy(object):
 
     #========================================================================
     def __setitem__(self, key, value):
+        if Instrumentation.active:
+            Instrumentation.count('Proxy.setitem')
         return self.__setitem__impl(key, value)
 
     #========================================================================
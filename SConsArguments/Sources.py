@@ -0,0 +1,318 @@
+"""`SConsArguments.Sources`
+
+Pluggable sources of *argument* values.
+
+Besides command-line variables, options and ``os.environ``, values of
+*arguments* may come from other places, such as team-wide configuration
+files or a configuration service. A `ValueSource` provides a dictionary
+mapping *argument* names to values (the same as ``ose`` dictionary taken by
+`SConsArguments.Arguments._Arguments.Postprocess()`). Sources are passed to
+``Postprocess()`` (or ``UpdateEnvironment()``) as a list::
+
+    # SConstruct
+    import os
+    from SConsArguments import ImportArguments, JSONFileSource, URLSource
+
+    env = Environment()
+    var = Variables()
+    decls = ImportArguments(['cc', 'link'])
+    args = decls.Commit(env, var, True)
+    sources = [ JSONFileSource('/etc/ourteam/build.json'),
+                URLSource('http://localhost:8080/build', precedence = 1, ttl = 300) ]
+    args.Postprocess(env, var, True, os.environ, sources = sources)
+
+All the sources are loaded concurrently (each one in its own thread), while
+command-line variables and options are being processed. Values of sources
+with higher ``precedence`` win over these with lower one (for equal
+precedence the later source in the list wins). As with ``ose``, they're
+assigned only to *arguments* not set by command-line variables nor options.
+
+Loaded values are cached for ``ttl`` seconds. Sources given a ``cache``
+(a `SConsArguments.Defaults.DefaultsCache`, preferably a file of its own,
+such as ``DefaultsCache('.sconsarguments.sources.json')``) keep them on
+disk, so subsequent SCons runs don't load them again until they expire.
+If a source fails to load, its last known (even expired) values are used;
+if there are none, the source is ignored, unless it's ``required``.
+"""
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+from SConsArguments.Util import MISSING
+from SConsArguments import Instrumentation
+import SCons.Errors
+import threading
+import json
+import time
+import os
+
+#############################################################################
+class ValueSource(object):
+    #========================================================================
+    """Base class for sources of *argument* values. Subclasses implement
+    `load()` and optionally `stamp()`."""
+    #========================================================================
+
+    #========================================================================
+    def __init__(self, name=None, precedence=0, ttl=None, required=False, cache=None):
+        """Constructor for `ValueSource`
+
+        :Parameters:
+            name : str
+                name of the source, used in diagnostics and as a key in
+                persistent cache,
+            precedence : int
+                sources with higher precedence win over these with lower one,
+            ttl : float | None
+                how long (in seconds) loaded values stay valid; ``None``
+                means "until the process exits", ``0`` disables caching,
+            required : boolean
+                if ``True``, failure to load the values is an error,
+            cache : `SConsArguments.Defaults.DefaultsCache` | None
+                persistent cache for the values; used only if `ttl` is a
+                positive number. `MISSING` selects the cache returned by
+                `SConsArguments.Defaults.GetDefaultsCache()`.
+        """
+        self.name = name if name is not None else self.__class__.__name__
+        self.precedence = precedence
+        self.ttl = ttl
+        self.required = required
+        self.cache = cache
+        self.error = None
+        self.__loaded = None
+
+    #========================================================================
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.name)
+
+    #========================================================================
+    def load(self):
+        """Load the values. Return a dictionary mapping *argument* names to
+        values. Raise an exception if the values can't be loaded."""
+        raise NotImplementedError("%s.load() is not implemented" % self.__class__.__name__)
+
+    #========================================================================
+    def stamp(self):
+        """Return a JSON-serializable value identifying version of the data
+        behind the source; values cached for other stamps are discarded."""
+        return None
+
+    #========================================================================
+    def _persistent_cache(self):
+        """Return the persistent cache to use, if any. This method is for
+        internal use and IS **NOT a part of public API**."""
+        if not self.ttl:
+            return None
+        if self.cache is MISSING:
+            from SConsArguments.Defaults import GetDefaultsCache
+            return GetDefaultsCache()
+        return self.cache
+
+    #========================================================================
+    def _lookup(self, now):
+        """Return ``(values, fresh)`` cached in memory or on disk, or
+        ``(None, False)``. This method is for internal use and IS **NOT a part
+        of public API**."""
+        stamp = self.stamp()
+        loaded = self.__loaded
+        if loaded is None or loaded[0] != stamp:
+            loaded = None
+            cache = self._persistent_cache()
+            if cache is not None:
+                entry = cache.lookup('source:' + self.name, stamp)
+                if isinstance(entry, dict) and isinstance(entry.get('values'), dict):
+                    loaded = (stamp, entry.get('time', 0), entry['values'])
+                    self.__loaded = loaded
+        if loaded is None:
+            return (None, False)
+        if self.ttl is None:
+            fresh = True
+        else:
+            fresh = now < loaded[1] + self.ttl
+        return (loaded[2], fresh)
+
+    #========================================================================
+    def _store(self, values, now):
+        """Remember freshly loaded `values`. This method is for internal use
+        and IS **NOT a part of public API**."""
+        stamp = self.stamp()
+        if self.ttl != 0:
+            self.__loaded = (stamp, now, values)
+        cache = self._persistent_cache()
+        if cache is not None:
+            cache.store('source:' + self.name, stamp, { 'time' : now, 'values' : values })
+
+#############################################################################
+class DictSource(ValueSource):
+    """Values taken from a dictionary (e.g. ``os.environ``), as it is at the
+    time the values are loaded."""
+
+    #========================================================================
+    def __init__(self, mapping, name=None, **kw):
+        kw.setdefault('ttl', 0)
+        super(DictSource, self).__init__(name if name is not None else 'dict', **kw)
+        self.mapping = mapping
+
+    #========================================================================
+    def load(self):
+        return dict(self.mapping)
+
+#############################################################################
+class JSONFileSource(ValueSource):
+    """Values read from a JSON file containing a dictionary. A missing file
+    provides no values (unless the source is ``required``). The file is
+    re-read when it changes."""
+
+    #========================================================================
+    def __init__(self, filename, name=None, **kw):
+        super(JSONFileSource, self).__init__(name if name is not None else filename, **kw)
+        self.filename = filename
+
+    #========================================================================
+    def stamp(self):
+        try:
+            st = os.stat(self.filename)
+        except OSError:
+            return None
+        return [st.st_mtime, st.st_size]
+
+    #========================================================================
+    def load(self):
+        if not self.required and not os.path.exists(self.filename):
+            return {}
+        with open(self.filename) as f:
+            return json.load(f)
+
+#############################################################################
+class URLSource(ValueSource):
+    """Values fetched from an URL (usually a configuration service), which
+    responds with a JSON dictionary. By default, the values are cached in
+    memory for 60 seconds; they're kept on disk only if a ``cache`` is
+    given."""
+
+    #========================================================================
+    def __init__(self, url, timeout=10.0, name=None, **kw):
+        kw.setdefault('ttl', 60)
+        super(URLSource, self).__init__(name if name is not None else url, **kw)
+        self.url = url
+        self.timeout = timeout
+
+    #========================================================================
+    def stamp(self):
+        return self.url
+
+    #========================================================================
+    def load(self):
+        try:
+            from urllib.request import urlopen
+        except ImportError:
+            from urllib2 import urlopen
+        response = urlopen(self.url, timeout = self.timeout)
+        try:
+            return json.loads(response.read().decode('utf-8'))
+        finally:
+            response.close()
+
+#############################################################################
+class _PendingSources(object):
+    """Sources being loaded in background threads. This class is for
+    internal use and IS **NOT a part of public API**."""
+
+    #========================================================================
+    def __init__(self, sources):
+        now = time.time()
+        self.now = now
+        self.sources = list(sources)
+        self.slots = []
+        self.threads = []
+        for source in self.sources:
+            (values, fresh) = source._lookup(now)
+            slot = { 'stale' : values }
+            if fresh:
+                if Instrumentation.active:
+                    Instrumentation.count('Sources.cache_hits')
+                slot['values'] = values
+            else:
+                thread = threading.Thread(target = self.__load, args = (source, slot))
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+            self.slots.append(slot)
+
+    #========================================================================
+    @staticmethod
+    def __load(source, slot):
+        try:
+            values = source.load()
+            if not isinstance(values, dict):
+                raise ValueError("expected a dictionary, got %s" % type(values).__name__)
+            slot['loaded'] = values
+        except Exception as e:
+            slot['error'] = e
+
+    #========================================================================
+    def result(self):
+        """Wait for the sources to load and return their values merged
+        according to their precedence."""
+        with Instrumentation.phase('Sources.wait'):
+            for thread in self.threads:
+                thread.join()
+        merged = {}
+        order = sorted(range(len(self.sources)), key = lambda i : (self.sources[i].precedence, i))
+        for i in order:
+            (source, slot) = (self.sources[i], self.slots[i])
+            source.error = slot.get('error')
+            if 'loaded' in slot:
+                source._store(slot['loaded'], self.now)
+                values = slot['loaded']
+            elif 'values' in slot:
+                values = slot['values']
+            elif slot['stale'] is not None:
+                values = slot['stale']
+            elif source.required:
+                raise SCons.Errors.UserError("can't load values from %s: %s" % (source.name, source.error))
+            else:
+                continue
+            merged.update(values)
+        return merged
+
+#############################################################################
+def LoadSources(sources):
+    #------------------------------------------------------------------------
+    """Load values from `sources` concurrently and merge them.
+
+    :Parameters:
+        sources : list
+            `ValueSource` objects.
+    :Returns:
+        dictionary mapping *argument* names to values, taken from the
+        source with the highest precedence which provides the value.
+    """
+    #------------------------------------------------------------------------
+    return _PendingSources(sources).result()
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
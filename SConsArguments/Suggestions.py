@@ -0,0 +1,144 @@
+"""`SConsArguments.Suggestions`
+
+"Did you mean ...?" suggestions for misspelled names.
+
+Names are indexed by their trigrams, so finding candidates for a misspelled
+name costs a few dictionary lookups instead of comparing it to every known
+name. Only the candidates sharing the most trigrams with the misspelled name
+are then ranked by their similarity (as computed by ``difflib``).
+"""
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import difflib
+import heapq
+
+_cutoff = 0.6
+"""Minimal similarity of suggested names (see ``difflib.get_close_matches()``)."""
+
+_max_candidates = 64
+"""How many candidates (sharing most trigrams) are ranked by similarity."""
+
+#############################################################################
+def _trigrams(word):
+    """Return the set of trigrams of `word`. The word is lowercased and
+    padded, so short words and their prefixes and suffixes have trigrams too.
+    This function is for internal use and IS **NOT a part of public API**."""
+    word = '$' + word.lower() + '$'
+    return set(word[i:i+3] for i in range(max(len(word) - 2, 1)))
+
+#############################################################################
+def _rank(word, candidates, n = 3, cutoff = _cutoff):
+    """Return at most `n` of `candidates` most similar to `word`, best first.
+    This function is for internal use and IS **NOT a part of public API**."""
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(word.lower())
+    scored = []
+    for candidate in set(candidates):
+        matcher.set_seq1(candidate.lower())
+        if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+            ratio = matcher.ratio()
+            if ratio >= cutoff:
+                scored.append((-ratio, candidate))
+    return [ c for (r, c) in sorted(scored)[:n] ]
+
+#############################################################################
+def _did_you_mean(suggestions):
+    """Format `suggestions` as a question. Return empty string if there are
+    no suggestions. This function is for internal use and IS **NOT a part of
+    public API**."""
+    if not suggestions:
+        return ''
+    quoted = [ repr(str(s)) for s in suggestions ]
+    if len(quoted) > 1:
+        quoted = [ ', '.join(quoted[:-1]) , quoted[-1] ]
+    return 'did you mean %s?' % ' or '.join(quoted)
+
+#############################################################################
+class _SuggestionIndex(object):
+    """Trigram index of names, to find names similar to misspelled ones.
+    This class is for internal use and IS **NOT a part of public API**."""
+
+    #========================================================================
+    def __init__(self, words = ()):
+        self.__words = set()
+        self.__index = {}
+        self.add(words)
+
+    #========================================================================
+    def __len__(self):
+        return len(self.__words)
+
+    #========================================================================
+    def __contains__(self, word):
+        return word in self.__words
+
+    #========================================================================
+    def add(self, words):
+        """Add `words` to the index."""
+        index = self.__index
+        for word in words:
+            if word not in self.__words:
+                self.__words.add(word)
+                for trigram in _trigrams(word):
+                    index.setdefault(trigram, []).append(word)
+
+    #========================================================================
+    def suggest(self, word, n = 3, cutoff = _cutoff):
+        #--------------------------------------------------------------------
+        """Return at most `n` indexed names similar to `word`, best first.
+
+        Small indexes are searched exhaustively. In large ones only names
+        sharing most trigrams with `word` are ranked, unless these give
+        less than `n` suggestions (short names and transposed letters share
+        few trigrams, e.g. ``'CCX'`` and ``'CXX'``).
+
+        :Parameters:
+            word : str
+                the (misspelled) name,
+            n : int
+                maximum number of suggestions,
+            cutoff : float
+                minimal similarity of suggested names, in range ``[0, 1]``.
+        """
+        #--------------------------------------------------------------------
+        if len(self.__words) <= _max_candidates:
+            return _rank(word, self.__words, n, cutoff)
+        shared = {}
+        for trigram in _trigrams(word):
+            for candidate in self.__index.get(trigram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        if len(shared) > _max_candidates:
+            shared = dict(heapq.nlargest(_max_candidates, shared.items(),
+                                         key = lambda item : (item[1], item[0])))
+        suggestions = _rank(word, shared, n, cutoff)
+        if len(suggestions) < n:
+            suggestions = _rank(word, self.__words, n, cutoff)
+        return suggestions
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
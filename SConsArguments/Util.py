@@ -29,6 +29,11 @@ __docformat__ = "restructuredText"
 import SCons.Util
 import string
 import shlex
+import hashlib
+import json
+import os
+import re
+from SConsArguments import Instrumentation
 
 #############################################################################
 ENV = 0
@@ -43,9 +48,13 @@ OPT = 2
 """Represents selection of command-line option (OPT *endpoint*) related to
 particular *argument*."""
 
-ALL = 3
-"""Number of all namespaces (currently there are three: ``ENV``, ``VAR``,
-``OPT``)"""
+OSE = 3
+"""Represents selection of OS environment variable (OSE *endpoint*) read
+for particular *argument*."""
+
+ALL = 4
+"""Number of all namespaces (currently there are four: ``ENV``, ``VAR``,
+``OPT``, ``OSE``)"""
 #############################################################################
 
 #############################################################################
@@ -121,6 +130,8 @@ def _resubst(value, resubst_dict = {}):
     """
     if SCons.Util.is_String(value):
         # make substitution in strings only
+        if Instrumentation.active:
+            Instrumentation.count('Util._resubst')
         return string.Template(value).safe_substitute(**resubst_dict)
     else:
         return value
@@ -207,6 +218,245 @@ def _compose_mappings(dict1, dict2):
 def _invert_dict(_dict):
     return dict(map(lambda x : (x[1],x[0]), _dict.items()))
 
+#############################################################################
+_numbers = (int, float, complex)
+try:
+    _numbers += (long,)
+except NameError:
+    pass
+
+#############################################################################
+def _is_immutable(value):
+    """Return ``True`` if `value` is known to be immutable (so its canonical
+    form can't change as long as it is the same object). This function is for
+    internal use and IS **NOT a part of public API**."""
+    if value is None or value is UNDEFINED or isinstance(value, _numbers) \
+       or SCons.Util.is_String(value):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_immutable(v) for v in value)
+    return False
+
+#############################################################################
+def _canonical_value(value, resubst_dict = {}):
+    """Return canonical, type-tagged string representation of `value`. This
+    function is for internal use and IS **NOT a part of public API**.
+
+    Equal values have equal representations, regardless of the order of items
+    in dictionaries and sets. Lists and ``CLVar`` objects with same items are
+    represented equally. Placeholders in strings (at any depth) are renamed
+    with `resubst_dict` (see `_resubst()`).
+
+    :Parameters:
+        value
+            the value to be represented,
+        resubst_dict
+            a dictionary used to rename placeholders in strings,
+    :Returns:
+        a string representing the `value`.
+    """
+    if value is None:
+        return 'N'
+    elif value is UNDEFINED:
+        return 'U'
+    elif isinstance(value, bool):
+        return 'b%d' % value
+    elif isinstance(value, _numbers):
+        return 'n' + repr(value)
+    elif SCons.Util.is_String(value):
+        value = _resubst(value, resubst_dict)
+        return 's%d:%s' % (len(value), value)
+    elif SCons.Util.is_Dict(value):
+        items = sorted(_canonical_value(k, resubst_dict) + '=' + \
+                       _canonical_value(v, resubst_dict) for (k, v) in value.items())
+        return 'd{' + ','.join(items) + '}'
+    elif SCons.Util.is_List(value):
+        return 'l[' + ','.join(_canonical_value(v, resubst_dict) for v in value) + ']'
+    elif isinstance(value, tuple):
+        return 't(' + ','.join(_canonical_value(v, resubst_dict) for v in value) + ')'
+    elif isinstance(value, (set, frozenset)):
+        return 'S{' + ','.join(sorted(_canonical_value(v, resubst_dict) for v in value)) + '}'
+    elif callable(value) and hasattr(value, '__name__'):
+        return 'c' + getattr(value, '__module__', '?') + '.' + value.__name__
+    else:
+        text = str(value)
+        return 'o%s:%d:%s' % (type(value).__name__, len(text), text)
+
+#############################################################################
+def _json_value(value):
+    """Return a representation of `value` which may be serialized to JSON.
+    Strings, numbers, booleans and ``None`` are returned as they are,
+    containers are converted recursively (tuples and sets become lists),
+    named callables are represented by ``"module.name"`` strings, and other
+    objects by their ``str()``. This function is for internal use and IS
+    **NOT a part of public API**."""
+    if value is None or isinstance(value, bool) or SCons.Util.is_String(value):
+        return value
+    elif isinstance(value, _numbers) and not isinstance(value, complex):
+        return value
+    elif SCons.Util.is_Dict(value):
+        return dict((str(k), _json_value(v)) for (k, v) in value.items())
+    elif SCons.Util.is_List(value) or isinstance(value, tuple):
+        return [_json_value(v) for v in value]
+    elif isinstance(value, (set, frozenset)):
+        return sorted(_json_value(v) for v in value)
+    elif callable(value) and hasattr(value, '__name__'):
+        return getattr(value, '__module__', '?') + '.' + value.__name__
+    else:
+        return str(value)
+
+#############################################################################
+def _same(a, b):
+    """Compare `a` and `b` including types of all the nested values. This
+    function is for internal use and IS **NOT a part of public API**."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return len(a) == len(b) and all(k in b and _same(v, b[k]) for (k, v) in a.items())
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for (x, y) in zip(a, b))
+    return a == b or a != a # NaN
+
+#############################################################################
+def _json_exact(values):
+    """Check whether `values` survive serialization to JSON unchanged (tuples,
+    for example, come back as lists). Only such values may be kept in
+    persistent caches. This function is for internal use and IS **NOT a part
+    of public API**."""
+    try:
+        return _same(values, json.loads(json.dumps(values)))
+    except (TypeError, ValueError):
+        return False
+
+#############################################################################
+def _write_file(filename, text):
+    """Atomically (as far as the platform permits) replace contents of
+    `filename` with `text`. Return ``False`` if the file couldn't be written.
+    This function is for internal use and IS **NOT a part of public API**."""
+    tmpname = '%s.%d.tmp' % (filename, os.getpid())
+    try:
+        with open(tmpname, 'w') as f:
+            f.write(text)
+        if os.path.exists(filename) and os.name == 'nt': # pragma: no cover
+            os.remove(filename)
+        os.rename(tmpname, filename)
+    except (IOError, OSError): # pragma: no cover
+        return False
+    return True
+
+#############################################################################
+def _write_json_file(filename, data):
+    """Same as `_write_file()`, but writes `data` serialized to JSON. This
+    function is for internal use and IS **NOT a part of public API**."""
+    return _write_file(filename, json.dumps(data, indent = 1, sort_keys = True))
+
+#############################################################################
+def _value_digest(key, value, resubst_dict = {}):
+    """Return a digest (an integer) of `key` and `value`, based on
+    `_canonical_value()`. This function is for internal use and IS **NOT a
+    part of public API**."""
+    data = 's%d:%s=%s' % (len(key), key, _canonical_value(value, resubst_dict))
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+    return int(hashlib.sha1(data).hexdigest(), 16)
+
+#############################################################################
+_placeholder_re = re.compile(r'\$(?:(\$)|\{([_a-zA-Z][_a-zA-Z0-9]*)\}|([_a-zA-Z][_a-zA-Z0-9]*))')
+
+#############################################################################
+def _placeholders(value):
+    """Return the set of names referenced by placeholders (``$name`` or
+    ``${name}``) in `value`. This function is for internal use and IS **NOT a
+    part of public API**.
+
+    :Parameters:
+        value
+            a string or a list (possibly nested) of strings; other values do
+            not reference anything,
+    :Returns:
+        a set of names.
+    """
+    names = set()
+    if SCons.Util.is_String(value):
+        for m in _placeholder_re.finditer(value):
+            name = m.group(2) or m.group(3)
+            if name:
+                names.add(name)
+    elif SCons.Util.is_List(value) or SCons.Util.is_Tuple(value):
+        for v in value:
+            names.update(_placeholders(v))
+    return names
+
+#############################################################################
+def _expand_placeholders(value, expansions):
+    """Replace placeholders in `value` with strings from `expansions`. This
+    function is for internal use and IS **NOT a part of public API**.
+
+    Unlike `_resubst()`, escaped dollars (``$$``) are preserved, as well as
+    placeholders referring to names not present in `expansions`, so the
+    result may still be passed to ``env.subst()``. Lists are joined with
+    spaces, ``None`` and ``UNDEFINED`` are expanded to empty strings.
+
+    :Parameters:
+        value
+            the value to be expanded,
+        expansions : dict
+            a dictionary mapping names to the strings they expand to,
+    :Returns:
+        a string.
+    """
+    if value is None or value is UNDEFINED:
+        return ''
+    elif SCons.Util.is_String(value):
+        def replace(m):
+            name = m.group(2) or m.group(3)
+            try:
+                return expansions[name]
+            except KeyError:
+                return m.group(0)
+        return _placeholder_re.sub(replace, value)
+    elif SCons.Util.is_List(value) or SCons.Util.is_Tuple(value):
+        return ' '.join(_expand_placeholders(v, expansions) for v in value)
+    else:
+        return str(value)
+
+#############################################################################
+def _find_cycle(graph):
+    """Find a cycle in a directed graph. This function is for internal use
+    and IS **NOT a part of public API**.
+
+    :Parameters:
+        graph : dict
+            a dictionary mapping nodes to iterables of their successors;
+            successors which are not keys of `graph` are ignored,
+    :Returns:
+        a list of nodes forming a cycle (with the first node repeated at the
+        end), or ``None`` if the graph is acyclic.
+    """
+    done = set()
+    for start in sorted(graph):
+        if start in done:
+            continue
+        path = [start]
+        onpath = set(path)
+        stack = [iter(sorted(graph[start]))]
+        while stack:
+            for node in stack[-1]:
+                if node not in graph or node in done:
+                    continue
+                if node in onpath:
+                    return path[path.index(node):] + [node]
+                path.append(node)
+                onpath.add(node)
+                stack.append(iter(sorted(graph[node])))
+                break
+            else:
+                stack.pop()
+                node = path.pop()
+                onpath.discard(node)
+                done.add(node)
+    return None
+
 #############################################################################
 def flags2list(arg):
     splitter = shlex.shlex(arg, posix=True)
@@ -26,8 +26,13 @@ Provides the `_VariablesWrapper` class
 
 __docformat__ = "restructuredText"
 
-from SConsArguments.Util import UNDEFINED
+from SConsArguments.Util import UNDEFINED, MISSING, _canonical_value
 import SCons.Errors
+import SCons.Util
+from SConsArguments import Instrumentation
+from SConsArguments.Defaults import LazyDefault
+from SConsArguments.Profiles import ProfileValues, LoadProfile
+import hashlib
 
 #############################################################################
 class _VariablesWrapper(object):
@@ -43,77 +48,199 @@ class _VariablesWrapper(object):
         return getattr(self.variables, attr)
 
     #========================================================================
-    def Update(self, env, args):
+    def Update(self, env, args, profile=None):
         # One reason why it's reimplemented here is to get rid of env.subst(...)
         # substitutions that are present in the original SCons implementation
         # of Variables.Update(). The other is handling of the special UNDEFINED
         # value. If a variable's value is UNDEFINED, the corresponding construction
         # variable will not be created (env[varname] will raise keyerror,
-        # unless it was created by someone else).
+        # unless it was created by someone else). The values of the optional
+        # profile (see SConsArguments.Profiles) are applied after these from
+        # variables' files.
         import os
         import sys
 
         variables = self.variables
         values = {}
+        phase = Instrumentation.phase
+        timed = Instrumentation.active
 
         # first set the defaults:
-        for option in variables.options:
-            if not option.default is None:
-                values[option.key] = option.default
+        with phase('Update.defaults'):
+            for option in variables.options:
+                if not option.default is None:
+                    values[option.key] = option.default
 
         # next set the value specified in the options file
-        for filename in variables.files:
-            if os.path.exists(filename):
-                dir = os.path.split(os.path.abspath(filename))[0]
-                if dir:
-                    sys.path.insert(0, dir)
-                try:
-                    values['__name__'] = filename
-                    exec(open(filename, 'rU').read(), {}, values)
-                finally:
+        with phase('Update.files'):
+            for filename in variables.files:
+                if os.path.exists(filename):
+                    dir = os.path.split(os.path.abspath(filename))[0]
                     if dir:
-                        del sys.path[0]
-                    del values['__name__']
+                        sys.path.insert(0, dir)
+                    try:
+                        values['__name__'] = filename
+                        exec(open(filename, 'rU').read(), {}, values)
+                    finally:
+                        if dir:
+                            del sys.path[0]
+                        del values['__name__']
+
+        # next the values from profile layers
+        if profile is not None:
+            with phase('Update.profile'):
+                if not isinstance(profile, ProfileValues):
+                    profile = LoadProfile(profile)
+                values.update(profile)
 
         # set the values specified on the command line
         if args is None: # pragma: no cover
             args = variables.args
 
-        for arg, value in args.items():
-            added = False
-            for option in variables.options:
-                if arg in list(option.aliases) + [ option.key ]:
-                    values[option.key] = value
-                    added = True
-            if not added:
-                variables.unknown[arg] = value
+        with phase('Update.args'):
+            for arg, value in args.items():
+                added = False
+                for option in variables.options:
+                    if arg in list(option.aliases) + [ option.key ]:
+                        values[option.key] = value
+                        added = True
+                if not added:
+                    variables.unknown[arg] = value
 
         # put the variables in the environment:
         # (don't copy over variables that are not declared as options)
-        for option in variables.options:
-            try:
-                if values[option.key] is not UNDEFINED:
-                    env[option.key] = values[option.key]
-            except KeyError: # pragma: no cover
-                pass
+        with phase('Update.env'):
+            for option in variables.options:
+                try:
+                    if values[option.key] is not UNDEFINED:
+                        env[option.key] = values[option.key]
+                except KeyError: # pragma: no cover
+                    pass
 
         # Call the convert functions:
-        for option in variables.options:
-            if option.converter and option.key in values and values[option.key] is not UNDEFINED:
-                value = env.get(option.key)
-                try:
+        with phase('Update.convert'):
+            for option in variables.options:
+                if option.converter and option.key in values and values[option.key] is not UNDEFINED \
+                   and not isinstance(values[option.key], LazyDefault):
+                    if timed:
+                        Instrumentation.count('Update.converter_calls')
+                        start = Instrumentation.clock()
+                    value = env.get(option.key)
                     try:
-                        env[option.key] = option.converter(value)
-                    except TypeError: # pragma: no cover
-                        env[option.key] = option.converter(value, env)
-                except ValueError as x: # pragma: no cover
-                    raise SCons.Errors.UserError('Error converting option: %s\n%s'%(option.key, x))
+                        try:
+                            env[option.key] = option.converter(value)
+                        except TypeError: # pragma: no cover
+                            env[option.key] = option.converter(value, env)
+                    except ValueError as x: # pragma: no cover
+                        raise SCons.Errors.UserError('Error converting option: %s\n%s'%(option.key, x))
+                    if timed:
+                        Instrumentation.variable_time('converter', option.key, Instrumentation.clock() - start)
 
 
         # Finally validate the values:
-        for option in variables.options:
-            if option.validator and option.key in values:
-                option.validator(option.key, env.get(option.key), env)
+        with phase('Update.validate'):
+            for option in variables.options:
+                if option.validator and option.key in values \
+                   and not isinstance(values[option.key], LazyDefault):
+                    if timed:
+                        Instrumentation.count('Update.validator_calls')
+                        start = Instrumentation.clock()
+                    option.validator(option.key, env.get(option.key), env)
+                    if timed:
+                        Instrumentation.variable_time('validator', option.key, Instrumentation.clock() - start)
+
+    #========================================================================
+    def Save(self, filename, env):
+        # Variables still having their lazy defaults (see LazyDefault) are
+        # hidden from the original implementation, which would otherwise
+        # compute them just to find out that they're equal to defaults.
+        options = getattr(self.variables, 'options', None)
+        if SCons.Util.is_List(options) and \
+           any(isinstance(o.default, LazyDefault) for o in options):
+            env = _LazyDefaultsHidden(env)
+        self.variables.Save(filename, env)
+
+    #========================================================================
+    def GenerateHelpText(self, env, *args, **kw):
+        # Without any of the 'select', 'output' or 'cache' keywords, this is
+        # the original Variables.GenerateHelpText(). Otherwise the help is
+        # rendered variable by variable: only the selected variables are
+        # rendered, the text of each variable is written to output as soon
+        # as it's ready and, if a cache is given, the formatted texts are
+        # looked up in it. Caching is opt-in: computing the stamp costs
+        # about as much as formatting the text.
+        if not set(('select', 'output', 'cache')).intersection(kw):
+            return self.variables.GenerateHelpText(env, *args, **kw)
+        select = kw.pop('select', None)
+        output = kw.pop('output', None)
+        cache = kw.pop('cache', None)
+        sort = kw.get('sort', args[0] if args else None)
+
+        options = self.variables.options
+        if callable(sort):
+            from functools import cmp_to_key
+            options = sorted(options, key=cmp_to_key(lambda x,y: sort(x.key,y.key)))
+        elif sort is True:
+            options = sorted(options, key=lambda x: x.key)
+
+        texts = []
+        with Instrumentation.phase('GenerateHelpText'):
+            for opt in options:
+                if select is not None and not select(opt.key):
+                    continue
+                text = self._format_variable_help(env, opt, cache)
+                if text:
+                    if output is not None:
+                        output.write(text)
+                    texts.append(text)
+        return ''.join(texts)
+
+    #========================================================================
+    def _format_variable_help(self, env, opt, cache):
+        """Return the help text for variable `opt`, taking it from `cache`
+        if it's there. The text is cached under ``help:<key>`` with a stamp
+        computed from the variable's description, its current value and
+        the format strings of the wrapped object. This method is for
+        internal use and IS **NOT a part of public API**."""
+        variables = self.variables
+        if opt.key in env:
+            actual = env.subst('${%s}' % opt.key)
+        else:
+            actual = None
+        aliases = getattr(opt, 'aliases', [])
+        if cache is None:
+            return variables.FormatVariableHelpText(env, opt.key, opt.help, opt.default, actual, aliases)
+        formats = tuple(getattr(variables, a, None) for a in ('fmt', 'aliasfmt', 'format', 'format_'))
+        data = (type(variables).__name__, formats, opt.help, opt.default, actual, list(aliases))
+        stamp = hashlib.sha1(_canonical_value(data).encode('utf-8')).hexdigest()
+        text = cache.lookup('help:%s' % opt.key, stamp)
+        if text is MISSING:
+            text = variables.FormatVariableHelpText(env, opt.key, opt.help, opt.default, actual, aliases)
+            cache.store('help:%s' % opt.key, stamp, text)
+        elif Instrumentation.active:
+            Instrumentation.count('GenerateHelpText.cache_hits')
+        return text
+
+#############################################################################
+class _LazyDefaultsHidden(object):
+    """Wrapper of an environment, which pretends that variables having
+    `LazyDefault` values do not exist. This class is for internal use and IS
+    **NOT a part of public API**."""
+
+    #========================================================================
+    def __init__(self, env):
+        self.env = env
+
+    #========================================================================
+    def __getattr__(self, attr):
+        return getattr(self.env, attr)
+
+    #========================================================================
+    def __getitem__(self, key):
+        value = self.env[key]
+        if isinstance(value, LazyDefault):
+            raise KeyError(key)
+        return value
 
 # Local Variables:
 # # tab-width:4
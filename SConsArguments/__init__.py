@@ -16,11 +16,13 @@ shall flow from command-line to SCons environment.
 
 **Endpoint names and data flow**
 
-Each *argument* has up to three *endpoints*:
+Each *argument* has up to four *endpoints*:
 
 - ``ENV`` *endpoint*: a construction variable in SCons environment,
-- ``VAR`` *endpoint*: a command line variable, and
-- ``OPT`` *endpoint*: a command line option.
+- ``VAR`` *endpoint*: a command line variable,
+- ``OPT`` *endpoint*: a command line option, and
+- ``OSE`` *endpoint*: an OS environment variable (read-only, see
+  `SConsArguments.Arguments._Arguments.GetOSEValues()`).
 
 Separate "namespaces" are used to keep names of ``ENV``, ``VAR`` and ``OPT``
 endpoints (i.e. construction variables, command-line variables and command-line
@@ -196,16 +198,97 @@ be a good starting point for developers and advanced users.
 
 __docformat__ = "restructuredText"
 
-from SConsArguments.Declaration import _ArgumentDeclaration, ArgumentDeclaration, DeclareArgument
-from SConsArguments.Declarations import _ArgumentDeclarations, ArgumentDeclarations, DeclareArguments
-from SConsArguments.Arguments import _Arguments
-from SConsArguments.Proxy import  _ArgumentsProxy
-from SConsArguments.NameConv import _ArgumentNameConv
-from SConsArguments.Util import ENV, VAR, OPT, ALL
-from SConsArguments.Util import _missing, MISSING, _undef, UNDEFINED, _notfound, NOTFOUND
-from SConsArguments.Util import _resubst, _build_resubst_dict, _build_iresubst_dict, _compose_mappings, _invert_dict
-from SConsArguments.VariablesWrapper import _VariablesWrapper
-from SConsArguments.Importer import ImportArguments
+import sys
+
+_lazy_attributes = {
+    '_ArgumentDeclaration'  : 'SConsArguments.Declaration',
+    'ArgumentDeclaration'   : 'SConsArguments.Declaration',
+    'DeclareArgument'       : 'SConsArguments.Declaration',
+    '_ArgumentDeclarations' : 'SConsArguments.Declarations',
+    'ArgumentDeclarations'  : 'SConsArguments.Declarations',
+    'DeclareArguments'      : 'SConsArguments.Declarations',
+    '_Arguments'            : 'SConsArguments.Arguments',
+    '_ArgumentsProxy'       : 'SConsArguments.Proxy',
+    '_ArgumentNameConv'     : 'SConsArguments.NameConv',
+    'ENV'                   : 'SConsArguments.Util',
+    'VAR'                   : 'SConsArguments.Util',
+    'OPT'                   : 'SConsArguments.Util',
+    'OSE'                   : 'SConsArguments.Util',
+    'ALL'                   : 'SConsArguments.Util',
+    '_missing'              : 'SConsArguments.Util',
+    'MISSING'               : 'SConsArguments.Util',
+    '_undef'                : 'SConsArguments.Util',
+    'UNDEFINED'             : 'SConsArguments.Util',
+    '_notfound'             : 'SConsArguments.Util',
+    'NOTFOUND'              : 'SConsArguments.Util',
+    '_resubst'              : 'SConsArguments.Util',
+    '_build_resubst_dict'   : 'SConsArguments.Util',
+    '_build_iresubst_dict'  : 'SConsArguments.Util',
+    '_compose_mappings'     : 'SConsArguments.Util',
+    '_invert_dict'          : 'SConsArguments.Util',
+    '_VariablesWrapper'     : 'SConsArguments.VariablesWrapper',
+    'ImportArguments'       : 'SConsArguments.Importer',
+    'LazyDefault'           : 'SConsArguments.Defaults',
+    'DefaultsCache'         : 'SConsArguments.Defaults',
+    'GetDefaultsCache'      : 'SConsArguments.Defaults',
+    'SetDefaultsCache'      : 'SConsArguments.Defaults',
+    'GenerateCompletion'    : 'SConsArguments.Completion',
+    'ExportCompletion'      : 'SConsArguments.Completion',
+    'ValueSource'           : 'SConsArguments.Sources',
+    'DictSource'            : 'SConsArguments.Sources',
+    'JSONFileSource'        : 'SConsArguments.Sources',
+    'URLSource'             : 'SConsArguments.Sources',
+    'LoadSources'           : 'SConsArguments.Sources',
+    'ProfileLayer'          : 'SConsArguments.Profiles',
+    'ProfileValues'         : 'SConsArguments.Profiles',
+    'LoadProfile'           : 'SConsArguments.Profiles',
+}
+"""Attributes of this package, and the submodules providing them. The
+submodules (and SCons modules they depend on) are imported on first access
+to any of their attributes."""
+
+_lazy_submodules = ( 'Arguments', 'Completion', 'Daemon', 'Declaration',
+                     'Declarations', 'Defaults', 'Importer', 'Instrumentation',
+                     'NameConv', 'Profiles', 'Proxy', 'Sources', 'Suggestions',
+                     'Util', 'VariablesWrapper' )
+"""Submodules which may be accessed as attributes of this package without
+being explicitly imported first."""
+
+__all__ = sorted(k for k in _lazy_attributes if not k.startswith('_'))
+
+if sys.version_info >= (3,7):
+    def __getattr__(name):
+        try:
+            modname = _lazy_attributes[name]
+        except KeyError:
+            if name not in _lazy_submodules:
+                raise AttributeError("module %r has no attribute %r" % (__name__, name))
+            modname = __name__ + '.' + name
+            __import__(modname)
+            return sys.modules[modname]
+        __import__(modname)
+        value = getattr(sys.modules[modname], name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_lazy_attributes) | set(_lazy_submodules))
+else:
+    # No module-level __getattr__ (PEP 562), import everything eagerly.
+    from SConsArguments.Declaration import _ArgumentDeclaration, ArgumentDeclaration, DeclareArgument
+    from SConsArguments.Declarations import _ArgumentDeclarations, ArgumentDeclarations, DeclareArguments
+    from SConsArguments.Arguments import _Arguments
+    from SConsArguments.Proxy import  _ArgumentsProxy
+    from SConsArguments.NameConv import _ArgumentNameConv
+    from SConsArguments.Util import ENV, VAR, OPT, OSE, ALL
+    from SConsArguments.Util import _missing, MISSING, _undef, UNDEFINED, _notfound, NOTFOUND
+    from SConsArguments.Util import _resubst, _build_resubst_dict, _build_iresubst_dict, _compose_mappings, _invert_dict
+    from SConsArguments.VariablesWrapper import _VariablesWrapper
+    from SConsArguments.Importer import ImportArguments
+    from SConsArguments.Defaults import LazyDefault, DefaultsCache, GetDefaultsCache, SetDefaultsCache
+    from SConsArguments.Completion import GenerateCompletion, ExportCompletion
+    from SConsArguments.Sources import ValueSource, DictSource, JSONFileSource, URLSource, LoadSources
+    from SConsArguments.Profiles import ProfileLayer, ProfileValues, LoadProfile
 
 # Local Variables:
 # # tab-width:4
@@ -0,0 +1,478 @@
+"""`SConsArguments.__main__`
+
+Command-line interface to *argument* declarations, usable without running
+SCons::
+
+    python -m SConsArguments list [--json] [PATTERN ...]
+    python -m SConsArguments help [PATTERN ...]
+    python -m SConsArguments dump-values [--json] FILE
+    python -m SConsArguments check FILE [FILE ...]
+    python -m SConsArguments serve [--stop]
+
+The declarations are imported from the modules bundled with SConsArguments
+(all of them, unless ``-m`` options select some) or found in
+``site_scons/site_arguments`` directories, as `ImportArguments()` does when
+running under SCons. ``dump-values`` and ``check`` read variables files
+(such as these written by ``Variables.Save()``) and pass their values
+through converters and validators of the declared variables.
+
+``serve`` starts a daemon, which keeps the declarations and values read from
+variables files in memory and answers the other commands through a Unix
+domain socket (see `SConsArguments.Daemon`). The commands are sent to the
+daemon if ``--socket`` option (or ``SCONSARGUMENTS_SOCKET`` environment
+variable) names the socket; they are evaluated in-process if there is no
+daemon listening or it has been started with different ``-m``, ``-I``,
+``-C`` or site directory options. The daemon reloads the declarations when
+any of the arguments' modules (or directories they're looked up in) change
+and re-reads variables files when they change.
+"""
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+# Note: SCons and most of SConsArguments is imported only when a command is
+# evaluated in-process, so querying a daemon is cheap.
+
+_prog = 'python -m SConsArguments'
+
+_socket_env = 'SCONSARGUMENTS_SOCKET'
+"""Environment variable naming the daemon's socket."""
+
+_default_socket = '.sconsarguments.sock'
+"""Socket used by ``serve`` if none is given, relative to the top directory."""
+
+_config_fields = ('modules', 'argpath', 'topdir', 'site_dir', 'no_site_dir')
+"""Options that determine the declarations."""
+
+_request_fields = ('command', 'json', 'patterns', 'file', 'files')
+"""Options sent to the daemon with each request."""
+
+#############################################################################
+def _parser():
+    """Create the parser of command-line arguments. This function is for
+    internal use and IS **NOT a part of public API**."""
+    parser = argparse.ArgumentParser(prog = _prog,
+        description = 'Query SConsArguments declarations without running SCons.')
+    parser.add_argument('-m', '--module', dest = 'modules', action = 'append',
+        metavar = 'NAME', help = 'import arguments from module NAME (may be '
+        'repeated); by default all the bundled modules are imported')
+    parser.add_argument('-I', '--argpath', dest = 'argpath', action = 'append',
+        default = [], metavar = 'DIR', help = 'search DIR for arguments\' '
+        'modules (may be repeated)')
+    parser.add_argument('-C', '--directory', dest = 'topdir', default = '.',
+        metavar = 'DIR', help = 'top directory of the project, where '
+        'site_scons is looked for (default: current directory)')
+    parser.add_argument('--site-dir', dest = 'site_dir', metavar = 'DIR',
+        help = 'use DIR instead of the usual site_scons directories')
+    parser.add_argument('--no-site-dir', dest = 'no_site_dir',
+        action = 'store_true', help = 'do not search site_scons directories')
+    parser.add_argument('--socket', dest = 'socket', metavar = 'PATH',
+        default = os.environ.get(_socket_env), help = 'query the daemon '
+        'listening on PATH, if any (default: $%s); for serve, listen on PATH '
+        '(default: %s in the top directory)' % (_socket_env, _default_socket))
+    commands = parser.add_subparsers(dest = 'command', metavar = 'COMMAND')
+
+    cmd = commands.add_parser('list', help = 'list declared arguments')
+    cmd.add_argument('--json', action = 'store_true',
+        help = 'print the declaration schema as JSON')
+    cmd.add_argument('patterns', nargs = '*', metavar = 'PATTERN',
+        help = 'list only arguments with matching names, keys, modules or groups')
+
+    cmd = commands.add_parser('help', help = 'print help for command-line variables')
+    cmd.add_argument('patterns', nargs = '*', metavar = 'PATTERN',
+        help = 'print help only for matching variables, arguments or modules')
+
+    cmd = commands.add_parser('dump-values',
+        help = 'print values read from a variables file, after conversion')
+    cmd.add_argument('--json', action = 'store_true', help = 'print the values as JSON')
+    cmd.add_argument('file', metavar = 'FILE')
+
+    cmd = commands.add_parser('check', help = 'validate variables files')
+    cmd.add_argument('files', nargs = '+', metavar = 'FILE')
+
+    cmd = commands.add_parser('serve', help = 'answer the other commands '
+        'through a Unix domain socket')
+    cmd.add_argument('--stop', action = 'store_true',
+        help = 'stop the daemon instead of starting it')
+    return parser
+
+#############################################################################
+def _init_argpath(opts):
+    """Set `SConsArguments.Importer._defaultArgpath` the way SCons would,
+    but without starting SCons. This function is for internal use and IS
+    **NOT a part of public API**."""
+    from SConsArguments import Importer
+    Importer._defaultArgpath = []
+    topdir = os.path.abspath(opts.topdir)
+    if opts.site_dir:
+        Importer._handle_site_scons_dir(topdir, opts.site_dir)
+    elif not opts.no_site_dir:
+        Importer._handle_all_site_scons_dirs(topdir)
+
+#############################################################################
+def _import_decls(opts):
+    """Import declarations selected by command-line options. This function
+    is for internal use and IS **NOT a part of public API**."""
+    from SConsArguments import Importer
+    _init_argpath(opts)
+    modules = opts.modules or Importer._bundled_argmod_names()
+    return Importer.ImportArguments(modules, opts.argpath or None)
+
+#############################################################################
+def _environment():
+    """Create a construction environment with no tools. This function is for
+    internal use and IS **NOT a part of public API**."""
+    import SCons.Environment
+    return SCons.Environment.Environment(tools = [])
+
+#############################################################################
+def _read_variables_file(filename):
+    """Read variables file `filename` in the way ``SCons.Variables`` does.
+    This function is for internal use and IS **NOT a part of public API**."""
+    with open(filename) as f:
+        code = f.read()
+    values = {}
+    dirname = os.path.dirname(os.path.abspath(filename))
+    sys.path.insert(0, dirname)
+    try:
+        exec(compile(code, filename, 'exec'), {}, values)
+    finally:
+        del sys.path[0]
+    return values
+
+#############################################################################
+def _file_stamp(filename):
+    """Return ``(mtime, size)`` of file `filename` or ``None`` if it can't be
+    accessed. This function is for internal use and IS **NOT a part of public
+    API**."""
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+#############################################################################
+def _read_values(decls, filename, cache = None):
+    """Read variables file `filename` and update a new environment with its
+    values, calling converters and validators. Return ``(values, unknown)``,
+    where ``values`` maps names of command-line variables found in the file
+    to converted values and ``unknown`` is a list of ``(name, suggestions)``
+    pairs for names not declared (see `_unknown_text()`). The
+    result is remembered in `cache` (if given) until the file changes. This
+    function is for internal use and IS **NOT a part of public API**."""
+    if cache is not None:
+        key = os.path.abspath(filename)
+        stamp = _file_stamp(key)
+        try:
+            cached_stamp, result = cache[key]
+        except KeyError:
+            pass
+        else:
+            if stamp is not None and cached_stamp == stamp:
+                return result
+        result = _read_values(decls, filename)
+        cache[key] = (stamp, result)
+        return result
+    from SConsArguments.Arguments import _Arguments
+    import SCons.Variables
+    raw = _read_variables_file(filename)
+    env = _environment()
+    variables = SCons.Variables.Variables(args = raw)
+    decls.commit()
+    decls.add_to(None, variables)
+    args = _Arguments(decls)
+    args.UpdateEnvironment(env, variables, args = raw)
+    proxy = args.VarEnvProxy(env)
+    values = {}
+    for option in variables.options:
+        if option.key in proxy and \
+           any(k in raw for k in [option.key] + list(option.aliases)):
+            values[option.key] = proxy[option.key]
+    unknown = [ (k, args.SuggestVariables(k, variables)) for k in sorted(variables.unknown) ]
+    return (values, unknown)
+
+#############################################################################
+def _unknown_text(name, suggestions):
+    """Describe unknown variable `name`. This function is for internal use
+    and IS **NOT a part of public API**."""
+    from SConsArguments.Suggestions import _did_you_mean
+    question = _did_you_mean(suggestions)
+    return 'unknown variable %r%s' % (str(name), ', ' + question if question else '')
+
+#############################################################################
+def _cmd_list(decls, opts, out, err):
+    """Implementation of the ``list`` command. This function is for internal
+    use and IS **NOT a part of public API**."""
+    schema = decls.Schema()
+    if opts.json:
+        json.dump(schema, out, indent = 1, sort_keys = True)
+        out.write('\n')
+        return 0
+    for (name, arg) in sorted(schema['arguments'].items()):
+        keys = [ arg[ns]['key'] if ns in arg else '-' for ns in ('env', 'var') ]
+        keys.append(','.join(arg['opt']['names']) if 'opt' in arg else '-')
+        names = [name, arg['module'] or ''] + arg['groups'] + keys
+        if opts.patterns and not any(fnmatch.fnmatchcase(n, p)
+                                     for n in names for p in opts.patterns):
+            continue
+        origin = arg['module'] or ''
+        if arg['groups']:
+            origin += ':' + ','.join(arg['groups'])
+        out.write('%-24s %-24s %-24s %s%s\n' % (name, keys[0], keys[1], keys[2],
+                  ' (%s)' % origin if origin else ''))
+    return 0
+
+#############################################################################
+def _cmd_help(decls, opts, out, err):
+    """Implementation of the ``help`` command. This function is for internal
+    use and IS **NOT a part of public API**."""
+    from SConsArguments.Arguments import _Arguments
+    import SCons.Variables
+    env = _environment()
+    variables = SCons.Variables.Variables(args = {})
+    decls.commit()
+    decls.add_to(env, variables)
+    args = _Arguments(decls)
+    args.GenerateVariablesHelpText(variables, env, select = opts.patterns or None,
+                                   output = out, cache = None)
+    return 0
+
+#############################################################################
+def _cmd_dump_values(decls, opts, out, err):
+    """Implementation of the ``dump-values`` command. This function is for
+    internal use and IS **NOT a part of public API**."""
+    from SConsArguments.Util import _json_value
+    try:
+        (values, unknown) = _read_values(decls, opts.file, getattr(opts, 'cache', None))
+    except Exception as e: # raised by the file, converters or validators
+        err.write('%s: %s: error: %s\n' % (_prog, opts.file, e))
+        return 2
+    if opts.json:
+        json.dump(_json_value(values), out, indent = 1, sort_keys = True)
+        out.write('\n')
+    else:
+        for key in sorted(values):
+            out.write('%s = %r\n' % (key, values[key]))
+    for (key, suggestions) in unknown:
+        err.write('%s: %s: %s\n' % (_prog, opts.file, _unknown_text(key, suggestions)))
+    return 0
+
+#############################################################################
+def _cmd_check(decls, opts, out, err):
+    """Implementation of the ``check`` command. This function is for internal
+    use and IS **NOT a part of public API**."""
+    status = 0
+    for filename in opts.files:
+        try:
+            (values, unknown) = _read_values(decls, filename, getattr(opts, 'cache', None))
+        except Exception as e: # raised by the file, converters or validators
+            out.write('%s: error: %s\n' % (filename, e))
+            status = 1
+            continue
+        for (key, suggestions) in unknown:
+            out.write('%s: %s\n' % (filename, _unknown_text(key, suggestions)))
+            status = 1
+        if not unknown:
+            out.write('%s: OK\n' % filename)
+    return status
+
+#############################################################################
+_commands = { 'list'        : _cmd_list,
+              'help'        : _cmd_help,
+              'dump-values' : _cmd_dump_values,
+              'check'       : _cmd_check }
+
+#############################################################################
+def _run(opts, out, err, declarations):
+    """Evaluate command given by `opts` with declarations returned by
+    `declarations()`. This function is for internal use and IS **NOT a part
+    of public API**."""
+    import SCons.Errors
+    try:
+        return _commands[opts.command](declarations(), opts, out, err)
+    except (SCons.Errors.UserError, ImportError, RuntimeError, IOError, OSError) as e:
+        err.write('%s: error: %s\n' % (_prog, e))
+        return 2
+
+#############################################################################
+def _config(opts):
+    """Return options that determine the declarations, in a form which may
+    be compared between the client and the daemon. This function is for
+    internal use and IS **NOT a part of public API**."""
+    config = dict((k, getattr(opts, k)) for k in _config_fields)
+    config['argpath'] = [ os.path.abspath(d) for d in opts.argpath ]
+    config['topdir'] = os.path.abspath(opts.topdir)
+    return config
+
+#############################################################################
+def _stamp(filenames):
+    """Return stamps of files `filenames`, to be compared later to find out
+    whether any of them has changed. This function is for internal use and IS
+    **NOT a part of public API**."""
+    return [ (f, _file_stamp(f)) for f in sorted(set(filenames)) ]
+
+#############################################################################
+class _Session(object):
+    """State of the daemon started by ``serve``: the declarations and values
+    read from variables files, kept between requests. Objects of this class
+    are request handlers for `SConsArguments.Daemon.Serve()`. This class is
+    for internal use and IS **NOT a part of public API**."""
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.config = _config(opts)
+        self.decls = None
+        self.stamp = None
+        self.cache = {}
+
+    def watched(self):
+        """Files and directories whose modification invalidates the
+        declarations."""
+        from SConsArguments import Importer
+        dirs = list(self.opts.argpath) + list(Importer._defaultArgpath or [])
+        return dirs + [ f for (name, f) in Importer._argmod_cache ]
+
+    def declarations(self):
+        """Return the declarations, (re)importing them if necessary."""
+        if self.decls is None or _stamp(self.watched()) != self.stamp:
+            self.decls = None
+            self.cache.clear()
+            self.decls = _import_decls(self.opts)
+            self.stamp = _stamp(self.watched())
+        return self.decls
+
+    def __call__(self, request):
+        if request.get('config') != self.config:
+            return { 'status' : None, 'error' : 'configuration mismatch' }
+        opts = argparse.Namespace(**vars(self.opts))
+        for (k, v) in (request.get('request') or {}).items():
+            if k in _request_fields:
+                setattr(opts, k, v)
+        if opts.command not in _commands:
+            return { 'status' : None, 'error' : 'unknown command %r' % opts.command }
+        opts.cache = self.cache
+        out = StringIO()
+        err = StringIO()
+        cwd = os.getcwd()
+        try:
+            os.chdir(request.get('cwd') or cwd)
+            status = _run(opts, out, err, self.declarations)
+        except OSError as e:
+            return { 'status' : None, 'error' : str(e) }
+        finally:
+            os.chdir(cwd)
+        return { 'status' : status, 'output' : out.getvalue(), 'errors' : err.getvalue() }
+
+#############################################################################
+def _serve(opts, out, err):
+    """Implementation of the ``serve`` command. This function is for internal
+    use and IS **NOT a part of public API**."""
+    from SConsArguments import Daemon
+    import SCons.Errors
+    path = opts.socket or os.path.join(opts.topdir, _default_socket)
+    # requests are evaluated in clients' working directories
+    opts.argpath = [ os.path.abspath(d) for d in opts.argpath ]
+    opts.topdir = os.path.abspath(opts.topdir)
+    if opts.stop:
+        if Daemon.Shutdown(path):
+            return 0
+        err.write('%s: error: no daemon listening on %s\n' % (_prog, path))
+        return 1
+    session = _Session(opts)
+    def ready():
+        out.write('%s: listening on %s\n' % (_prog, path))
+        out.flush()
+    try:
+        session.declarations()
+        Daemon.Serve(path, session, ready)
+    except (SCons.Errors.UserError, ImportError, RuntimeError, IOError, OSError) as e:
+        err.write('%s: error: %s\n' % (_prog, e))
+        return 2
+    return 0
+
+#############################################################################
+def _query(opts, out, err):
+    """Send command given by `opts` to the daemon. Return the exit status or
+    ``None`` if the daemon hasn't answered. This function is for internal use
+    and IS **NOT a part of public API**."""
+    from SConsArguments import Daemon
+    request = dict((k, getattr(opts, k)) for k in _request_fields if hasattr(opts, k))
+    reply = Daemon.Query(opts.socket, { 'config' : _config(opts),
+                                        'cwd' : os.getcwd(),
+                                        'request' : request })
+    if reply is None:
+        return None
+    out.write(reply.get('output', ''))
+    err.write(reply.get('errors', ''))
+    return reply['status']
+
+#############################################################################
+def main(argv = None, out = None):
+    #------------------------------------------------------------------------
+    """Run the command-line interface.
+
+    :Parameters:
+        argv : list
+            command-line arguments (without the program name); defaults to
+            ``sys.argv[1:]``,
+        out : file
+            where to write the output; defaults to ``sys.stdout``.
+    :Returns:
+        exit status: ``0`` on success, ``1`` if ``check`` found problems,
+        ``2`` on errors.
+    """
+    #------------------------------------------------------------------------
+    if out is None:
+        out = sys.stdout
+    parser = _parser()
+    opts = parser.parse_args(argv)
+    if opts.command is None:
+        parser.print_usage(sys.stderr)
+        return 2
+    if opts.command == 'serve':
+        return _serve(opts, out, sys.stderr)
+    if opts.socket:
+        status = _query(opts, out, sys.stderr)
+        if status is not None:
+            return status
+    return _run(opts, out, sys.stderr, lambda : _import_decls(opts))
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
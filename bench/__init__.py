@@ -0,0 +1,12 @@
+"""`bench`
+
+Benchmarks for SConsArguments, see `bench.benchmarks`.
+"""
+
+__docformat__ = "restructuredText"
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,266 @@
+#! /usr/bin/env python
+"""`bench.benchmarks`
+
+Micro-benchmarks for the hot paths of SConsArguments.
+
+Every benchmark is run for several problem sizes (numbers of *arguments*),
+each measurement is repeated several times and the results are written out as
+JSON, so that scaling curves may be compared between releases::
+
+    python bench/benchmarks.py --sizes 10 100 1000 --output bench.json
+
+Run ``python bench/benchmarks.py --help`` for all the options. The script may
+also be run via ``scons bench``.
+"""
+
+#
+# Copyright (c) 2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+_topdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _topdir not in sys.path:
+    sys.path.insert(0, _topdir)
+
+import SCons
+import SCons.Environment
+import SCons.Variables
+import SConsArguments
+import SConsArguments.Importer
+from SConsArguments.Util import ENV, _resubst, _build_resubst_dict
+from bench import generators
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+_tmpdirs = []
+"""Temporary directories created by benchmarks, removed by `run()`."""
+
+#############################################################################
+def _environment():
+    return SCons.Environment.Environment(tools = [])
+
+#############################################################################
+def _variables(args = None):
+    return SCons.Variables.Variables(args = (args or {}))
+
+#############################################################################
+def _committed(n):
+    """Return ``(env, variables, args)`` with **n** *arguments* committed"""
+    env = _environment()
+    variables = _variables(generators.generate_cli_args(n))
+    args = SConsArguments.DeclareArguments(**generators.generate_declarations(n)).Commit(env, variables)
+    return env, variables, args
+
+#############################################################################
+# Each benchmark takes the problem size ``n`` and returns a callable to be
+# timed (the "setup" part is not measured). The callable is invoked once per
+# repetition, so it must not depend on state left by previous invocations.
+#############################################################################
+def bench_DeclareArguments(n):
+    decls = generators.generate_declarations(n)
+    return lambda : SConsArguments.DeclareArguments(**decls)
+
+#############################################################################
+def bench_ImportArguments(n):
+    # note: loaded modules are cached by SConsArguments.Importer, so this
+    # measures repeated imports of an already loaded module
+    tmpdir = tempfile.mkdtemp()
+    _tmpdirs.append(tmpdir)
+    generators.write_argmod(tmpdir, 'benchmod', n)
+    return lambda : SConsArguments.ImportArguments('benchmod', [tmpdir])
+
+#############################################################################
+def bench_commit(n):
+    decls = generators.generate_declarations(n)
+    def run():
+        SConsArguments.DeclareArguments(**decls).commit(_environment(), _variables())
+    return run
+
+#############################################################################
+def bench_Commit(n):
+    decls = generators.generate_declarations(n)
+    def run():
+        SConsArguments.DeclareArguments(**decls).Commit(_environment(), _variables())
+    return run
+
+#############################################################################
+def bench_EnvProxy_get(n):
+    env, variables, args = _committed(n)
+    proxy = args.EnvProxy(env)
+    keys = list(args.get_keys())
+    def run():
+        for key in keys:
+            proxy[key]
+    return run
+
+#############################################################################
+def bench_EnvProxy_set(n):
+    env, variables, args = _committed(n)
+    proxy = args.EnvProxy(env)
+    items = list(generators.generate_ose(n, fraction = 1.0).items())
+    def run():
+        for key, value in items:
+            proxy[key] = value
+    return run
+
+#############################################################################
+def bench__resubst(n):
+    decls = SConsArguments.DeclareArguments(**generators.generate_declarations(n))
+    resubst = _build_resubst_dict(decls.get_rename_dict(ENV))
+    values = [ d['default'] for d in generators.generate_declarations(n).values() ]
+    def run():
+        for value in values:
+            _resubst(value, resubst)
+    return run
+
+#############################################################################
+def bench__VariablesWrapper_Update(n):
+    env, variables, args = _committed(n)
+    cli = generators.generate_cli_args(n)
+    wrapper = SConsArguments._VariablesWrapper(variables)
+    proxy = args.VarEnvProxy(env)
+    return lambda : wrapper.Update(proxy, cli)
+
+#############################################################################
+def bench_Postprocess(n):
+    decls = generators.generate_declarations(n)
+    cli = generators.generate_cli_args(n)
+    ose = generators.generate_ose(n)
+    def run():
+        env = _environment()
+        variables = _variables(cli)
+        args = SConsArguments.DeclareArguments(**decls).Commit(env, variables)
+        args.Postprocess(env, variables, False, ose)
+    return run
+
+#############################################################################
+def bench_GenerateVariablesHelpText(n):
+    env, variables, args = _committed(n)
+    return lambda : args.GenerateVariablesHelpText(variables, env)
+
+#############################################################################
+benchmarks = [ ('DeclareArguments', bench_DeclareArguments),
+               ('ImportArguments', bench_ImportArguments),
+               ('commit', bench_commit),
+               ('Commit', bench_Commit),
+               ('EnvProxy.get', bench_EnvProxy_get),
+               ('EnvProxy.set', bench_EnvProxy_set),
+               ('_resubst', bench__resubst),
+               ('_VariablesWrapper.Update', bench__VariablesWrapper_Update),
+               ('Postprocess', bench_Postprocess),
+               ('GenerateVariablesHelpText', bench_GenerateVariablesHelpText) ]
+"""All the benchmarks, as ``(name, factory)`` pairs."""
+
+#############################################################################
+def measure(factory, n, repeat):
+    """Time the callable returned by ``factory(n)`` **repeat** times
+
+    :Returns:
+        a dict with ``min``, ``median`` and ``max`` times (in seconds)
+    """
+    run = factory(n)
+    times = []
+    for i in range(repeat):
+        start = _clock()
+        run()
+        times.append(_clock() - start)
+    times.sort()
+    return { 'min' : times[0],
+             'median' : times[len(times) // 2],
+             'max' : times[-1],
+             'per_argument' : times[0] / n }
+
+#############################################################################
+def run(sizes, repeat, selected = None, log = None):
+    """Run benchmarks and return the results ready to be dumped as JSON
+
+    :Parameters:
+        sizes : list
+            problem sizes (numbers of *arguments*),
+        repeat : int
+            number of measurements for each benchmark and size,
+        selected : list | None
+            names of benchmarks to run (all by default),
+        log : file | None
+            where to report progress
+    """
+    results = []
+    try:
+        for name, factory in benchmarks:
+            if selected and name not in selected:
+                continue
+            for n in sizes:
+                result = measure(factory, n, repeat)
+                result.update(benchmark = name, size = n, repeat = repeat)
+                results.append(result)
+                if log:
+                    log.write('%-28s %7d %12.6f s\n' % (name, n, result['min']))
+    finally:
+        while _tmpdirs:
+            shutil.rmtree(_tmpdirs.pop(), ignore_errors = True)
+    return { 'meta' : { 'python' : platform.python_version(),
+                        'scons' : getattr(SCons, '__version__', None),
+                        'platform' : platform.platform(),
+                        'time' : time.strftime('%Y-%m-%dT%H:%M:%S') },
+             'results' : results }
+
+#############################################################################
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Run SConsArguments micro-benchmarks')
+    parser.add_argument('-s', '--sizes', type = int, nargs = '+', default = [10, 100, 1000, 10000],
+                        help = 'numbers of arguments to benchmark with (default: %(default)s)')
+    parser.add_argument('-r', '--repeat', type = int, default = 5,
+                        help = 'number of measurements per benchmark (default: %(default)s)')
+    parser.add_argument('-b', '--benchmark', action = 'append', dest = 'benchmarks',
+                        choices = [ name for name, factory in benchmarks ],
+                        help = 'benchmark to run (may be repeated; default: all)')
+    parser.add_argument('-o', '--output', type = str, default = None,
+                        help = 'write results to this JSON file (default: stdout)')
+    opts = parser.parse_args(argv)
+
+    # there are no site_scons directories to search when running outside of SCons
+    SConsArguments.Importer._defaultArgpath = []
+
+    results = run(opts.sizes, opts.repeat, opts.benchmarks, sys.stderr)
+    text = json.dumps(results, indent = 1, sort_keys = True)
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        sys.stdout.write(text + '\n')
+
+if __name__ == '__main__':
+    main()
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
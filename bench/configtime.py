@@ -0,0 +1,374 @@
+#! /usr/bin/env python
+"""`bench.configtime`
+
+Configuration-time regression harness.
+
+Representative ``SConstruct`` files are run several times, each time in
+a fresh ``scons`` process. The scenarios are the examples of the user manual
+(taken from ``test/SConsArguments/UserManual/sconstest-*.py``) and a generated
+project importing a module with thousands of *arguments*. For each scenario
+the wall time and peak RSS of the process are recorded. One extra run is
+profiled to find the share of time spent in SConsArguments code. Results are
+compared against a stored baseline and the script exits with non-zero status
+if any scenario got slower (or bigger) than the baseline allows::
+
+    python bench/configtime.py                    # compare with baseline
+    python bench/configtime.py --update-baseline  # record new baseline
+
+Baselines are machine-specific, record them on the machine which is used to
+run the comparisons. Results obtained with other Python or SCons versions
+than the baseline are not compared at all. Run ``python bench/configtime.py --help`` for all the
+options.
+"""
+
+#
+# Copyright (c) 2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import argparse
+import ast
+import glob
+import json
+import os
+import platform
+import pstats
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+_topdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _topdir not in sys.path:
+    sys.path.insert(0, _topdir)
+
+from bench import generators
+
+_clock = getattr(time, 'perf_counter', time.time)
+
+_default_baseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'configtime-baseline.json')
+
+_launcher = '''
+import os
+import sys
+profile = os.environ.get('SCONSARGUMENTS_CONFIGTIME_PROFILE')
+import SCons.Script
+if profile:
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        SCons.Script.main()
+    finally:
+        profiler.disable()
+        profiler.dump_stats(profile)
+else:
+    SCons.Script.main()
+'''
+"""Script used to start scons (optionally under profiler)."""
+
+_generated_sconstruct = '''
+from SConsArguments import ImportArguments
+env = Environment(tools = [])
+var = Variables()
+decls = ImportArguments('benchmod')
+args = decls.Commit(env, var, True)
+args.Postprocess(env, var, True)
+'''
+"""SConstruct of the generated project."""
+
+#############################################################################
+class Scenario(object):
+    """A project to be configured by scons"""
+    def __init__(self, name, sconstruct, arguments, setup = None):
+        self.name = name
+        self.sconstruct = sconstruct
+        self.arguments = arguments
+        self.setup = setup
+
+    def create(self, dirname):
+        """Create project files in **dirname**"""
+        site_scons = os.path.join(dirname, 'site_scons')
+        shutil.copytree(os.path.join(_topdir, 'SConsArguments'),
+                        os.path.join(site_scons, 'SConsArguments'),
+                        ignore = shutil.ignore_patterns('__pycache__', '*.pyc'))
+        with open(os.path.join(dirname, 'SConstruct'), 'w') as f:
+            f.write(self.sconstruct)
+        if self.setup:
+            self.setup(dirname)
+
+#############################################################################
+def _parse_sconstest(filename):
+    """Extract SConstruct contents and command-line arguments from
+    a sconstest script, returns ``(sconstruct, arguments)``"""
+    with open(filename) as f:
+        tree = ast.parse(f.read(), filename)
+    sconstruct, arguments = None, None
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+            continue
+        if node.func.attr == 'write' and sconstruct is None and len(node.args) == 2:
+            try:
+                if ast.literal_eval(node.args[0]) == 'SConstruct':
+                    sconstruct = ast.literal_eval(node.args[1])
+            except ValueError:
+                pass
+        elif node.func.attr == 'run' and arguments is None:
+            for kw in node.keywords:
+                if kw.arg == 'arguments':
+                    arguments = list(ast.literal_eval(kw.value))
+    return sconstruct, (arguments or ['-Q'])
+
+#############################################################################
+def usermanual_scenarios():
+    """Scenarios made of the user manual examples"""
+    pattern = os.path.join(_topdir, 'test', 'SConsArguments', 'UserManual', 'sconstest-*.py')
+    scenarios = []
+    for filename in sorted(glob.glob(pattern)):
+        sconstruct, arguments = _parse_sconstest(filename)
+        if sconstruct is None:
+            continue
+        name = os.path.splitext(os.path.basename(filename))[0][len('sconstest-arguments-'):]
+        scenarios.append(Scenario(name, sconstruct, arguments))
+    return scenarios
+
+#############################################################################
+def generated_scenario(size):
+    """Scenario importing a generated module with **size** arguments"""
+    def setup(dirname):
+        argdir = os.path.join(dirname, 'site_scons', 'site_arguments')
+        os.makedirs(argdir)
+        generators.write_argmod(argdir, 'benchmod', size)
+    cli = [ '%s=%s' % kv for kv in sorted(generators.generate_cli_args(min(size, 100)).items()) ]
+    return Scenario('generated-%d' % size, _generated_sconstruct, ['-Q'] + cli, setup)
+
+#############################################################################
+def _peak_rss(rusage):
+    """Peak RSS in kilobytes"""
+    if rusage is None:
+        return None
+    if sys.platform == 'darwin':
+        return rusage.ru_maxrss // 1024
+    return rusage.ru_maxrss
+
+#############################################################################
+def _run_scons(cmd, cwd, env):
+    """Run scons, return ``(wall_time, peak_rss)``"""
+    start = _clock()
+    proc = subprocess.Popen(cmd, cwd = cwd, env = env,
+                            stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+    if hasattr(os, 'wait4'):
+        # read output first, so the child does not block on a full pipe
+        output = proc.stdout.read()
+        pid, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+    else:
+        output, rusage = proc.communicate()[0], None
+    elapsed = _clock() - start
+    proc.stdout.close()
+    if proc.returncode != 0:
+        raise RuntimeError("%s failed with status %r:\n%s" % (' '.join(cmd), proc.returncode,
+                                                             output.decode('utf-8', 'replace')))
+    return elapsed, _peak_rss(rusage)
+
+#############################################################################
+def _sconsarguments_share(profile):
+    """Fraction of profiled time spent in functions of SConsArguments"""
+    stats = pstats.Stats(profile)
+    total = own = 0.0
+    for (filename, line, func), (cc, nc, tt, ct, callers) in stats.stats.items():
+        total += tt
+        if os.sep + 'SConsArguments' + os.sep in filename:
+            own += tt
+    return (own / total) if total else None
+
+#############################################################################
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+#############################################################################
+def _scons_env(scons_path = None):
+    """Environment for the scons processes"""
+    pythonpath = list(sys.path)
+    if scons_path:
+        pythonpath.insert(0, scons_path)
+    env = dict(os.environ, PYTHONPATH = os.pathsep.join(pythonpath))
+    env.pop('SCONSFLAGS', None)
+    return env
+
+#############################################################################
+def scons_version(scons_path = None):
+    """Version of the SCons package used to run the scenarios"""
+    cmd = [ sys.executable, '-c', 'import SCons; print(SCons.__version__)' ]
+    output = subprocess.check_output(cmd, env = _scons_env(scons_path))
+    return output.decode('utf-8', 'replace').strip()
+
+#############################################################################
+def measure(scenario, runs, profile = True, scons_path = None):
+    """Run **scenario** **runs** times in fresh processes
+
+    :Returns:
+        a dict with ``wall`` (median, min and max, in seconds), ``rss``
+        (median peak RSS in kB) and ``sconsarguments_share``
+    """
+    tmpdir = tempfile.mkdtemp()
+    try:
+        projdir = os.path.join(tmpdir, 'project')
+        os.makedirs(projdir)
+        scenario.create(projdir)
+        launcher = os.path.join(tmpdir, 'scons_launcher.py')
+        with open(launcher, 'w') as f:
+            f.write(_launcher)
+        env = _scons_env(scons_path)
+        cmd = [ sys.executable, launcher ] + scenario.arguments
+        walls, rss = [], []
+        for i in range(runs):
+            wall, peak = _run_scons(cmd, projdir, env)
+            walls.append(wall)
+            if peak is not None:
+                rss.append(peak)
+        share = None
+        if profile:
+            prof = os.path.join(tmpdir, 'profile.out')
+            _run_scons(cmd, projdir, dict(env, SCONSARGUMENTS_CONFIGTIME_PROFILE = prof))
+            share = _sconsarguments_share(prof)
+        return { 'wall' : { 'median' : _median(walls), 'min' : min(walls), 'max' : max(walls) },
+                 'rss' : (_median(rss) if rss else None),
+                 'sconsarguments_share' : share,
+                 'runs' : runs }
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors = True)
+
+#############################################################################
+def compare(data, baseline, tolerance, rss_tolerance):
+    """Compare **data** against **baseline**
+
+    Both arguments are dicts with ``meta`` and ``results`` as written by
+    `main()`. Timings taken with different Python or SCons versions are not
+    comparable, so `ValueError` is raised if the versions recorded in
+    ``meta`` differ.
+
+    :Returns:
+        list of messages describing regressions (empty if there are none)
+    """
+    for key in ('python', 'scons'):
+        ours, theirs = data['meta'].get(key), baseline['meta'].get(key)
+        if ours != theirs:
+            raise ValueError('%s version %s differs from baseline %s, record a new baseline with --update-baseline'
+                             % (key, ours, theirs))
+    regressions = []
+    for name, result in sorted(data['results'].items()):
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        limit = base['wall']['median'] * (1.0 + tolerance)
+        if result['wall']['median'] > limit:
+            regressions.append('%s: wall time %.3fs exceeds baseline %.3fs (+%d%%)' %
+                               (name, result['wall']['median'], base['wall']['median'], tolerance * 100))
+        if result.get('rss') and base.get('rss'):
+            limit = base['rss'] * (1.0 + rss_tolerance)
+            if result['rss'] > limit:
+                regressions.append('%s: peak RSS %dkB exceeds baseline %dkB (+%d%%)' %
+                                   (name, result['rss'], base['rss'], rss_tolerance * 100))
+    return regressions
+
+#############################################################################
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Configuration-time regression harness for SConsArguments')
+    parser.add_argument('-n', '--runs', type = int, default = 5,
+                        help = 'number of runs per scenario (default: %(default)s)')
+    parser.add_argument('--size', type = int, default = 5000,
+                        help = 'number of arguments in the generated project (default: %(default)s)')
+    parser.add_argument('-s', '--scenario', action = 'append', dest = 'scenarios',
+                        help = 'scenario to run (may be repeated; default: all)')
+    parser.add_argument('--baseline', type = str, default = _default_baseline,
+                        help = 'baseline file (default: %(default)s)')
+    parser.add_argument('--update-baseline', action = 'store_true',
+                        help = 'store the results as new baseline instead of comparing')
+    parser.add_argument('--tolerance', type = float, default = 0.25,
+                        help = 'allowed relative increase of median wall time (default: %(default)s)')
+    parser.add_argument('--rss-tolerance', type = float, default = 0.10,
+                        help = 'allowed relative increase of peak RSS (default: %(default)s)')
+    parser.add_argument('--no-profile', dest = 'profile', action = 'store_false',
+                        help = 'skip the profiled run')
+    parser.add_argument('--scons-path', type = str, default = None,
+                        help = 'directory containing the SCons package to be used')
+    parser.add_argument('-o', '--output', type = str, default = None,
+                        help = 'write results to this JSON file')
+    opts = parser.parse_args(argv)
+
+    scenarios = usermanual_scenarios() + [ generated_scenario(opts.size) ]
+    if opts.scenarios:
+        unknown = sorted(set(opts.scenarios) - set(s.name for s in scenarios))
+        if unknown:
+            parser.error('unknown scenario(s): %s (available: %s)' %
+                         (', '.join(unknown), ', '.join(s.name for s in scenarios)))
+        scenarios = [ s for s in scenarios if s.name in opts.scenarios ]
+
+    meta = { 'python' : platform.python_version(),
+             'scons' : scons_version(opts.scons_path),
+             'platform' : platform.platform(),
+             'time' : time.strftime('%Y-%m-%dT%H:%M:%S') }
+
+    results = {}
+    for scenario in scenarios:
+        result = measure(scenario, opts.runs, opts.profile, opts.scons_path)
+        results[scenario.name] = result
+        share = result['sconsarguments_share']
+        sys.stderr.write('%-40s %8.3fs %8s kB %s\n' % (scenario.name, result['wall']['median'],
+                         result['rss'], ('%5.1f%%' % (share * 100)) if share is not None else '-'))
+
+    data = { 'meta' : meta, 'results' : results }
+    text = json.dumps(data, indent = 1, sort_keys = True) + '\n'
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            f.write(text)
+
+    if opts.update_baseline:
+        with open(opts.baseline, 'w') as f:
+            f.write(text)
+        return 0
+
+    try:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)
+    except (IOError, OSError):
+        sys.stderr.write('no baseline found in %s, use --update-baseline to create one\n' % opts.baseline)
+        return 0
+    try:
+        regressions = compare(data, baseline, opts.tolerance, opts.rss_tolerance)
+    except ValueError as e:
+        sys.stderr.write('cannot compare with %s: %s\n' % (opts.baseline, e))
+        return 2
+    for msg in regressions:
+        sys.stderr.write('REGRESSION: %s\n' % msg)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
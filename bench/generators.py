@@ -0,0 +1,143 @@
+"""`bench.generators`
+
+Synthetic *argument* declarations, command-line values and arguments' modules
+used by the benchmarks.
+
+The generated values are a mix of plain strings, strings with placeholders
+referring to other *arguments* (``"${ARG00001} -O2"``) and ``CLVar`` lists, so
+that substitution-related code paths get exercised as in real projects.
+"""
+
+#
+# Copyright (c) 2016 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+__docformat__ = "restructuredText"
+
+import os
+import random
+import SCons.Util
+
+#############################################################################
+PLAIN, PLACEHOLDER, CLVAR = range(3)
+"""Kinds of generated values."""
+
+#############################################################################
+def argument_name(i):
+    """Name of i-th generated *argument*"""
+    return 'ARG%05d' % i
+
+#############################################################################
+def value_kind(i):
+    """Kind of value used by i-th *argument* (`PLAIN`, `PLACEHOLDER` or
+    `CLVAR`); the mix is roughly 50% / 25% / 25%"""
+    return (PLAIN, PLACEHOLDER, PLAIN, CLVAR)[i % 4]
+
+#############################################################################
+def generate_value(i, n, rng, variant = 'default'):
+    """Generate a value for i-th *argument* out of **n**
+
+    Placeholders refer to *arguments* with lower indices only, so the
+    generated values never form reference cycles.
+    """
+    kind = value_kind(i)
+    if kind == PLACEHOLDER and i > 0:
+        ref = argument_name(rng.randrange(0, i))
+        return '${%s} -%s%d' % (ref, variant[0], i)
+    elif kind == CLVAR:
+        return SCons.Util.CLVar(['-%s%d' % (variant[0], i), '-I/usr/include/%s' % argument_name(i).lower()])
+    else:
+        return '%s value of %s' % (variant, argument_name(i))
+
+#############################################################################
+def generate_declarations(n, seed = 0):
+    """Generate **n** *argument* declarations
+
+    :Returns:
+        a dict which may be passed to `SConsArguments.DeclareArguments()`
+        (after being expanded to keyword arguments)
+    """
+    rng = random.Random(seed)
+    decls = {}
+    for i in range(n):
+        name = argument_name(i)
+        decl = { 'help' : 'Help for %s' % name,
+                 'default' : generate_value(i, n, rng),
+                 'env_key' : name,
+                 'var_key' : 'var_%s' % name.lower() }
+        if value_kind(i) == CLVAR:
+            decl['converter'] = SCons.Util.CLVar
+        decls[name] = decl
+    return decls
+
+#############################################################################
+def generate_cli_args(n, seed = 1, fraction = 0.5):
+    """Generate command-line variable assignments (``var=value``) for the
+    first ``fraction * n`` of **n** generated *arguments*"""
+    rng = random.Random(seed)
+    args = {}
+    for i in range(int(n * fraction)):
+        value = generate_value(i, n, rng, 'cli')
+        if SCons.Util.is_List(value):
+            value = ' '.join(value)
+        args['var_%s' % argument_name(i).lower()] = value
+    return args
+
+#############################################################################
+def generate_ose(n, seed = 2, fraction = 0.25):
+    """Generate an ``os.environ``-like dictionary for the last
+    ``fraction * n`` of **n** generated *arguments*"""
+    rng = random.Random(seed)
+    ose = {}
+    for i in range(n - int(n * fraction), n):
+        ose[argument_name(i)] = generate_value(i, n, rng, 'ose')
+    return ose
+
+#############################################################################
+def write_argmod(dirname, modname, n, seed = 0):
+    """Write an arguments' module **modname** declaring **n** *arguments*
+    to directory **dirname**
+
+    :Returns:
+        path to the module file
+    """
+    decls = generate_declarations(n, seed)
+    lines = [ 'import SCons.Util', '', '_all_arguments = {' ]
+    for name in sorted(decls):
+        decl = decls[name].copy()
+        converter = decl.pop('converter', None)
+        default = decl['default']
+        if SCons.Util.is_List(default):
+            decl['default'] = list(default)
+        text = repr(decl)
+        if converter is not None:
+            text = text[:-1] + ", 'converter' : SCons.Util.CLVar}"
+        lines.append('  %r : %s,' % (name, text))
+    lines += [ '}', '', 'def arguments(**kw):', '    return dict(_all_arguments)', '' ]
+    filename = os.path.join(dirname, modname + '.py')
+    with open(filename, 'w') as f:
+        f.write('\n'.join(lines))
+    return filename
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -27,6 +27,7 @@ __docformat__ = "restructuredText"
 # SOFTWARE
 
 import SConsArguments.Arguments
+import SCons.Util
 import unittest
 
 # The mock module does not come as a part of python 2.x stdlib, it has to be
@@ -55,6 +56,7 @@ class Test__Arguments(unittest.TestCase):
         # method defined
         decls = mock.Mock(name = 'decls0')
         decls.keys = mock.Mock(name = 'keys', return_value = ['k','e','y','s'])
+        decls.get_ose_table = mock.Mock(name = 'get_ose_table', return_value = ())
         return decls
 
     @classmethod
@@ -111,13 +113,13 @@ class Test__Arguments(unittest.TestCase):
     @classmethod
     def _mock_decls_supp_dicts_4(cls, decls):
         def get_rename_dict(xxx):
-            return  [ {'a' : 'env_a'},    {'a' : 'var_a'},    {'a' : 'opt_a'}    ][xxx]
+            return  [ {'a' : 'env_a'},    {'a' : 'var_a'},    {'a' : 'opt_a'},    {} ][xxx]
         def get_resubst_dict(xxx):
-            return  [ {'a' : '${env_a}'}, {'a' : '${var_a}'}, {'a' : '${opt_a}'} ][xxx]
+            return  [ {'a' : '${env_a}'}, {'a' : '${var_a}'}, {'a' : '${opt_a}'}, {} ][xxx]
         def get_irename_dict(xxx):
-            return  [ {'env_a' : 'a'},    {'var_a' : 'a'},    {'opt_a' : 'a'}    ][xxx]
+            return  [ {'env_a' : 'a'},    {'var_a' : 'a'},    {'opt_a' : 'a'},    {} ][xxx]
         def get_iresubst_dict(xxx):
-            return  [ {'env_a' : '${a}'}, {'var_a' : '${a}'}, {'opt_a' : '${a}'} ][xxx]
+            return  [ {'env_a' : '${a}'}, {'var_a' : '${a}'}, {'opt_a' : '${a}'}, {} ][xxx]
         decls.get_rename_dict = mock.Mock(name = 'get_rename_dict', side_effect = get_rename_dict)
         decls.get_irename_dict = mock.Mock(name = 'get_rename_dict', side_effect = get_irename_dict)
         decls.get_resubst_dict = mock.Mock(name = 'get_rename_dict', side_effect = get_resubst_dict)
@@ -130,25 +132,29 @@ class Test__Arguments(unittest.TestCase):
             return  [
                 {'k' : 'env_k', 'e' : 'env_e', 'y' : 'env_y', 's' : 'env_s'},
                 {'k' : 'var_k', 'e' : 'var_e', 'y' : 'var_y', 's' : 'var_s'},
-                {'k' : 'opt_k', 'e' : 'opt_e', 'y' : 'opt_y', 's' : 'opt_s'}
+                {'k' : 'opt_k', 'e' : 'opt_e', 'y' : 'opt_y', 's' : 'opt_s'},
+                {}
             ][xxx]
         def get_resubst_dict(xxx):
             return  [
                 {'k' : '${env_k}', 'e' : '${env_e}', 'y' : '${env_y}', 's' : '${env_s}'},
                 {'k' : '${var_k}', 'e' : '${var_e}', 'y' : '${var_y}', 's' : '${var_s}'},
-                {'k' : '${opt_k}', 'e' : '${opt_e}', 'y' : '${opt_y}', 's' : '${opt_s}'}
+                {'k' : '${opt_k}', 'e' : '${opt_e}', 'y' : '${opt_y}', 's' : '${opt_s}'},
+                {}
             ][xxx]
         def get_irename_dict(xxx):
             return  [
                 {'env_k' : 'k', 'env_e' : 'e', 'env_y' : 'y', 'env_s' : 's' },
                 {'var_k' : 'k', 'var_e' : 'e', 'var_y' : 'y', 'var_s' : 's' },
-                {'opt_k' : 'k', 'opt_e' : 'e', 'opt_y' : 'y', 'opt_s' : 's' }
+                {'opt_k' : 'k', 'opt_e' : 'e', 'opt_y' : 'y', 'opt_s' : 's' },
+                {}
             ][xxx]
         def get_iresubst_dict(xxx):
             return  [
                 {'env_k' : '${k}','env_e' : '${e}',  'env_y' : '${y}', 'env_s' : '${s}' },
                 {'var_k' : '${k}','var_e' : '${e}',  'var_y' : '${y}', 'var_s' : '${s}' },
                 {'opt_k' : '${k}','opt_e' : '${e}',  'opt_y' : '${y}', 'opt_s' : '${s}' },
+                {}
             ][xxx]
         decls.get_rename_dict = mock.Mock(name = 'get_rename_dict', side_effect = get_rename_dict)
         decls.get_irename_dict = mock.Mock(name = 'get_rename_dict', side_effect = get_irename_dict)
@@ -174,10 +180,10 @@ class Test__Arguments(unittest.TestCase):
     def test___init___2(self):
         """_Arguments.__init__(decls) should initialize its iternal dicts"""
         args = SConsArguments.Arguments._Arguments(self._decls_mock_2())
-        self.assertEqual(args._rename_dict, ['rename_dict[0]', 'rename_dict[1]', 'rename_dict[2]'])
-        self.assertEqual(args._resubst_dict, ['resubst_dict[0]', 'resubst_dict[1]', 'resubst_dict[2]'])
-        self.assertEqual(args._irename_dict, ['irename_dict[0]', 'irename_dict[1]', 'irename_dict[2]'])
-        self.assertEqual(args._iresubst_dict, ['iresubst_dict[0]', 'iresubst_dict[1]', 'iresubst_dict[2]'])
+        self.assertEqual(args._rename_dict, ['rename_dict[0]', 'rename_dict[1]', 'rename_dict[2]', 'rename_dict[3]'])
+        self.assertEqual(args._resubst_dict, ['resubst_dict[0]', 'resubst_dict[1]', 'resubst_dict[2]', 'resubst_dict[3]'])
+        self.assertEqual(args._irename_dict, ['irename_dict[0]', 'irename_dict[1]', 'irename_dict[2]', 'irename_dict[3]'])
+        self.assertEqual(args._iresubst_dict, ['iresubst_dict[0]', 'iresubst_dict[1]', 'iresubst_dict[2]', 'iresubst_dict[3]'])
 
 
     @unittest.skipIf(_mock_missing, "requires mock module")
@@ -185,26 +191,26 @@ class Test__Arguments(unittest.TestCase):
         """<_Arguments>.__reset_supp_dicts() should reset internal dicts to {}"""
         args = SConsArguments.Arguments._Arguments(self._decls_mock_2())
         args._Arguments__reset_supp_dicts()
-        self.assertEqual(args._rename_dict, [{},{},{}])
-        self.assertEqual(args._resubst_dict, [{},{},{}])
-        self.assertEqual(args._irename_dict, [{},{},{}])
-        self.assertEqual(args._iresubst_dict, [{},{},{}])
+        self.assertEqual(args._rename_dict, [{},{},{},{}])
+        self.assertEqual(args._resubst_dict, [{},{},{},{}])
+        self.assertEqual(args._irename_dict, [{},{},{},{}])
+        self.assertEqual(args._iresubst_dict, [{},{},{},{}])
 
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test___init_supp_dicts(self):
         """<_Arguments>.__init_supp_dicts(decls) should initialize internal dicts appropriately"""
         decls = self._decls_mock_3()
         args = SConsArguments.Arguments._Arguments(decls)
-        self.assertEqual(args._rename_dict, [None, None, None])
-        self.assertEqual(args._resubst_dict, [None, None, None])
-        self.assertEqual(args._irename_dict, [None, None, None])
-        self.assertEqual(args._iresubst_dict, [None, None, None])
+        self.assertEqual(args._rename_dict, [None, None, None, None])
+        self.assertEqual(args._resubst_dict, [None, None, None, None])
+        self.assertEqual(args._irename_dict, [None, None, None, None])
+        self.assertEqual(args._iresubst_dict, [None, None, None, None])
         self._mock_decls_supp_dicts_2(decls)
         args._Arguments__init_supp_dicts(decls)
-        self.assertEqual(args._rename_dict, ['rename_dict[0]', 'rename_dict[1]', 'rename_dict[2]'])
-        self.assertEqual(args._resubst_dict, ['resubst_dict[0]', 'resubst_dict[1]', 'resubst_dict[2]'])
-        self.assertEqual(args._irename_dict, ['irename_dict[0]', 'irename_dict[1]', 'irename_dict[2]'])
-        self.assertEqual(args._iresubst_dict, ['iresubst_dict[0]', 'iresubst_dict[1]', 'iresubst_dict[2]'])
+        self.assertEqual(args._rename_dict, ['rename_dict[0]', 'rename_dict[1]', 'rename_dict[2]', 'rename_dict[3]'])
+        self.assertEqual(args._resubst_dict, ['resubst_dict[0]', 'resubst_dict[1]', 'resubst_dict[2]', 'resubst_dict[3]'])
+        self.assertEqual(args._irename_dict, ['irename_dict[0]', 'irename_dict[1]', 'irename_dict[2]', 'irename_dict[3]'])
+        self.assertEqual(args._iresubst_dict, ['iresubst_dict[0]', 'iresubst_dict[1]', 'iresubst_dict[2]', 'iresubst_dict[3]'])
 
     def XxxEnvProxy_test(self, x):
         args = SConsArguments.Arguments._Arguments(self._decls_mock_4())
@@ -246,6 +252,15 @@ class Test__Arguments(unittest.TestCase):
         # expect a copy of __keys, not __keys
         self.assertIsNot(args.get_keys(), args._Arguments__keys)
 
+    def test__get_supp_dicts(self):
+        """_Arguments(decls)._get_supp_dicts() should return the supplementary dicts"""
+        args = SConsArguments.DeclareArguments(foo = { 'env_key' : 'ENV_FOO' }).Commit()
+        rename, irename, resubst, iresubst = args._get_supp_dicts()
+        self.assertEqual(rename[SConsArguments.ENV], {'foo' : 'ENV_FOO'})
+        self.assertEqual(irename[SConsArguments.ENV], {'ENV_FOO' : 'foo'})
+        self.assertIs(resubst, args._resubst_dict)
+        self.assertIs(iresubst, args._iresubst_dict)
+
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test_get_key_ENV_x(self):
         """_Arguments(decls).get_key(ENV, 'x') should be raise KeyError"""
@@ -487,10 +502,9 @@ class Test__Arguments(unittest.TestCase):
             args = SConsArguments.Arguments._Arguments(self._decls_mock_1())
             args.GenerateVariablesHelpText = mock.Mock(return_value = 'All the help')
             args.HandleVariablesHelp('var1', 'env1', 'arg1', 'arg2', foo='foo1')
-            mock_AddOption.assert_called_once_with('--help-variables',dest='help_variables',action='store_true',help='print help for CLI variables')
+            mock_AddOption.assert_called_once_with('--help-variables',dest='help_variables',type='string',nargs='?',const='*',metavar='PATTERNS',help='print help for CLI variables')
             mock_GetOption.assert_called_once_with('help_variables')
-            args.GenerateVariablesHelpText.assert_called_once_with('var1', 'env1', 'arg1', 'arg2', foo='foo1')
-            mock_stdout.write.assert_called_once_with('All the help')
+            args.GenerateVariablesHelpText.assert_called_once_with('var1', 'env1', 'arg1', 'arg2', foo='foo1', output=mock_stdout)
 
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test_HandleVariablesHelp_2(self):
@@ -502,10 +516,9 @@ class Test__Arguments(unittest.TestCase):
             args.GenerateVariablesHelpText = mock.Mock(return_value = 'All the help')
             result = args.HandleVariablesHelp('var1', 'env1', option_name='--my-help', option_dest='my_help', option_help='Print My Help')
             self.assertEqual(result, 'All the help')
-            mock_AddOption.assert_called_once_with('--my-help',dest='my_help',action='store_true',help='Print My Help')
+            mock_AddOption.assert_called_once_with('--my-help',dest='my_help',type='string',nargs='?',const='*',metavar='PATTERNS',help='Print My Help')
             mock_GetOption.assert_called_once_with('my_help')
-            args.GenerateVariablesHelpText.assert_called_once_with('var1','env1')
-            mock_stdout.write.assert_called_once_with('All the help')
+            args.GenerateVariablesHelpText.assert_called_once_with('var1','env1', output=mock_stdout)
 
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test_HandleVariablesHelp_3(self):
@@ -519,8 +532,7 @@ class Test__Arguments(unittest.TestCase):
             self.assertEqual(result, 'All the help')
             mock_AddOption.assert_not_called()
             mock_GetOption.assert_called_once_with('help_variables')
-            args.GenerateVariablesHelpText.assert_called_once_with('var1', 'env1')
-            mock_stdout.write.assert_called_once_with('All the help')
+            args.GenerateVariablesHelpText.assert_called_once_with('var1', 'env1', output=mock_stdout)
 
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test_HandleVariablesHelp_4(self):
@@ -532,9 +544,9 @@ class Test__Arguments(unittest.TestCase):
             args.GenerateVariablesHelpText = mock.Mock(return_value = 'All the help')
             result = args.HandleVariablesHelp('var1', 'env1', print_help=False)
             self.assertEqual(result, 'All the help')
-            mock_AddOption.assert_called_once_with('--help-variables',dest='help_variables',action='store_true',help='print help for CLI variables')
+            mock_AddOption.assert_called_once_with('--help-variables',dest='help_variables',type='string',nargs='?',const='*',metavar='PATTERNS',help='print help for CLI variables')
             mock_GetOption.assert_called_once_with('help_variables')
-            args.GenerateVariablesHelpText.assert_called_once_with('var1', 'env1')
+            args.GenerateVariablesHelpText.assert_called_once_with('var1', 'env1', output=None)
             mock_stdout.write.assert_not_called()
 
     @unittest.skipIf(_mock_missing, "requires mock module")
@@ -547,13 +559,75 @@ class Test__Arguments(unittest.TestCase):
             args.GenerateVariablesHelpText = mock.Mock(return_value = 'All the help')
             result = args.HandleVariablesHelp('var1', 'env1')
             self.assertIs(result, None)
-            mock_AddOption.assert_called_once_with('--help-variables',dest='help_variables',action='store_true',help='print help for CLI variables')
+            mock_AddOption.assert_called_once_with('--help-variables',dest='help_variables',type='string',nargs='?',const='*',metavar='PATTERNS',help='print help for CLI variables')
             mock_GetOption.assert_called_once_with('help_variables')
             args.GenerateVariablesHelpText.assert_not_called()
             mock_stdout.write.assert_not_called()
 
 
 
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test_HandleVariablesHelp_6(self):
+        """_Arguments(decls).HandleVariablesHelp('var1', 'env1') with --help-variables=cc,link"""
+        with mock.patch('sys.stdout') as mock_stdout, \
+             mock.patch('SCons.Script.Main.AddOption') as mock_AddOption, \
+             mock.patch('SCons.Script.Main.GetOption', return_value = 'cc,link') as mock_GetOption:
+            args = SConsArguments.Arguments._Arguments(self._decls_mock_1())
+            args.GenerateVariablesHelpText = mock.Mock(return_value = 'All the help')
+            result = args.HandleVariablesHelp('var1', 'env1')
+            self.assertEqual(result, 'All the help')
+            args.GenerateVariablesHelpText.assert_called_once_with('var1', 'env1', select='cc,link', output=mock_stdout)
+
+    def test__help_selector_1(self):
+        """_Arguments(decls)._help_selector(patterns) should match variables, arguments and modules"""
+        decls = SConsArguments.DeclareArguments(
+            cc = { 'var_key' : 'CC', 'env_key' : 'CC' },
+            cflags = { 'var_key' : 'CFLAGS', 'env_key' : 'CFLAGS' },
+            link = { 'var_key' : 'LINKER', 'env_key' : 'LINK' },
+            foo = { 'var_key' : 'FOO', 'env_key' : 'FOO' }
+        )
+        SConsArguments.Importer._record_origins(decls, ['cc', 'cflags'], 'cc')
+        decls.commit()
+        args = SConsArguments.Arguments._Arguments(decls)
+        select = args._help_selector('cc')
+        self.assertEqual([k for k in ('CC', 'CFLAGS', 'LINKER', 'FOO', 'BAR') if select(k)], ['CC', 'CFLAGS'])
+        select = args._help_selector(['lin*', ' F?O '])
+        self.assertEqual([k for k in ('CC', 'CFLAGS', 'LINKER', 'FOO', 'BAR') if select(k)], ['LINKER', 'FOO'])
+        select = args._help_selector('BA*,')
+        self.assertEqual([k for k in ('CC', 'CFLAGS', 'LINKER', 'FOO', 'BAR') if select(k)], ['BAR'])
+
+    def test_SuggestVariables_1(self):
+        """_Arguments(decls).SuggestVariables(name, variables) should return similar VAR keys and aliases"""
+        decls = SConsArguments.DeclareArguments(
+            cxxflags = { 'var_key' : 'CXXFLAGS', 'env_key' : 'CXXFLAGS' },
+            cc = { 'var_key' : 'CC', 'env_key' : 'CC' }
+        )
+        decls.commit()
+        args = SConsArguments.Arguments._Arguments(decls)
+        self.assertEqual(args.SuggestVariables('CXXFLAG'), ['CXXFLAGS'])
+        variables = mock.Mock(options = [ mock.Mock(key = 'CXXFLAGS', aliases = ['CPPFLAG']),
+                                          mock.Mock(key = 'CC', aliases = []) ])
+        self.assertEqual(args.SuggestVariables('CXXFLAG', variables), ['CXXFLAGS', 'CPPFLAG'])
+
+    def test_CheckUnknownVariables_1(self):
+        """_Arguments(decls).CheckUnknownVariables(variables) should tell what user probably meant"""
+        import SCons.Errors
+        decls = SConsArguments.DeclareArguments(
+            cxxflags = { 'var_key' : 'CXXFLAGS', 'env_key' : 'CXXFLAGS' },
+            cflags = { 'var_key' : 'CFLAGS', 'env_key' : 'CFLAGS' }
+        )
+        decls.commit()
+        args = SConsArguments.Arguments._Arguments(decls)
+        variables = mock.Mock(options = [], unknown = { 'CXXFLAG' : '-g', 'XYZ' : '1' })
+        messages = [ "Unknown variable 'CXXFLAG', did you mean 'CXXFLAGS' or 'CFLAGS'?",
+                     "Unknown variable 'XYZ'" ]
+        self.assertEqual(args.CheckUnknownVariables(variables), messages)
+        with self.assertRaises(SCons.Errors.UserError) as cm:
+            args.CheckUnknownVariables(variables, error = True)
+        self.assertEqual(str(cm.exception), '\n'.join(messages))
+        variables.unknown = {}
+        self.assertEqual(args.CheckUnknownVariables(variables, error = True), [])
+
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test_GetCurrentValues_1(self):
         """_Arguments(decls).GetCurrentValues(env) works as expected"""
@@ -645,6 +719,129 @@ class Test__Arguments(unittest.TestCase):
         args.OverwriteUnaltered.assert_called_once_with('env', 'org', 'ose')
         _test_alt.update.assert_called_once_with('chg')
 
+    def test_Postprocess_2(self):
+        """<_Arguments>.Postprocess(env, ose = ose, sources = sources) should merge sources by precedence"""
+        from SConsArguments.Sources import DictSource
+        import SCons.Environment
+        import SCons.Variables
+        decls = SConsArguments.DeclareArguments(
+            cc = { 'env_key' : 'CC', 'var_key' : 'CC', 'default' : 'cc' },
+            cxx = { 'env_key' : 'CXX', 'default' : 'c++' },
+            ld = { 'env_key' : 'LD', 'default' : 'ld' },
+            ar = { 'env_key' : 'AR', 'default' : 'ar' }
+        )
+        env = SCons.Environment.Environment(tools = [])
+        variables = SCons.Variables.Variables(args = { 'CC' : 'gcc' })
+        args = decls.Commit(env, variables)
+        sources = [ DictSource({ 'cc' : 'team cc', 'cxx' : 'team cxx', 'ld' : 'team ld' }, precedence = 1),
+                    DictSource({ 'cxx' : 'low cxx', 'ar' : 'low ar' }) ]
+        chg = args.Postprocess(env, variables, ose = { 'ld' : 'ose ld' }, sources = sources)
+        self.assertEqual([env[k] for k in ('CC', 'CXX', 'LD', 'AR')], ['gcc', 'team cxx', 'ose ld', 'low ar'])
+        self.assertEqual(chg, { 'CC' : 'gcc', 'CXX' : 'team cxx', 'LD' : 'ose ld', 'AR' : 'low ar' })
+
+    def test_GetOSEValues_1(self):
+        """<_Arguments>.GetOSEValues(ose) should read, convert and validate declared OS environment variables only"""
+        import SCons.Errors
+        import SCons.Variables
+        validated = []
+        def validator(key, val, env):
+            validated.append((key, val, env[key]))
+        decls = SConsArguments.DeclareArguments(
+            cflags = { 'env_key' : 'CFLAGS', 'ose_key' : 'CFLAGS',
+                       'converter' : SConsArguments.Util.flags2list, 'validator' : validator },
+            debug = { 'env_key' : 'DEBUG', 'ose_key' : 'MY_DEBUG',
+                      'converter' : SCons.Variables.BoolVariable('x', '', 0)[4] },
+            cc = { 'env_key' : 'CC' }
+        )
+        args = decls.Commit()
+        ose = { 'CFLAGS' : '-g -O2', 'MY_DEBUG' : 'yes', 'CC' : 'gcc', 'cc' : 'gcc' }
+        self.assertEqual(args.GetOSEValues(ose), { 'cflags' : ['-g', '-O2'], 'debug' : True })
+        self.assertEqual(validated, [('CFLAGS', ['-g', '-O2'], ['-g', '-O2'])])
+        self.assertEqual(args.GetOSEValues({}), {})
+        self.assertEqual(args.get_ose_key('debug'), 'MY_DEBUG')
+        with self.assertRaises(SCons.Errors.UserError) as cm:
+            args.GetOSEValues({ 'MY_DEBUG' : 'maybe' })
+        self.assertIn('MY_DEBUG', str(cm.exception))
+
+    def test_Postprocess_3(self):
+        """<_Arguments>.Postprocess(env, ose = os.environ) should use OSE endpoints when declared"""
+        import SCons.Environment
+        import SCons.Variables
+        decls = SConsArguments.DeclareArguments(
+            cc = { 'env_key' : 'CC', 'var_key' : 'CC', 'ose_key' : 'CC', 'default' : 'cc' },
+            cflags = { 'env_key' : 'CFLAGS', 'ose_key' : 'CFLAGS', 'default' : [],
+                       'converter' : SConsArguments.Util.flags2list },
+            ld = { 'env_key' : 'LD', 'default' : 'ld' }
+        )
+        env = SCons.Environment.Environment(tools = [])
+        variables = SCons.Variables.Variables(args = { 'CC' : 'gcc' })
+        args = decls.Commit(env, variables)
+        ose = { 'CC' : 'clang', 'CFLAGS' : '-g -O2', 'LD' : 'gold' }
+        chg = args.Postprocess(env, variables, ose = ose)
+        self.assertEqual([env[k] for k in ('CC', 'CFLAGS', 'LD')], ['gcc', ['-g', '-O2'], 'ld'])
+        self.assertEqual(chg, { 'CC' : 'gcc', 'CFLAGS' : ['-g', '-O2'] })
+
+    def test_Postprocess_5(self):
+        """<_Arguments>.Postprocess(env, ose = ose) should merge OSE endpoints with entries keyed by argument names"""
+        import SCons.Environment
+        import SCons.Variables
+        decls = SConsArguments.DeclareArguments(
+            cc = { 'env_key' : 'CC', 'ose_key' : 'CC', 'default' : 'cc' },
+            cflags = { 'env_key' : 'CFLAGS', 'ose_key' : 'CFLAGS', 'default' : [],
+                       'converter' : SConsArguments.Util.flags2list },
+            ld = { 'env_key' : 'LD', 'default' : 'ld' }
+        )
+        env = SCons.Environment.Environment(tools = [])
+        variables = SCons.Variables.Variables(args = {})
+        args = decls.Commit(env, variables)
+        ose = { 'CC' : 'clang', 'CFLAGS' : '-g -O2', 'cflags' : ['-O3'], 'ld' : 'gold' }
+        chg = args.Postprocess(env, variables, ose = ose)
+        self.assertEqual([env[k] for k in ('CC', 'CFLAGS', 'LD')], ['clang', ['-O3'], 'gold'])
+        self.assertEqual(chg, { 'CC' : 'clang', 'CFLAGS' : ['-O3'], 'LD' : 'gold' })
+
+    def test_Postprocess_4(self):
+        """<_Arguments>.Postprocess(env, variables, profile = profile) should take values of variables from profile layers"""
+        import SCons.Environment
+        import SCons.Variables
+        import tempfile, shutil, os
+        from SConsArguments.Profiles import ProfileLayer, LoadProfile
+        tmpdir = tempfile.mkdtemp()
+        try:
+            site = os.path.join(tmpdir, 'site.py')
+            with open(site, 'w') as f:
+                f.write("CC = 'gcc'\nCFLAGS = '-g -O2'\n")
+            decls = SConsArguments.DeclareArguments(
+                cc = { 'env_key' : 'CC', 'var_key' : 'CC', 'default' : 'cc' },
+                cflags = { 'env_key' : 'CFLAGS', 'var_key' : 'CFLAGS', 'default' : [],
+                           'converter' : SConsArguments.Util.flags2list },
+                ld = { 'env_key' : 'LD', 'var_key' : 'LD', 'default' : 'ld' }
+            )
+            env = SCons.Environment.Environment(tools = [])
+            variables = SCons.Variables.Variables(args = { 'CC' : 'clang' })
+            args = decls.Commit(env, variables)
+            profile = LoadProfile([ ProfileLayer(site, name = 'site', cache = None) ])
+            args.Postprocess(env, variables, profile = profile)
+            self.assertEqual([env[k] for k in ('CC', 'CFLAGS', 'LD')], ['clang', ['-g', '-O2'], 'ld'])
+            self.assertEqual(profile.provenance['CFLAGS'], 'site')
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_UpdateEnvironment_5(self):
+        """_Arguments(decls).UpdateEnvironment(env, sources = sources) should update unaltered arguments from sources"""
+        from SConsArguments.Sources import DictSource
+        import SCons.Environment
+        import SCons.Variables
+        decls = SConsArguments.DeclareArguments(
+            cc = { 'env_key' : 'CC', 'default' : 'cc' },
+            cxx = { 'env_key' : 'CXX', 'var_key' : 'CXX', 'default' : 'c++' },
+            ld = { 'env_key' : 'LD', 'default' : 'ld' }
+        )
+        env = SCons.Environment.Environment(tools = [])
+        variables = SCons.Variables.Variables(args = { 'CXX' : 'g++' })
+        args = decls.Commit(env, variables)
+        args.UpdateEnvironment(env, variables, sources = [ DictSource({ 'cc' : 'gcc', 'cxx' : 'clang++', 'xx' : 'x' }) ])
+        self.assertEqual([env[k] for k in ('CC', 'CXX', 'LD')], ['gcc', 'g++', 'ld'])
+
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test_Demangle_1(self):
         """Test <_Arguments>.Demangle()"""
@@ -653,6 +850,126 @@ class Test__Arguments(unittest.TestCase):
         res = args.Demangle(env)
         self.assertEqual(res, { 'k' : 'K', 'e' : 'E', 's' : None })
 
+    def _fingerprint_args(self, foo = 'ENV_FOO', bar = 'ENV_BAR'):
+        decls = SConsArguments.DeclareArguments(
+            foo = { 'env_key' : foo },
+            bar = { 'env_key' : bar },
+            geez = { 'var_key' : 'GEEZ' }
+        )
+        return decls.Commit()
+
+    def test_Fingerprint_1(self):
+        """<_Arguments>.Fingerprint() should not depend on names of construction variables"""
+        args1 = self._fingerprint_args()
+        args2 = self._fingerprint_args('F', 'B')
+        env1 = { 'ENV_FOO' : 'foo ${ENV_BAR}', 'ENV_BAR' : ['-g', '-O2'] }
+        env2 = { 'B' : SCons.Util.CLVar('-g -O2'), 'F' : 'foo ${B}' }
+        self.assertEqual(args1.Fingerprint(env1), args2.Fingerprint(env2))
+        self.assertEqual(len(args1.Fingerprint(env1)), 40)
+
+    def test_Fingerprint_2(self):
+        """<_Arguments>.Fingerprint() should change when values change"""
+        args = self._fingerprint_args()
+        env = { 'ENV_FOO' : 'foo', 'ENV_BAR' : ['bar'] }
+        fp1 = args.Fingerprint(env)
+        env['ENV_BAR'].append('baz')
+        fp2 = args.Fingerprint(env)
+        env['ENV_FOO'] = 'FOO'
+        fp3 = args.Fingerprint(env)
+        del env['ENV_FOO']
+        fp4 = args.Fingerprint(env)
+        self.assertEqual(len(set([fp1, fp2, fp3, fp4])), 4)
+        env['ENV_FOO'] = 'foo'
+        env['ENV_BAR'] = ['bar']
+        self.assertEqual(args.Fingerprint(env), fp1)
+
+    def test_Fingerprint_3(self):
+        """<_Arguments>.Fingerprint(env, keys) should take only given keys into account"""
+        args = self._fingerprint_args()
+        env = { 'ENV_FOO' : 'foo', 'ENV_BAR' : 'bar' }
+        fp = args.Fingerprint(env, ['foo'])
+        env['ENV_BAR'] = 'BAR'
+        self.assertEqual(args.Fingerprint(env, ['foo']), fp)
+        self.assertNotEqual(args.Fingerprint(env), args.Fingerprint(env, ['foo']))
+        with self.assertRaises(KeyError):
+            args.Fingerprint(env, ['geez'])
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test_Fingerprint_4(self):
+        """<_Arguments>.Fingerprint() should rehash only changed immutable values"""
+        args = self._fingerprint_args()
+        env = { 'ENV_FOO' : 'foo', 'ENV_BAR' : 'bar' }
+        with mock.patch('SConsArguments.Arguments._value_digest', side_effect = SConsArguments.Util._value_digest) as digest:
+            args.Fingerprint(env)
+            self.assertEqual(digest.call_count, 2)
+            args.Fingerprint(env)
+            self.assertEqual(digest.call_count, 2)
+            env['ENV_FOO'] = 'FOO'
+            args.Fingerprint(env)
+            self.assertEqual(digest.call_count, 3)
+
+    def test_Fingerprint_5(self):
+        """<_Arguments>.Fingerprint() should not keep SCons environments alive"""
+        import gc
+        import weakref
+        import SCons.Environment
+        args = self._fingerprint_args()
+        env = SCons.Environment.Environment(tools = [], ENV_FOO = 'foo', ENV_BAR = 'bar')
+        fp = args.Fingerprint(env)
+        self.assertEqual(args.Fingerprint(env), fp)
+        ref = weakref.ref(env)
+        del env
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_FingerprintGenerator_1(self):
+        """<_Arguments>.FingerprintGenerator() should return fingerprint of the env it's called with"""
+        args = self._fingerprint_args()
+        env = { 'ENV_FOO' : 'foo', 'ENV_BAR' : 'bar' }
+        generator = args.FingerprintGenerator(length = 8)
+        self.assertEqual(generator(None, None, env, False), args.Fingerprint(env)[:8])
+
+    def _expand_args(self):
+        decls = SConsArguments.DeclareArguments(
+            prefix = { 'env_key' : 'PREFIX' },
+            bindir = { 'env_key' : 'BINDIR' },
+            cc = { 'env_key' : 'CC' },
+            other = { 'env_key' : 'OTHER' },
+        )
+        return decls.Commit()
+
+    def test_ExpandAll_1(self):
+        """<_Arguments>.ExpandAll() should expand references to other arguments"""
+        args = self._expand_args()
+        env = { 'PREFIX' : '/usr', 'BINDIR' : '${PREFIX}/bin', 'CC' : ['$BINDIR/gcc', '-o $TARGET', '$$x'] }
+        self.assertEqual(args.ExpandAll(env), { 'prefix' : '/usr', 'bindir' : '/usr/bin',
+                                                'cc' : '/usr/bin/gcc -o $TARGET $$x' })
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test_ExpandAll_2(self):
+        """<_Arguments>.ExpandAll() should re-expand changed values and their dependents only"""
+        args = self._expand_args()
+        env = { 'PREFIX' : '/usr', 'BINDIR' : '${PREFIX}/bin', 'CC' : '$BINDIR/gcc', 'OTHER' : 'x' }
+        args.ExpandAll(env)
+        with mock.patch('SConsArguments.Arguments._expand_placeholders',
+                        side_effect = SConsArguments.Util._expand_placeholders) as expand:
+            self.assertEqual(args.ExpandAll(env)['cc'], '/usr/bin/gcc')
+            self.assertEqual(expand.call_count, 0)
+            env['PREFIX'] = '/opt'
+            self.assertEqual(args.ExpandAll(env)['cc'], '/opt/bin/gcc')
+            self.assertEqual(expand.call_count, 3)
+            env['BINDIR'] = '/opt/bin'
+            self.assertEqual(args.ExpandAll(env)['cc'], '/opt/bin/gcc')
+            self.assertEqual(expand.call_count, 4)
+
+    def test_ExpandAll_3(self):
+        """<_Arguments>.ExpandAll() should raise UserError for cyclic references"""
+        import SCons.Errors
+        args = self._expand_args()
+        env = { 'PREFIX' : '$CC', 'BINDIR' : '${PREFIX}/bin', 'CC' : '$BINDIR/gcc' }
+        with self.assertRaises(SCons.Errors.UserError):
+            args.ExpandAll(env)
+
 #############################################################################
 if __name__ == "__main__":
     ldr = unittest.TestLoader()
@@ -0,0 +1,136 @@
+""" `SConsArguments.CompletionTests`
+
+Unit tests for `SConsArguments.Completion`
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsArguments
+import SConsArguments.Completion as tested
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+#############################################################################
+def _decls():
+    decls = SConsArguments.DeclareArguments(
+        cc = { 'env_key' : 'CC', 'var_key' : 'CC', 'help' : 'The C compiler' },
+        mode = { 'var_key' : 'MODE', 'opt_key' : 'mode', 'option' : '--mode',
+                 'type' : 'choice', 'choices' : ['debug', 'release'],
+                 'help' : "Build mode: it's [debug]" },
+        verbose = { 'opt_key' : 'verbose', 'option' : '-v --verbose',
+                    'action' : 'store_true' }
+    )
+    decls.commit()
+    return decls
+
+#############################################################################
+class Test_GenerateCompletion(unittest.TestCase):
+    def test_bash_1(self):
+        """GenerateCompletion(decls, 'bash') should complete variables, options and choices"""
+        script = tested.GenerateCompletion(_decls(), 'bash')
+        self.assertIn('compgen -W "CC= MODE="', script)
+        self.assertIn('compgen -W "--mode= -v --verbose"', script)
+        self.assertIn('--mode) words="debug release" ;;', script)
+        self.assertIn('MODE) words="debug release" ;;', script)
+        self.assertIn('complete -o default -F _scons_sconsarguments scons', script)
+
+    def test_zsh_1(self):
+        """GenerateCompletion(decls, 'zsh') should complete variables, options and choices"""
+        script = tested.GenerateCompletion(_decls(), 'zsh', 'scons.py')
+        self.assertTrue(script.startswith('#compdef scons.py\n'))
+        self.assertIn("'CC:The C compiler'", script)
+        self.assertIn("'--mode=[Build mode\\: it'\\''s \\[debug\\]]:MODE:(debug release)'", script)
+        self.assertIn("'--verbose[]'", script)
+        self.assertIn('MODE) compadd -- debug release ;;', script)
+        self.assertIn('compdef _scons_py_sconsarguments scons.py', script)
+
+    def test_schema_1(self):
+        """GenerateCompletion(schema) should give same script as GenerateCompletion(decls)"""
+        decls = _decls()
+        self.assertEqual(tested.GenerateCompletion(decls.Schema()), tested.GenerateCompletion(decls))
+
+    def test_unsafe_words_1(self):
+        """GenerateCompletion() should skip choices which can't be put into the script safely"""
+        decls = SConsArguments.DeclareArguments(
+            x = { 'opt_key' : 'x', 'option' : '--x', 'type' : 'choice', 'choices' : ['a', 'b c', '$(rm)'] })
+        script = tested.GenerateCompletion(decls)
+        self.assertIn('--x) words="a" ;;', script)
+        self.assertNotIn('$(rm)', script)
+
+    def test_shell_1(self):
+        """GenerateCompletion(decls, 'tcsh') should raise ValueError"""
+        self.assertRaises(ValueError, tested.GenerateCompletion, _decls(), 'tcsh')
+
+#############################################################################
+class Test_ExportCompletion(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'scons.bash')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_ExportCompletion_1(self):
+        """ExportCompletion() should rewrite the script only when declarations change"""
+        decls = _decls()
+        self.assertTrue(tested.ExportCompletion(decls, self.filename))
+        self.assertFalse(tested.ExportCompletion(decls, self.filename))
+        self.assertTrue(tested.ExportCompletion(decls, self.filename, 'zsh'))
+        with open(self.filename) as f:
+            self.assertEqual(f.read(), tested.GenerateCompletion(decls, 'zsh'))
+        decls2 = SConsArguments.DeclareArguments(cc = { 'var_key' : 'CC' })
+        self.assertTrue(tested.ExportCompletion(decls2, self.filename, 'zsh'))
+
+    def test_ExportCompletion_2(self):
+        """ExportCompletion() should accept name of a schema file"""
+        decls = _decls()
+        schema = os.path.join(self.tmpdir, 'schema.json')
+        decls.ExportSchema(schema)
+        self.assertTrue(tested.ExportCompletion(schema, self.filename))
+        with open(self.filename) as f:
+            self.assertEqual(f.read(), tested.GenerateCompletion(decls))
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_GenerateCompletion
+               , Test_ExportCompletion
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
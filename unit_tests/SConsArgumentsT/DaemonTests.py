@@ -0,0 +1,145 @@
+""" `SConsArguments.DaemonTests`
+
+Unit tests for `SConsArguments.Daemon`
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsArguments.Daemon as tested
+import unittest
+import threading
+import tempfile
+import shutil
+import socket
+import os
+import sys
+
+#############################################################################
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "requires Unix domain sockets")
+class Test_Serve(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'sock')
+        self.requests = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def handler(self, request):
+        self.requests.append(request)
+        if request.get('refuse'):
+            return { 'status' : None }
+        if request.get('fail'):
+            raise SyntaxError('invalid syntax')
+        return { 'status' : 0, 'output' : request['text'].upper() }
+
+    def start(self):
+        ready = threading.Event()
+        thread = threading.Thread(target = tested.Serve, args = (self.path, self.handler, ready.set))
+        thread.daemon = True
+        thread.start()
+        self.assertTrue(ready.wait(10))
+        return thread
+
+    def test_Serve_1(self):
+        """Serve() should answer Query() requests until Shutdown()"""
+        thread = self.start()
+        self.assertEqual(tested.Query(self.path, { 'text' : 'foo' }), { 'status' : 0, 'output' : 'FOO' })
+        self.assertEqual(tested.Query(self.path, { 'text' : 'bar' }), { 'status' : 0, 'output' : 'BAR' })
+        self.assertEqual(self.requests, [ { 'protocol' : tested._protocol, 'text' : 'foo' },
+                                          { 'protocol' : tested._protocol, 'text' : 'bar' } ])
+        self.assertTrue(tested.Shutdown(self.path))
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_Serve_2(self):
+        """Query() should return None if the daemon refuses to answer"""
+        thread = self.start()
+        self.assertIsNone(tested.Query(self.path, { 'refuse' : True }))
+        self.assertTrue(tested.Shutdown(self.path))
+        thread.join(10)
+
+    def test_Serve_3(self):
+        """Serve() should replace stale sockets and refuse to steal live ones"""
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        thread = self.start()
+        self.assertRaises(RuntimeError, tested.Serve, self.path, self.handler)
+        self.assertTrue(tested.Shutdown(self.path))
+        thread.join(10)
+        with open(self.path, 'w') as f:
+            f.write('not a socket')
+        self.assertRaises(RuntimeError, tested.Serve, self.path, self.handler)
+
+    def test_Serve_4(self):
+        """Serve() should survive exceptions raised by the handler"""
+        thread = self.start()
+        self.assertIsNone(tested.Query(self.path, { 'fail' : True }))
+        self.assertEqual(tested.Query(self.path, { 'text' : 'foo' }), { 'status' : 0, 'output' : 'FOO' })
+        self.assertTrue(tested.Shutdown(self.path))
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+
+    def test_Serve_5(self):
+        """Serve() should drop clients which don't send their requests"""
+        timeout, tested._client_timeout = tested._client_timeout, 0.2
+        try:
+            thread = self.start()
+            idle = tested._connect(self.path, 10.0)
+            try:
+                self.assertEqual(tested.Query(self.path, { 'text' : 'foo' }, 10.0), { 'status' : 0, 'output' : 'FOO' })
+            finally:
+                idle.close()
+            self.assertTrue(tested.Shutdown(self.path))
+            thread.join(10)
+        finally:
+            tested._client_timeout = timeout
+
+    def test_Query_1(self):
+        """Query() should return None if there is no daemon"""
+        self.assertIsNone(tested.Query(self.path, { 'text' : 'foo' }))
+        self.assertIsNone(tested.Query(None, { 'text' : 'foo' }))
+        self.assertFalse(tested.Shutdown(self.path))
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_Serve
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
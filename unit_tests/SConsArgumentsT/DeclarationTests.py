@@ -955,6 +955,48 @@ class Test__ArgumentDeclaration(unittest.TestCase):
         with self.assertRaises(IndexError):
             SConsArguments.Declaration._ArgumentDeclaration().add_to(SConsArguments.OPT)
 
+    def test_set_ose_decl_1(self):
+        """_ArgumentDeclaration(ose_decl = ...) should accept string, tuple and dict"""
+        conv = lambda x : x.split()
+        decl = SConsArguments.Declaration._ArgumentDeclaration(ose_decl = 'FOO')
+        self.assertEqual(decl.get_ose_decl(), {'key' : 'FOO'})
+        decl = SConsArguments.Declaration._ArgumentDeclaration(ose_decl = ('FOO', conv))
+        self.assertEqual(decl.get_ose_decl(), {'key' : 'FOO', 'converter' : conv})
+        decl = SConsArguments.Declaration._ArgumentDeclaration(ose_decl = {'key' : 'FOO', 'validator' : None})
+        self.assertEqual(decl.get_ose_decl(), {'key' : 'FOO', 'validator' : None})
+        self.assertTrue(decl.has_ose_decl())
+        self.assertEqual(decl.get_ose_key(), 'FOO')
+        decl.set_ose_key('BAR')
+        self.assertEqual(decl.get_key(SConsArguments.OSE), 'BAR')
+
+    def test_set_ose_decl_2(self):
+        """<_ArgumentDeclaration>.set_ose_decl() should reject malformed declarations"""
+        decl = SConsArguments.Declaration._ArgumentDeclaration()
+        with self.assertRaises(ValueError):
+            decl.set_ose_decl(())
+        with self.assertRaises(ValueError):
+            decl.set_ose_decl({'converter' : None})
+        with self.assertRaises(TypeError):
+            decl.set_ose_decl(123)
+        with self.assertRaises(IndexError):
+            decl.get_ose_decl()
+
+    def test_ose_default_1(self):
+        """OSE endpoint of _ArgumentDeclaration should have no default value"""
+        decl = SConsArguments.Declaration._ArgumentDeclaration(ose_decl = 'FOO')
+        self.assertIs(decl.get_default(SConsArguments.OSE), SConsArguments.UNDEFINED)
+        decl.set_default(SConsArguments.OSE, SConsArguments.UNDEFINED)
+        with self.assertRaises(ValueError):
+            decl.set_default(SConsArguments.OSE, 'x')
+
+    def test_add_to__OSE_1(self):
+        """<_ArgumentDeclaration>.add_to(OSE) should only check the declaration"""
+        decl = SConsArguments.Declaration._ArgumentDeclaration(ose_decl = 'FOO')
+        decl.add_to(SConsArguments.OSE)
+        self.assertTrue(decl.safe_add_to(SConsArguments.OSE))
+        with self.assertRaises(IndexError):
+            SConsArguments.Declaration._ArgumentDeclaration().add_to(SConsArguments.OSE)
+
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test_add_to__ENV_0(self):
         """_ArgumentDeclaration(env_decl = 'FOO').add_to(ENV,env) should not call env.SetDefault()"""
@@ -1123,6 +1165,14 @@ class Test_DeclareArgument(unittest.TestCase):
         decl2 = SConsArguments.DeclareArgument(decl1)
         self.assertIs(decl2, decl1)
 
+    def test_DeclareArgument_ose_key_1(self):
+        """DeclareArgument(ose_key = 'FOO', ...) should declare OSE endpoint sharing converter and validator"""
+        conv = lambda x : x.split()
+        valid = lambda k, v, e : None
+        decl = SConsArguments.DeclareArgument(var_key = 'foo', ose_key = 'FOO', converter = conv, validator = valid)
+        self.assertEqual(decl.get_ose_decl(), {'key' : 'FOO', 'converter' : conv, 'validator' : valid})
+        self.assertFalse(SConsArguments.DeclareArgument(var_key = 'foo').has_ose_decl())
+
     def test_user_doc_example_2(self):
         """example 2 from user documentation should work"""
         decl = SConsArguments.DeclareArgument(env_key = 'xvar', opt_key = 'xvar', option = '--xvar', type = 'string')
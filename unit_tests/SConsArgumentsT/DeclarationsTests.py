@@ -149,10 +149,10 @@ class Test__ArgumentDeclarations(unittest.TestCase):
         decls = SConsArguments.Declarations._ArgumentDeclarations(a = a, b = b)
         decls.commit() # to generate resubst/iresubst dicts
         decls._ArgumentDeclarations__reset_supp_dicts()
-        self.assertEqual(decls._ArgumentDeclarations__rename,   [dict(),dict(),dict()])
-        self.assertEqual(decls._ArgumentDeclarations__irename,  [dict(),dict(),dict()])
-        self.assertEqual(decls._ArgumentDeclarations__resubst,  [dict(),dict(),dict()])
-        self.assertEqual(decls._ArgumentDeclarations__iresubst, [dict(),dict(),dict()])
+        self.assertEqual(decls._ArgumentDeclarations__rename,   [dict(),dict(),dict(),dict()])
+        self.assertEqual(decls._ArgumentDeclarations__irename,  [dict(),dict(),dict(),dict()])
+        self.assertEqual(decls._ArgumentDeclarations__resubst,  [dict(),dict(),dict(),dict()])
+        self.assertEqual(decls._ArgumentDeclarations__iresubst, [dict(),dict(),dict(),dict()])
 
     def test___replace_key_in_supp_dicts__ENV_1(self):
         """<_ArgumentDeclarations>.__replace_key_in_supp_dicts(ENV,'a','ENX_a') should replace 'ENV_a' with 'ENX_a' in rename/irename dicts"""
@@ -162,10 +162,12 @@ class Test__ArgumentDeclarations(unittest.TestCase):
         decls._ArgumentDeclarations__replace_key_in_supp_dicts(SConsArguments.ENV, 'a', 'ENX_a')
         self.assertEqual(decls._ArgumentDeclarations__rename,   [  {'a' : 'ENX_a', 'b' : 'ENV_b'},
                                                             {'a' : 'VAR_a', 'b' : 'VAR_b'},
-                                                            {'a' : 'OPT_a', 'b' : 'OPT_b'} ])
+                                                            {'a' : 'OPT_a', 'b' : 'OPT_b'},
+                                                            {} ])
         self.assertEqual(decls._ArgumentDeclarations__irename,  [  {'ENX_a' : 'a', 'ENV_b' : 'b'},
                                                             {'VAR_a' : 'a', 'VAR_b' : 'b'},
-                                                            {'OPT_a' : 'a', 'OPT_b' : 'b'} ])
+                                                            {'OPT_a' : 'a', 'OPT_b' : 'b'},
+                                                            {} ])
 
     def test___replace_key_in_supp_dicts__VAR_1(self):
         """<_ArgumentDeclarations>.__replace_key_in_supp_dicts(VAR,'a','VAX_a') should replace 'VAR_a' with 'VAX_a' in rename/irename dicts"""
@@ -175,10 +177,12 @@ class Test__ArgumentDeclarations(unittest.TestCase):
         decls._ArgumentDeclarations__replace_key_in_supp_dicts(SConsArguments.VAR, 'a', 'VAX_a')
         self.assertEqual(decls._ArgumentDeclarations__rename,   [  {'a' : 'ENV_a', 'b' : 'ENV_b'},
                                                             {'a' : 'VAX_a', 'b' : 'VAR_b'},
-                                                            {'a' : 'OPT_a', 'b' : 'OPT_b'} ])
+                                                            {'a' : 'OPT_a', 'b' : 'OPT_b'},
+                                                            {} ])
         self.assertEqual(decls._ArgumentDeclarations__irename,  [  {'ENV_a' : 'a', 'ENV_b' : 'b'},
                                                             {'VAX_a' : 'a', 'VAR_b' : 'b'},
-                                                            {'OPT_a' : 'a', 'OPT_b' : 'b'} ])
+                                                            {'OPT_a' : 'a', 'OPT_b' : 'b'},
+                                                            {} ])
 
     def test___replace_key_in_supp_dicts__OPT_1(self):
         """<_ArgumentDeclarations>.__replace_key_in_supp_dicts(OPT,'a','OPX_a') should replace 'OPT_a' with 'OPX_a' in rename/irename dicts"""
@@ -188,10 +192,12 @@ class Test__ArgumentDeclarations(unittest.TestCase):
         decls._ArgumentDeclarations__replace_key_in_supp_dicts(SConsArguments.OPT, 'a', 'OPX_a')
         self.assertEqual(decls._ArgumentDeclarations__rename,   [  {'a' : 'ENV_a', 'b' : 'ENV_b'},
                                                             {'a' : 'VAR_a', 'b' : 'VAR_b'},
-                                                            {'a' : 'OPX_a', 'b' : 'OPT_b'} ])
+                                                            {'a' : 'OPX_a', 'b' : 'OPT_b'},
+                                                            {} ])
         self.assertEqual(decls._ArgumentDeclarations__irename,  [  {'ENV_a' : 'a', 'ENV_b' : 'b'},
                                                             {'VAR_a' : 'a', 'VAR_b' : 'b'},
-                                                            {'OPX_a' : 'a', 'OPT_b' : 'b'} ])
+                                                            {'OPX_a' : 'a', 'OPT_b' : 'b'},
+                                                            {} ])
     def test___replace_key_in_supp_dicts__nokey_1(self):
         """<_ArgumentDeclarations>.__replace_key_in_supp_dicts(ENV,'inexistent', 'foo') should add new name mapping"""
         a = SConsArguments.Declarations._ArgumentDeclaration(('ENV_a',None), ('VAR_a',), ('--a', {'dest' : 'OPT_a'}))
@@ -200,10 +206,12 @@ class Test__ArgumentDeclarations(unittest.TestCase):
         decls._ArgumentDeclarations__replace_key_in_supp_dicts(SConsArguments.ENV, 'inexistent', 'foo')
         self.assertEqual(decls._ArgumentDeclarations__rename,   [  {'a' : 'ENV_a', 'b' : 'ENV_b', 'inexistent' : 'foo'},
                                                             {'a' : 'VAR_a', 'b' : 'VAR_b'},
-                                                            {'a' : 'OPT_a', 'b' : 'OPT_b'} ])
+                                                            {'a' : 'OPT_a', 'b' : 'OPT_b'},
+                                                            {} ])
         self.assertEqual(decls._ArgumentDeclarations__irename,  [  {'ENV_a' : 'a', 'ENV_b' : 'b', 'foo': 'inexistent'},
                                                             {'VAR_a' : 'a', 'VAR_b' : 'b'},
-                                                            {'OPT_a' : 'a', 'OPT_b' : 'b'} ])
+                                                            {'OPT_a' : 'a', 'OPT_b' : 'b'},
+                                                            {} ])
 
     def test___del_from_supp_dicts_1(self):
         """<_ArgumentDeclarations>.__del_from_supp_dicts('a') should delete 'a' from rename/irename dictionaries"""
@@ -213,10 +221,12 @@ class Test__ArgumentDeclarations(unittest.TestCase):
         decls._ArgumentDeclarations__del_from_supp_dicts('a')
         self.assertEqual(decls._ArgumentDeclarations__rename,   [  {'b' : 'ENV_b'},
                                                             {'b' : 'VAR_b'},
-                                                            {'b' : 'OPT_b'} ])
+                                                            {'b' : 'OPT_b'},
+                                                            {} ])
         self.assertEqual(decls._ArgumentDeclarations__irename,  [  {'ENV_b' : 'b'},
                                                             {'VAR_b' : 'b'},
-                                                            {'OPT_b' : 'b'} ])
+                                                            {'OPT_b' : 'b'},
+                                                            {} ])
 
     def test___del_from_supp_dicts_2(self):
         """<_ArgumentDeclarations>.__del_from_supp_dicts('b') should delete 'a' from rename/irename dictionaries"""
@@ -226,10 +236,12 @@ class Test__ArgumentDeclarations(unittest.TestCase):
         decls._ArgumentDeclarations__del_from_supp_dicts('b')
         self.assertEqual(decls._ArgumentDeclarations__rename,   [  {'a' : 'ENV_a'},
                                                             {'a' : 'VAR_a'},
-                                                            {'a' : 'OPT_a'} ])
+                                                            {'a' : 'OPT_a'},
+                                                            {} ])
         self.assertEqual(decls._ArgumentDeclarations__irename,  [  {'ENV_a' : 'a'},
                                                             {'VAR_a' : 'a'},
-                                                            {'OPT_a' : 'a'} ])
+                                                            {'OPT_a' : 'a'},
+                                                            {} ])
 
     def test___ensure_not_committed_1(self):
         """<_ArgumetnDecls>.__ensure_not_committed() should not raise on a committed <_ArgumentDeclarations>"""
@@ -576,6 +588,17 @@ class Test__ArgumentDeclarations(unittest.TestCase):
         decls = SConsArguments.Declarations._ArgumentDeclarations(a = a, b = b)
         self.assertEqual(decls.get_rename_dict(SConsArguments.ENV), {'a' : 'ENV_a', 'b' : 'ENV_b'})
 
+    def test__get_supp_dicts_1(self):
+        """<_ArgumentDeclarations>._get_supp_dicts() should return the supplementary dicts, not copies"""
+        a = SConsArguments.Declarations._ArgumentDeclaration(('ENV_a','A'))
+        decls = SConsArguments.Declarations._ArgumentDeclarations(a = a)
+        rename, irename, resubst, iresubst = decls._get_supp_dicts()
+        self.assertEqual(rename[SConsArguments.ENV], {'a' : 'ENV_a'})
+        self.assertEqual(irename[SConsArguments.ENV], {'ENV_a' : 'a'})
+        self.assertIs(rename, decls._get_supp_dicts()[0])
+        self.assertEqual(len(resubst), SConsArguments.ALL)
+        self.assertEqual(len(iresubst), SConsArguments.ALL)
+
     def test_get_irename_dict__ENV_1(self):
         """_ArgumentDeclarations().get_irename_dict(ENV) should return empty dict"""
         self.assertEqual(SConsArguments.Declarations._ArgumentDeclarations().get_irename_dict(SConsArguments.ENV), dict())
@@ -1014,9 +1037,9 @@ class Test__ArgumentDeclarations(unittest.TestCase):
 
     @unittest.skipIf(_mock_missing, "requires mock module")
     def test_add_to_1(self):
-        """<_ArgumentDeclarations>.add_to(11,12,13) should invoke <_ArgumentDeclarations>._safe_add_to(ns,...) for ns in [ENV, VAR, OPT]"""
+        """<_ArgumentDeclarations>.add_to(11,12,13) should invoke <_ArgumentDeclarations>._bulk_add_to(ns,...) for ns in [ENV, VAR, OPT]"""
         decls = SConsArguments.Declarations._ArgumentDeclarations()
-        decls._safe_add_to = mock.Mock(name = '_safe_add_to')
+        decls._bulk_add_to = mock.Mock(name = '_bulk_add_to')
         with mock.patch.object(SConsArguments.Declarations._ArgumentDeclarations, '_ArgumentDeclarations__ensure_committed', return_value = True) as __ensure_committed:
             decls.add_to(10, 11, 12)
         try:
@@ -1024,10 +1047,228 @@ class Test__ArgumentDeclarations(unittest.TestCase):
             calls = [ mock.call(SConsArguments.ENV, 10),
                       mock.call(SConsArguments.VAR, 11),
                       mock.call(SConsArguments.OPT, 12) ]
-            decls._safe_add_to.assert_has_calls(calls)
+            decls._bulk_add_to.assert_has_calls(calls)
+        except AssertionError as e:
+            self.fail(str(e))
+
+    def test__bulk_add_to_ENV(self):
+        """<_ArgumentDeclarations>._bulk_add_to(ENV,env) should call env.SetDefault() once with all defaults"""
+        decls = SConsArguments.Declarations._ArgumentDeclarations(
+            a = SConsArguments.DeclareArgument(env_key = 'A', default = 'a'),
+            b = SConsArguments.DeclareArgument(env_key = 'B'),
+            c = SConsArguments.DeclareArgument(env_key = 'C', default = 'c'),
+            d = SConsArguments.DeclareArgument(var_key = 'D', default = 'd')
+        )
+        env = mock.Mock(name = 'env')
+        decls._bulk_add_to(SConsArguments.ENV, env)
+        try:
+            env.SetDefault.assert_called_once_with(A = 'a', C = 'c')
+        except AssertionError as e:
+            self.fail(str(e))
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__bulk_add_to_VAR(self):
+        """<_ArgumentDeclarations>._bulk_add_to(VAR,variables) should register declared variables with variables.Add()"""
+        decls = SConsArguments.Declarations._ArgumentDeclarations(
+            a = SConsArguments.DeclareArgument(var_key = 'A', default = 'a', help = 'A help'),
+            b = SConsArguments.DeclareArgument(env_key = 'B', default = 'b'),
+            c = SConsArguments.DeclareArgument(var_key = 'C', converter = int)
+        )
+        variables = mock.Mock(name = 'variables')
+        decls._bulk_add_to(SConsArguments.VAR, variables)
+        try:
+            self.assertEqual(variables.Add.call_count, 2)
+            variables.Add.assert_any_call(key = 'A', default = 'a', help = 'A help')
+            variables.Add.assert_any_call(key = 'C', default = SConsArguments.UNDEFINED, converter = int)
+        except AssertionError as e:
+            self.fail(str(e))
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__bulk_add_to_VAR_kw(self):
+        """<_ArgumentDeclarations>._bulk_add_to(VAR,variables) should use variables.Add() for declarations with extra keywords"""
+        decls = SConsArguments.Declarations._ArgumentDeclarations(
+            a = SConsArguments.DeclareArgument(var_key = 'A', default = 'a'),
+        )
+        decls['a'].set_var_decl({ 'key' : 'A', 'default' : 'a', 'kw' : {'subst' : False} })
+        variables = mock.Mock(name = 'variables')
+        decls._bulk_add_to(SConsArguments.VAR, variables)
+        try:
+            variables.Add.assert_called_once_with(key = 'A', default = 'a', subst = False)
+            variables.AddVariables.assert_not_called()
+        except AssertionError as e:
+            self.fail(str(e))
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__bulk_add_to_OPT(self):
+        """<_ArgumentDeclarations>._bulk_add_to(OPT) should parse leftover command-line arguments only once"""
+        decls = SConsArguments.Declarations._ArgumentDeclarations(
+            a = SConsArguments.DeclareArgument(opt_key = 'a', option = '--a'),
+            b = SConsArguments.DeclareArgument(opt_key = 'b', option = '--b')
+        )
+        parser = mock.Mock(name = 'OptionsParser', spec = ['largs', 'values', 'parse_args'])
+        parser.largs = ['--a=1', '--b=2']
+        seen = []
+        def add_to_opt(self): seen.append(list(parser.largs))
+        with mock.patch('SCons.Script.Main.OptionsParser', parser), \
+             mock.patch.object(SConsArguments.Declarations._ArgumentDeclaration, 'add_to_opt', add_to_opt):
+            decls._bulk_add_to(SConsArguments.OPT)
+        self.assertEqual(seen, [[], []])
+        self.assertEqual(parser.largs, ['--a=1', '--b=2'])
+        try:
+            parser.parse_args.assert_called_once_with(['--a=1', '--b=2'], parser.values)
         except AssertionError as e:
             self.fail(str(e))
 
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__bulk_add_to_OPT_deferred(self):
+        """<_ArgumentDeclarations>._bulk_add_to(OPT,'deferred') should create only options given on command line"""
+        decls = SConsArguments.Declarations._ArgumentDeclarations(
+            a = SConsArguments.DeclareArgument(opt_key = 'a', option = '--a-long', opt_default = 'A'),
+            b = SConsArguments.DeclareArgument(opt_key = 'b', option = '--b', opt_default = 'B')
+        )
+        class _Values(object): pass
+        parser = mock.Mock(name = 'OptionsParser', spec = ['largs', 'values', 'parse_args'])
+        parser.largs = ['--a-l=1']
+        parser.values = _Values()
+        parser.values.__defaults__ = _Values()
+        created = []
+        def add_to_opt(self): created.append(self.get_opt_decl()[1]['dest'])
+        with mock.patch('SCons.Script.Main.OptionsParser', parser), \
+             mock.patch('sys.argv', ['scons', '--a-l=1']), \
+             mock.patch.object(SConsArguments.Declarations._ArgumentDeclaration, 'add_to_opt', add_to_opt):
+            decls._bulk_add_to(SConsArguments.OPT, 'deferred')
+            self.assertEqual(created, ['a'])
+            self.assertEqual(parser.values.__defaults__.b, 'B')
+            self.assertFalse(hasattr(parser.values.__defaults__, 'a'))
+            self.assertEqual(decls.add_deferred_options(), 1)
+            self.assertEqual(created, ['a', 'b'])
+            self.assertEqual(decls.add_deferred_options(), 0)
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__bulk_add_to_OPT_deferred_help(self):
+        """<_ArgumentDeclarations>._bulk_add_to(OPT,'deferred') should create all options when help is requested"""
+        decls = SConsArguments.Declarations._ArgumentDeclarations(
+            a = SConsArguments.DeclareArgument(opt_key = 'a', option = '--a'),
+            b = SConsArguments.DeclareArgument(opt_key = 'b', option = '--b')
+        )
+        class _Values(object): pass
+        parser = mock.Mock(name = 'OptionsParser', spec = ['largs', 'values', 'parse_args'])
+        parser.largs = []
+        parser.values = _Values()
+        parser.values.__defaults__ = _Values()
+        created = []
+        def add_to_opt(self): created.append(self.get_opt_decl()[1]['dest'])
+        with mock.patch('SCons.Script.Main.OptionsParser', parser), \
+             mock.patch('sys.argv', ['scons', '-h']), \
+             mock.patch.object(SConsArguments.Declarations._ArgumentDeclaration, 'add_to_opt', add_to_opt):
+            decls._bulk_add_to(SConsArguments.OPT, 'deferred')
+        self.assertEqual(sorted(created), ['a', 'b'])
+        self.assertEqual(decls.add_deferred_options(), 0)
+
+    def test_Schema_1(self):
+        """<_ArgumentDeclarations>.Schema() should describe declared endpoints"""
+        decls = SConsArguments.DeclareArguments(
+            foo = { 'env_key' : 'FOO', 'var_key' : 'VFOO', 'help' : 'Foo help', 'default' : 'foo',
+                    'converter' : SConsArguments.Util.flags2list },
+            bar = { 'env_key' : 'BAR', 'opt_key' : 'bar', 'option' : '--bar', 'type' : 'string' }
+        )
+        schema = decls.Schema()
+        self.assertEqual(schema['format'], 'sconsarguments-schema')
+        self.assertEqual(schema['fingerprint'], decls.SchemaFingerprint())
+        self.assertEqual(schema['arguments']['foo'], {
+            'module' : None, 'groups' : [],
+            'env' : { 'key' : 'FOO', 'default' : 'foo' },
+            'var' : { 'key' : 'VFOO', 'help' : 'Foo help', 'default' : 'foo',
+                      'converter' : 'SConsArguments.Util.flags2list' } })
+        self.assertEqual(schema['arguments']['bar'], {
+            'module' : None, 'groups' : [],
+            'env' : { 'key' : 'BAR' },
+            'opt' : { 'names' : ['--bar'], 'dest' : 'bar', 'type' : 'string' } })
+        self.assertIs(decls.Schema(), schema)
+
+    def test_SchemaFingerprint_1(self):
+        """<_ArgumentDeclarations>.SchemaFingerprint() should change with declarations"""
+        decls = SConsArguments.DeclareArguments(foo = { 'env_key' : 'FOO', 'default' : 'foo' })
+        fp1 = decls.SchemaFingerprint()
+        self.assertEqual(fp1, SConsArguments.DeclareArguments(foo = { 'env_key' : 'FOO', 'default' : 'foo' }).SchemaFingerprint())
+        decls['foo'].set_env_default('bar')
+        self.assertNotEqual(decls.SchemaFingerprint(), fp1)
+
+    def test_ExportSchema_1(self):
+        """<_ArgumentDeclarations>.ExportSchema(filename) should write the file only if it's outdated"""
+        import tempfile, shutil, os, json
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'schema.json')
+            decls = SConsArguments.DeclareArguments(foo = { 'env_key' : 'FOO', 'default' : 'foo' })
+            self.assertTrue(decls.ExportSchema(filename))
+            self.assertFalse(decls.ExportSchema(filename))
+            with open(filename) as f:
+                self.assertEqual(json.load(f), decls.Schema())
+            decls['foo'].set_env_default('bar')
+            self.assertTrue(decls.ExportSchema(filename))
+            with open(filename) as f:
+                self.assertEqual(json.load(f)['arguments']['foo']['env']['default'], 'bar')
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_suggest_var_keys_1(self):
+        """<_ArgumentDeclarations>.suggest_var_keys(name) should return similar VAR keys"""
+        decls = SConsArguments.DeclareArguments(
+            cxxflags = { 'var_key' : 'CXXFLAGS', 'env_key' : 'CXXFLAGS' },
+            cflags = { 'var_key' : 'CFLAGS', 'env_key' : 'CFLAGS' },
+            cc = { 'var_key' : 'CC', 'env_key' : 'CC' },
+            prefix = { 'env_key' : 'PREFIX' }
+        )
+        self.assertEqual(decls.suggest_var_keys('CXXFLAG', 1), ['CXXFLAGS'])
+        self.assertEqual(decls.suggest_var_keys('cflags'), ['CFLAGS', 'CXXFLAGS'])
+        self.assertEqual(decls.suggest_var_keys('PREFIX'), [])
+        decls.set_key(SConsArguments.VAR, 'cc', 'COMPILER')
+        self.assertEqual(decls.suggest_var_keys('COMPILR'), ['COMPILER'])
+        decls.commit()
+        self.assertEqual(decls.suggest_var_keys('COMPILERS'), ['COMPILER'])
+
+    def test_get_ose_table_1(self):
+        """<_ArgumentDeclarations>.get_ose_table() should list OS environment variables read by arguments"""
+        conv = SConsArguments.Util.flags2list
+        decls = SConsArguments.DeclareArguments(
+            cflags = { 'env_key' : 'CFLAGS', 'var_key' : 'CFLAGS', 'ose_key' : 'CFLAGS', 'converter' : conv },
+            cc = { 'env_key' : 'CC', 'ose_key' : 'CC' },
+            prefix = { 'env_key' : 'PREFIX' }
+        )
+        self.assertEqual(decls.get_ose_table(), ())
+        decls.set_key(SConsArguments.OSE, 'cc', 'MY_CC')
+        decls.commit()
+        self.assertEqual(decls.get_ose_table(), (('CFLAGS', 'cflags', conv, None),
+                                                 ('MY_CC', 'cc', None, None)))
+        self.assertEqual(decls.Schema()['arguments']['cc']['ose'], { 'key' : 'MY_CC' })
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test_get_dependency_graph_1(self):
+        """<_ArgumentDeclarations>.get_dependency_graph() should map arguments to arguments referenced by their defaults"""
+        decls = SConsArguments.DeclareArguments(
+            prefix = { 'env_key' : 'PREFIX', 'default' : '/usr' },
+            bindir = { 'env_key' : 'BINDIR', 'var_key' : 'bindir', 'default' : '${prefix}/bin' },
+            tools = { 'env_key' : 'TOOLS', 'default' : ['$bindir/cc', '$prefix/lib', '$TARGET'] },
+        )
+        self.assertEqual(decls.get_dependency_graph(), {})
+        decls.commit()
+        self.assertEqual(decls.get_dependency_graph(), { 'prefix' : frozenset(),
+                                                         'bindir' : frozenset(['prefix']),
+                                                         'tools'  : frozenset(['prefix', 'bindir']) })
+
+    def test_commit_3(self):
+        """<_ArgumentDeclarations>.commit() should raise UserError if defaults depend on each other cyclically"""
+        import SCons.Errors
+        decls = SConsArguments.DeclareArguments(
+            a = { 'env_key' : 'A', 'default' : '$b' },
+            b = { 'env_key' : 'B', 'default' : '${c}' },
+            c = { 'env_key' : 'C', 'default' : 'x $a' },
+        )
+        with self.assertRaises(SCons.Errors.UserError) as cm:
+            decls.commit()
+        self.assertIn('a -> b -> c -> a', str(cm.exception))
+
 
 #############################################################################
 class Test_ArgumentDeclarations(unittest.TestCase):
@@ -1145,6 +1386,22 @@ class Test_DeclareArguments(unittest.TestCase):
         self.assertIsInstance(decls['foo'], SConsArguments.Declarations._ArgumentDeclaration)
         self.assertIsInstance(decls['bar'], SConsArguments.Declarations._ArgumentDeclaration)
 
+#############################################################################
+class Test__scan_option_names(unittest.TestCase):
+    def test__scan_option_names(self):
+        """_scan_option_names(argv) should find long options and clustered short options"""
+        argv = ['--foo=1', '--bar', 'x', '-jv', 'FOO=2', '--', '--baz']
+        names = SConsArguments.Declarations._scan_option_names(argv)
+        self.assertEqual(names, set(['--foo', '--bar', '-j', '-v']))
+
+    def test__option_requested(self):
+        """_option_requested(names, seen) should match exact and abbreviated names"""
+        _option_requested = SConsArguments.Declarations._option_requested
+        self.assertTrue(_option_requested(('-f', '--foo'), set(['-f'])))
+        self.assertTrue(_option_requested(('--foo-bar',), set(['--foo'])))
+        self.assertFalse(_option_requested(('--foo',), set(['--foo-bar', '-x'])))
+        self.assertFalse(_option_requested(('--foo',), set(['--'])))
+
 #############################################################################
 if __name__ == "__main__":
     ldr = unittest.TestLoader()
@@ -1152,7 +1409,8 @@ if __name__ == "__main__":
     # Load tests to test suite
     tclasses = [ Test__ArgumentDeclarations
                , Test_ArgumentDeclarations
-               , Test_DeclareArguments ]
+               , Test_DeclareArguments
+               , Test__scan_option_names ]
 
     for tclass in tclasses:
         suite.addTests(ldr.loadTestsFromTestCase(tclass))
@@ -0,0 +1,226 @@
+""" `SConsArguments.DefaultsTests`
+
+Unit tests for `SConsArguments.Defaults`
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsArguments
+import SConsArguments.Defaults as tested
+import SCons.Environment
+import SCons.Variables
+import unittest
+import tempfile
+import shutil
+import json
+import os
+import sys
+
+#############################################################################
+def _probe(env):
+    _probe.calls += 1
+    return 'probed %d' % _probe.calls
+
+#############################################################################
+class Test_DefaultsCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'cache.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_lookup_1(self):
+        """DefaultsCache.lookup() should return MISSING for inexistent file"""
+        cache = tested.DefaultsCache(self.filename)
+        self.assertIs(cache.lookup('foo', 'stamp'), SConsArguments.MISSING)
+
+    def test_store_1(self):
+        """DefaultsCache.store() + flush() should persist values"""
+        cache = tested.DefaultsCache(self.filename)
+        self.assertTrue(cache.store('foo', 'stamp', ['a', 'b']))
+        self.assertEqual(cache.lookup('foo', 'stamp'), ['a', 'b'])
+        cache.flush()
+        cache = tested.DefaultsCache(self.filename)
+        self.assertEqual(cache.lookup('foo', 'stamp'), ['a', 'b'])
+        self.assertIs(cache.lookup('foo', 'other'), SConsArguments.MISSING)
+
+    def test_store_2(self):
+        """DefaultsCache.store() should refuse values not representable in JSON"""
+        cache = tested.DefaultsCache(self.filename)
+        self.assertFalse(cache.store('foo', 'stamp', object()))
+        self.assertIs(cache.lookup('foo', 'stamp'), SConsArguments.MISSING)
+
+    def test_store_3(self):
+        """DefaultsCache.store() should refuse values changed by a JSON round-trip"""
+        cache = tested.DefaultsCache(self.filename)
+        self.assertFalse(cache.store('foo', 'stamp', ('a', 'b')))
+        self.assertFalse(cache.store('bar', 'stamp', {'a' : ('b',)}))
+        self.assertIs(cache.lookup('foo', 'stamp'), SConsArguments.MISSING)
+        self.assertIs(cache.lookup('bar', 'stamp'), SConsArguments.MISSING)
+
+    def test_lookup_2(self):
+        """DefaultsCache.lookup() should ignore corrupted files"""
+        with open(self.filename, 'w') as f:
+            f.write('{ corrupted')
+        cache = tested.DefaultsCache(self.filename)
+        self.assertIs(cache.lookup('foo', 'stamp'), SConsArguments.MISSING)
+
+#############################################################################
+class Test_LazyDefault(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = tested.DefaultsCache(os.path.join(self.tmpdir, 'cache.json'))
+        _probe.calls = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test___init___1(self):
+        """LazyDefault(func) should derive the key from func"""
+        lazy = tested.LazyDefault(_probe)
+        self.assertEqual(lazy.key, __name__ + '._probe')
+        self.assertEqual(str(lazy), 'LazyDefault(%s._probe)' % __name__)
+
+    def test___init___2(self):
+        """LazyDefault(lambda, fingerprint) should require key"""
+        with self.assertRaises(ValueError):
+            tested.LazyDefault(lambda env : 1, 'fp')
+        self.assertEqual(tested.LazyDefault(lambda env : 1, 'fp', key = 'one').key, 'one')
+
+    def test_resolve_1(self):
+        """LazyDefault.resolve() should compute the value once"""
+        lazy = tested.LazyDefault(_probe, cache = self.cache)
+        self.assertEqual(lazy.resolve(), 'probed 1')
+        self.assertEqual(lazy.resolve(), 'probed 1')
+        self.assertEqual(_probe.calls, 1)
+
+    def test_resolve_2(self):
+        """LazyDefault.resolve() should recompute value when fingerprint changes"""
+        stamp = ['v1']
+        lazy = tested.LazyDefault(_probe, lambda env : stamp[0], cache = self.cache)
+        self.assertEqual(lazy.resolve(), 'probed 1')
+        self.assertEqual(lazy.resolve(), 'probed 1')
+        stamp[0] = 'v2'
+        self.assertEqual(lazy.resolve(), 'probed 2')
+
+    def test_resolve_3(self):
+        """LazyDefault.resolve() should reuse values cached on disk"""
+        lazy = tested.LazyDefault(_probe, 'v1', cache = self.cache)
+        self.assertEqual(lazy.resolve(), 'probed 1')
+        self.cache.flush()
+        cache = tested.DefaultsCache(self.cache.filename)
+        lazy = tested.LazyDefault(_probe, 'v1', cache = cache)
+        self.assertEqual(lazy.resolve(), 'probed 1')
+        self.assertEqual(_probe.calls, 1)
+        lazy = tested.LazyDefault(_probe, 'v2', cache = cache)
+        self.assertEqual(lazy.resolve(), 'probed 2')
+
+    def test_resolve_4(self):
+        """LazyDefault.resolve() should keep tuples in memory only"""
+        func = lambda env : (_probe(env), 'x')
+        lazy = tested.LazyDefault(func, 'v1', key = 'tuple', cache = self.cache)
+        self.assertEqual(lazy.resolve(), ('probed 1', 'x'))
+        self.assertEqual(lazy.resolve(), ('probed 1', 'x'))
+        self.assertEqual(_probe.calls, 1)
+        self.cache.flush()
+        # warm cache (same file) must not turn the tuple into a list
+        cache = tested.DefaultsCache(self.cache.filename)
+        lazy = tested.LazyDefault(func, 'v1', key = 'tuple', cache = cache)
+        self.assertEqual(lazy.resolve(), ('probed 2', 'x'))
+        self.assertIsInstance(lazy.resolve(), tuple)
+
+    def test___call___1(self):
+        """LazyDefault should be computed when substituted by SCons"""
+        env = SCons.Environment.Environment(tools = [], FOO = tested.LazyDefault(_probe, cache = None))
+        self.assertEqual(_probe.calls, 0)
+        self.assertEqual(env.subst('$FOO'), 'probed 1')
+        self.assertEqual(env.subst('$FOO'), 'probed 1')
+
+#############################################################################
+class Test_LazyDefault_arguments(unittest.TestCase):
+    def setUp(self):
+        _probe.calls = 0
+
+    def _decls(self):
+        return SConsArguments.DeclareArguments(
+            foo = { 'env_key' : 'FOO', 'var_key' : 'FOO',
+                    'default' : tested.LazyDefault(_probe, cache = None),
+                    'converter' : lambda x : x.upper(),
+                    'validator' : lambda k, v, e : v.upper() }
+        )
+
+    def test_Postprocess_1(self):
+        """Lazy default should not be computed by Postprocess() if overridden"""
+        env = SCons.Environment.Environment(tools = [])
+        variables = SCons.Variables.Variables(args = { 'FOO' : 'foo' })
+        args = self._decls().Commit(env, variables)
+        args.Postprocess(env, variables)
+        self.assertEqual(env['FOO'], 'FOO')
+        self.assertEqual(_probe.calls, 0)
+
+    def test_Postprocess_2(self):
+        """Lazy default should not be computed (nor converted) by Postprocess() if not overridden"""
+        env = SCons.Environment.Environment(tools = [])
+        variables = SCons.Variables.Variables(args = {})
+        args = self._decls().Commit(env, variables)
+        tmpdir = tempfile.mkdtemp()
+        try:
+            args.Postprocess(env, variables, filename = os.path.join(tmpdir, 'vars.py'))
+        finally:
+            shutil.rmtree(tmpdir)
+        self.assertIsInstance(env['FOO'], tested.LazyDefault)
+        self.assertEqual(_probe.calls, 0)
+        self.assertEqual(args.ResolveDefaults(env), { 'foo' : 'probed 1' })
+        self.assertEqual(env['FOO'], 'probed 1')
+
+    def test_Postprocess_3(self):
+        """Lazy default should not be computed by Postprocess() if overridden by ose"""
+        env = SCons.Environment.Environment(tools = [])
+        args = self._decls().Commit(env)
+        args.Postprocess(env, ose = { 'foo' : 'ose' })
+        self.assertEqual(env['FOO'], 'ose')
+        self.assertEqual(_probe.calls, 0)
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_DefaultsCache
+               , Test_LazyDefault
+               , Test_LazyDefault_arguments
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
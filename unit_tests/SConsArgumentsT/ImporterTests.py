@@ -29,10 +29,15 @@ __docformat__ = "restructuredText"
 import SConsArguments.Importer as tested
 import SConsArguments.Declaration
 import SConsArguments.Declarations
+import SConsArguments.Util
 import SCons.Script.Main
 import SCons.Node.FS
 import SCons.Platform
 import contextlib
+import tempfile
+import shutil
+import types
+import json
 import sys
 import unittest
 import os.path
@@ -101,6 +106,250 @@ class Test__load_module_file(unittest.TestCase):
             m_module_from_spec.assert_called_once_with('spec1')
             finder1.loader.exec_module.assert_called_once_with('mod_spec1')
 
+#############################################################################
+class Test__cached_argmod(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'cachedmod.py')
+        with open(self.filename, 'w') as f:
+            f.write("def arguments(**kw):\n    return {'arg1' : {'help' : 'arg1'}}\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        tested._argmod_cache.clear()
+
+    def test__cached_argmod_1(self):
+        """Test SConsArguments.Importer._cached_argmod() loads module once"""
+        load = lambda : types.ModuleType('cachedmod')
+        mod1 = tested._cached_argmod('cachedmod', self.filename, load)
+        mod2 = tested._cached_argmod('cachedmod', self.filename, load)
+        self.assertIs(mod1, mod2)
+
+    def test__cached_argmod_2(self):
+        """Test SConsArguments.Importer._cached_argmod() reloads modified module"""
+        load = lambda : types.ModuleType('cachedmod')
+        mod1 = tested._cached_argmod('cachedmod', self.filename, load)
+        mtime = os.path.getmtime(self.filename)
+        os.utime(self.filename, (mtime + 10, mtime + 10))
+        mod2 = tested._cached_argmod('cachedmod', self.filename, load)
+        self.assertIsNot(mod1, mod2)
+        self.assertIs(mod2, tested._cached_argmod('cachedmod', self.filename, load))
+
+    def test__cached_argmod_3(self):
+        """Test SConsArguments.Importer._cached_argmod() does not cache non-files"""
+        load = lambda : types.ModuleType('cachedmod')
+        mod1 = tested._cached_argmod('cachedmod', None, load)
+        mod2 = tested._cached_argmod('cachedmod', None, load)
+        self.assertIsNot(mod1, mod2)
+        self.assertEqual(tested._argmod_cache, {})
+
+    def test__load_module_file_cached(self):
+        """Test SConsArguments.Importer._load_module_file() with real module file"""
+        mod1 = tested._load_module_file('cachedmod', [self.tmpdir])
+        mod2 = tested._load_module_file('cachedmod', [self.tmpdir])
+        self.assertIs(mod1, mod2)
+        self.assertEqual(mod1.arguments(), {'arg1' : {'help' : 'arg1'}})
+
+#############################################################################
+class Test__argdir_index(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.dir1 = os.path.join(self.tmpdir, 'dir1')
+        self.dir2 = os.path.join(self.tmpdir, 'dir2')
+        os.mkdir(self.dir1)
+        os.mkdir(self.dir2)
+        self.write(self.dir1, 'foo.py', 'where = "dir1"\n')
+        self.write(self.dir2, 'foo.py', 'where = "dir2"\n')
+        self.write(self.dir2, 'bar.py', 'where = "dir2"\n')
+        os.mkdir(os.path.join(self.dir2, 'pkg'))
+        self.write(os.path.join(self.dir2, 'pkg'), '__init__.py', 'where = "pkg"\n')
+        self.write(self.dir2, 'README', '')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        tested._argpath_index.clear()
+        tested._argmod_cache.clear()
+
+    def write(self, dirname, basename, content):
+        with open(os.path.join(dirname, basename), 'w') as f:
+            f.write(content)
+
+    def test__scan_argdir(self):
+        """Test SConsArguments.Importer._scan_argdir()"""
+        index = tested._scan_argdir(self.dir2)
+        self.assertEqual(index, { 'foo' : os.path.join(self.dir2, 'foo.py'),
+                                  'bar' : os.path.join(self.dir2, 'bar.py'),
+                                  'pkg' : os.path.join(self.dir2, 'pkg', '__init__.py') })
+
+    def test__argdir_index_1(self):
+        """Test SConsArguments.Importer._argdir_index() with inexistent directory"""
+        self.assertIsNone(tested._argdir_index(os.path.join(self.tmpdir, 'inexistent')))
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__argdir_index_2(self):
+        """Test SConsArguments.Importer._argdir_index() scans directory once per generation"""
+        with mock.patch('SConsArguments.Importer._scan_argdir', side_effect = tested._scan_argdir) as m_scan, \
+             mock.patch('SConsArguments.Importer._file_mtime', side_effect = tested._file_mtime) as m_mtime:
+            index1 = tested._argdir_index(self.dir1)
+            index2 = tested._argdir_index(self.dir1)
+            self.assertIs(index1, index2)
+            m_scan.assert_called_once_with(self.dir1)
+            m_mtime.assert_called_once_with(self.dir1)
+
+    def test__argdir_index_3(self):
+        """Test SConsArguments.Importer._argdir_index() rescans modified directory"""
+        index1 = tested._argdir_index(self.dir1)
+        self.assertNotIn('geez', index1)
+        self.write(self.dir1, 'geez.py', '')
+        mtime = os.path.getmtime(self.dir1)
+        os.utime(self.dir1, (mtime + 10, mtime + 10))
+        # same generation, index is not re-validated
+        self.assertIs(tested._argdir_index(self.dir1), index1)
+        tested._argpath_generation += 1
+        index2 = tested._argdir_index(self.dir1)
+        self.assertIn('geez', index2)
+
+    def test__load_module_file_index_1(self):
+        """Test SConsArguments.Importer._load_module_file() respects the order of directories"""
+        self.assertEqual(tested._load_module_file('foo', [self.dir1, self.dir2]).where, 'dir1')
+        self.assertEqual(tested._load_module_file('bar', [self.dir1, self.dir2]).where, 'dir2')
+        self.assertEqual(tested._load_module_file('pkg', [self.dir1, self.dir2]).where, 'pkg')
+
+    def test__load_module_file_index_2(self):
+        """Test SConsArguments.Importer._load_module_file() with missing module"""
+        with self.assertRaises(ImportError):
+            tested._load_module_file('geez', [self.dir1, self.dir2, os.path.join(self.tmpdir, 'inexistent')])
+
+#############################################################################
+class Test__catalog(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test__catalog_1(self):
+        """The catalog.json should be up to date (regenerate it with bin/gencatalog.py)"""
+        with open(tested._catalog_file) as f:
+            catalog = json.load(f)
+        self.assertEqual(catalog, json.loads(json.dumps(tested._generate_catalog())))
+
+    def test__catalog_2(self):
+        """Test SConsArguments.Importer._catalog_argmod() for all bundled modules"""
+        for name in tested._bundled_argmod_names():
+            mod = tested._catalog_argmod(name)
+            self.assertIsInstance(mod, types.ModuleType)
+            orig = tested._load_module_file(name, sys.modules['SConsArguments'].__path__)
+            self.assertEqual(mod.arguments(), orig.arguments())
+            self.assertEqual(mod.arguments(include_groups = 'flags'), orig.arguments(include_groups = 'flags'))
+
+    def test__catalog_3(self):
+        """Test SConsArguments.Importer._catalog_argmod() caches module objects"""
+        mod = tested._catalog_argmod('cc')
+        self.assertIs(tested._catalog_argmod('cc'), mod)
+        self.assertIs(mod._all_arguments['CCFLAGS']['converter'], SConsArguments.Util.flags2list)
+        self.assertIsNone(tested._catalog_argmod('inexistent'))
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__catalog_4(self):
+        """SConsArguments.Importer._catalog_argmod() should ignore catalogs of unsupported version"""
+        filename = os.path.join(self.tmpdir, 'catalog.json')
+        data = { 'version' : tested._catalog_version + 1,
+                 'modules' : { 'foo' : { 'modname' : 'foo', 'arguments' : {}, 'groups' : {} } } }
+        with open(filename, 'w') as f:
+            json.dump(data, f)
+        with mock.patch('SConsArguments.Importer._catalog_file', filename):
+            self.assertIsNone(tested._catalog_argmod('foo'))
+            data['version'] = tested._catalog_version
+            with open(filename, 'w') as f:
+                json.dump(data, f)
+            os.utime(filename, (0, 0))
+            self.assertIsInstance(tested._catalog_argmod('foo'), types.ModuleType)
+        self.assertIsNone(tested._catalog_argmod('foo'))
+
+    def test__catalog_ref_1(self):
+        """Test SConsArguments.Importer._catalog_ref()"""
+        self.assertEqual(tested._catalog_ref(SConsArguments.Util.flags2list), 'SConsArguments.Util.flags2list')
+        self.assertEqual(tested._catalog_ref(int), 'builtins.int')
+        self.assertIs(tested._catalog_deref('builtins.int'), int)
+        with self.assertRaisesRegexp(ValueError, "can't store a reference"):
+            tested._catalog_ref(lambda x : x)
+
+#############################################################################
+class Test__argmod_arguments(unittest.TestCase):
+    def setUp(self):
+        self.mod = types.ModuleType('fakemod')
+        self.calls = []
+        def arguments(**kw):
+            self.calls.append(kw)
+            return { 'arg1' : { 'help' : 'arg1' }, 'arg2' : { 'help' : 'arg2' } }
+        self.mod.arguments = arguments
+
+    def test__argmod_arguments_1(self):
+        """Test SConsArguments.Importer._argmod_arguments() memoizes results"""
+        res1 = tested._argmod_arguments(self.mod, include_groups = ['flags'])
+        res2 = tested._argmod_arguments(self.mod, include_groups = ['flags'])
+        self.assertEqual(res1, res2)
+        self.assertEqual(self.calls, [{'include_groups' : ['flags']}])
+
+    def test__argmod_arguments_2(self):
+        """Test SConsArguments.Importer._argmod_arguments() returns fresh copies"""
+        res1 = tested._argmod_arguments(self.mod)
+        res1['arg1']['help'] = 'modified'
+        del res1['arg2']
+        res2 = tested._argmod_arguments(self.mod)
+        self.assertEqual(res2, { 'arg1' : { 'help' : 'arg1' }, 'arg2' : { 'help' : 'arg2' } })
+
+    def test__argmod_arguments_3(self):
+        """Test SConsArguments.Importer._argmod_arguments() with distinct keywords"""
+        tested._argmod_arguments(self.mod, foo = 'FOO')
+        tested._argmod_arguments(self.mod, foo = 'BAR')
+        tested._argmod_arguments(self.mod, foo = 'FOO')
+        self.assertEqual(self.calls, [{'foo' : 'FOO'}, {'foo' : 'BAR'}])
+
+    def test__argmod_arguments_4(self):
+        """Test SConsArguments.Importer._argmod_arguments() with unhashable keywords"""
+        class Unhashable(object):
+            __hash__ = None
+        tested._argmod_arguments(self.mod, foo = Unhashable())
+        tested._argmod_arguments(self.mod, foo = Unhashable())
+        self.assertEqual(len(self.calls), 2)
+
+    def test__argmod_arguments_5(self):
+        """Test SConsArguments.Importer._argmod_arguments() returns deep copies"""
+        self.mod.arguments = lambda **kw : { 'arg1' : { 'default' : ['-g'], 'choices' : ['a', 'b'] } }
+        res1 = tested._argmod_arguments(self.mod)
+        res1['arg1']['default'].append('-O2')
+        res1['arg1']['choices'].remove('a')
+        res2 = tested._argmod_arguments(self.mod)
+        self.assertEqual(res2, { 'arg1' : { 'default' : ['-g'], 'choices' : ['a', 'b'] } })
+
+    def test__argmod_arguments_7(self):
+        """Test SConsArguments.Importer._argmod_arguments() copies only mutable values"""
+        self.mod.arguments = lambda **kw : { 'arg1' : { 'help' : 'arg1', 'default' : ['-g'], 'converter' : int } }
+        res1 = tested._argmod_arguments(self.mod)
+        res2 = tested._argmod_arguments(self.mod)
+        self.assertIs(res1['arg1']['help'], res2['arg1']['help'])
+        self.assertIs(res1['arg1']['converter'], int)
+        self.assertIsNot(res1['arg1']['default'], res2['arg1']['default'])
+
+    def test__argmod_arguments_6(self):
+        """Test mutating declarations loaded from a cached module doesn't affect later imports"""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(tmpdir, 'mutmod.py'), 'w') as f:
+                f.write("def arguments(**kw):\n    return {'arg1' : {'help' : 'arg1', 'default' : ['-g']}}\n")
+            mod = tested._load_module_file('mutmod', [tmpdir])
+            decls1 = tested._load_decls(tested._argmod_arguments(mod))
+            decls1['arg1'].get_var_decl()['default'].append('-O2')
+            mod = tested._load_module_file('mutmod', [tmpdir])
+            decls2 = tested._load_decls(tested._argmod_arguments(mod))
+            self.assertEqual(decls2['arg1'].get_var_decl()['default'], ['-g'])
+            self.assertEqual(decls2['arg1'].get_env_decl()['default'], ['-g'])
+        finally:
+            shutil.rmtree(tmpdir)
+            tested._argmod_cache.clear()
+
 #############################################################################
 class Test__handle_site_scons_dir(unittest.TestCase):
     @unittest.skipIf(_mock_missing, "requires mock module")
@@ -343,6 +592,25 @@ class Test__initDefaultArgpath(unittest.TestCase):
             self.assertIsInstance(tested._defaultArgpath, list)
             self.assertEqual(tested._defaultArgpath, ['topdir/path/site_scons'])
 
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__initDefaultArgpath_4(self):
+        """Test SConsArguments.Importer._initDefaultArgpath() with --no-site-dir stored as site_dir = False"""
+        def get_option(name):
+            if name == 'site_dir':
+                return False
+            raise AttributeError("'Values' object has no attribute '%s'" % name)
+
+        with self.mocks1() as m:
+
+            m.GetOption.side_effect = get_option
+
+            tested._defaultArgpath = None
+            tested._initDefaultArgpath()
+
+            m._handle_site_scons_dir.assert_not_called()
+            m._handle_all_site_scons_dirs.assert_not_called()
+            self.assertEqual(tested._defaultArgpath, [])
+
 #############################################################################
 class Test_GetDefaultArgpath(unittest.TestCase):
     def test_GetDefaultArgpath_1(self):
@@ -552,6 +820,13 @@ class Test__load_decls(unittest.TestCase):
         self.assertEqual(declo['arg1'].get_var_decl()['help'], 'This is arg1')
         self.assertEqual(declo['arg2'].get_var_decl()['help'], 'This is arg2')
 
+    def test__load_decls_ose_1(self):
+        """Test SConsArguments.Importer._load_decls({'arg1' : {...}}, ose_key_transform = True, ose_key_prefix = ...)"""
+        decli = { 'arg1' : {'help' : 'This is arg1'} }
+        self.assertFalse(tested._load_decls(decli)['arg1'].has_ose_decl())
+        declo = tested._load_decls(decli, ose_key_transform = True, ose_key_prefix = 'MY_')
+        self.assertEqual(declo['arg1'].get_ose_key(), 'MY_arg1')
+
     def test__load_decls_3(self):
         """Test SConsArguments.Importer._load_decls({'arg1' : {...}}, name_filter = lambda x : ...)"""
         declo = tested._load_decls({ 'arg1' : {'help' : 'This is arg1'}, 'arg2' : {'help' : 'This is arg2' }}, name_filter = lambda x : (x == 'arg1'))
@@ -583,6 +858,85 @@ class Test__load_decls(unittest.TestCase):
         self.assertEqual(declo['arg1'].get_var_decl()['help'], 'This is arg1')
         self.assertFalse('arg2' in declo)
 
+    def test__load_decls_7(self):
+        """Test SConsArguments.Importer._load_decls({'arg1' : {...}}, preprocessor = ..., env_key_prefix = ...)"""
+        decli = { 'arg1' : {'help' : 'This is arg1'}, 'arg2' : {'help' : 'This is arg2', 'env_key' : 'ARG_2' } }
+        def preprocessor(decl):
+            decl = decl.copy()
+            decl['help'] = decl['help'].upper()
+            return decl
+        declo = tested._load_decls(decli, preprocessor = preprocessor, env_key_prefix = 'pre_')
+        self.assertEqual(declo['arg1'].get_var_decl()['help'], 'THIS IS ARG1')
+        self.assertEqual(declo['arg1'].get_env_key(), 'pre_arg1')
+        self.assertEqual(declo['arg2'].get_env_key(), 'ARG_2')
+        self.assertEqual(decli['arg1'], {'help' : 'This is arg1'})
+
+    def test__load_decls_8(self):
+        """SConsArguments.Importer._load_decls({'arg1' : 'foo'}) should raise TypeError"""
+        with self.assertRaisesRegexp(TypeError, "Unsupported decl type %s" % type('foo')):
+            tested._load_decls({'arg1' : 'foo'})
+
+    def test__load_decls_9(self):
+        """Test SConsArguments.Importer._load_decls({'arg1' : {...}}, name_filter = [<glob>, ...])"""
+        decli = { 'CC' : {}, 'CFLAGS' : {}, 'CXXFLAGS' : {}, 'LINK' : {} }
+        declo = tested._load_decls(decli, name_filter = ['*FLAGS', 'CC'])
+        self.assertEqual(sorted(declo.keys()), ['CC', 'CFLAGS', 'CXXFLAGS'])
+        declo = tested._load_decls(decli, name_filter = 'CXX*')
+        self.assertEqual(sorted(declo.keys()), ['CXXFLAGS'])
+
+#############################################################################
+class Test__compile_name_filter(unittest.TestCase):
+    def test__compile_name_filter_1(self):
+        """SConsArguments.Importer._compile_name_filter(None) should accept everything"""
+        f = tested._compile_name_filter(None)
+        self.assertTrue(f('foo'))
+
+    def test__compile_name_filter_2(self):
+        """SConsArguments.Importer._compile_name_filter(callable) should return the callable"""
+        f = lambda x : x == 'foo'
+        self.assertIs(tested._compile_name_filter(f), f)
+
+    def test__compile_name_filter_3(self):
+        """Test SConsArguments.Importer._compile_name_filter([...])"""
+        for name_filter in [ ['foo', 'ba?'], ('foo', 'ba?'), {'foo', 'ba?'}, frozenset(['foo', 'ba?']) ]:
+            f = tested._compile_name_filter(name_filter)
+            self.assertTrue(f('foo'))
+            self.assertTrue(f('bar'))
+            self.assertTrue(f('baz'))
+            self.assertFalse(f('ba'))
+            self.assertFalse(f('barr'))
+            self.assertFalse(f('fooo'))
+
+    def test__compile_name_filter_4(self):
+        """SConsArguments.Importer._compile_name_filter() should reuse compiled filters"""
+        f1 = tested._compile_name_filter(['foo', '*bar'])
+        f2 = tested._compile_name_filter(('*bar', 'foo'))
+        self.assertIs(f1, f2)
+
+#############################################################################
+class Test__nameconv_for(unittest.TestCase):
+    def test__nameconv_for_1(self):
+        """SConsArguments.Importer._nameconv_for() should reuse converters created from same keywords"""
+        nc1, force1 = tested._nameconv_for({'env_key_prefix' : 'foo_', 'help' : 'x'})
+        nc2, force2 = tested._nameconv_for({'env_key_prefix' : 'foo_'})
+        self.assertIsInstance(nc1, SConsArguments.NameConv._ArgumentNameConv)
+        self.assertIs(nc1, nc2)
+        self.assertFalse(force1)
+        self.assertFalse(force2)
+        self.assertEqual(nc1.env_key_prefix, 'foo_')
+        nc3, force3 = tested._nameconv_for({'env_key_prefix' : 'bar_'})
+        self.assertIsNot(nc1, nc3)
+
+    def test__nameconv_for_2(self):
+        """SConsArguments.Importer._nameconv_for() should return nameconv provided by user"""
+        nc = SConsArguments.NameConv._ArgumentNameConv()
+        self.assertEqual(tested._nameconv_for({'nameconv' : nc}), (nc, True))
+
+    def test__nameconv_for_3(self):
+        """SConsArguments.Importer._nameconv_for({'nameconv' : 'foo'}) should raise TypeError"""
+        with self.assertRaisesRegexp(TypeError, "The nameconv must be an instance of _ArgumentNameConv, not %r" % 'foo'):
+            tested._nameconv_for({'nameconv' : 'foo'})
+
 #############################################################################
 class Test__import_argmod(unittest.TestCase):
     def test__import_argmod_1(self):
@@ -672,6 +1026,153 @@ class Test_ImportArguments(unittest.TestCase):
             mock_load_decls.assert_called_once_with({'arg1' : {'help' : 'This is arg1'}}, name_filter = ['arg1', 'baaz'], foo = 'FOO')
             mock_mod.arguments.assert_called_once_with(name_filter = ['arg1', 'baaz'], foo = 'FOO')
 
+#############################################################################
+class Test__LazyArgumentDeclarations(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.mod1 = self._fakemod('mod1', { 'arg1' : { 'help' : 'arg1 from mod1' },
+                                            'arg2' : { 'help' : 'arg2 from mod1' } })
+        self.mod2 = self._fakemod('mod2', { 'arg2' : { 'help' : 'arg2 from mod2' },
+                                            'arg3' : { 'help' : 'arg3 from mod2' } })
+
+    def _fakemod(self, name, args):
+        mod = types.ModuleType(name)
+        def arguments(**kw):
+            self.calls.append(name)
+            return args
+        mod.arguments = arguments
+        return mod
+
+    def test__LazyArgumentDeclarations_1(self):
+        """ImportArguments(..., lazy = True) should not load modules before they're needed"""
+        decls = tested.ImportArguments([self.mod1, self.mod2], lazy = True)
+        self.assertIsInstance(decls, tested._LazyArgumentDeclarations)
+        self.assertEqual(self.calls, [])
+        self.assertEqual(decls.pending(), [self.mod1, self.mod2])
+
+    def test__LazyArgumentDeclarations_2(self):
+        """Test _LazyArgumentDeclarations loads only the module owning the queried argument"""
+        decls = tested.ImportArguments([self.mod1, self.mod2], lazy = True)
+        self.assertTrue('arg1' in decls)
+        self.assertFalse('arg4' in decls)
+        self.assertEqual(decls.pending(), [self.mod1, self.mod2])
+        self.assertEqual(decls['arg1'].get_var_decl()['help'], 'arg1 from mod1')
+        self.assertEqual(decls.pending(), [self.mod2])
+        self.assertEqual(decls.get('arg3').get_var_decl()['help'], 'arg3 from mod2')
+        self.assertEqual(decls.pending(), [])
+
+    def test__LazyArgumentDeclarations_3(self):
+        """Test _LazyArgumentDeclarations gives precedence to later modules"""
+        decls = tested.ImportArguments([self.mod1, self.mod2], lazy = True)
+        self.assertEqual(decls['arg2'].get_var_decl()['help'], 'arg2 from mod2')
+        self.assertEqual(decls['arg1'].get_var_decl()['help'], 'arg1 from mod1')
+        self.assertEqual(decls['arg2'].get_var_decl()['help'], 'arg2 from mod2')
+
+    def test__LazyArgumentDeclarations_4(self):
+        """Test _LazyArgumentDeclarations is equivalent to eagerly imported declarations"""
+        eager = tested.ImportArguments([self.mod1, self.mod2], env_key_prefix = 'X_')
+        lazy = tested.ImportArguments([self.mod1, self.mod2], lazy = True, env_key_prefix = 'X_')
+        self.assertEqual(sorted(lazy.keys()), sorted(eager.keys()))
+        self.assertEqual(len(lazy), len(eager))
+        self.assertEqual(lazy.pending(), [self.mod1, self.mod2])
+        for ns in range(0, SConsArguments.Util.ALL):
+            self.assertEqual(lazy.get_rename_dict(ns), eager.get_rename_dict(ns))
+        self.assertEqual(lazy.pending(), [])
+        self.assertEqual(lazy.get_key(SConsArguments.Util.ENV, 'arg3'), 'X_arg3')
+
+    def test__LazyArgumentDeclarations_5(self):
+        """Test _LazyArgumentDeclarations.commit() loads all modules"""
+        decls = tested.ImportArguments([self.mod1, self.mod2], lazy = True)
+        decls.commit()
+        self.assertEqual(decls.pending(), [])
+        self.assertEqual(len(decls), 3)
+
+    def test__LazyArgumentDeclarations_6(self):
+        """Test _LazyArgumentDeclarations with arguments declared by user"""
+        decls = tested.ImportArguments([self.mod1, self.mod2], lazy = True)
+        decls['arg4'] = SConsArguments.Declarations.DeclareArgument(help = 'arg4')
+        del decls['arg3']
+        self.assertEqual(decls.pending(), [self.mod1])
+        self.assertFalse('arg3' in decls)
+        self.assertEqual(sorted(decls.keys()), ['arg1', 'arg2', 'arg4'])
+
+    def test__LazyArgumentDeclarations_7(self):
+        """Test _LazyArgumentDeclarations with name_filter"""
+        decls = tested.ImportArguments([self.mod1, self.mod2], lazy = True, name_filter = ['arg1', 'arg3'])
+        self.assertFalse('arg2' in decls)
+        self.assertEqual(sorted(decls.keys()), ['arg1', 'arg3'])
+
+    def test__LazyArgumentDeclarations_8(self):
+        """Test _LazyArgumentDeclarations doesn't load modules overridden by the owner of queried argument"""
+        mod3 = self._fakemod('mod3', { 'arg4' : { 'help' : 'arg4 from mod3' } })
+        decls = tested.ImportArguments([self.mod1, self.mod2, mod3], lazy = True)
+        self.assertEqual(decls.get_key(SConsArguments.Util.VAR, 'arg4'), 'arg4')
+        self.assertEqual(self.calls, ['mod3'])
+        self.assertEqual(decls.pending(), [self.mod1, self.mod2])
+        self.assertEqual(decls['arg3'].get_var_decl()['help'], 'arg3 from mod2')
+        self.assertEqual(self.calls, ['mod3', 'mod2'])
+        self.assertEqual(decls.pending(), [self.mod1])
+        self.assertEqual(sorted(decls), ['arg1', 'arg2', 'arg3', 'arg4'])
+        self.assertEqual(decls.pending(), [self.mod1])
+
+    @unittest.skipIf(_mock_missing, "requires mock module")
+    def test__LazyArgumentDeclarations_9(self):
+        """Test _LazyArgumentDeclarations takes names of bundled modules from the catalog"""
+        with mock.patch('SConsArguments.Importer.GetDefaultArgpath', return_value = []), \
+             mock.patch('SConsArguments.Importer._import_argmod', side_effect = tested._import_argmod) as mock_import_argmod:
+            decls = tested.ImportArguments(['cc', 'link'], lazy = True)
+            self.assertTrue('LINKFLAGS' in decls)
+            self.assertTrue('CFLAGS' in decls)
+            self.assertFalse('NOTANARG' in decls)
+            self.assertIn('CC', decls.keys())
+            self.assertFalse(mock_import_argmod.called)
+            self.assertEqual(decls['CC'].get_var_decl()['key'], 'CC')
+            mock_import_argmod.assert_called_once_with('cc', None)
+            self.assertEqual(decls.pending(), ['link'])
+
+#############################################################################
+class Test__origins(unittest.TestCase):
+    def _fakemod(self, name, args):
+        mod = types.ModuleType(name)
+        mod.arguments = lambda **kw : args
+        return mod
+
+    def setUp(self):
+        self.mod1 = self._fakemod('mod1', { 'arg1' : {}, 'arg2' : {} })
+        self.mod2 = self._fakemod('mod2', { 'arg2' : {}, 'arg3' : {} })
+
+    def test__get_origins_1(self):
+        """_get_origins() should map imported arguments to their modules"""
+        decls = tested.ImportArguments([self.mod1, self.mod2])
+        self.assertEqual(tested._get_origins(decls), { 'arg1' : 'mod1', 'arg2' : 'mod2', 'arg3' : 'mod2' })
+
+    def test__get_origins_2(self):
+        """_get_origins() should skip arguments removed from declarations"""
+        decls = tested.ImportArguments([self.mod1])
+        del decls['arg1']
+        self.assertEqual(tested._get_origins(decls), { 'arg2' : 'mod1' })
+
+    def test__get_origins_3(self):
+        """_get_origins() should return origins of lazily loaded arguments"""
+        decls = tested.ImportArguments([self.mod1, self.mod2], lazy = True)
+        self.assertEqual(tested._get_origins(decls), {})
+        decls['arg3']
+        self.assertEqual(tested._get_origins(decls), { 'arg2' : 'mod2', 'arg3' : 'mod2' })
+
+    def test__get_origins_4(self):
+        """_get_origins() should return empty dict for declarations not created by ImportArguments()"""
+        self.assertEqual(tested._get_origins(SConsArguments.DeclareArguments()), {})
+
+    def test__get_groups_1(self):
+        """_get_groups() should map imported arguments to groups of their modules"""
+        self.mod1._groups = { 'progs' : ['arg1'], 'flags' : ['arg2'], 'all' : ['arg1', 'arg2'] }
+        decls = tested.ImportArguments([self.mod1, self.mod2])
+        self.assertEqual(tested._get_groups(decls), { 'arg1' : ['all', 'progs'], 'arg2' : [], 'arg3' : [] })
+        decls = tested.ImportArguments([self.mod2, self.mod1], lazy = True)
+        decls['arg1']
+        self.assertEqual(tested._get_groups(decls), { 'arg1' : ['all', 'progs'], 'arg2' : ['all', 'flags'] })
+        self.assertEqual(tested._get_groups(SConsArguments.DeclareArguments()), {})
+
 #############################################################################
 class Test_export_arguments(unittest.TestCase):
     """Test case for SConsArguments.Importer.export_arguments()"""
@@ -775,6 +1276,45 @@ class Test_export_arguments(unittest.TestCase):
         result = tested.export_arguments('foomod', arguments, groups, foomod_exclude_groups = ['inexistent'])
         self.assertEqual(result, expected)
 
+    def test_export_arguments_11(self):
+        groups = dict(self.groupsFixture, g12 = ['VAR2', 'VAR3'])
+        arguments = self.argsFixture
+        expected = { k : arguments[k] for k in ['VAR1'] }
+        result = tested.export_arguments('foomod', arguments, groups, include_groups = 'g1 & !g12')
+        self.assertEqual(result, expected)
+        expected = { k : arguments[k] for k in ['VAR1', 'VAR5', 'VAR6'] }
+        result = tested.export_arguments('foomod', arguments, groups, include_groups = '(g1 | g3) & !(inexistent | g2)', exclude_groups = 'g1 & g12')
+        self.assertEqual(result, expected)
+        expected = { k : arguments[k] for k in ['VAR4', 'VAR5', 'VAR6'] }
+        result = tested.export_arguments('foomod', arguments, groups, include_groups = '!g1&!g12')
+        self.assertEqual(result, expected)
+
+    def test_export_arguments_12(self):
+        groups = dict(self.groupsFixture, g12 = ['VAR2', 'VAR3'])
+        arguments = self.argsFixture
+        expected = { k : arguments[k] for k in ['VAR1', 'VAR2', 'VAR3'] }
+        result = tested.export_arguments('foomod', arguments, groups, include_groups = 'g1*')
+        self.assertEqual(result, expected)
+        expected = { k : arguments[k] for k in ['VAR4', 'VAR5', 'VAR6'] }
+        result = tested.export_arguments('foomod', arguments, groups, exclude_groups = ['g?2', 'g1'])
+        self.assertEqual(result, expected)
+
+    def test_export_arguments_13(self):
+        groups = self.groupsFixture
+        arguments = self.argsFixture
+        result1 = tested.export_arguments('foomod', arguments, groups, include_groups = 'g1')
+        groups2 = dict(groups, g1 = ['VAR6'])
+        result2 = tested.export_arguments('foomod', arguments, groups2, include_groups = 'g1')
+        self.assertEqual(sorted(result1), ['VAR1', 'VAR2'])
+        self.assertEqual(sorted(result2), ['VAR6'])
+
+    def test_export_arguments_14(self):
+        groups = self.groupsFixture
+        arguments = self.argsFixture
+        for expr in ['g1 &', '(g1', 'g1)', '!', 'g1 g2', '']:
+            with self.assertRaisesRegexp(ValueError, "invalid group expression"):
+                tested.export_arguments('foomod', arguments, groups, include_groups = expr)
+
 
 #############################################################################
 if __name__ == "__main__":
@@ -782,6 +1322,10 @@ if __name__ == "__main__":
     suite = unittest.TestSuite()
     # Load tests to test suite
     tclasses = [ Test__load_module_file
+               , Test__cached_argmod
+               , Test__argdir_index
+               , Test__catalog
+               , Test__argmod_arguments
                , Test__handle_site_scons_dir
                , Test__handle_all_site_scons_dirs
                , Test__initDefaultArgpath
@@ -789,8 +1333,12 @@ if __name__ == "__main__":
                , Test__load_dict_decl
                , Test__load_decl
                , Test__load_decls
+               , Test__compile_name_filter
+               , Test__nameconv_for
                , Test__import_argmod
                , Test_ImportArguments
+               , Test__LazyArgumentDeclarations
+               , Test__origins
                , Test_export_arguments
                ]
 
@@ -0,0 +1,219 @@
+""" `SConsArguments.InstrumentationTests`
+
+Unit tests for `SConsArguments.Instrumentation`
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsArguments
+import SConsArguments.Instrumentation as Instrumentation
+import SCons.Variables
+import unittest
+import tempfile
+import json
+import os
+import sys
+
+#############################################################################
+class Test_Instrumentation(unittest.TestCase):
+    def setUp(self):
+        self.saved = (Instrumentation.active, Instrumentation._summary,
+                      Instrumentation._trace, Instrumentation._atexit_registered)
+        # don't let atexit report anything from within tests
+        Instrumentation._atexit_registered = True
+        Instrumentation.Reset()
+
+    def tearDown(self):
+        (Instrumentation.active, Instrumentation._summary,
+         Instrumentation._trace, Instrumentation._atexit_registered) = self.saved
+        Instrumentation.Reset()
+
+    def test_phase_1(self):
+        """Instrumentation.phase() should record nothing when disabled"""
+        Instrumentation.Disable()
+        with Instrumentation.phase('foo'):
+            pass
+        self.assertEqual(Instrumentation.GetData()['phases'], {})
+
+    def test_phase_2(self):
+        """Instrumentation.phase() should record calls and time when enabled"""
+        Instrumentation.Enable(summary = False)
+        with Instrumentation.phase('foo'):
+            pass
+        with Instrumentation.phase('foo'):
+            pass
+        calls, total = Instrumentation.GetData()['phases']['foo']
+        self.assertEqual(calls, 2)
+        self.assertTrue(total >= 0.0)
+
+    def test_instrumented_1(self):
+        """Instrumentation.instrumented() should measure decorated function"""
+        @Instrumentation.instrumented('bar')
+        def bar(x):
+            return x + 1
+        Instrumentation.Enable(summary = False)
+        self.assertEqual(bar(1), 2)
+        self.assertEqual(Instrumentation.GetData()['phases']['bar'][0], 1)
+        self.assertEqual(bar.__name__, 'bar')
+
+    def test_count_1(self):
+        """Instrumentation.count() should increment counters"""
+        Instrumentation.count('foo')
+        Instrumentation.count('foo', 2)
+        self.assertEqual(Instrumentation.GetData()['counters'], {'foo' : 3})
+
+    def test_FormatSummary_1(self):
+        """Instrumentation.FormatSummary() should list phases, counters and variables"""
+        Instrumentation.Enable(summary = False)
+        with Instrumentation.phase('foo'):
+            pass
+        Instrumentation.count('bar')
+        Instrumentation.variable_time('converter', 'geez', 0.5)
+        summary = Instrumentation.FormatSummary()
+        self.assertIn('foo', summary)
+        self.assertIn('bar', summary)
+        self.assertIn('geez (converter)', summary)
+
+    def test_WriteTrace_1(self):
+        """Instrumentation.WriteTrace() should write Chrome trace events"""
+        Instrumentation.Enable(summary = False, trace = os.devnull)
+        with Instrumentation.phase('foo', x = 1):
+            pass
+        Instrumentation.count('bar')
+        fd, filename = tempfile.mkstemp(suffix = '.json')
+        os.close(fd)
+        try:
+            Instrumentation.WriteTrace(filename)
+            with open(filename) as f:
+                data = json.load(f)
+        finally:
+            os.remove(filename)
+        events = dict((e['name'], e) for e in data['traceEvents'])
+        self.assertEqual(events['foo']['ph'], 'X')
+        self.assertEqual(events['foo']['args'], {'x' : 1})
+        self.assertEqual(events['bar']['ph'], 'C')
+        self.assertEqual(events['bar']['args'], {'count' : 1})
+
+    def test__enable_from_environment_1(self):
+        """Instrumentation._enable_from_environment() should parse SCONSARGUMENTS_INSTRUMENT"""
+        Instrumentation._enable_from_environment('summary, trace=foo.json')
+        self.assertTrue(Instrumentation.active)
+        self.assertTrue(Instrumentation._summary)
+        self.assertEqual(Instrumentation._trace, 'foo.json')
+
+    def test__enable_from_environment_2(self):
+        """Instrumentation._enable_from_environment() should ignore unknown values"""
+        Instrumentation.Disable()
+        Instrumentation._enable_from_environment('bogus')
+        self.assertFalse(Instrumentation.active)
+
+    def test_hooks_1(self):
+        """Instrumentation should measure commit and Postprocess"""
+        Instrumentation.Enable(summary = False)
+        decls = SConsArguments.DeclareArguments(
+            foo = { 'env_key' : 'ENV_FOO', 'var_key' : 'VAR_FOO',
+                    'default' : 'x', 'converter' : lambda v : v + 'y' }
+        )
+        env = {}
+        variables = SCons.Variables.Variables(args = {'VAR_FOO' : 'z'})
+        args = decls.Commit(env, variables)
+        args.Postprocess(env, variables)
+        data = Instrumentation.GetData()
+        self.assertEqual(env['ENV_FOO'], 'zy')
+        for name in ('commit', 'add_to', 'Postprocess', 'Update.convert'):
+            self.assertIn(name, data['phases'])
+        self.assertIn(('converter', 'VAR_FOO'), data['variables'])
+        self.assertIn('Util._resubst', data['counters'])
+
+#############################################################################
+class Test_MemoryReport(unittest.TestCase):
+    def _decls(self):
+        return SConsArguments.DeclareArguments(
+            foo = { 'env_key' : 'ENV_FOO', 'var_key' : 'VAR_FOO', 'default' : 'x',
+                    'help' : 'Help for foo' },
+            bar = { 'env_key' : 'ENV_BAR', 'opt_key' : 'OPT_BAR', 'option' : '--bar',
+                    'help' : 'Help for bar' }
+        )
+
+    def test_MemoryReport_1(self):
+        """MemoryReport() should break down bytes by category and namespace"""
+        decls = self._decls()
+        report = Instrumentation.MemoryReport(decls)
+        self.assertEqual(set(report['categories']), set(['declarations', 'help', 'supplementary']))
+        self.assertEqual(set(report['namespaces']), set(['ENV', 'VAR', 'OPT']))
+        self.assertEqual(report['total'], sum(report['categories'].values()))
+        self.assertEqual(list(report['modules']), [Instrumentation._unattributed])
+
+    def test_MemoryReport_2(self):
+        """MemoryReport() should count objects shared between its arguments once"""
+        decls = self._decls()
+        env = { 'ENV_FOO' : ['a', 'list', 'value'] }
+        args = decls.Commit()
+        alone = Instrumentation.MemoryReport(decls)['total']
+        report = Instrumentation.MemoryReport(decls, args, args.EnvProxy(env), env = env)
+        self.assertIn('values', report['categories'])
+        self.assertTrue(report['total'] > alone)
+        self.assertTrue(report['total'] < 2 * alone + report['categories']['values'])
+
+    def test_MemoryReport_3(self):
+        """MemoryReport() should attribute imported arguments to their modules"""
+        import types
+        mod = types.ModuleType('mod1')
+        mod.arguments = lambda **kw : { 'geez' : { 'help' : 'Help for geez' } }
+        decls = SConsArguments.ImportArguments([mod])
+        decls.update(self._decls())
+        modules = Instrumentation.MemoryReport(decls)['modules']
+        self.assertEqual(set(modules), set(['mod1', Instrumentation._unattributed]))
+
+    def test_MemoryReport_4(self):
+        """MemoryReport() should raise TypeError for unsupported objects"""
+        with self.assertRaises(TypeError):
+            Instrumentation.MemoryReport({})
+
+    def test_FormatMemoryReport_1(self):
+        """FormatMemoryReport() should list categories, modules and namespaces"""
+        text = Instrumentation.FormatMemoryReport(Instrumentation.MemoryReport(self._decls()))
+        for word in ('declarations', 'help', 'supplementary', 'ENV', 'VAR', 'OPT'):
+            self.assertIn(word, text)
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_Instrumentation
+               , Test_MemoryReport
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
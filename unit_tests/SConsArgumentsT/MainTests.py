@@ -0,0 +1,263 @@
+""" `SConsArguments.MainTests`
+
+Unit tests for `SConsArguments.__main__`
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsArguments
+import SConsArguments.__main__ as tested
+import unittest
+import tempfile
+import shutil
+import threading
+import socket
+import json
+import os
+import sys
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+#############################################################################
+class Test_main(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.argpath = SConsArguments.Importer._defaultArgpath
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        SConsArguments.Importer._defaultArgpath = self.argpath
+
+    def _main(self, *argv):
+        out = StringIO()
+        status = tested.main(['--no-site-dir'] + list(argv), out)
+        return (status, out.getvalue())
+
+    def _write(self, name, text):
+        filename = os.path.join(self.tmpdir, name)
+        with open(filename, 'w') as f:
+            f.write(text)
+        return filename
+
+    def test_list_1(self):
+        """main(['list']) should list arguments of selected modules"""
+        (status, output) = self._main('-m', 'cc', 'list', 'CPP*')
+        self.assertEqual(status, 0)
+        self.assertEqual([l.split()[0] for l in output.splitlines()], ['CPPDEFINES', 'CPPFLAGS', 'CPPPATH'])
+        self.assertTrue(all(l.endswith(' (cc:flags)') for l in output.splitlines()))
+        (status, output) = self._main('-m', 'cc', 'list', 'progs')
+        self.assertEqual(status, 0)
+        self.assertEqual([l.split()[0] for l in output.splitlines()], ['CC', 'SHCC'])
+
+    def test_list_2(self):
+        """main(['list', '--json']) should print the declaration schema"""
+        (status, output) = self._main('-m', 'cc', 'list', '--json')
+        self.assertEqual(status, 0)
+        schema = json.loads(output)
+        self.assertEqual(schema['arguments']['CC']['module'], 'cc')
+        self.assertEqual(schema['arguments']['CC']['groups'], ['progs'])
+
+    def test_list_3(self):
+        """main(['-I', dir, ...]) should import arguments from modules found in dir"""
+        self._write('foo.py', "def arguments(**kw):\n    return { 'FOO' : { 'help' : 'Foo help' } }\n")
+        (status, output) = self._main('-I', self.tmpdir, '-m', 'foo', 'list')
+        self.assertEqual(status, 0)
+        self.assertEqual(output.split()[:4], ['FOO', 'FOO', 'FOO', '-'])
+
+    def test_help_1(self):
+        """main(['help', pattern]) should print help for matching variables"""
+        (status, output) = self._main('-m', 'cc', 'help', 'CFLAGS')
+        self.assertEqual(status, 0)
+        self.assertIn('CFLAGS: ', output)
+        self.assertNotIn('CCFLAGS: ', output)
+
+    def test_dump_values_1(self):
+        """main(['dump-values', file]) should print converted values"""
+        filename = self._write('vars.py', "CC = 'clang'\nCCFLAGS = '-O2 -g'\n")
+        (status, output) = self._main('-m', 'cc', 'dump-values', filename)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, "CC = 'clang'\nCCFLAGS = ['-O2', '-g']\n")
+        (status, output) = self._main('-m', 'cc', 'dump-values', '--json', filename)
+        self.assertEqual(json.loads(output), { 'CC' : 'clang', 'CCFLAGS' : ['-O2', '-g'] })
+
+    def test_dump_values_2(self):
+        """main(['dump-values', file]) should report errors in the file and return 2"""
+        broken = self._write('broken.py', "CC = \n")
+        stderr, sys.stderr = sys.stderr, StringIO()
+        try:
+            (status, output) = self._main('-m', 'cc', 'dump-values', broken)
+        finally:
+            stderr, sys.stderr = sys.stderr, stderr
+        self.assertEqual(status, 2)
+        self.assertEqual(output, '')
+        self.assertTrue(stderr.getvalue().startswith('%s: %s: error: ' % (tested._prog, broken)))
+
+    def test_check_1(self):
+        """main(['check', ...]) should report unknown variables and broken files"""
+        good = self._write('good.py', "CC = 'clang'\n")
+        bad = self._write('bad.py', "CC = 'clang'\nCCC = 'x'\n")
+        broken = self._write('broken.py', "CC = \n")
+        (status, output) = self._main('-m', 'cc', 'check', good)
+        self.assertEqual(status, 0)
+        self.assertEqual(output, '%s: OK\n' % good)
+        (status, output) = self._main('-m', 'cc', 'check', good, bad, broken)
+        self.assertEqual(status, 1)
+        lines = output.splitlines()
+        self.assertEqual(lines[1], "%s: unknown variable 'CCC', did you mean 'CC'?" % bad)
+        self.assertTrue(lines[2].startswith('%s: error: ' % broken))
+
+    def test_errors_1(self):
+        """main() should return 2 if modules can't be imported"""
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            (status, output) = self._main('-m', 'inexistent_module', 'list')
+        finally:
+            sys.stderr = stderr
+        self.assertEqual(status, 2)
+
+#############################################################################
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "requires Unix domain sockets")
+class Test_serve(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.tmpdir, 'sock')
+        self.argpath = SConsArguments.Importer._defaultArgpath
+        self.cwd = os.getcwd()
+        os.chdir(self.tmpdir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmpdir)
+        SConsArguments.Importer._defaultArgpath = self.argpath
+
+    def _main(self, *argv):
+        out = StringIO()
+        status = tested.main(['--no-site-dir', '--socket', self.socket] + list(argv), out)
+        return (status, out.getvalue())
+
+    def test_Session_1(self):
+        """_Session should reuse declarations and values until files change"""
+        with open('vars.py', 'w') as f:
+            f.write("CC = 'clang'\n")
+        opts = tested._parser().parse_args(['--no-site-dir', '-m', 'cc', 'serve'])
+        session = tested._Session(opts)
+        request = { 'config' : tested._config(opts), 'cwd' : self.tmpdir,
+                    'request' : { 'command' : 'dump-values', 'json' : False, 'file' : 'vars.py' } }
+        reply = session(request)
+        self.assertEqual(reply, { 'status' : 0, 'output' : "CC = 'clang'\n", 'errors' : '' })
+        decls = session.decls
+        self.assertEqual(list(session.cache), [ os.path.join(os.path.realpath(self.tmpdir), 'vars.py') ])
+        session.cache[list(session.cache)[0]][1][0]['CC'] = 'cached'
+        self.assertEqual(session(request)['output'], "CC = 'cached'\n")
+        self.assertIs(session.decls, decls)
+        with open('vars.py', 'w') as f:
+            f.write("CC = 'gcc'\nCXX = 'g++'\n")
+        self.assertEqual(session(request)['output'], "CC = 'gcc'\n")
+        self.assertIs(session.decls, decls)
+
+    def test_Session_2(self):
+        """_Session should refuse requests for other declarations"""
+        opts = tested._parser().parse_args(['--no-site-dir', '-m', 'cc', 'serve'])
+        other = tested._parser().parse_args(['--no-site-dir', '-m', 'link', 'list'])
+        session = tested._Session(opts)
+        reply = session({ 'config' : tested._config(other), 'request' : { 'command' : 'list' } })
+        self.assertIsNone(reply['status'])
+        self.assertIsNone(session.decls)
+
+    def test_serve_1(self):
+        """main(['serve']) should answer commands sent by other main() calls"""
+        out = StringIO()
+        thread = threading.Thread(target = tested.main,
+                                  args = (['--no-site-dir', '-m', 'cc', '--socket', self.socket, 'serve'], out))
+        thread.daemon = True
+        thread.start()
+        for i in range(100):
+            if os.path.exists(self.socket):
+                break
+            thread.join(0.1)
+        with open('vars.py', 'w') as f:
+            f.write("CC = 'clang'\nCCC = 'x'\n")
+        (status, output) = self._main('-m', 'cc', 'check', 'vars.py')
+        self.assertEqual((status, output), (1, "vars.py: unknown variable 'CCC', did you mean 'CC'?\n"))
+        self.assertEqual(self._main('-m', 'cc', 'serve', '--stop'), (0, ''))
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket))
+        # no daemon, evaluated in-process
+        (status, output) = self._main('-m', 'cc', 'check', 'vars.py')
+        self.assertEqual((status, output), (1, "vars.py: unknown variable 'CCC', did you mean 'CC'?\n"))
+
+    def test_serve_2(self):
+        """main(['serve']) should keep serving after a malformed variables file"""
+        out = StringIO()
+        thread = threading.Thread(target = tested.main,
+                                  args = (['--no-site-dir', '-m', 'cc', '--socket', self.socket, 'serve'], out))
+        thread.daemon = True
+        thread.start()
+        for i in range(100):
+            if os.path.exists(self.socket):
+                break
+            thread.join(0.1)
+        with open('bad.py', 'w') as f:
+            f.write("CC = \n")
+        with open('vars.py', 'w') as f:
+            f.write("CC = 'clang'\n")
+        stderr, sys.stderr = sys.stderr, StringIO()
+        try:
+            (status, output) = self._main('-m', 'cc', 'dump-values', 'bad.py')
+            errors = sys.stderr.getvalue()
+        finally:
+            stderr, sys.stderr = sys.stderr, stderr
+        self.assertEqual((status, output), (2, ''))
+        self.assertTrue(errors.startswith('%s: bad.py: error: ' % tested._prog))
+        self.assertTrue(thread.is_alive())
+        self.assertEqual(self._main('-m', 'cc', 'dump-values', 'vars.py'), (0, "CC = 'clang'\n"))
+        self.assertEqual(self._main('-m', 'cc', 'serve', '--stop'), (0, ''))
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_main
+               , Test_serve
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
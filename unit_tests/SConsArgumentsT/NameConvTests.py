@@ -142,6 +142,44 @@ class Test__ArgumentNameConv(unittest.TestCase):
         d2 = nc2.name2dict('FOO')
         self.assertEqual(d2, {})
 
+    def test__ArgumentNameConv_name2ose_1(self):
+        """Test _ArgumentNameConv.name2ose()"""
+        nc = SConsArguments.NameConv._ArgumentNameConv()
+        self.assertIs(nc.name2ose('FOO'), None)
+        nc = SConsArguments.NameConv._ArgumentNameConv(ose_key_transform = True,
+                                                       ose_key_prefix = 'MY_',
+                                                       ose_key_suffix = '_ESO')
+        self.assertEqual(nc.name2ose('FOO'), 'MY_FOO_ESO')
+        self.assertEqual(nc.name2dict('FOO')['ose_key'], 'MY_FOO_ESO')
+        nc = SConsArguments.NameConv._ArgumentNameConv(ose_key_transform = lambda x : x.upper())
+        self.assertEqual(nc.names2dicts(['foo'])['foo']['ose_key'], 'FOO')
+
+    def test__ArgumentNameConv_names2dicts_1(self):
+        """Test _ArgumentNameConv.names2dicts() with default settings"""
+        nc = SConsArguments.NameConv._ArgumentNameConv()
+        d = nc.names2dicts(['FOO', 'BAR'])
+        self.assertEqual(d, {'FOO' : nc.name2dict('FOO'),
+                             'BAR' : nc.name2dict('BAR')})
+        self.assertEqual(nc.names2dicts([]), {})
+
+    def test__ArgumentNameConv_names2dicts_2(self):
+        """_ArgumentNameConv.names2dicts() should return fresh dictionaries"""
+        nc = SConsArguments.NameConv._ArgumentNameConv()
+        d1 = nc.names2dicts(['FOO'])
+        d1['FOO']['env_key'] = 'XXX'
+        d2 = nc.names2dicts(['FOO'])
+        self.assertEqual(d2['FOO']['env_key'], 'FOO')
+        self.assertIsNot(d1['FOO'], d2['FOO'])
+
+    def test__ArgumentNameConv_names2dicts_3(self):
+        """_ArgumentNameConv.names2dicts() should respect changed prefixes"""
+        nc = SConsArguments.NameConv._ArgumentNameConv()
+        self.assertEqual(nc.names2dicts(['FOO'])['FOO']['env_key'], 'FOO')
+        nc.env_key_prefix = 'ENV_'
+        self.assertEqual(nc.names2dicts(['FOO'])['FOO']['env_key'], 'ENV_FOO')
+        nc.opt_name_suffix = '_NO'
+        self.assertEqual(nc.names2dicts(['FOO'])['FOO']['option'], '--foo-NO')
+
 #############################################################################
 if __name__ == "__main__":
     ldr = unittest.TestLoader()
@@ -0,0 +1,147 @@
+""" `SConsArguments.ProfilesTests`
+
+Unit tests for `SConsArguments.Profiles`
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsArguments.Profiles as tested
+from SConsArguments.Defaults import DefaultsCache
+from SConsArguments.Util import MISSING
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+#############################################################################
+class _ProfileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.executed = []
+        self.exec_layer = tested._exec_layer
+        def exec_layer(path, content):
+            self.executed.append(os.path.basename(path))
+            return self.exec_layer(path, content)
+        tested._exec_layer = exec_layer
+
+    def tearDown(self):
+        tested._exec_layer = self.exec_layer
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, text, mtime = None):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+#############################################################################
+class Test_LoadProfile(_ProfileTestCase):
+    def test_LoadProfile_1(self):
+        """LoadProfile(layers) should merge layers in order of precedence and record provenance"""
+        defaults = self.write('defaults.py', "CC = 'cc'\nCFLAGS = '-O2'\nLD = 'ld'\n")
+        site = self.write('site.py', "import os\nCC = 'gcc'\n")
+        ci = tested.ProfileLayer(self.write('ci.py', "CFLAGS = '-O0'\nLD = 'gold'\n"), name = 'ci', cache = None)
+        user = tested.ProfileLayer(self.write('user.py', "LD = 'lld'\n"), cache = None)
+        layers = [ tested.ProfileLayer(defaults, cache = None),
+                   tested.ProfileLayer(site, cache = None),
+                   tested.ProfileLayer(os.path.join(self.tmpdir, 'missing.py'), cache = None),
+                   user, ci ]
+        user.precedence = -1
+        profile = tested.LoadProfile(layers)
+        self.assertIsInstance(profile, tested.ProfileValues)
+        self.assertEqual(profile, { 'CC' : 'gcc', 'CFLAGS' : '-O0', 'LD' : 'gold' })
+        self.assertEqual(profile.provenance, { 'CC' : site, 'CFLAGS' : 'ci', 'LD' : 'ci' })
+        self.assertEqual(profile.layers[0], user)
+
+    def test_LoadProfile_2(self):
+        """LoadProfile(layers) should raise UserError for missing required layers"""
+        import SCons.Errors
+        layer = tested.ProfileLayer(os.path.join(self.tmpdir, 'ci.py'), name = 'ci', required = True, cache = None)
+        with self.assertRaises(SCons.Errors.UserError) as cm:
+            tested.LoadProfile(layer)
+        self.assertIn('ci', str(cm.exception))
+
+#############################################################################
+class Test_ProfileLayer(_ProfileTestCase):
+    def test_load_1(self):
+        """ProfileLayer(filename).load() should execute the file only when its contents change"""
+        a = self.write('a.py', "A = 'a'\n", 1000000)
+        b = self.write('b.py', "B = 'b'\n", 1000000)
+        layers = [ tested.ProfileLayer(a, cache = None), tested.ProfileLayer(b, cache = None) ]
+        self.assertEqual(tested.LoadProfile(layers), { 'A' : 'a', 'B' : 'b' })
+        self.assertEqual(sorted(self.executed), ['a.py', 'b.py'])
+        self.assertEqual(tested.LoadProfile(layers), { 'A' : 'a', 'B' : 'b' })
+        self.write('a.py', "A = 'a'\n", 2000000) # touched only
+        self.write('b.py', "B = 'bb'\n", 1000000)
+        self.assertEqual(tested.LoadProfile(layers), { 'A' : 'a', 'B' : 'bb' })
+        self.assertEqual(sorted(self.executed), ['a.py', 'b.py', 'b.py'])
+
+    @unittest.skipIf(sys.version_info < (3,), "JSON strings come back as unicode in python 2")
+    def test_load_2(self):
+        """ProfileLayer(filename, cache = cache).load() should take values of unchanged files from persistent cache"""
+        cache = DefaultsCache(os.path.join(self.tmpdir, 'cache.json'))
+        a = self.write('a.py', "import os\nA = ['a', 1]\n")
+        self.assertEqual(tested.ProfileLayer(a, cache = cache).load(), { 'A' : ['a', 1] })
+        cache.flush()
+        del tested._parsed_layers[os.path.abspath(a)]
+        cache = DefaultsCache(os.path.join(self.tmpdir, 'cache.json'))
+        self.assertEqual(tested.ProfileLayer(a, cache = cache).load(), { 'A' : ['a', 1] })
+        self.assertEqual(self.executed, ['a.py'])
+
+    def test_load_3(self):
+        """ProfileLayer(filename, cache = cache).load() should keep values not representable in JSON in memory only"""
+        cache = DefaultsCache(os.path.join(self.tmpdir, 'cache.json'))
+        a = self.write('a.py', "A = ('a', 1)\n")
+        self.assertEqual(tested.ProfileLayer(a, cache = cache).load(), { 'A' : ('a', 1) })
+        self.assertEqual(tested.ProfileLayer(a, cache = cache).load(), { 'A' : ('a', 1) })
+        self.assertEqual(self.executed, ['a.py'])
+        self.assertIs(cache.lookup('profile:' + os.path.abspath(a), tested._parsed_layers[os.path.abspath(a)][1]),
+                      MISSING)
+        del tested._parsed_layers[os.path.abspath(a)]
+        self.assertEqual(tested.ProfileLayer(a, cache = cache).load(), { 'A' : ('a', 1) })
+        self.assertEqual(self.executed, ['a.py', 'a.py'])
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_LoadProfile
+               , Test_ProfileLayer
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
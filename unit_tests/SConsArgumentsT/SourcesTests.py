@@ -0,0 +1,229 @@
+""" `SConsArguments.SourcesTests`
+
+Unit tests for `SConsArguments.Sources`
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsArguments.Sources as tested
+from SConsArguments.Defaults import DefaultsCache
+import unittest
+import threading
+import tempfile
+import shutil
+import json
+import time
+import os
+import sys
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+#############################################################################
+class _Source(tested.ValueSource):
+    def __init__(self, values, delay = 0, **kw):
+        super(_Source, self).__init__(**kw)
+        self.values = values
+        self.delay = delay
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        time.sleep(self.delay)
+        if isinstance(self.values, Exception):
+            raise self.values
+        return self.values
+
+#############################################################################
+class _ConfigService(object):
+    """Stand-in for a configuration service"""
+
+    def __init__(self, values):
+        service = self
+        self.values = values
+        self.requests = 0
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                service.requests += 1
+                data = json.dumps(service.values).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            def log_message(self, *args):
+                pass
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d/config' % self.server.server_address[1]
+        self.thread = threading.Thread(target = self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+#############################################################################
+class Test_LoadSources(unittest.TestCase):
+    def test_LoadSources_1(self):
+        """LoadSources(sources) should merge values according to precedence"""
+        sources = [ _Source({ 'a' : 'A1', 'b' : 'B1' }, precedence = 1),
+                    _Source({ 'a' : 'A0', 'c' : 'C0' }),
+                    _Source({ 'b' : 'B2' }, precedence = 1) ]
+        self.assertEqual(tested.LoadSources(sources), { 'a' : 'A1', 'b' : 'B2', 'c' : 'C0' })
+
+    def test_LoadSources_2(self):
+        """LoadSources(sources) should load sources concurrently"""
+        sources = [ _Source({ 'a' : i }, delay = 0.3) for i in range(4) ]
+        start = time.time()
+        self.assertEqual(tested.LoadSources(sources), { 'a' : 3 })
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_LoadSources_3(self):
+        """LoadSources(sources) should ignore broken optional sources and raise UserError for required ones"""
+        import SCons.Errors
+        broken = _Source(ValueError('broken'))
+        self.assertEqual(tested.LoadSources([ _Source({ 'a' : 'A' }), broken ]), { 'a' : 'A' })
+        self.assertEqual(str(broken.error), 'broken')
+        self.assertEqual(tested.LoadSources([ _Source(['not', 'a', 'dict']) ]), {})
+        with self.assertRaises(SCons.Errors.UserError) as cm:
+            tested.LoadSources([ _Source(ValueError('broken'), name = 'foo', required = True) ])
+        self.assertIn('foo', str(cm.exception))
+
+#############################################################################
+class Test_ValueSource(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_ttl_1(self):
+        """ValueSource(ttl = ttl) should reload values when they expire"""
+        forever = _Source({ 'a' : 'A' })
+        never = _Source({ 'a' : 'A' }, ttl = 0)
+        short = _Source({ 'a' : 'A' }, ttl = 0.2)
+        for i in range(3):
+            tested.LoadSources([ forever, never, short ])
+        self.assertEqual((forever.loads, never.loads, short.loads), (1, 3, 1))
+        time.sleep(0.3)
+        tested.LoadSources([ short ])
+        self.assertEqual(short.loads, 2)
+
+    def test_ttl_2(self):
+        """ValueSource should use expired values if it can't be loaded"""
+        source = _Source({ 'a' : 'A' }, ttl = 0.1)
+        tested.LoadSources([ source ])
+        time.sleep(0.2)
+        source.values = IOError('service is down')
+        self.assertEqual(tested.LoadSources([ source ]), { 'a' : 'A' })
+        self.assertEqual(source.loads, 2)
+
+    def test_cache_1(self):
+        """ValueSource(ttl = ttl, cache = cache) should keep values in persistent cache"""
+        filename = os.path.join(self.tmpdir, 'cache.json')
+        cache = DefaultsCache(filename)
+        source = _Source({ 'a' : 'A' }, name = 'foo', ttl = 60, cache = cache)
+        tested.LoadSources([ source ])
+        cache.flush()
+        # as if in the next SCons run
+        source = _Source({ 'a' : 'B' }, name = 'foo', ttl = 60, cache = DefaultsCache(filename))
+        self.assertEqual(tested.LoadSources([ source ]), { 'a' : 'A' })
+        self.assertEqual(source.loads, 0)
+
+    def test_JSONFileSource_1(self):
+        """JSONFileSource(filename) should read values from file, when it changes"""
+        filename = os.path.join(self.tmpdir, 'values.json')
+        source = tested.JSONFileSource(filename)
+        self.assertEqual(tested.LoadSources([ source ]), {})
+        with open(filename, 'w') as f:
+            json.dump({ 'a' : 'A' }, f)
+        self.assertEqual(tested.LoadSources([ source ]), { 'a' : 'A' })
+        with open(filename, 'w') as f:
+            json.dump({ 'a' : 'AA' }, f)
+        self.assertEqual(tested.LoadSources([ source ]), { 'a' : 'AA' })
+
+    def test_DictSource_1(self):
+        """DictSource(mapping) should take values from mapping each time"""
+        mapping = { 'a' : 'A' }
+        source = tested.DictSource(mapping)
+        self.assertEqual(tested.LoadSources([ source ]), { 'a' : 'A' })
+        mapping['a'] = 'B'
+        self.assertEqual(tested.LoadSources([ source ]), { 'a' : 'B' })
+
+    def test_URLSource_1(self):
+        """URLSource(url) should fetch values from configuration service"""
+        service = _ConfigService({ 'cc' : 'clang' })
+        try:
+            cache = DefaultsCache(os.path.join(self.tmpdir, 'cache.json'))
+            source = tested.URLSource(service.url, cache = cache)
+            local = tested.JSONFileSource(os.path.join(self.tmpdir, 'none.json'), precedence = 1)
+            self.assertEqual(tested.LoadSources([ source, local ]), { 'cc' : 'clang' })
+            service.values = { 'cc' : 'gcc' }
+            self.assertEqual(tested.LoadSources([ source, local ]), { 'cc' : 'clang' })
+            self.assertEqual(service.requests, 1)
+            self.assertEqual(tested.LoadSources([ tested.URLSource(service.url, ttl = 0) ]), { 'cc' : 'gcc' })
+        finally:
+            service.close()
+
+    def test_URLSource_2(self):
+        """URLSource(url) should not keep fetched values in the defaults cache"""
+        import SConsArguments.Defaults
+        service = _ConfigService({ 'cc' : 'clang' })
+        saved = SConsArguments.Defaults._defaults_cache
+        filename = os.path.join(self.tmpdir, 'defaults.json')
+        SConsArguments.Defaults.SetDefaultsCache(filename)
+        try:
+            source = tested.URLSource(service.url)
+            self.assertEqual(tested.LoadSources([ source ]), { 'cc' : 'clang' })
+            self.assertEqual(tested.LoadSources([ source ]), { 'cc' : 'clang' })
+            self.assertEqual(service.requests, 1)
+            SConsArguments.Defaults.GetDefaultsCache().flush()
+            self.assertFalse(os.path.exists(filename))
+        finally:
+            SConsArguments.Defaults._defaults_cache = saved
+            service.close()
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test_LoadSources
+               , Test_ValueSource
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
@@ -0,0 +1,102 @@
+""" `SConsArguments.SuggestionsTests`
+
+Unit tests for `SConsArguments.Suggestions`
+"""
+
+__docformat__ = "restructuredText"
+
+#
+# Copyright (c) 2017 by Pawel Tomulik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE
+
+import SConsArguments.Suggestions as tested
+import unittest
+import sys
+
+#############################################################################
+class Test__SuggestionIndex(unittest.TestCase):
+    words = ['CC', 'CFLAGS', 'CCFLAGS', 'CXX', 'CXXFLAGS', 'CPPPATH', 'LINKFLAGS']
+
+    def test_suggest_1(self):
+        """_SuggestionIndex(words).suggest(word) should return similar words, best first"""
+        index = tested._SuggestionIndex(self.words)
+        self.assertEqual(index.suggest('CXXFLAG'), ['CXXFLAGS', 'CFLAGS', 'CCFLAGS'])
+        self.assertEqual(index.suggest('CXXFLAG', 1), ['CXXFLAGS'])
+        self.assertEqual(index.suggest('cpppath'), ['CPPPATH'])
+        self.assertEqual(index.suggest('CPPATH'), ['CPPPATH'])
+        self.assertEqual(index.suggest('LNKFLAGS', 1), ['LINKFLAGS'])
+        self.assertEqual(index.suggest('CC_'), ['CC'])
+        self.assertEqual(index.suggest('PREFIX'), [])
+        self.assertEqual(index.suggest(''), [])
+
+    def test_suggest_2(self):
+        """_SuggestionIndex(words).suggest(word) should rank only best candidates of large indexes"""
+        words = ['V%04dFLAGS' % i for i in range(5000)]
+        index = tested._SuggestionIndex(words + ['CXXFLAGS'])
+        self.assertEqual(len(index), 5001)
+        self.assertEqual(index.suggest('CXXFLAG', 1), ['CXXFLAGS'])
+        self.assertEqual(index.suggest('V1234FLAG', 1), ['V1234FLAGS'])
+
+    def test_suggest_3(self):
+        """_SuggestionIndex(words).suggest(word) should find short names with transposed letters"""
+        index = tested._SuggestionIndex(['CC', 'CXX'])
+        self.assertEqual(index.suggest('CCX'), ['CC', 'CXX'])
+        words = ['V%04dFLAGS' % i for i in range(5000)]
+        index = tested._SuggestionIndex(words + ['CC', 'CXX'])
+        self.assertEqual(index.suggest('CCX', 2), ['CC', 'CXX'])
+
+    def test_add_1(self):
+        """_SuggestionIndex().add(words) should index new words"""
+        index = tested._SuggestionIndex()
+        self.assertEqual(index.suggest('CC_'), [])
+        index.add(['CC', 'CC'])
+        self.assertIn('CC', index)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.suggest('CC_'), ['CC'])
+
+#############################################################################
+class Test__did_you_mean(unittest.TestCase):
+    def test__did_you_mean_1(self):
+        """_did_you_mean(suggestions) should format a question"""
+        self.assertEqual(tested._did_you_mean([]), '')
+        self.assertEqual(tested._did_you_mean(['A']), "did you mean 'A'?")
+        self.assertEqual(tested._did_you_mean(['A', 'B']), "did you mean 'A' or 'B'?")
+        self.assertEqual(tested._did_you_mean(['A', 'B', 'C']), "did you mean 'A', 'B' or 'C'?")
+
+#############################################################################
+if __name__ == "__main__":
+    ldr = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    # Load tests to test suite
+    tclasses = [ Test__SuggestionIndex
+               , Test__did_you_mean
+               ]
+
+    for tclass in tclasses:
+        suite.addTests(ldr.loadTestsFromTestCase(tclass))
+
+    if not unittest.TextTestRunner(verbosity = 2).run(suite).wasSuccessful():
+        sys.exit(1)
+
+# Local Variables:
+# # tab-width:4
+# # indent-tabs-mode:nil
+# # End:
+# vim: set syntax=python expandtab tabstop=4 shiftwidth=4:
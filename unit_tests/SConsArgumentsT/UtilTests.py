@@ -42,9 +42,12 @@ class Test_module_constants(unittest.TestCase):
     def test_OPT(self):
         """Test 'Util.OPT'"""
         self.assertEqual(tested.OPT,2)
+    def test_OSE(self):
+        """Test 'Util.OSE'"""
+        self.assertEqual(tested.OSE,3)
     def test_ALL(self):
         """Test 'Util.ALL'"""
-        self.assertEqual(tested.ALL,3)
+        self.assertEqual(tested.ALL,4)
     def test_MISSING(self):
         """Test 'Util.MISSING'"""
         self.assertIs(tested.MISSING, tested._missing)
@@ -152,6 +155,103 @@ class Test__invert_dict(unittest.TestCase):
         """_invert_dict({ 'v' : 'w', 'x' : 'y' }) should == { 'w' : 'v', 'y' : 'x'}"""
         self.assertEqual(tested._invert_dict({'v' : 'w', 'x' : 'y'}), { 'w' : 'v', 'y' : 'x'})
 
+#############################################################################
+class Test__canonical_value(unittest.TestCase):
+    """Test SConsArguments.Util._canonical_value() function"""
+    def test__canonical_value_1(self):
+        """_canonical_value() should distinguish values of different types"""
+        values = [ None, tested.UNDEFINED, True, 1, '1', ['1'], ('1',), {'1' : 1}, set(['1']) ]
+        self.assertEqual(len(set(tested._canonical_value(v) for v in values)), len(values))
+    def test__canonical_value_2(self):
+        """_canonical_value() should not depend on order of items in dicts and sets"""
+        d1 = dict([('a', 1), ('b', [2, 3]), ('c', 'C')])
+        d2 = dict([('c', 'C'), ('b', [2, 3]), ('a', 1)])
+        self.assertEqual(tested._canonical_value(d1), tested._canonical_value(d2))
+        self.assertEqual(tested._canonical_value(set('abc')), tested._canonical_value(set('cba')))
+    def test__canonical_value_3(self):
+        """_canonical_value() should represent CLVar same as list"""
+        self.assertEqual(tested._canonical_value(SCons.Util.CLVar('-g -O2')), tested._canonical_value(['-g', '-O2']))
+        self.assertNotEqual(tested._canonical_value(['-g', '-O2']), tested._canonical_value(['-g -O2']))
+    def test__canonical_value_4(self):
+        """_canonical_value() should rename placeholders at any depth"""
+        self.assertEqual(tested._canonical_value(['$ENV_FOO', {'x' : '${ENV_FOO}'}], {'ENV_FOO' : '${foo}'}),
+                         tested._canonical_value(['${foo}', {'x' : '${foo}'}]))
+
+#############################################################################
+class Test__value_digest(unittest.TestCase):
+    """Test SConsArguments.Util._value_digest() function"""
+    def test__value_digest_1(self):
+        """_value_digest() should depend on both the key and value"""
+        self.assertEqual(tested._value_digest('foo', 'x'), tested._value_digest('foo', 'x'))
+        self.assertNotEqual(tested._value_digest('foo', 'x'), tested._value_digest('bar', 'x'))
+        self.assertNotEqual(tested._value_digest('foo', 'x'), tested._value_digest('foo', 'y'))
+
+#############################################################################
+class Test__json_value(unittest.TestCase):
+    """Test SConsArguments.Util._json_value() function"""
+    def test__json_value_1(self):
+        """_json_value() should leave plain values and convert containers"""
+        self.assertEqual(tested._json_value([None, True, 1, 1.5, 'x']), [None, True, 1, 1.5, 'x'])
+        self.assertEqual(tested._json_value({1 : ('a', set(['c', 'b']))}), {'1' : ['a', ['b', 'c']]})
+        self.assertEqual(tested._json_value(SCons.Util.CLVar('-g -O2')), ['-g', '-O2'])
+    def test__json_value_2(self):
+        """_json_value() should represent callables by name and other objects by str()"""
+        self.assertEqual(tested._json_value(tested.flags2list), 'SConsArguments.Util.flags2list')
+        self.assertEqual(tested._json_value(1j), '1j')
+        class _Obj(object):
+            def __str__(self): return 'obj'
+        self.assertEqual(tested._json_value(_Obj()), 'obj')
+
+#############################################################################
+class Test__json_exact(unittest.TestCase):
+    """Test SConsArguments.Util._json_exact() function"""
+    def test__json_exact_1(self):
+        """_json_exact() should accept values surviving a JSON round-trip"""
+        self.assertTrue(tested._json_exact({'a' : ['b', 1, 2.5, None, True], 'c' : {}}))
+        self.assertTrue(tested._json_exact(float('nan')))
+    def test__json_exact_2(self):
+        """_json_exact() should reject values changed by a JSON round-trip"""
+        self.assertFalse(tested._json_exact(('a', 'b')))
+        self.assertFalse(tested._json_exact({'a' : ('b',)}))
+        self.assertFalse(tested._json_exact({1 : 'a'}))
+        self.assertFalse(tested._json_exact(object()))
+
+#############################################################################
+class Test__placeholders(unittest.TestCase):
+    """Test SConsArguments.Util._placeholders() function"""
+    def test__placeholders_1(self):
+        """_placeholders() should find names referenced by placeholders"""
+        self.assertEqual(tested._placeholders('$a ${b}/c $$d ${e.f}'), set(['a', 'b']))
+    def test__placeholders_2(self):
+        """_placeholders() should search lists and ignore other values"""
+        self.assertEqual(tested._placeholders(['$a', ('${b}',)]), set(['a', 'b']))
+        self.assertEqual(tested._placeholders(None), set())
+        self.assertEqual(tested._placeholders({'$a' : '$b'}), set())
+
+#############################################################################
+class Test__expand_placeholders(unittest.TestCase):
+    """Test SConsArguments.Util._expand_placeholders() function"""
+    def test__expand_placeholders_1(self):
+        """_expand_placeholders() should replace known placeholders only"""
+        self.assertEqual(tested._expand_placeholders('$a ${b} $c $$a', {'a' : 'A', 'b' : 'B'}), 'A B $c $$a')
+    def test__expand_placeholders_2(self):
+        """_expand_placeholders() should join lists and stringify other values"""
+        self.assertEqual(tested._expand_placeholders(['$a', 'x', 1], {'a' : 'A'}), 'A x 1')
+        self.assertEqual(tested._expand_placeholders(None, {}), '')
+        self.assertEqual(tested._expand_placeholders(tested.UNDEFINED, {}), '')
+
+#############################################################################
+class Test__find_cycle(unittest.TestCase):
+    """Test SConsArguments.Util._find_cycle() function"""
+    def test__find_cycle_1(self):
+        """_find_cycle() should return None for acyclic graphs"""
+        self.assertIsNone(tested._find_cycle({}))
+        self.assertIsNone(tested._find_cycle({'a' : ['b', 'c'], 'b' : ['c'], 'c' : ['x']}))
+    def test__find_cycle_2(self):
+        """_find_cycle() should return a cycle"""
+        self.assertEqual(tested._find_cycle({'a' : ['a']}), ['a', 'a'])
+        self.assertEqual(tested._find_cycle({'a' : ['b'], 'b' : ['c'], 'c' : ['b']}), ['b', 'c', 'b'])
+
 #############################################################################
 class Test__flags2list(unittest.TestCase):
     def test__flags2list_0(self):
@@ -239,6 +339,13 @@ if __name__ == "__main__":
                , Test__build_iresubst_dict
                , Test__compose_mappings
                , Test__invert_dict
+               , Test__canonical_value
+               , Test__value_digest
+               , Test__json_value
+               , Test__json_exact
+               , Test__placeholders
+               , Test__expand_placeholders
+               , Test__find_cycle
                , Test__flags2list
                , Test__paths2list
                , Test__cdefs2list
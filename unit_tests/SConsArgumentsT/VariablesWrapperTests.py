@@ -107,6 +107,75 @@ class Test__VariablesWrapper(unittest.TestCase):
         self.assertEqual(env, {'c' : 'C def', 'b' : 'B file', 'd' :'D', 'e' : 'E converted', 'f' : None, 'g' : 'G', 'h' : 'H def'})
         self.assertEqual(variables.unknown, {'z' : 'Z'})
 
+    class _Env(dict):
+        def subst(self, s):
+            return str(self[s.lstrip('$').strip('{}')])
+
+    def _help_variables(self):
+        import SCons.Variables
+        variables = SCons.Variables.Variables()
+        variables.Add('A', 'A help', 'a')
+        variables.Add('B', 'B help', 'b')
+        variables.Add('C', 'C help', 'c')
+        return variables
+
+    def test_GenerateHelpText_1(self):
+        """<_VariablesWrapper>.GenerateHelpText(env, select = ...) should render selected variables only"""
+        variables = self._help_variables()
+        env = Test__VariablesWrapper._Env(A = 'x', C = 'z')
+        wrapper = SConsArguments._VariablesWrapper(variables)
+        full = wrapper.GenerateHelpText(env)
+        text = wrapper.GenerateHelpText(env, select = lambda k : k != 'B', cache = None)
+        self.assertEqual(full, variables.GenerateHelpText(env))
+        self.assertIn('A help', text)
+        self.assertNotIn('B help', text)
+        self.assertIn('C help', text)
+        self.assertEqual(text, full.replace(variables.FormatVariableHelpText(env, 'B', 'B help', 'b', None, []), ''))
+
+    def test_GenerateHelpText_2(self):
+        """<_VariablesWrapper>.GenerateHelpText(env, output = f) should write the text of each variable to f"""
+        class _Output(object):
+            def __init__(self): self.chunks = []
+            def write(self, s): self.chunks.append(s)
+        variables = self._help_variables()
+        env = Test__VariablesWrapper._Env(A = 'x')
+        output = _Output()
+        text = SConsArguments._VariablesWrapper(variables).GenerateHelpText(env, True, output = output, cache = None)
+        self.assertEqual(len(output.chunks), 3)
+        self.assertEqual(''.join(output.chunks), text)
+        self.assertEqual(text, variables.GenerateHelpText(env, True))
+
+    def test_GenerateHelpText_3(self):
+        """<_VariablesWrapper>.GenerateHelpText(env, cache = c) should reuse texts cached for unchanged variables"""
+        import tempfile, shutil, os
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cache = SConsArguments.DefaultsCache(os.path.join(tmpdir, 'cache.json'))
+            variables = self._help_variables()
+            variables.FormatVariableHelpText = mock.Mock(side_effect = lambda *args : '%s=%s\n' % args[1:5:3])
+            env = Test__VariablesWrapper._Env(A = 'x')
+            wrapper = SConsArguments._VariablesWrapper(variables)
+            text1 = wrapper.GenerateHelpText(env, cache = cache)
+            self.assertEqual(variables.FormatVariableHelpText.call_count, 3)
+            text2 = wrapper.GenerateHelpText(env, cache = cache)
+            self.assertEqual(variables.FormatVariableHelpText.call_count, 3)
+            self.assertEqual(text1, text2)
+            env['A'] = 'y'
+            text3 = wrapper.GenerateHelpText(env, cache = cache)
+            self.assertEqual(variables.FormatVariableHelpText.call_count, 4)
+            self.assertEqual(text3, 'A=y\nB=None\nC=None\n')
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_GenerateHelpText_4(self):
+        """<_VariablesWrapper>.GenerateHelpText(env, select = ...) should not use the defaults cache"""
+        variables = self._help_variables()
+        env = Test__VariablesWrapper._Env(A = 'x')
+        with mock.patch('SConsArguments.Defaults.GetDefaultsCache') as mock_GetDefaultsCache:
+            text = SConsArguments._VariablesWrapper(variables).GenerateHelpText(env, select = lambda k : True)
+            mock_GetDefaultsCache.assert_not_called()
+        self.assertEqual(text, variables.GenerateHelpText(env))
+
 #############################################################################
 if __name__ == "__main__":
     ldr = unittest.TestLoader()
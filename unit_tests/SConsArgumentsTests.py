@@ -34,7 +34,10 @@ import SConsArguments.Arguments
 import SConsArguments.VariablesWrapper
 import SConsArguments.Declaration
 import SConsArguments.Declarations
+import subprocess
 import unittest
+import sys
+import os
 
 #############################################################################
 class Test_module_imports(unittest.TestCase):
@@ -78,6 +81,9 @@ class Test_module_imports(unittest.TestCase):
     def test_OPT(self):
         "Test SConsArguments.OPT, should be SConsArguments.Util.OPT"
         self.assertIs(SConsArguments.OPT,SConsArguments.Util.OPT)
+    def test_OSE(self):
+        "Test SConsArguments.OSE, should be SConsArguments.Util.OSE"
+        self.assertIs(SConsArguments.OSE,SConsArguments.Util.OSE)
     def test_ALL(self):
         "Test SConsArguments.ALL, should be SConsArguments.Util.ALL"
         self.assertIs(SConsArguments.ALL,SConsArguments.Util.ALL)
@@ -120,6 +126,65 @@ class Test_module_imports(unittest.TestCase):
     def test_ImportArguments(self):
         "Test SConsArguments._ImportArguments, should be SConsArguments.Importer.ImportArguments"
         self.assertIs(SConsArguments.ImportArguments,SConsArguments.Importer.ImportArguments)
+    def test_LazyDefault(self):
+        "Test SConsArguments.LazyDefault, should be SConsArguments.Defaults.LazyDefault"
+        self.assertIs(SConsArguments.LazyDefault,SConsArguments.Defaults.LazyDefault)
+    def test_GenerateCompletion(self):
+        "Test SConsArguments.GenerateCompletion, should be SConsArguments.Completion.GenerateCompletion"
+        self.assertIs(SConsArguments.GenerateCompletion,SConsArguments.Completion.GenerateCompletion)
+    def test_LoadProfile(self):
+        "Test SConsArguments.LoadProfile, should be SConsArguments.Profiles.LoadProfile"
+        self.assertIs(SConsArguments.LoadProfile,SConsArguments.Profiles.LoadProfile)
+    def test_ValueSource(self):
+        "Test SConsArguments.ValueSource, should be SConsArguments.Sources.ValueSource"
+        self.assertIs(SConsArguments.ValueSource,SConsArguments.Sources.ValueSource)
+
+#############################################################################
+@unittest.skipIf(sys.version_info < (3,7), "requires python >= 3.7 (PEP 562, -X importtime)")
+class Test_lazy_imports(unittest.TestCase):
+    """Test lazy loading of SConsArguments submodules"""
+
+    # Cumulative time (in microseconds) allowed for "import SConsArguments"
+    import_time_budget = 50000
+
+    def _importtime(self, code):
+        env = dict(os.environ, PYTHONPATH = os.pathsep.join(sys.path))
+        proc = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', code],
+                                stdout = subprocess.PIPE, stderr = subprocess.PIPE, env = env)
+        out, err = proc.communicate()
+        self.assertEqual(proc.returncode, 0, err)
+        times = {}
+        for line in err.decode('utf-8', 'replace').splitlines():
+            if line.startswith('import time:') and not line.rstrip().endswith('| imported package'):
+                fields = line[len('import time:'):].split('|')
+                times[fields[2].strip()] = int(fields[1])
+        return times
+
+    def test_import_package(self):
+        "Test that 'import SConsArguments' imports no submodules and stays within time budget"
+        times = self._importtime('import SConsArguments')
+        self.assertIn('SConsArguments', times)
+        self.assertEqual([m for m in times if m.startswith('SConsArguments.')], [])
+        self.assertLess(times['SConsArguments'], self.import_time_budget)
+
+    def test_DeclareArguments(self):
+        "Test that using SConsArguments.DeclareArguments doesn't import Importer and SCons.Script"
+        times = self._importtime('import SConsArguments; SConsArguments.DeclareArguments')
+        self.assertIn('SConsArguments.Declarations', times)
+        self.assertNotIn('SConsArguments.Importer', times)
+        self.assertNotIn('SCons.Script.Main', times)
+
+    def test_ImportArguments(self):
+        "Test that SConsArguments.ImportArguments is loaded on demand"
+        times = self._importtime('from SConsArguments import ImportArguments')
+        self.assertIn('SConsArguments.Importer', times)
+        self.assertNotIn('SCons.Script.Main', times)
+
+    def test_dir(self):
+        "Test that dir(SConsArguments) lists lazy attributes"
+        names = dir(SConsArguments)
+        self.assertIn('ImportArguments', names)
+        self.assertIn('Importer', names)
 
 #############################################################################
 if __name__ == "__main__":
@@ -127,6 +192,7 @@ if __name__ == "__main__":
     suite = unittest.TestSuite()
     # Load tests to test suite
     tclasses = [ Test_module_imports
+               , Test_lazy_imports
                ]
 
     for tclass in tclasses: